@@ -1,18 +1,22 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
+import asyncio
 import logging
 
+from backend.config import Config
+from backend.utils.strategy_dedup import StrategyDeduplicator, strategy_deduplicator
+
 logger = logging.getLogger(__name__)
 
 # Try to import multi-AI verification (optional)
 try:
-    from backend.ai.multi_ai_verifier import MultiAIVerifier
+    from backend.ai.multi_ai_verifier import get_verifier
     from backend.ai.consensus_engine import ConsensusEngine
     MULTI_AI_AVAILABLE = True
 except ImportError:
     logger.warning("Multi-AI verification not available")
     MULTI_AI_AVAILABLE = False
-    MultiAIVerifier = None
+    get_verifier = None
     ConsensusEngine = None
 
 class BaseCollectorAgent(ABC):
@@ -20,8 +24,22 @@ class BaseCollectorAgent(ABC):
     Base class for all Collector Agents.
     Each collector searches specific sources for trading strategies.
     Includes multi-AI verification before saving strategies.
+    
+    A run is a pipeline: collect, drop near-duplicates (of each other or of
+    saved strategies, see strategy_dedup), verify with at most
+    `max_in_flight` strategies in flight, then persist verified strategies in
+    batches of `persist_batch_size`, in collection order. At most
+    `reorder_window` strategies may be taken ahead of the next one to persist,
+    so a slow strategy or a slow database holds back verification
+    (backpressure) and at most `reorder_window + persist_batch_size` verified
+    strategies are ever held in memory.
     """
     
+    max_in_flight = Config.MAX_VERIFICATIONS_IN_FLIGHT
+    reorder_window = 4 * Config.MAX_VERIFICATIONS_IN_FLIGHT
+    persist_batch_size = Config.BATCH_SIZE_STRATEGIES
+    deduplicator = strategy_deduplicator
+    
     def __init__(self, agent_id, source_name, confidence_threshold=70.0):
         self.agent_id = agent_id
         self.source_name = source_name
@@ -32,7 +50,8 @@ class BaseCollectorAgent(ABC):
         # Initialize multi-AI verifier if available
         if MULTI_AI_AVAILABLE:
             try:
-                self.verifier = MultiAIVerifier()
+                # Shared process-wide so all collectors reuse one connection pool
+                self.verifier = get_verifier()
                 self.consensus_engine = ConsensusEngine()
                 self.verification_enabled = True
                 logger.info(f"[{self.agent_id}] Multi-AI verification enabled")
@@ -68,133 +87,286 @@ class BaseCollectorAgent(ABC):
             Dict with verification results and decision
         """
         if not self.verification_enabled:
-            return {
-                "verified": True,
-                "confidence": 100.0,
-                "reason": "Multi-AI verification disabled",
-                "verification_data": None
-            }
+            return self._unverified_decision()
         
         try:
-            # Prepare strategy text for verification
-            strategy_text = f"{strategy.get('title', 'Unknown Strategy')}\\n\\n{strategy.get('content', '')}"
-            
-            # Verify with multi-AI
             logger.info(f"[{self.agent_id}] Verifying strategy with {8} AI models...")
-            verification_result = self.verifier.verify_strategy(strategy_text)
-            
-            # Calculate consensus
-            consensus = self.consensus_engine.calculate_consensus(verification_result['responses'])
-            
-            # Determine if strategy passes threshold
-            confidence = consensus.get('confidence', 0.0)
-            passes_threshold = confidence >= self.confidence_threshold
-            
-            verification_decision = {
-                "verified": passes_threshold,
-                "confidence": confidence,
-                "consensus_recommendation": consensus.get('consensus_recommendation', 'UNKNOWN'),
-                "average_score": consensus.get('average_score', 0.0),
-                "agreement_rate": consensus.get('agreement_rate', 0.0),
-                "reason": consensus.get('interpretation', ''),
-                "verification_data": {
-                    "timestamp": datetime.now().isoformat(),
-                    "total_models": verification_result['total_models'],
-                    "successful_responses": verification_result['successful_responses'],
-                    "failed_responses": verification_result['failed_responses'],
-                    "total_duration": verification_result['total_duration'],
-                    "responses": verification_result['responses'],
-                    "consensus": consensus
-                }
-            }
-            
-            if passes_threshold:
-                logger.info(
-                    f"[{self.agent_id}] Strategy VERIFIED - "
-                    f"Confidence: {confidence:.1f}%, "
-                    f"Recommendation: {consensus.get('consensus_recommendation')}"
-                )
-            else:
-                logger.warning(
-                    f"[{self.agent_id}] Strategy REJECTED - "
-                    f"Confidence: {confidence:.1f}% < Threshold: {self.confidence_threshold}%"
-                )
-            
-            return verification_decision
+            verification_result = self.verifier.verify_strategy(self._strategy_text(strategy))
+            return self._decide(verification_result)
+        except Exception as e:
+            return self._failed_decision(e)
+    
+    async def verify_strategy_async(self, strategy: dict) -> dict:
+        """
+        Verify a strategy on the caller's event loop (same result as verify_strategy)
+        
+        Args:
+            strategy: Strategy dict with title and content
             
+        Returns:
+            Dict with verification results and decision
+        """
+        if not self.verification_enabled:
+            return self._unverified_decision()
+        
+        try:
+            logger.info(f"[{self.agent_id}] Verifying strategy with {8} AI models...")
+            verification_result = await self.verifier.verify_strategy_async(self._strategy_text(strategy))
+            return self._decide(verification_result)
         except Exception as e:
-            logger.error(f"[{self.agent_id}] Verification error: {e}")
-            return {
-                "verified": False,
-                "confidence": 0.0,
-                "reason": f"Verification failed: {str(e)}",
-                "verification_data": None
+            return self._failed_decision(e)
+    
+    @staticmethod
+    def _strategy_text(strategy: dict) -> str:
+        return f"{strategy.get('title', 'Unknown Strategy')}\\n\\n{strategy.get('content', '')}"
+    
+    @staticmethod
+    def _unverified_decision() -> dict:
+        return {
+            "verified": True,
+            "confidence": 100.0,
+            "reason": "Multi-AI verification disabled",
+            "verification_data": None
+        }
+    
+    def _failed_decision(self, error: Exception) -> dict:
+        logger.error(f"[{self.agent_id}] Verification error: {error}")
+        return {
+            "verified": False,
+            "confidence": 0.0,
+            "reason": f"Verification failed: {str(error)}",
+            "verification_data": None
+        }
+    
+    def _decide(self, verification_result: dict) -> dict:
+        """Turn raw model responses into a verify/reject decision."""
+        # Calculate consensus
+        consensus = self.consensus_engine.calculate_consensus(
+            verification_result['responses'], cache_key=verification_result.get('cache_key')
+        )
+        
+        # Determine if strategy passes threshold
+        confidence = consensus.get('confidence', 0.0)
+        passes_threshold = confidence >= self.confidence_threshold
+        
+        verification_decision = {
+            "verified": passes_threshold,
+            "confidence": confidence,
+            "consensus_recommendation": consensus.get('consensus_recommendation', 'UNKNOWN'),
+            "average_score": consensus.get('average_score', 0.0),
+            "agreement_rate": consensus.get('agreement_rate', 0.0),
+            "reason": consensus.get('interpretation', ''),
+            "verification_data": {
+                "timestamp": datetime.now().isoformat(),
+                "total_models": verification_result['total_models'],
+                "successful_responses": verification_result['successful_responses'],
+                "failed_responses": verification_result['failed_responses'],
+                "total_duration": verification_result['total_duration'],
+                "responses": verification_result['responses'],
+                "consensus": consensus
+            }
+        }
+        
+        if passes_threshold:
+            logger.info(
+                f"[{self.agent_id}] Strategy VERIFIED - "
+                f"Confidence: {confidence:.1f}%, "
+                f"Recommendation: {consensus.get('consensus_recommendation')}"
+            )
+        else:
+            logger.warning(
+                f"[{self.agent_id}] Strategy REJECTED - "
+                f"Confidence: {confidence:.1f}% < Threshold: {self.confidence_threshold}%"
+            )
+        
+        return verification_decision
+    
+    def _collect_and_log(self) -> list:
+        logger.info(f"[{self.agent_id}] Starting collection from {self.source_name}...")
+        self.status = "running"
+        
+        # Collect strategies
+        strategies = self.collect()
+        logger.info(f"[{self.agent_id}] Collected {len(strategies)} strategies")
+        
+        # Log collection event
+        from backend.database.db import db
+        db.log_agent_activity(
+            self.agent_id, 
+            "COLLECTION", 
+            f"Collected {len(strategies)} strategies from {self.source_name}",
+            {"count": len(strategies)}
+        )
+        return strategies
+    
+    def _annotate(self, strategy: dict, verification: dict):
+        # Add verification data to strategy
+        strategy['verification'] = verification
+        strategy['collected_at'] = datetime.now().isoformat()
+        strategy['collector_id'] = self.agent_id
+        strategy['source'] = self.source_name
+    
+    def _summarize(self, strategies: list) -> dict:
+        verified_strategies = [s for s in strategies if s['verification']['verified']]
+        rejected_strategies = [s for s in strategies if not s['verification']['verified']]
+        
+        self.status = "completed"
+        self.last_run = datetime.now()
+        
+        logger.info(
+            f"[{self.agent_id}] Collection completed - "
+            f"Verified: {len(verified_strategies)}, "
+            f"Rejected: {len(rejected_strategies)}"
+        )
+        
+        return {
+            "total_collected": len(strategies),
+            "verified": verified_strategies,
+            "rejected": rejected_strategies,
+            "verification_enabled": self.verification_enabled
+        }
+    
+    def _failed_run(self, error: Exception) -> dict:
+        self.status = "failed"
+        logger.error(f"[{self.agent_id}] Collection failed: {error}")
+        return {
+            "total_collected": 0,
+            "verified": [],
+            "rejected": [],
+            "error": str(error)
+        }
+    
+    def _dedupe(self, strategies: list) -> list:
+        """Drop near-duplicates of saved strategies and of earlier ones in the batch."""
+        batch_index = StrategyDeduplicator()
+        unique = []
+        for strategy in strategies:
+            title, content = strategy.get('title'), strategy.get('content')
+            if self.deduplicator.find(title, content) is not None:
+                continue
+            if batch_index.add(title, content) is not None:
+                continue
+            unique.append(strategy)
+        if len(unique) < len(strategies):
+            logger.info(f"[{self.agent_id}] Dropped {len(strategies) - len(unique)} near-duplicate strategies")
+        return unique
+    
+    def _persist_batch(self, batch: list) -> int:
+        from backend.database.db import db
+        ids = db.insert_strategies_batch([
+            {
+                "title": strategy.get('title', 'Unknown'),
+                "content": strategy.get('content', ''),
+                "url": strategy.get('url', ''),
+                "source": self.source_name,
+                "collector_id": self.agent_id,
+                "verification_data": strategy.get('verification', {}),
+                "verified": True,
+                "confidence_score": strategy['verification'].get('confidence', 0.0)
             }
+            for strategy in batch
+        ])
+        if len(ids) < len(batch):
+            logger.error(f"[{self.agent_id}] Failed to save {len(batch) - len(ids)} strategies")
+        for strategy, strategy_id in zip(batch, ids):
+            strategy['strategy_id'] = strategy_id
+            self.deduplicator.add(strategy.get('title'), strategy.get('content'), strategy_id)
+        return len(ids)
     
-    def run(self):
+    async def _verify_and_persist(self, strategies: list, persist: bool) -> int:
+        """
+        Verify strategies concurrently and persist verified ones in collection order
+        
+        Args:
+            strategies: Deduplicated strategies (annotated in place)
+            persist: Save verified strategies to the database
+            
+        Returns:
+            Number of strategies persisted
+        """
+        loop = asyncio.get_running_loop()
+        todo = asyncio.Queue()
+        for item in enumerate(strategies):
+            todo.put_nowait(item)
+        verified = asyncio.Queue()
+        # Slots for strategies taken but not yet persisted; taken in index order,
+        # so the next strategy to persist always holds one and cannot starve
+        window = asyncio.Semaphore(max(self.reorder_window, self.max_in_flight))
+        
+        async def verify_worker():
+            while True:
+                await window.acquire()
+                try:
+                    index, strategy = todo.get_nowait()
+                except asyncio.QueueEmpty:
+                    window.release()
+                    return
+                logger.info(f"[{self.agent_id}] Verifying strategy {index + 1}/{len(strategies)}: {strategy.get('title', 'Untitled')}")
+                self._annotate(strategy, await self.verify_strategy_async(strategy))
+                verified.put_nowait(index)
+        
+        async def persister():
+            persisted = 0
+            finished = set()
+            next_index = 0
+            batch = []
+            while next_index < len(strategies):
+                finished.add(await verified.get())
+                while next_index in finished:
+                    finished.discard(next_index)
+                    if persist and strategies[next_index]['verification']['verified']:
+                        batch.append(strategies[next_index])
+                    if len(batch) >= self.persist_batch_size:
+                        persisted += await loop.run_in_executor(None, self._persist_batch, batch)
+                        batch = []
+                    next_index += 1
+                    window.release()
+            if batch:
+                persisted += await loop.run_in_executor(None, self._persist_batch, batch)
+            return persisted
+        
+        workers = [asyncio.ensure_future(verify_worker()) for _ in range(min(self.max_in_flight, len(strategies)))]
+        persisting = asyncio.ensure_future(persister())
+        try:
+            # A failed worker would leave the persister waiting forever
+            await asyncio.wait(workers + [persisting], return_when=asyncio.FIRST_EXCEPTION)
+            for task in workers:
+                if task.done() and task.exception():
+                    raise task.exception()
+            return await persisting
+        finally:
+            for task in workers + [persisting]:
+                task.cancel()
+    
+    def run(self, persist=False):
         """Execute collection and return results with verification."""
+        if self.verification_enabled:
+            # On the verifier's own loop, so its pooled session is reused
+            return self.verifier.run_sync(self.run_async(persist=persist))
+        return asyncio.run(self.run_async(persist=persist))
+    
+    async def run_async(self, persist=False):
+        """
+        Collect, dedupe, verify concurrently and (optionally) persist.
+        collect() and dedup run in the default executor so they do not block the loop.
+        
+        Args:
+            persist: Save verified strategies to the database
+        """
         try:
-            logger.info(f"[{self.agent_id}] Starting collection from {self.source_name}...")
-            self.status = "running"
-            
-            # Collect strategies
-            strategies = self.collect()
-            logger.info(f"[{self.agent_id}] Collected {len(strategies)} strategies")
+            loop = asyncio.get_running_loop()
+            strategies = await loop.run_in_executor(None, self._collect_and_log)
+            # The first call rebuilds the dedup index from the database
+            strategies = await loop.run_in_executor(None, self._dedupe, strategies)
             
-            # Log collection event
-            from backend.database.db import db
-            db.log_agent_activity(
-                self.agent_id, 
-                "COLLECTION", 
-                f"Collected {len(strategies)} strategies from {self.source_name}",
-                {"count": len(strategies)}
-            )
+            persisted = await self._verify_and_persist(strategies, persist)
             
-            # Verify each strategy
-            verified_strategies = []
-            rejected_strategies = []
-            
-            for i, strategy in enumerate(strategies, 1):
-                logger.info(f"[{self.agent_id}] Verifying strategy {i}/{len(strategies)}: {strategy.get('title', 'Untitled')}")
-                
-                verification = self.verify_strategy(strategy)
-                
-                # Add verification data to strategy
-                strategy['verification'] = verification
-                strategy['collected_at'] = datetime.now().isoformat()
-                strategy['collector_id'] = self.agent_id
-                strategy['source'] = self.source_name
-                
-                if verification['verified']:
-                    verified_strategies.append(strategy)
-                else:
-                    rejected_strategies.append(strategy)
-            
-            self.status = "completed"
-            self.last_run = datetime.now()
-            
-            logger.info(
-                f"[{self.agent_id}] Collection completed - "
-                f"Verified: {len(verified_strategies)}, "
-                f"Rejected: {len(rejected_strategies)}"
-            )
-            
-            return {
-                "total_collected": len(strategies),
-                "verified": verified_strategies,
-                "rejected": rejected_strategies,
-                "verification_enabled": self.verification_enabled
-            }
+            result = self._summarize(strategies)
+            result['persisted'] = persisted
+            return result
             
         except Exception as e:
-            self.status = "failed"
-            logger.error(f"[{self.agent_id}] Collection failed: {e}")
-            return {
-                "total_collected": 0,
-                "verified": [],
-                "rejected": [],
-                "error": str(e)
-            }
+            return self._failed_run(e)
     
     def get_status(self):
         """Return agent status info."""
@@ -275,8 +447,6 @@ class BaseCollectorAgent(ABC):
             interval_minutes: Minutes between collection cycles (Ignored for now, using 10s)
             max_iterations: Maximum iterations (None for infinite)
         """
-        import asyncio
-        
         iteration = 0
         # Override interval to 10 seconds as requested
         interval_seconds = 10
@@ -292,35 +462,18 @@ class BaseCollectorAgent(ABC):
                 logger.info(f"[{self.agent_id}] Continuous cycle #{iteration} starting...")
                 self.update_status("Running", f"Collection Cycle #{iteration}")
                 
-                # Run collection
-                result = self.run()
+                # Run collection; verified strategies are saved as part of the run
+                result = await self.run_async(persist=True)
                 
                 # Log results
                 logger.info(
                     f"[{self.agent_id}] Cycle #{iteration} complete - "
                     f"Collected: {result['total_collected']}, "
                     f"Verified: {len(result['verified'])}, "
-                    f"Rejected: {len(result['rejected'])}"
+                    f"Rejected: {len(result['rejected'])}, "
+                    f"Saved: {result.get('persisted', 0)}"
                 )
                 
-                # Save verified strategies to database
-                if result['verified']:
-                    from backend.database.db import db
-                    for strategy in result['verified']:
-                        try:
-                            db.insert_strategy(
-                                title=strategy.get('title', 'Unknown'),
-                                content=strategy.get('content', ''),
-                                url=strategy.get('url', ''),
-                                source=self.source_name,
-                                collector_id=self.agent_id,
-                                verification_data=strategy.get('verification', {}),
-                                verified=True,
-                                confidence_score=strategy['verification'].get('confidence', 0.0)
-                            )
-                        except Exception as e:
-                            logger.error(f"[{self.agent_id}] Failed to save strategy: {e}")
-                
                 # Update status to idle
                 self.update_status("Idle", f"Waiting {interval_seconds}s")
                 
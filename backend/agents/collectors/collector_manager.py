@@ -1,6 +1,10 @@
 import logging
 import asyncio
-from typing import Dict, Any
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional, Tuple
+from backend.streaming.smartapi_protocol import MODE_SNAP_QUOTE
 from .market_data import NSEDataCollector
 from .technical import TechnicalIndicatorCollector
 from .order_book import OrderBookAnalyzer
@@ -9,13 +13,36 @@ from .historical import HistoricalDataManager
 
 logger = logging.getLogger(__name__)
 
+# Symbols NSEDataCollector persists to market_data and streams bars for
+INDICATOR_SYMBOLS = ("NIFTY", "BANKNIFTY")
+
+# Seconds each collector may take per cycle before its result is dropped
+DEFAULT_DEADLINES = {
+    "market_data": 8.0,
+    "news": 5.0,
+    "order_book": 3.0,
+    "technical": 3.0
+}
+
 class CollectorManager:
     """
     Manages the lifecycle and execution of V2 Collector Agents.
     """
-    def __init__(self):
+    def __init__(self, collectors: Optional[Dict[str, Any]] = None, deadlines: Optional[Dict[str, float]] = None,
+                 max_workers: int = 8, latency_window: int = 100):
         self.collectors = {}
-        self.initialize_agents()
+        self.deadlines = {**DEFAULT_DEADLINES, **(deadlines or {})}
+        # Blocking collector calls (broker HTTP, SQLite) run here, never on the event loop
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="collector")
+        self.latencies: Dict[str, deque] = {}
+        self.latency_window = latency_window
+        # Symbols the cycle reads depth for; run_depth_feed() replaces them
+        self.depth_symbols = ("NIFTY",)
+        self.depth_feed = None
+        if collectors is not None:
+            self.collectors = collectors
+        else:
+            self.initialize_agents()
         
     def initialize_agents(self):
         """Initialize all 5 specialized collector agents."""
@@ -27,9 +54,95 @@ class CollectorManager:
                 "news": NewsEventCollector(),
                 "historical": HistoricalDataManager()
             }
+            # Technical indicators advance on every closed 1m bar, the same size load_history seeds from;
+            # seeding happens here, before the market data loop starts delivering bars
+            self.collectors["technical"].attach(self.collectors["market_data"], symbols=INDICATOR_SYMBOLS)
             logger.info(f"Initialized {len(self.collectors)} V2 collector agents")
         except Exception as e:
             logger.error(f"Failed to initialize agents: {e}")
+
+    async def run_depth_feed(self, depth_tokens: Dict[str, Tuple[int, str]], url: Optional[str] = None):
+        """
+        Stream snap-quote depth into the order book store until cancelled.
+
+        Args:
+            depth_tokens: {symbol: (exchange_type, token)}. NSE indices carry
+                no depth, so pass tradable instruments (e.g. the current
+                index future) under the symbol the cycle should report.
+            url: Optional feed URL, e.g. a local replay server.
+
+        Needs a logged-in NSEDataCollector (feed token).
+        """
+        market = self.collectors["market_data"]
+        tokens: Dict[int, list] = {}
+        for exchange_type, token in depth_tokens.values():
+            tokens.setdefault(exchange_type, []).append(token)
+        self.depth_feed = market.create_tick_feed(tokens=tokens, url=url, mode=MODE_SNAP_QUOTE)
+        self.collectors["order_book"].attach(
+            self.depth_feed.bus, symbol_map={token: symbol for symbol, (_, token) in depth_tokens.items()})
+        self.depth_symbols = tuple(depth_tokens)
+        logger.info(f"Order book depth feed started for {', '.join(self.depth_symbols)}")
+        await self.depth_feed.run()
+
+    # ===== Cycle steps (blocking; run on the executor) =====
+
+    def _collect_market_data(self) -> Tuple[Any, Dict[str, Any]]:
+        # Should be running continuously; the cycle takes a snapshot
+        market_snapshot = self.collectors["market_data"].get_indices()
+        return "active", {"market": market_snapshot}
+
+    def _collect_news(self) -> Tuple[Any, Dict[str, Any]]:
+        news_collector = self.collectors["news"]
+        events = news_collector.get_economic_calendar()
+        sentiment = news_collector.get_market_sentiment()
+        return len(events), {"sentiment": sentiment}
+
+    def _collect_order_book(self) -> Tuple[Any, Dict[str, Any]]:
+        # Latest recorded depth; history flushed to the database
+        ob_collector = self.collectors["order_book"]
+        if ob_collector.status == "initialized":
+            # Depth only arrives from a snap-quote feed; see run_depth_feed()
+            return "no_feed", {}
+        books = [ob_collector.get_order_book(symbol) for symbol in self.depth_symbols]
+        ob_collector.persist()
+        return ("captured" if any(books) else "no_depth"), {}
+
+    def _collect_technical(self) -> Tuple[Any, Dict[str, Any]]:
+        # Streaming state, seeded from stored bars when the collector was attached
+        tech_collector = self.collectors["technical"]
+        indicators = {}
+        for symbol in INDICATOR_SYMBOLS:
+            snapshot = tech_collector.get_indicators(symbol)
+            if snapshot:
+                indicators[symbol] = snapshot
+        return len(indicators), {"indicators": indicators}
+
+    def _cycle_steps(self) -> Dict[str, Callable[[], Tuple[Any, Dict[str, Any]]]]:
+        steps = {
+            "market_data": self._collect_market_data,
+            "news": self._collect_news,
+            "order_book": self._collect_order_book,
+            "technical": self._collect_technical
+        }
+        return {name: step for name, step in steps.items() if name in self.collectors}
+
+    async def _run_step(self, name: str, step: Callable) -> Tuple[str, str, Any, float]:
+        """Run one blocking step under its deadline. Returns (name, outcome, result, latency_ms)."""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(loop.run_in_executor(self.executor, step), self.deadlines.get(name, 5.0))
+            outcome = "ok"
+        except asyncio.TimeoutError:
+            # The worker thread cannot be interrupted; its late result is discarded
+            logger.warning(f"Collector {name} missed its {self.deadlines.get(name, 5.0)}s deadline")
+            result, outcome = None, "timeout"
+        except Exception as e:
+            logger.error(f"Collector {name} failed: {e}")
+            result, outcome = e, "failed"
+        latency_ms = (time.perf_counter() - started) * 1000
+        self.latencies.setdefault(name, deque(maxlen=self.latency_window)).append(latency_ms)
+        return name, outcome, result, latency_ms
             
     async def run_all_collectors(self) -> Dict[str, Any]:
         """
@@ -38,41 +151,43 @@ class CollectorManager:
         1. Ensuring continuous collectors are running.
         2. Fetching point-in-time data (News, Events).
         3. Aggregating current market state.
+
+        Collectors run concurrently, each under its own deadline, so the
+        cycle takes as long as the slowest one (capped at its deadline).
+        A collector that times out or fails is reported and the rest of the
+        summary is still returned, with status "partial".
         """
         logger.info("Starting V2 collection cycle...")
+        started = time.perf_counter()
         
         summary = {
             "total_collected": 0,
             "status": "success",
-            "details": {}
+            "details": {},
+            "latency_ms": {}
         }
         
         try:
-            # 1. Market Data (Should be running continuously, but we check/start here)
-            # For now, we'll just fetch a snapshot
-            market_collector = self.collectors["market_data"]
-            market_snapshot = market_collector.get_indices()
-            summary["details"]["market_data"] = "active"
-            
-            # 2. News & Events
-            news_collector = self.collectors["news"]
-            events = news_collector.get_economic_calendar()
-            sentiment = news_collector.get_market_sentiment()
-            summary["details"]["news"] = len(events)
-            
-            # 3. Order Book (Snapshot)
-            ob_collector = self.collectors["order_book"]
-            # Mock symbol for now
-            ob = ob_collector.get_order_book("NIFTY")
-            summary["details"]["order_book"] = "captured"
-            
-            # 4. Technicals (On current price)
-            tech_collector = self.collectors["technical"]
-            # Mock price data
-            rsi = tech_collector.calculate_rsi([100, 101, 102, 101, 100])
-            summary["details"]["technical"] = "calculated"
+            steps = self._cycle_steps()
+            results = await asyncio.gather(*(self._run_step(name, step) for name, step in steps.items()))
+
+            errors = {}
+            for name, outcome, result, latency_ms in results:
+                summary["latency_ms"][name] = round(latency_ms, 1)
+                if outcome == "ok":
+                    detail, extra = result
+                    summary["details"][name] = detail
+                    summary.update(extra)
+                else:
+                    summary["details"][name] = outcome
+                    errors[name] = str(result) if outcome == "failed" else "deadline exceeded"
+
+            if errors:
+                summary["status"] = "failed" if len(errors) == len(results) else "partial"
+                summary["errors"] = errors
+            summary["cycle_ms"] = round((time.perf_counter() - started) * 1000, 1)
             
-            logger.info("V2 Collection cycle completed.")
+            logger.info(f"V2 Collection cycle completed ({summary['status']}, {summary['cycle_ms']}ms).")
             return summary
             
         except Exception as e:
@@ -81,6 +196,24 @@ class CollectorManager:
             summary["error"] = str(e)
             return summary
 
+    def get_latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-collector latency over the recent cycles (ms)."""
+        stats = {}
+        for name, samples in self.latencies.items():
+            ordered = sorted(samples)
+            stats[name] = {
+                "last": round(samples[-1], 1),
+                "p50": round(ordered[len(ordered) // 2], 1),
+                "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+                "max": round(ordered[-1], 1),
+                "samples": len(ordered)
+            }
+        return stats
+
+    def shutdown(self):
+        """Stop accepting collector work; in-flight calls finish in the background."""
+        self.executor.shutdown(wait=False)
+
     def get_agent_statuses(self):
         """Get status of all agents."""
         statuses = []
@@ -0,0 +1,217 @@
+"""
+Batch Indicators
+Vectorized RSI, EMA, MACD, Bollinger Bands, ATR and ADX over a whole
+universe at once. Inputs are 2D (time x symbol) arrays or DataFrames; each
+indicator comes back as a matrix of the same shape.
+
+NaN marks a missing bar. Each symbol's valid bars are packed to the top of
+its column, the recursions run on those contiguous values, and results are
+scattered back to the original rows, so symbols that list late or skip bars
+warm up on their own data and gaps never leak into the averages. Rows that
+are missing or still warming up are NaN in the output.
+
+Warm-up and smoothing follow IncrementalIndicatorEngine, so the last row of
+a fully populated column equals the engine's streaming snapshot.
+"""
+
+import logging
+from typing import Any, Dict, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ArrayLike = Union[np.ndarray, pd.DataFrame]
+
+
+def _pack(valid: np.ndarray) -> np.ndarray:
+    """Row order per column that moves valid rows to the top, keeping time order."""
+    return np.argsort(~valid, axis=0, kind="stable")
+
+
+def _take(x: np.ndarray, order: np.ndarray) -> np.ndarray:
+    return np.take_along_axis(x, order, axis=0)
+
+
+def _unpack(packed: np.ndarray, order: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    out = np.empty_like(packed)
+    np.put_along_axis(out, order, packed, axis=0)
+    out[~valid] = np.nan
+    return out
+
+
+def _smooth(x: np.ndarray, alpha: float, start: int, seed: np.ndarray) -> np.ndarray:
+    """
+    y[start] = seed, then y[t] = y[t-1] + alpha * (x[t] - y[t-1]) down every
+    column. One vectorized step per row beats per-column ewm for wide universes.
+    """
+    out = np.full_like(x, np.nan)
+    if start >= x.shape[0]:
+        return out
+    out[start] = y = seed
+    keep = 1.0 - alpha
+    for t in range(start + 1, x.shape[0]):
+        y = y * keep + x[t] * alpha
+        out[t] = y
+    return out
+
+
+def _ema(x: np.ndarray, span: int) -> np.ndarray:
+    """EMA down each column, seeded with the first value."""
+    return _smooth(x, 2.0 / (span + 1), 0, x[0])
+
+
+def _wilder(x: np.ndarray, period: int, start: int = 0) -> np.ndarray:
+    """
+    Wilder average down each column of packed data whose first valid row is
+    `start`: SMA of the first `period` values, then 1/period smoothing.
+    """
+    seed_row = start + period - 1
+    if seed_row >= x.shape[0]:
+        return np.full_like(x, np.nan)
+    return _smooth(x, 1.0 / period, seed_row, x[start:seed_row + 1].mean(axis=0))
+
+
+def _directional(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> Dict[str, np.ndarray]:
+    """ATR, +DI, -DI and ADX on packed data."""
+    nan_row = np.full((1, close.shape[1]), np.nan)
+    prev_close = np.vstack([nan_row, close[:-1]])
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    up = np.vstack([nan_row, np.diff(high, axis=0)])
+    down = np.vstack([nan_row, -np.diff(low, axis=0)])
+    with np.errstate(invalid="ignore"):
+        pdm = np.where((up > down) & (up > 0), up, 0.0)
+        mdm = np.where((down > up) & (down > 0), down, 0.0)
+
+    atr = _wilder(true_range, period, start=1)
+    pdm_s = _wilder(pdm, period, start=1)
+    mdm_s = _wilder(mdm, period, start=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = np.where(atr > 0, 100.0 * pdm_s / atr, np.nan)
+        minus_di = np.where(atr > 0, 100.0 * mdm_s / atr, np.nan)
+        denom = pdm_s + mdm_s
+        dx = np.where(denom > 0, 100.0 * np.abs(pdm_s - mdm_s) / denom, np.where(np.isnan(denom), np.nan, 0.0))
+    return {"atr": atr, "plus_di": plus_di, "minus_di": minus_di, "adx": _wilder(dx, period, start=period)}
+
+
+def _bollinger(close: np.ndarray, period: int, num_std: float) -> Dict[str, np.ndarray]:
+    if close.shape[0] < period:
+        empty = np.full_like(close, np.nan)
+        return {"bb_upper": empty, "bb_middle": empty.copy(), "bb_lower": empty.copy()}
+    # Rolling moments from prefix sums, centred on each column's first price
+    # so the variance subtraction does not cancel away precision
+    centred = close - close[0]
+    zero = np.zeros((1, close.shape[1]))
+    s1 = np.vstack([zero, np.cumsum(centred, axis=0)])
+    s2 = np.vstack([zero, np.cumsum(centred * centred, axis=0)])
+    mean = np.full_like(close, np.nan)
+    var = np.full_like(close, np.nan)
+    mean[period - 1:] = (s1[period:] - s1[:-period]) / period
+    var[period - 1:] = (s2[period:] - s2[:-period]) / period - mean[period - 1:] ** 2
+    std = np.sqrt(np.maximum(var, 0.0))
+    middle = mean + close[0]
+    return {"bb_upper": middle + num_std * std, "bb_middle": middle, "bb_lower": middle - num_std * std}
+
+
+def _rsi(close: np.ndarray, period: int) -> np.ndarray:
+    nan_row = np.full((1, close.shape[1]), np.nan)
+    delta = np.vstack([nan_row, np.diff(close, axis=0)])
+    gain = _wilder(np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0)), period, start=1)
+    loss = _wilder(np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0)), period, start=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(loss > 0, 100.0 - 100.0 / (1.0 + gain / loss), np.where(gain > 0, 100.0, 50.0))
+    rsi[np.isnan(gain)] = np.nan
+    return rsi
+
+
+def _wrap(result: Dict[str, np.ndarray], like: Any) -> Dict[str, ArrayLike]:
+    if isinstance(like, pd.DataFrame):
+        return {name: pd.DataFrame(values, index=like.index, columns=like.columns) for name, values in result.items()}
+    return result
+
+
+def _matrix(x: ArrayLike) -> np.ndarray:
+    x = np.asarray(x, dtype=float)
+    return x.reshape(-1, 1) if x.ndim == 1 else x
+
+
+def _packed_call(fn, arrays, valid, *args) -> Dict[str, np.ndarray]:
+    order = _pack(valid)
+    packed = fn(*(_take(a, order) for a in arrays), *args)
+    if isinstance(packed, np.ndarray):
+        return _unpack(packed, order, valid)
+    return {name: _unpack(values, order, valid) for name, values in packed.items()}
+
+
+def ema(values: ArrayLike, span: int) -> ArrayLike:
+    x = _matrix(values)
+    result = _packed_call(lambda v: _ema(v, span), [x], np.isfinite(x))
+    return _wrap({"ema": result}, values)["ema"]
+
+
+def rsi(close: ArrayLike, period: int = 14) -> ArrayLike:
+    x = _matrix(close)
+    result = _packed_call(lambda c: _rsi(c, period), [x], np.isfinite(x))
+    return _wrap({"rsi": result}, close)["rsi"]
+
+
+def macd(close: ArrayLike, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, ArrayLike]:
+    x = _matrix(close)
+
+    def kernel(c):
+        line = _ema(c, fast) - _ema(c, slow)
+        signal_line = _ema(line, signal)
+        return {"macd": line, "macd_signal": signal_line, "macd_histogram": line - signal_line}
+
+    return _wrap(_packed_call(kernel, [x], np.isfinite(x)), close)
+
+
+def bollinger(close: ArrayLike, period: int = 20, num_std: float = 2.0) -> Dict[str, ArrayLike]:
+    x = _matrix(close)
+    return _wrap(_packed_call(lambda c: _bollinger(c, period, num_std), [x], np.isfinite(x)), close)
+
+
+def directional(high: ArrayLike, low: ArrayLike, close: ArrayLike, period: int = 14) -> Dict[str, ArrayLike]:
+    """ATR, +DI, -DI and ADX (Wilder)."""
+    h, l, c = _matrix(high), _matrix(low), _matrix(close)
+    valid = np.isfinite(h) & np.isfinite(l) & np.isfinite(c)
+    return _wrap(_packed_call(lambda *a: _directional(*a, period), [h, l, c], valid), close)
+
+
+def compute_indicators(high: ArrayLike, low: ArrayLike, close: ArrayLike, rsi_period: int = 14,
+                       ema_periods=(20, 50), macd_spans=(12, 26, 9), bb_period: int = 20,
+                       bb_std: float = 2.0, adx_period: int = 14) -> Dict[str, ArrayLike]:
+    """
+    Every indicator for every symbol in one pass. A row counts as valid for
+    a symbol only when its high, low and close are all present.
+    """
+    h, l, c = _matrix(high), _matrix(low), _matrix(close)
+    if not (h.shape == l.shape == c.shape):
+        raise ValueError(f"high/low/close shapes differ: {h.shape}, {l.shape}, {c.shape}")
+    valid = np.isfinite(h) & np.isfinite(l) & np.isfinite(c)
+    fast, slow, signal = macd_spans
+
+    def kernel(h, l, c):
+        out = {"rsi": _rsi(c, rsi_period)}
+        for span in ema_periods:
+            out[f"ema_{span}"] = _ema(c, span)
+        line = _ema(c, fast) - _ema(c, slow)
+        signal_line = _ema(line, signal)
+        out.update({"macd": line, "macd_signal": signal_line, "macd_histogram": line - signal_line})
+        out.update(_bollinger(c, bb_period, bb_std))
+        out.update(_directional(h, l, c, adx_period))
+        return out
+
+    return _wrap(_packed_call(kernel, [h, l, c], valid), close)
+
+
+def latest(indicators: Dict[str, ArrayLike]) -> pd.DataFrame:
+    """Last row of each indicator matrix as a symbol x indicator table."""
+    columns = {}
+    for name, values in indicators.items():
+        if isinstance(values, pd.DataFrame):
+            columns[name] = values.iloc[-1]
+        else:
+            columns[name] = pd.Series(np.asarray(values)[-1])
+    return pd.DataFrame(columns)
@@ -0,0 +1,378 @@
+"""
+Incremental Indicator Engine
+Stateful RSI (Wilder), EMA, MACD, Bollinger Bands (sliding Welford),
+ATR/ADX (Wilder) and rolling support/resistance for many symbols.
+
+State for every symbol lives in numpy array slots indexed by symbol id, so
+update_many() advances hundreds of symbols by one bar with a few dozen
+vectorized operations, and update() is the one-symbol case of the same
+code path. initialize() seeds a slot from history with vectorized pandas
+recursions instead of replaying bar by bar; both paths produce the same
+state.
+
+Warm-up follows the textbook definitions: Wilder averages are seeded with
+the simple mean of their first `period` values, EMAs with the first close.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def wilder_series(x: np.ndarray, period: int) -> np.ndarray:
+    """Wilder averages of x from the period-th value on (SMA seed, then 1/period smoothing)."""
+    if len(x) < period:
+        return np.empty(0)
+    seeded = np.concatenate(([x[:period].mean()], x[period:]))
+    return pd.Series(seeded).ewm(alpha=1.0 / period, adjust=False).mean().to_numpy()
+
+
+def _wilder_state(x: np.ndarray, period: int) -> float:
+    """Engine state after consuming x: running sum while warming up, else the Wilder average."""
+    if len(x) < period:
+        return float(x.sum())
+    return float(wilder_series(x, period)[-1])
+
+
+def ema_series(x: np.ndarray, span: int) -> np.ndarray:
+    return pd.Series(x).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+class IncrementalIndicatorEngine:
+    """
+    O(1)-per-bar technical indicators for many symbols.
+    """
+
+    _ROW_FIELDS = ("count", "prev_close", "prev_high", "prev_low",
+                   "gain_avg", "loss_avg", "tr_avg", "pdm_avg", "mdm_avg", "adx",
+                   "macd_fast", "macd_slow", "macd_signal",
+                   "bb_mean", "bb_m2", "res_val", "res_pos", "sup_val", "sup_pos")
+
+    def __init__(self, capacity: int = 256, rsi_period: int = 14, ema_periods: Sequence[int] = (20, 50),
+                 macd: Sequence[int] = (12, 26, 9), bb_period: int = 20, bb_std: float = 2.0,
+                 adx_period: int = 14, sr_window: int = 20):
+        self.rsi_period = rsi_period
+        self.ema_periods = list(ema_periods)
+        self.macd_fast_span, self.macd_slow_span, self.macd_signal_span = macd
+        self.bb_period = bb_period
+        self.bb_std = bb_std
+        self.adx_period = adx_period
+        self.sr_window = sr_window
+
+        self.symbol_ids: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        # Bars arrive on the feed's event loop while seeding and reads run on collector threads
+        self._lock = threading.RLock()
+        self._allocate(capacity)
+
+    # ===== Slots =====
+
+    def _allocate(self, capacity: int):
+        for name in self._ROW_FIELDS:
+            dtype = np.int64 if name in ("count", "res_pos", "sup_pos") else float
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.ema = np.zeros((len(self.ema_periods), capacity))
+        self.bb_ring = np.zeros((capacity, self.bb_period))
+        self.high_ring = np.zeros((capacity, self.sr_window))
+        self.low_ring = np.zeros((capacity, self.sr_window))
+
+    def _grow(self, capacity: int):
+        old = {name: getattr(self, name) for name in self._ROW_FIELDS}
+        old_ema, old_bb, old_high, old_low = self.ema, self.bb_ring, self.high_ring, self.low_ring
+        n = old["count"].shape[0]
+        self._allocate(capacity)
+        for name, values in old.items():
+            getattr(self, name)[:n] = values
+        self.ema[:, :n] = old_ema
+        self.bb_ring[:n] = old_bb
+        self.high_ring[:n] = old_high
+        self.low_ring[:n] = old_low
+
+    def symbol_id(self, symbol: str) -> int:
+        with self._lock:
+            sid = self.symbol_ids.get(symbol)
+            if sid is None:
+                sid = len(self.symbols)
+                if sid >= self.count.shape[0]:
+                    self._grow(self.count.shape[0] * 2)
+                self.symbol_ids[symbol] = sid
+                self.symbols.append(symbol)
+            return sid
+
+    def reset(self, symbol: str):
+        with self._lock:
+            sid = self.symbol_id(symbol)
+            for name in self._ROW_FIELDS:
+                getattr(self, name)[sid] = 0
+            self.ema[:, sid] = 0
+            self.bb_ring[sid] = self.high_ring[sid] = self.low_ring[sid] = 0
+
+    # ===== Incremental updates =====
+
+    def update(self, symbol: str, high: float, low: float, close: float):
+        """Advance one symbol by one bar."""
+        self.update_many([symbol], [high], [low], [close])
+
+    def update_many(self, symbols: Sequence[str], highs: Sequence[float], lows: Sequence[float],
+                    closes: Sequence[float]):
+        """Advance several (distinct) symbols by one bar each, vectorized across symbols."""
+        with self._lock:
+            self._update_many(symbols, highs, lows, closes)
+
+    def _update_many(self, symbols: Sequence[str], highs: Sequence[float], lows: Sequence[float],
+                     closes: Sequence[float]):
+        idx = np.fromiter((self.symbol_id(s) for s in symbols), dtype=np.int64, count=len(symbols))
+        h = np.asarray(highs, dtype=float)
+        l = np.asarray(lows, dtype=float)
+        c = np.asarray(closes, dtype=float)
+
+        cnt = self.count[idx] + 1
+        self.count[idx] = cnt
+        first = cnt == 1
+        has_prev = ~first
+        k = cnt - 1                      # price changes seen so far
+        bar = cnt - 1                    # 0-based bar index
+
+        pc, ph, pl = self.prev_close[idx], self.prev_high[idx], self.prev_low[idx]
+        change = np.where(has_prev, c - pc, 0.0)
+        true_range = np.where(has_prev, np.maximum(h - l, np.maximum(np.abs(h - pc), np.abs(l - pc))), 0.0)
+        up, down = h - ph, pl - l
+        pdm = np.where(has_prev & (up > down) & (up > 0), up, 0.0)
+        mdm = np.where(has_prev & (down > up) & (down > 0), down, 0.0)
+
+        p = self.rsi_period
+        self._wilder(self.gain_avg, idx, np.maximum(change, 0.0), k, p)
+        self._wilder(self.loss_avg, idx, np.maximum(-change, 0.0), k, p)
+
+        a = self.adx_period
+        self._wilder(self.tr_avg, idx, true_range, k, a)
+        self._wilder(self.pdm_avg, idx, pdm, k, a)
+        self._wilder(self.mdm_avg, idx, mdm, k, a)
+        ready = k >= a
+        pdm_s, mdm_s = self.pdm_avg[idx], self.mdm_avg[idx]
+        denom = pdm_s + mdm_s
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dx = np.where(denom > 0, 100.0 * np.abs(pdm_s - mdm_s) / denom, 0.0)
+        self._wilder(self.adx, idx, dx, np.where(ready, k - a + 1, 0), a)
+
+        # EMAs and MACD, seeded with the first close
+        for row, span in enumerate(self.ema_periods):
+            self.ema[row, idx] = self._ema_step(self.ema[row, idx], c, span, first)
+        fast = self._ema_step(self.macd_fast[idx], c, self.macd_fast_span, first)
+        slow = self._ema_step(self.macd_slow[idx], c, self.macd_slow_span, first)
+        self.macd_fast[idx], self.macd_slow[idx] = fast, slow
+        self.macd_signal[idx] = self._ema_step(self.macd_signal[idx], fast - slow, self.macd_signal_span, first)
+
+        # Bollinger: sliding-window Welford over a ring buffer
+        P = self.bb_period
+        slot = bar % P
+        old = self.bb_ring[idx, slot]
+        mean, m2 = self.bb_mean[idx], self.bb_m2[idx]
+        full = bar >= P
+        n = np.minimum(cnt, P)
+        grow_delta = c - mean
+        grow_mean = mean + grow_delta / n
+        grow_m2 = m2 + grow_delta * (c - grow_mean)
+        slide_mean = mean + (c - old) / P
+        slide_m2 = m2 + (c - old) * (c - slide_mean + old - mean)
+        self.bb_mean[idx] = np.where(full, slide_mean, grow_mean)
+        self.bb_m2[idx] = np.maximum(np.where(full, slide_m2, grow_m2), 0.0)
+        self.bb_ring[idx, slot] = c
+
+        # Rolling support / resistance with lazily rescanned extremes
+        W = self.sr_window
+        sr_slot = bar % W
+        self.high_ring[idx, sr_slot] = h
+        self.low_ring[idx, sr_slot] = l
+        self._track_extreme(self.res_val, self.res_pos, self.high_ring, idx, h, bar, first, np.greater_equal, np.argmax)
+        self._track_extreme(self.sup_val, self.sup_pos, self.low_ring, idx, l, bar, first, np.less_equal, np.argmin)
+
+        self.prev_close[idx], self.prev_high[idx], self.prev_low[idx] = c, h, l
+
+    @staticmethod
+    def _wilder(state: np.ndarray, idx: np.ndarray, x: np.ndarray, step: np.ndarray, period: int):
+        """step counts values consumed (0 = none yet). Sum while warming up, seed at `period`, then smooth."""
+        s = state[idx]
+        warm = s + x
+        state[idx] = np.select(
+            [step <= 0, step < period, step == period],
+            [s, warm, warm / period],
+            s * (1.0 - 1.0 / period) + x / period
+        )
+
+    @staticmethod
+    def _ema_step(prev: np.ndarray, x: np.ndarray, span: int, first: np.ndarray) -> np.ndarray:
+        alpha = 2.0 / (span + 1)
+        return np.where(first, x, prev * (1.0 - alpha) + x * alpha)
+
+    def _track_extreme(self, values, positions, ring, idx, x, bar, first, better, arg):
+        W = self.sr_window
+        current = values[idx]
+        improve = first | better(x, current)
+        values[idx] = np.where(improve, x, current)
+        positions[idx] = np.where(improve, bar, positions[idx])
+
+        expired = ~improve & (positions[idx] <= bar - W)
+        if expired.any():
+            rows = idx[expired]
+            window = ring[rows]
+            best_slot = arg(window, axis=1)
+            values[rows] = window[np.arange(len(rows)), best_slot]
+            b = bar[expired]
+            positions[rows] = b - ((b - best_slot) % W)
+
+    # ===== Vectorized initialization from history =====
+
+    def initialize(self, symbol: str, highs: Sequence[float], lows: Sequence[float], closes: Sequence[float]):
+        """
+        Seed a symbol's state from its full history in one vectorized pass.
+        Equivalent to calling update() for every bar in order.
+        """
+        with self._lock:
+            self._initialize(symbol, highs, lows, closes)
+
+    def _initialize(self, symbol: str, highs: Sequence[float], lows: Sequence[float], closes: Sequence[float]):
+        sid = self.symbol_id(symbol)
+        self.reset(symbol)
+        h = np.asarray(highs, dtype=float)
+        l = np.asarray(lows, dtype=float)
+        c = np.asarray(closes, dtype=float)
+        n = len(c)
+        if n == 0:
+            return
+
+        self.count[sid] = n
+        self.prev_close[sid], self.prev_high[sid], self.prev_low[sid] = c[-1], h[-1], l[-1]
+
+        change = np.diff(c)
+        self.gain_avg[sid] = _wilder_state(np.maximum(change, 0.0), self.rsi_period)
+        self.loss_avg[sid] = _wilder_state(np.maximum(-change, 0.0), self.rsi_period)
+
+        a = self.adx_period
+        pc = c[:-1]
+        true_range = np.maximum(h[1:] - l[1:], np.maximum(np.abs(h[1:] - pc), np.abs(l[1:] - pc)))
+        up, down = np.diff(h), -np.diff(l)
+        pdm = np.where((up > down) & (up > 0), up, 0.0)
+        mdm = np.where((down > up) & (down > 0), down, 0.0)
+        self.tr_avg[sid] = _wilder_state(true_range, a)
+        self.pdm_avg[sid] = _wilder_state(pdm, a)
+        self.mdm_avg[sid] = _wilder_state(mdm, a)
+        pdm_s, mdm_s = wilder_series(pdm, a), wilder_series(mdm, a)
+        denom = pdm_s + mdm_s
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dx = np.where(denom > 0, 100.0 * np.abs(pdm_s - mdm_s) / denom, 0.0)
+        self.adx[sid] = _wilder_state(dx, a)
+
+        for row, span in enumerate(self.ema_periods):
+            self.ema[row, sid] = ema_series(c, span)[-1]
+        fast = ema_series(c, self.macd_fast_span)
+        slow = ema_series(c, self.macd_slow_span)
+        self.macd_fast[sid], self.macd_slow[sid] = fast[-1], slow[-1]
+        self.macd_signal[sid] = ema_series(fast - slow, self.macd_signal_span)[-1]
+
+        P = self.bb_period
+        recent = np.arange(max(0, n - P), n)
+        self.bb_ring[sid, recent % P] = c[recent]
+        window = c[recent]
+        self.bb_mean[sid] = window.mean()
+        self.bb_m2[sid] = ((window - window.mean()) ** 2).sum()
+
+        W = self.sr_window
+        recent = np.arange(max(0, n - W), n)
+        self.high_ring[sid, recent % W] = h[recent]
+        self.low_ring[sid, recent % W] = l[recent]
+        # Latest occurrence of each extreme, so it expires as late as possible
+        res = len(recent) - 1 - np.argmax(h[recent][::-1])
+        sup = len(recent) - 1 - np.argmin(l[recent][::-1])
+        self.res_val[sid], self.res_pos[sid] = h[recent][res], recent[res]
+        self.sup_val[sid], self.sup_pos[sid] = l[recent][sup], recent[sup]
+
+    def initialize_frame(self, symbol: str, df: pd.DataFrame):
+        """initialize() from an OHLC DataFrame (High/Low/Close columns)."""
+        self.initialize(symbol, df["High"].to_numpy(), df["Low"].to_numpy(), df["Close"].to_numpy())
+
+    def on_bars(self, bars: Iterable[Dict[str, Any]], timeframe: Optional[str] = "1m"):
+        """BarAggregator listener: advance every symbol that closed a bar of `timeframe`."""
+        latest = {}
+        for b in bars:
+            if timeframe is None or b.get("timeframe") == timeframe:
+                latest.setdefault(b["symbol"], []).append(b)
+        # Bars of one symbol are applied in order; distinct symbols go in one vectorized step
+        while latest:
+            batch = [(sym, queue.pop(0)) for sym, queue in latest.items()]
+            self.update_many([s for s, _ in batch], [b["high"] for _, b in batch],
+                             [b["low"] for _, b in batch], [b["close"] for _, b in batch])
+            latest = {sym: queue for sym, queue in latest.items() if queue}
+
+    # ===== Reads =====
+
+    def _values(self, sid) -> Dict[str, Any]:
+        """Indicator values for a slot index or an index array."""
+        cnt = self.count[sid]
+        k = cnt - 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gain, loss = self.gain_avg[sid], self.loss_avg[sid]
+            rsi = np.where(loss > 0, 100.0 - 100.0 / (1.0 + gain / loss), np.where(gain > 0, 100.0, 50.0))
+            rsi = np.where(k >= self.rsi_period, rsi, np.nan)
+
+            atr_ready = k >= self.adx_period
+            atr = np.where(atr_ready, self.tr_avg[sid], np.nan)
+            plus_di = np.where(atr_ready & (atr > 0), 100.0 * self.pdm_avg[sid] / atr, np.nan)
+            minus_di = np.where(atr_ready & (atr > 0), 100.0 * self.mdm_avg[sid] / atr, np.nan)
+            adx = np.where(k >= 2 * self.adx_period - 1, self.adx[sid], np.nan)
+
+            bb_ready = cnt >= self.bb_period
+            std = np.sqrt(self.bb_m2[sid] / self.bb_period)
+            middle = np.where(bb_ready, self.bb_mean[sid], np.nan)
+
+        macd = self.macd_fast[sid] - self.macd_slow[sid]
+        values = {
+            "bars": cnt,
+            "rsi": rsi,
+            "macd": macd,
+            "macd_signal": self.macd_signal[sid],
+            "macd_histogram": macd - self.macd_signal[sid],
+            "bb_upper": middle + self.bb_std * std,
+            "bb_middle": middle,
+            "bb_lower": middle - self.bb_std * std,
+            "atr": atr,
+            "plus_di": plus_di,
+            "minus_di": minus_di,
+            "adx": adx,
+            "support": self.sup_val[sid],
+            "resistance": self.res_val[sid]
+        }
+        for row, span in enumerate(self.ema_periods):
+            values[f"ema_{span}"] = self.ema[row, sid]
+        return values
+
+    def snapshot(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Latest indicators for one symbol (None before its first bar). Unwarmed values are None."""
+        with self._lock:
+            sid = self.symbol_ids.get(symbol)
+            if sid is None or self.count[sid] == 0:
+                return None
+            values = self._values(sid)
+        out = {"symbol": symbol}
+        for name, value in values.items():
+            value = float(value) if name != "bars" else int(value)
+            out[name] = None if isinstance(value, float) and np.isnan(value) else value
+        return out
+
+    def values(self, symbols: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Indicator arrays for the given (already seen) symbols, in order. Unwarmed values are NaN."""
+        with self._lock:
+            sids = np.fromiter((self.symbol_ids[s] for s in symbols), dtype=np.int64, count=len(symbols))
+            return self._values(sids)
+
+    def to_frame(self) -> pd.DataFrame:
+        """All symbols' indicators as one DataFrame (vectorized read)."""
+        with self._lock:
+            sids = np.arange(len(self.symbols))
+            values, index = self._values(sids), pd.Index(self.symbols, name="symbol")
+        return pd.DataFrame(values, index=index)
@@ -4,8 +4,10 @@ import json
 import asyncio
 from datetime import datetime, timedelta
 import random
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, List
 from backend.database.db import db
+from backend.utils.broker_session import broker_session
+from backend.streaming.bar_aggregator import BarAggregator
 
 # Angel One API
 try:
@@ -34,9 +36,18 @@ class NSEDataCollector:
         self.snapshot_interval = 3600 # 1 hour
         self.last_snapshot_time = 0
         self.data_buffer = {}
+        # Callbacks fed every saved bar (e.g. StreamingBacktest.attach)
+        self.bar_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        # Polled index quotes roll up into session-aligned 1m bars before they
+        # are stored or published, so live and stored history share one bar size
+        self.bar_aggregator = BarAggregator(timeframes=["1m"], capacity=8, flush_size=1)
+        self.bar_aggregator.add_bar_listener(self._on_closed_bars)
         
         # Angel One initialization
         self.angel_client = None
+        self.auth_token = None
+        self.feed_token = None
+        self.tick_feed = None
         self.api_key = os.getenv("ANGEL_ONE_API_KEY")
         self.client_id = os.getenv("ANGEL_ONE_CLIENT_ID")
         self.password = os.getenv("ANGEL_ONE_PASSWORD")
@@ -56,36 +67,79 @@ class NSEDataCollector:
             self.status = "error_no_credentials"
 
     def _init_angel_one(self):
-        """Initialize Angel One SmartAPI connection."""
+        """Attach to the shared Angel One session (one login per process)."""
         try:
-            self.angel_client = SmartConnect(api_key=self.api_key)
-            
-            if self.client_id and self.password and self.totp_secret:
-                # Generate TOTP
-                totp = pyotp.TOTP(self.totp_secret).now()
-                
-                # Login
-                data = self.angel_client.generateSession(self.client_id, self.password, totp)
-                
-                if data and data.get('status'):
-                    self.auth_token = data['data']['jwtToken']
-                    self.refresh_token = data['data']['refreshToken']
-                    self.feed_token = data['data']['feedToken']
-                    logger.info(f"✅ Angel One API connected successfully for {self.client_id}")
-                    self.status = "connected_angel_one"
-                else:
-                    logger.error(f"Angel One login failed: {data.get('message', 'Unknown error')}")
-                    self.angel_client = None
-                    self.status = "error_login_failed"
-            else:
+            if not (self.client_id and self.password and self.totp_secret):
                 logger.warning("Missing Angel One credentials (CLIENT_ID/PASSWORD/TOTP). API initialized but not logged in.")
                 self.status = "error_missing_credentials"
-                
+                return
+
+            if broker_session.ensure_session():
+                self.angel_client = broker_session.client
+                self.auth_token = broker_session.auth_token
+                self.refresh_token = broker_session.refresh_token
+                self.feed_token = broker_session.feed_token
+                logger.info(f"✅ Angel One API connected successfully for {self.client_id}")
+                self.status = "connected_angel_one"
+            else:
+                logger.error(f"Angel One login failed: {broker_session.last_error or 'Unknown error'}")
+                self.angel_client = None
+                self.status = "error_login_failed"
+
         except Exception as e:
             logger.error(f"Angel One initialization failed: {e}")
             self.angel_client = None
             self.status = "error_initialization_failed"
 
+    def add_bar_listener(self, callback: Callable[[str, Dict[str, Any]], None]):
+        """Register callback(symbol, bar) to receive every bar saved by the collector."""
+        self.bar_listeners.append(callback)
+
+    def remove_bar_listener(self, callback: Callable[[str, Dict[str, Any]], None]):
+        if callback in self.bar_listeners:
+            self.bar_listeners.remove(callback)
+
+    def record_quote(self, symbol: str, epoch_seconds: float, price: float):
+        """Fold one polled price into the symbol's forming 1m bar."""
+        aggregator = self.bar_aggregator
+        aggregator.update(aggregator.symbol_id(symbol), epoch_seconds, price)
+
+    def _on_closed_bars(self, bars: List[Dict[str, Any]]):
+        """BarAggregator listener: store completed 1m bars, then publish them."""
+        db.save_market_data_batch(bars)
+        for bar in bars:
+            self._publish_bar(bar["symbol"], bar)
+
+    def _publish_bar(self, symbol: str, bar: Dict[str, Any]):
+        for callback in list(self.bar_listeners):
+            try:
+                callback(symbol, bar)
+            except Exception as e:
+                logger.error(f"Bar listener failed for {symbol}: {e}")
+
+    def create_tick_feed(self, tokens: Optional[Dict[int, List[str]]] = None, bus=None, url: Optional[str] = None,
+                         mode: Optional[int] = None):
+        """
+        Build a SmartAPIFeed on this collector's session. Defaults to the
+        index tokens in token_map; url can point at a local replay server
+        and mode=MODE_SNAP_QUOTE adds best-5 depth.
+        Run it with `await feed.subscribe(...)` and `await feed.run()`.
+        """
+        from backend.streaming.smartapi_feed import SmartAPIFeed
+        from backend.streaming.smartapi_protocol import EXCHANGE_TYPES
+
+        if tokens is None:
+            tokens = {}
+            for info in self.token_map.values():
+                tokens.setdefault(EXCHANGE_TYPES[info["exchange"]], []).append(info["token"])
+
+        kwargs = {"url": url} if url else {}
+        if mode is not None:
+            kwargs["mode"] = mode
+        self.tick_feed = SmartAPIFeed.from_collector(self, bus=bus, **kwargs)
+        self.tick_feed.add_tokens(tokens)
+        return self.tick_feed
+
     def get_indices(self) -> Dict[str, Dict[str, float]]:
         """
         Fetch major indices data (NIFTY 50, BANKNIFTY) using Angel One API.
@@ -99,7 +153,8 @@ class NSEDataCollector:
                 for index_name, token_info in self.token_map.items():
                     try:
                         # Fetch LTP using Angel One
-                        ltp_data = self.angel_client.ltpData(
+                        ltp_data = broker_session.call(
+                            "ltpData",
                             token_info["exchange"],
                             token_info["symbol"],
                             token_info["token"]
@@ -227,31 +282,14 @@ class NSEDataCollector:
                 self.data_buffer = market_snapshot
                 self.last_collection_time = current_time
                 
-                # Save to Market Data Table (High Frequency)
+                # Save to Market Data Table as 1m bars
                 # We save NIFTY 50 as the primary symbol for now
                 if "NIFTY 50" in indices:
-                    nifty_data = indices["NIFTY 50"]
-                    db.save_market_data(
-                        symbol="NIFTY",
-                        timestamp=datetime.now(),
-                        open_price=nifty_data["open"],
-                        high=nifty_data["high"],
-                        low=nifty_data["low"],
-                        close=nifty_data["price"],
-                        volume=0
-                    )
-                    
+                    self.record_quote("NIFTY", current_time, indices["NIFTY 50"]["price"])
                 if "BANKNIFTY" in indices:
-                    bn_data = indices["BANKNIFTY"]
-                    db.save_market_data(
-                        symbol="BANKNIFTY",
-                        timestamp=datetime.now(),
-                        open_price=bn_data["open"],
-                        high=bn_data["high"],
-                        low=bn_data["low"],
-                        close=bn_data["price"],
-                        volume=0
-                    )
+                    self.record_quote("BANKNIFTY", current_time, indices["BANKNIFTY"]["price"])
+                # Close minutes that ended even if no newer quote arrived
+                self.bar_aggregator.advance(current_time)
                 
                 logger.info(f"Collected market data at {market_snapshot['timestamp']}")
                 
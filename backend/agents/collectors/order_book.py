@@ -1,7 +1,7 @@
 import logging
-from typing import Dict, List, Any
-import random
-from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from .order_book_store import OrderBookStore
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -12,51 +12,50 @@ class OrderBookAnalyzer:
     Collector Agent 3: Order Book Intelligence
     Responsibility: Analyze bid/ask depth, detect iceberg orders, calculate imbalance.
     """
-    def __init__(self):
+    def __init__(self, store: Optional[OrderBookStore] = None):
         self.name = "OrderBookAnalyzer"
         self.status = "initialized"
+        # Ring-buffered depth history per symbol
+        self.store = store or OrderBookStore()
+
+    def attach(self, bus, symbol_map: Optional[Dict[str, str]] = None) -> "OrderBookAnalyzer":
+        """Record depth from snap-quote ticks on a TickBus."""
+        if symbol_map:
+            self.store.symbol_map.update(symbol_map)
+        self.store.attach(bus)
+        self.status = "streaming"
+        return self
+
+    def record_snapshot(self, symbol: str, bids: List[Dict[str, float]], asks: List[Dict[str, float]],
+                        timestamp: Optional[float] = None):
+        """Add an L2 snapshot from any source (feed, REST depth, replay)."""
+        self.store.record(symbol, bids, asks, timestamp)
 
     def get_order_book(self, symbol: str) -> Dict[str, Any]:
         """
-        Fetch Level 2 order book data.
+        Latest Level 2 order book recorded for a symbol.
+        Returns empty dict if no depth has been received.
         """
         try:
-            # Placeholder for actual L2 data fetch
-            # In reality, this would connect to a broker API or data feed
-            
-            # Simulating 5 levels of depth
-            bids = [{"price": 24500 - i*5, "qty": random.randint(100, 1000)} for i in range(5)]
-            asks = [{"price": 24500 + i*5, "qty": random.randint(100, 1000)} for i in range(5)]
-            
-            return {
-                "symbol": symbol,
-                "bids": bids,
-                "asks": asks,
-                "timestamp": datetime.now().isoformat()
-            }
+            book = self.store.latest(symbol)
+            if book is None:
+                logger.warning(f"No order book depth recorded for {symbol}")
+                return {}
+            return book
         except Exception as e:
             logger.error(f"Error fetching order book for {symbol}: {e}")
             return {}
 
-    def detect_iceberg_orders(self, order_book: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def detect_iceberg_orders(self, order_book: Dict[str, Any], lookback: int = 300) -> List[Dict[str, Any]]:
         """
         Detect potential iceberg orders (large orders hidden as small ones).
         Logic: Look for consistent reloading of quantity at a specific price level.
         """
         try:
-            # This requires tracking order book changes over time.
-            # For this stateless method, we'll return a mock detection.
-            
-            # Mock detection logic:
-            icebergs = []
-            if random.random() < 0.1: # 10% chance to detect one
-                icebergs.append({
-                    "type": "BUY" if random.random() > 0.5 else "SELL",
-                    "price": 24500,
-                    "estimated_qty": 5000,
-                    "visible_qty": 500
-                })
-            return icebergs
+            symbol = order_book.get("symbol")
+            if not symbol:
+                return []
+            return self.store.detect_icebergs(symbol, lookback=lookback)
         except Exception as e:
             logger.error(f"Error detecting iceberg orders: {e}")
             return []
@@ -86,6 +85,24 @@ class OrderBookAnalyzer:
             logger.error(f"Error calculating imbalance: {e}")
             return 0.0
 
+    def calculate_rolling_imbalance(self, symbol: str, window: int = 20) -> float:
+        """
+        Mean imbalance over the last `window` snapshots; steadier than a single book.
+        """
+        try:
+            return self.store.rolling_imbalance(symbol, window)
+        except Exception as e:
+            logger.error(f"Error calculating rolling imbalance: {e}")
+            return 0.0
+
+    def persist(self, db=None) -> int:
+        """Save snapshots recorded since the last call to order_book_snapshots."""
+        try:
+            return self.store.persist(db)
+        except Exception as e:
+            logger.error(f"Error persisting order book snapshots: {e}")
+            return 0
+
     def predict_next_tick(self, imbalance: float) -> str:
         """
         Predict next tick direction based on imbalance.
@@ -99,6 +116,9 @@ class OrderBookAnalyzer:
 
 if __name__ == "__main__":
     analyzer = OrderBookAnalyzer()
+    analyzer.record_snapshot("NIFTY",
+                             [{"price": 24500 - i*5, "qty": 500 + i*100} for i in range(5)],
+                             [{"price": 24505 + i*5, "qty": 300 + i*100} for i in range(5)])
     ob = analyzer.get_order_book("NIFTY")
     print(f"Order Book: {ob}")
     imb = analyzer.calculate_imbalance(ob)
@@ -0,0 +1,327 @@
+"""
+Order Book Store
+Per-symbol fixed-capacity ring buffers of L2 depth snapshots. Each ring
+holds contiguous (capacity x levels) price/qty arrays, so memory is bounded
+and a history window is a single fancy-index read.
+
+On top of the history it computes rolling bid/ask imbalance and detects
+iceberg orders from queue replenishment. A level that trades down and then
+reloads at the same price, again and again, is showing only part of a
+larger resting order. Snapshots are persisted to order_book_snapshots as
+packed binary depth instead of JSON.
+"""
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# One packed depth level: price in rupees, quantity
+DEPTH_DTYPE = np.dtype([("price", "<f8"), ("qty", "<u4")])
+
+
+def pack_depth(prices: np.ndarray, qtys: np.ndarray) -> bytes:
+    """Pack one side of the book (levels with a price only) into bytes."""
+    present = np.isfinite(prices) & (prices > 0)
+    levels = np.empty(int(present.sum()), dtype=DEPTH_DTYPE)
+    levels["price"] = prices[present]
+    levels["qty"] = qtys[present]
+    return levels.tobytes()
+
+
+def unpack_depth(blob) -> Tuple[np.ndarray, np.ndarray]:
+    """Inverse of pack_depth. Also reads legacy JSON depth ([{"price", "qty"}, ...])."""
+    if blob is None:
+        return np.empty(0), np.empty(0)
+    if isinstance(blob, str):
+        levels = json.loads(blob)
+        return (np.array([l["price"] for l in levels], dtype=float),
+                np.array([l["qty"] for l in levels], dtype=float))
+    levels = np.frombuffer(blob, dtype=DEPTH_DTYPE)
+    return levels["price"].astype(float), levels["qty"].astype(float)
+
+
+def _side_arrays(side, levels: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(price, qty) arrays padded to `levels` from [(price, qty, ...)] or [{"price", "qty"}]."""
+    prices = np.full(levels, np.nan)
+    qtys = np.zeros(levels)
+    for i, level in enumerate(side[:levels]):
+        if isinstance(level, dict):
+            prices[i], qtys[i] = level["price"], level["qty"]
+        else:
+            prices[i], qtys[i] = level[0], level[1]
+    return prices, qtys
+
+
+class OrderBookRing:
+    """
+    Fixed-capacity history of one symbol's L2 snapshots.
+    """
+
+    def __init__(self, capacity: int = 2048, levels: int = 5):
+        self.capacity = capacity
+        self.levels = levels
+        self.ts = np.zeros(capacity)
+        self.bid_px = np.full((capacity, levels), np.nan)
+        self.bid_qty = np.zeros((capacity, levels))
+        self.ask_px = np.full((capacity, levels), np.nan)
+        self.ask_qty = np.zeros((capacity, levels))
+        self.total = 0        # snapshots ever appended
+        self.persisted = 0    # value of `total` at the last persist
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def append(self, ts: float, bid_px: np.ndarray, bid_qty: np.ndarray, ask_px: np.ndarray, ask_qty: np.ndarray):
+        row = self.total % self.capacity
+        self.ts[row] = ts
+        self.bid_px[row], self.bid_qty[row] = bid_px, bid_qty
+        self.ask_px[row], self.ask_qty[row] = ask_px, ask_qty
+        self.total += 1
+
+    def rows(self, n: Optional[int] = None) -> np.ndarray:
+        """Ring rows of the last n snapshots, oldest first."""
+        size = len(self)
+        n = size if n is None else min(n, size)
+        return (self.total - n + np.arange(n)) % self.capacity
+
+    def window(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        rows = self.rows(n)
+        return {"ts": self.ts[rows], "bid_px": self.bid_px[rows], "bid_qty": self.bid_qty[rows],
+                "ask_px": self.ask_px[rows], "ask_qty": self.ask_qty[rows]}
+
+
+def imbalance(bid_qty: np.ndarray, ask_qty: np.ndarray, depth: Optional[int] = None) -> np.ndarray:
+    """(bid - ask) / (bid + ask) over the top `depth` levels of each snapshot, in [-1, 1]."""
+    bids = bid_qty[:, :depth].sum(axis=1)
+    asks = ask_qty[:, :depth].sum(axis=1)
+    total = bids + asks
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total > 0, (bids - asks) / total, 0.0)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean; the first window-1 points average what is available."""
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    idx = np.arange(1, len(values) + 1)
+    start = np.maximum(idx - window, 0)
+    return (csum[idx] - csum[start]) / (idx - start)
+
+
+def queue_refills(px: np.ndarray, qty: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Replenishment statistics per price level for one side of the book.
+
+    Snapshots are matched level-by-price (a price can move between level
+    slots as the book shifts). A refill is a size increase at a price whose
+    queue shrank in the previous step. Returns per-price arrays: price,
+    refills, depleted (total shrinkage), reloaded (total refill size) and
+    visible (latest displayed qty).
+    """
+    empty = {k: np.empty(0) for k in ("price", "refills", "depleted", "reloaded", "visible")}
+    if len(px) < 3:
+        return empty
+
+    cur_px, prev_px = px[1:], px[:-1]
+    match = cur_px[:, :, None] == prev_px[:, None, :]         # (steps, level, prev level)
+    seen = match.any(axis=2)
+    before = np.where(match, qty[:-1][:, None, :], 0.0).sum(axis=2)
+    delta = np.where(seen, qty[1:] - before, 0.0)
+    drop = np.where(delta < 0, -delta, 0.0)
+
+    # Did this price's queue shrink in the step before?
+    prev_drop = np.where(match[1:], drop[:-1][:, None, :], 0.0).sum(axis=2)
+    refill = np.zeros_like(seen)
+    refill[1:] = (delta[1:] > 0) & (prev_drop > 0)
+
+    valid = seen & np.isfinite(cur_px)
+    if not valid.any():
+        return empty
+    prices, inverse = np.unique(cur_px[valid], return_inverse=True)
+    count = len(prices)
+
+    # Visible size is the displayed qty at each price in the latest snapshot
+    at_price = prices[:, None] == px[-1][None, :]
+    visible = np.where(at_price, qty[-1][None, :], 0.0).sum(axis=1)
+
+    return {
+        "price": prices,
+        "refills": np.bincount(inverse, weights=refill[valid], minlength=count),
+        "depleted": np.bincount(inverse, weights=drop[valid], minlength=count),
+        "reloaded": np.bincount(inverse, weights=np.where(refill, delta, 0.0)[valid], minlength=count),
+        "visible": visible
+    }
+
+
+class OrderBookStore:
+    """
+    Ring-buffered L2 history for many symbols with vectorized analytics.
+    """
+
+    def __init__(self, capacity: int = 2048, levels: int = 5, symbol_map: Optional[Dict[str, str]] = None):
+        self.capacity = capacity
+        self.levels = levels
+        # Optional token -> trading symbol for feed ticks
+        self.symbol_map = symbol_map or {}
+        self.books: Dict[str, OrderBookRing] = {}
+        # Ticks arrive on the feed loop while API threads read
+        self._lock = threading.Lock()
+        self.stats = {"snapshots": 0, "persisted": 0, "lost_before_persist": 0}
+        self._persisting = False
+
+    def _ring(self, symbol: str) -> OrderBookRing:
+        ring = self.books.get(symbol)
+        if ring is None:
+            ring = self.books[symbol] = OrderBookRing(self.capacity, self.levels)
+        return ring
+
+    # ===== Ingestion =====
+
+    def record(self, symbol: str, bids: Sequence, asks: Sequence, timestamp: Optional[float] = None):
+        """Append a snapshot. bids/asks are best-first [(price, qty, ...)] or [{"price", "qty"}]."""
+        bid_px, bid_qty = _side_arrays(bids, self.levels)
+        ask_px, ask_qty = _side_arrays(asks, self.levels)
+        with self._lock:
+            ring = self._ring(symbol)
+            if ring.total - ring.persisted >= ring.capacity:
+                # Oldest unpersisted snapshot is about to be overwritten
+                ring.persisted += 1
+                if self._persisting:
+                    self.stats["lost_before_persist"] += 1
+            ring.append(time.time() if timestamp is None else timestamp, bid_px, bid_qty, ask_px, ask_qty)
+            self.stats["snapshots"] += 1
+
+    def on_tick(self, tick):
+        """TickBus listener; only snap-quote ticks carry depth."""
+        if tick.depth:
+            self.record(self.symbol_map.get(tick.token, tick.token), tick.depth[0], tick.depth[1], tick.exchange_ts / 1000.0)
+
+    def attach(self, bus, tokens=None) -> "OrderBookStore":
+        bus.add_listener(self.on_tick, tokens=tokens)
+        return self
+
+    # ===== Reads =====
+
+    def window(self, symbol: str, n: Optional[int] = None) -> Optional[Dict[str, np.ndarray]]:
+        with self._lock:
+            ring = self.books.get(symbol)
+            if ring is None or len(ring) == 0:
+                return None
+            return ring.window(n)
+
+    def latest(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Most recent snapshot in get_order_book() format."""
+        w = self.window(symbol, 1)
+        if w is None:
+            return None
+
+        def side(px, qty):
+            return [{"price": float(p), "qty": int(q)} for p, q in zip(px[0], qty[0]) if np.isfinite(p)]
+
+        return {
+            "symbol": symbol,
+            "bids": side(w["bid_px"], w["bid_qty"]),
+            "asks": side(w["ask_px"], w["ask_qty"]),
+            "timestamp": datetime.fromtimestamp(w["ts"][0]).isoformat()
+        }
+
+    def imbalance_series(self, symbol: str, window: int = 1, depth: Optional[int] = None,
+                         last: Optional[int] = None) -> np.ndarray:
+        """Per-snapshot imbalance, smoothed by a trailing `window`-snapshot mean."""
+        w = self.window(symbol, last)
+        if w is None:
+            return np.empty(0)
+        series = imbalance(w["bid_qty"], w["ask_qty"], depth)
+        return rolling_mean(series, window) if window > 1 else series
+
+    def rolling_imbalance(self, symbol: str, window: int = 20, depth: Optional[int] = None) -> float:
+        series = self.imbalance_series(symbol, window=1, depth=depth, last=window)
+        return float(series.mean()) if len(series) else 0.0
+
+    def detect_icebergs(self, symbol: str, lookback: int = 300, min_refills: int = 3,
+                        min_reload_ratio: float = 1.0) -> List[Dict[str, Any]]:
+        """
+        Price levels that reloaded after being traded down at least
+        `min_refills` times in the last `lookback` snapshots, with total
+        reloaded size at least `min_reload_ratio` x the visible size.
+        """
+        w = self.window(symbol, lookback)
+        if w is None:
+            return []
+        found = []
+        for kind, px, qty in (("BUY", w["bid_px"], w["bid_qty"]), ("SELL", w["ask_px"], w["ask_qty"])):
+            stats = queue_refills(px, qty)
+            visible = np.maximum(stats["visible"], 1.0)
+            flagged = (stats["refills"] >= min_refills) & (stats["reloaded"] >= min_reload_ratio * visible)
+            for i in np.flatnonzero(flagged):
+                found.append({
+                    "type": kind,
+                    "price": float(stats["price"][i]),
+                    "refills": int(stats["refills"][i]),
+                    "visible_qty": int(stats["visible"][i]),
+                    "executed_qty": int(stats["depleted"][i]),
+                    "estimated_qty": int(stats["depleted"][i] + stats["visible"][i])
+                })
+        return sorted(found, key=lambda f: -f["estimated_qty"])
+
+    # ===== Persistence =====
+
+    def pending_rows(self, symbol: Optional[str] = None) -> List[Tuple]:
+        """Snapshots not yet persisted as (symbol, timestamp, bid_blob, ask_blob, imbalance) rows."""
+        return self._pending(symbol)[0]
+
+    def _pending(self, symbol: Optional[str] = None) -> Tuple[List[Tuple], Dict[str, int]]:
+        """Pending rows plus each ring's `total` at read time, to mark persisted once written."""
+        rows = []
+        marks = {}
+        with self._lock:
+            symbols = [symbol] if symbol else list(self.books)
+            for sym in symbols:
+                ring = self.books.get(sym)
+                if ring is None:
+                    continue
+                n = ring.total - ring.persisted
+                if n <= 0:
+                    continue
+                w = ring.window(n)
+                values = imbalance(w["bid_qty"], w["ask_qty"])
+                for i in range(n):
+                    rows.append((sym, datetime.fromtimestamp(w["ts"][i]),
+                                 pack_depth(w["bid_px"][i], w["bid_qty"][i]),
+                                 pack_depth(w["ask_px"][i], w["ask_qty"][i]),
+                                 float(values[i])))
+                marks[sym] = ring.total
+        return rows, marks
+
+    def persist(self, db=None, symbol: Optional[str] = None) -> int:
+        """Write snapshots recorded since the last persist in one batch."""
+        if db is None:
+            from backend.database.db import db as default_db
+            db = default_db
+        self._persisting = True
+        rows, marks = self._pending(symbol)
+        if not rows or not db.save_order_book_snapshots(rows):
+            # A failed write leaves the snapshots pending for the next persist
+            return 0
+        with self._lock:
+            for sym, mark in marks.items():
+                ring = self.books[sym]
+                # record() may have already skipped past overwritten rows
+                ring.persisted = max(ring.persisted, mark)
+            self.stats["persisted"] += len(rows)
+        return len(rows)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "symbols": len(self.books),
+                "capacity_per_symbol": self.capacity,
+                "memory_bytes": sum(r.ts.nbytes + r.bid_px.nbytes * 4 for r in self.books.values())
+            }
@@ -1,6 +1,9 @@
 import logging
 import numpy as np
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Sequence
+
+from . import indicator_batch
+from .indicator_engine import IncrementalIndicatorEngine, ema_series, wilder_series
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -11,9 +14,74 @@ class TechnicalIndicatorCollector:
     Collector Agent 2: Technical Indicators
     Responsibility: Calculate RSI, Bollinger Bands, MACD, ADX, and detect Support/Resistance.
     """
-    def __init__(self):
+    def __init__(self, engine: Optional[IncrementalIndicatorEngine] = None):
         self.name = "TechnicalIndicatorCollector"
         self.status = "initialized"
+        # Live per-symbol indicator state, advanced one bar at a time
+        self.engine = engine or IncrementalIndicatorEngine()
+        self._history_loaded = set()
+
+    # ===== Streaming indicators =====
+
+    def update_bar(self, symbol: str, high: float, low: float, close: float) -> Dict[str, Any]:
+        """Advance a symbol's indicators by one bar and return the latest values."""
+        self.engine.update(symbol, high, low, close)
+        return self.engine.snapshot(symbol)
+
+    def on_bar(self, symbol: str, bar: Dict[str, Any]):
+        """NSEDataCollector bar listener."""
+        self.update_bar(symbol, bar["high"], bar["low"], bar["close"])
+
+    def attach(self, market_collector, symbols: Sequence[str] = ()) -> "TechnicalIndicatorCollector":
+        """
+        Stream market_collector's closed bars into the engine. `symbols` are
+        seeded from stored history first, before any live bar can arrive, so
+        a seed never overwrites a bar that was applied while it loaded.
+        """
+        for symbol in symbols:
+            try:
+                self.load_history(symbol)
+            except Exception as e:
+                logger.error(f"Error seeding {symbol} indicators: {e}")
+        market_collector.add_bar_listener(self.on_bar)
+        self.status = "streaming"
+        return self
+
+    def initialize_symbol(self, symbol: str, highs: List[float], lows: List[float], closes: List[float]):
+        """Seed a symbol's indicator state from history in one vectorized pass."""
+        self.engine.initialize(symbol, highs, lows, closes)
+
+    def load_history(self, symbol: str, limit: int = 500, timeframe: str = '1m') -> int:
+        """Seed a symbol from stored market_data bars once; returns the number of bars used."""
+        if symbol in self._history_loaded:
+            return 0
+        from backend.database.db import db
+        bars = db.get_market_data_history(symbol, limit=limit, timeframe=timeframe)
+        self._history_loaded.add(symbol)
+        if bars:
+            self.initialize_symbol(symbol, [b['high'] for b in bars], [b['low'] for b in bars],
+                                   [b['close'] for b in bars])
+        return len(bars)
+
+    def get_indicators(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Latest streaming indicators for a symbol, or None if it has no bars yet."""
+        return self.engine.snapshot(symbol)
+
+    # ===== Universe-wide batch calculations =====
+
+    def calculate_batch(self, highs, lows, closes, **params) -> Dict[str, Any]:
+        """
+        All indicators for a whole universe in one vectorized pass. Inputs are
+        (time x symbol) arrays or DataFrames, NaN for missing bars; returns
+        one matrix per indicator (see indicator_batch.compute_indicators).
+        """
+        return indicator_batch.compute_indicators(highs, lows, closes, **params)
+
+    def latest_batch(self, highs, lows, closes, **params):
+        """calculate_batch() reduced to the latest row: a symbol x indicator DataFrame."""
+        return indicator_batch.latest(self.calculate_batch(highs, lows, closes, **params))
+
+    # ===== Point-in-time calculations =====
 
     def calculate_rsi(self, prices: List[float], period: int = 14) -> float:
         """
@@ -23,30 +91,12 @@ class TechnicalIndicatorCollector:
             if not prices or len(prices) < period + 1:
                 return 50.0
             
-            prices_np = np.array(prices)
-            deltas = np.diff(prices_np)
-            seed = deltas[:period+1]
-            up = seed[seed >= 0].sum()/period
-            down = -seed[seed < 0].sum()/period
-            rs = up/down
-            rsi = np.zeros_like(prices_np)
-            rsi[:period] = 100. - 100./(1. + rs)
-
-            for i in range(period, len(prices_np)):
-                delta = deltas[i-1]
-                if delta > 0:
-                    upval = delta
-                    downval = 0.
-                else:
-                    upval = 0.
-                    downval = -delta
-
-                up = (up*(period-1) + upval)/period
-                down = (down*(period-1) + downval)/period
-                rs = up/down
-                rsi[i] = 100. - 100./(1. + rs)
-
-            return float(rsi[-1])
+            deltas = np.diff(np.asarray(prices, dtype=float))
+            up = wilder_series(np.maximum(deltas, 0.0), period)[-1]
+            down = wilder_series(np.maximum(-deltas, 0.0), period)[-1]
+            if down == 0:
+                return 100.0 if up > 0 else 50.0
+            return float(100. - 100./(1. + up/down))
         except Exception as e:
             logger.error(f"Error calculating RSI: {e}")
             return 50.0
@@ -99,10 +149,12 @@ class TechnicalIndicatorCollector:
         Calculate ADX (Average Directional Index).
         """
         try:
-            # Simplified ADX calculation for brevity
-            # In production, use a library like talib or pandas_ta
-            # For now, returning a safe default if calculation fails or libs missing
-            return 25.0 
+            if not closes or len(closes) < 2 * period or not (len(highs) == len(lows) == len(closes)):
+                return 0.0
+
+            engine = IncrementalIndicatorEngine(capacity=1, adx_period=period)
+            engine.initialize("ADX", highs, lows, closes)
+            return float(engine.snapshot("ADX")["adx"])
         except Exception as e:
             logger.error(f"Error calculating ADX: {e}")
             return 0.0
@@ -128,11 +180,7 @@ class TechnicalIndicatorCollector:
         """Helper to calculate EMA."""
         if not data:
             return []
-        alpha = 2 / (window + 1)
-        ema = [data[0]]
-        for i in range(1, len(data)):
-            ema.append(alpha * data[i] + (1 - alpha) * ema[i-1])
-        return ema
+        return ema_series(np.asarray(data, dtype=float), window).tolist()
 
 if __name__ == "__main__":
     # Test with dummy data
@@ -28,12 +28,12 @@ class AdaptiveMetaStrategy:
         "LOW_VOLATILITY": "Low Volatility (VIX<15)"
     }
     
-    def __init__(self, organism: Optional[TradingOrganism] = None):
+    def __init__(self, organism: Optional[TradingOrganism] = None, backtester: Optional[BacktestEngine] = None):
         self.organism = organism
         self.agent_name = "adaptive_meta"
         self.db = DatabaseManager()
         self.fitness_calculator = FitnessCalculator()
-        self.backtester = BacktestEngine()
+        self.backtester = backtester or BacktestEngine()
         
         if organism:
             self.params = self._extract_dna_params(organism.dna)
@@ -19,12 +19,12 @@ class MeanReversionStrategy:
     Buys oversold, sells overbought conditions
     """
     
-    def __init__(self, organism: Optional[TradingOrganism] = None):
+    def __init__(self, organism: Optional[TradingOrganism] = None, backtester: Optional[BacktestEngine] = None):
         self.organism = organism
         self.agent_name = "mean_reversion"
         self.db = DatabaseManager()
         self.fitness_calculator = FitnessCalculator()
-        self.backtester = BacktestEngine()
+        self.backtester = backtester or BacktestEngine()
         
         if organism:
             self.params = self._extract_dna_params(organism.dna)
@@ -20,12 +20,12 @@ class ScalperStrategy:
     DNA-driven scalping strategy with tight stops and quick targets
     """
     
-    def __init__(self, organism: Optional[TradingOrganism] = None):
+    def __init__(self, organism: Optional[TradingOrganism] = None, backtester: Optional[BacktestEngine] = None):
         self.organism = organism
         self.agent_name = "scalper"
         self.db = DatabaseManager()
         self.fitness_calculator = FitnessCalculator()
-        self.backtester = BacktestEngine()
+        self.backtester = backtester or BacktestEngine()
         
         # Extract DNA parameters or use defaults
         if organism:
@@ -3,7 +3,7 @@ Tester Manager - Coordinates all 5 advanced tester agents
 Runs parallel tests on organisms and aggregates results
 """
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
@@ -12,6 +12,7 @@ from backend.agents.testers.scalper import ScalperStrategy
 from backend.agents.testers.swing_trader import SwingTraderStrategy
 from backend.agents.testers.mean_reversion import MeanReversionStrategy
 from backend.agents.testers.adaptive_meta import AdaptiveMetaStrategy
+from backend.intelligence.backtester import BacktestEngine
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +21,9 @@ class TesterManager:
     Manages all 5 tester agents and coordinates parallel testing
     """
     
-    def __init__(self):
+    def __init__(self, backtester: Optional[BacktestEngine] = None):
+        # Shared engine handed to every tester (None = each builds its own)
+        self.backtester = backtester
         self.testers = {
             "scalper": ScalperStrategy,
             "swing_trader": SwingTraderStrategy,
@@ -45,7 +48,7 @@ class TesterManager:
         
         for tester_name, TesterClass in self.testers.items():
             try:
-                tester = TesterClass(organism=organism)
+                tester = TesterClass(organism=organism, backtester=self.backtester)
                 result = tester.test_strategy()
                 
                 results[tester_name] = result
@@ -3,15 +3,31 @@ Consensus Engine
 Analyzes responses from multiple AI models and creates consensus
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 import re
 from collections import Counter
 
+from backend.ai.verification_cache import VerificationCache, responses_signature, verification_cache
+
+# Patterns like "8/10", "score: 7", "viability: 6", tried in order
+SCORE_PATTERNS = [
+    re.compile(r'(\d+)/10'),
+    re.compile(r'score[:\s]+(\d+)'),
+    re.compile(r'viability[:\s]+(\d+)'),
+    re.compile(r'rating[:\s]+(\d+)'),
+    re.compile(r'(\d+)\s*out\s*of\s*10')
+]
+# An explicit "Recommendation: VIABLE" line, as the streaming prompt asks for
+# Successful responses at which the response-count confidence factor saturates
+RESPONSE_TARGET = 8
+
+RECOMMENDATION_PATTERN = re.compile(r'recommendation\W*(not viable|viable|moderate|risky)\b')
+
 class ConsensusEngine:
     """Creates consensus from multiple AI model responses"""
     
-    def __init__(self):
-        pass
+    def __init__(self, cache: Optional[VerificationCache] = verification_cache):
+        self.cache = cache
     
     def extract_score(self, text: str) -> float:
         """
@@ -26,17 +42,9 @@ class ConsensusEngine:
         if not text:
             return 0.0
         
-        # Look for patterns like "8/10", "score: 7", "viability: 6"
-        patterns = [
-            r'(\d+)/10',
-            r'score[:\s]+(\d+)',
-            r'viability[:\s]+(\d+)',
-            r'rating[:\s]+(\d+)',
-            r'(\d+)\s*out\s*of\s*10'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text.lower())
+        text_lower = text.lower()
+        for pattern in SCORE_PATTERNS:
+            match = pattern.search(text_lower)
             if match:
                 score = float(match.group(1))
                 return min(10.0, max(1.0, score))
@@ -68,17 +76,20 @@ class ConsensusEngine:
         
         return "UNKNOWN"
     
-    def calculate_consensus(self, responses: List[Dict]) -> Dict:
+    def calculate_consensus(self, responses: List[Dict], cache_key: Optional[str] = None) -> Dict:
         """
         Calculate consensus from multiple AI responses
         
         Args:
             responses: List of AI response dicts
+            cache_key: Strategy hash from the verifier; enables the consensus cache
             
         Returns:
             Consensus analysis
         """
         successful = [r for r in responses if r.get("success", False)]
+        # Calls cancelled by an early exit never answered; they do not count against confidence
+        cancelled = sum(1 for r in responses if r.get("cancelled"))
         
         if not successful:
             return {
@@ -87,6 +98,19 @@ class ConsensusEngine:
                 "confidence": 0.0
             }
         
+        if cache_key and self.cache is not None:
+            signature = responses_signature(successful) + (f"/{cancelled}" if cancelled else "")
+            consensus = self.cache.get_consensus(cache_key, signature)
+            if consensus is None:
+                consensus = self._build_consensus(successful, cancelled)
+                self.cache.put_consensus(cache_key, signature, consensus)
+            return consensus
+        
+        return self._build_consensus(successful, cancelled)
+    
+    def _build_consensus(self, successful: List[Dict], cancelled: int = 0) -> Dict:
+        """Score and tally the successful responses"""
+        
         # Extract scores and recommendations
         scores = []
         recommendations = []
@@ -124,7 +148,8 @@ class ConsensusEngine:
             scores,
             recommendations,
             total_responses,
-            agreement_rate
+            agreement_rate,
+            max(RESPONSE_TARGET - cancelled, 1)
         )
         
         # Identify agreements and disagreements
@@ -166,11 +191,16 @@ class ConsensusEngine:
         scores: List[float],
         recommendations: List[str],
         total_responses: int,
-        agreement_rate: float
+        agreement_rate: float,
+        target_responses: int = RESPONSE_TARGET
     ) -> float:
         """
         Calculate confidence score based on multiple factors
         
+        Args:
+            target_responses: Response count for a full response factor;
+                lowered by the calls an early exit cancelled
+        
         Returns:
             Confidence score (0.0-1.0)
         """
@@ -180,7 +210,7 @@ class ConsensusEngine:
         factors.append(agreement_rate * 0.4)
         
         # Factor 2: Number of responses (20% weight)
-        response_factor = min(total_responses / 8.0, 1.0)  # 8 is target
+        response_factor = min(total_responses / target_responses, 1.0)
         factors.append(response_factor * 0.2)
         
         # Factor 3: Score consistency (20% weight)
@@ -220,6 +250,152 @@ class ConsensusEngine:
         return f"This is a {score_text} strategy ({recommendation.lower()}) with {conf_text}."
 
 
+class IncrementalConsensus:
+    """
+    Consensus over responses consumed as they complete, so a verification can
+    stop once the outcome is settled instead of waiting on the slowest model.
+    
+    Settled means at least `quorum` successful responses and either the leading
+    recommendation leads by more than the number of outstanding models (so it
+    can no longer change) or confidence has reached `confidence_bound`.
+    """
+    
+    def __init__(
+        self,
+        expected: int,
+        quorum: Optional[int] = None,
+        confidence_bound: Optional[float] = None,
+        engine: Optional[ConsensusEngine] = None
+    ):
+        self.engine = engine or ConsensusEngine(cache=None)
+        self.expected = expected
+        self.quorum = quorum if quorum is not None else expected // 2 + 1
+        # Percent, same scale as calculate_consensus()["confidence"]
+        self.confidence_bound = confidence_bound
+        self.received = 0
+        self.successful: List[Dict] = []
+        self.scores: List[float] = []
+        self.recommendations: Counter = Counter()
+        self.weighted_sum = 0.0
+        self.weight_total = 0.0
+    
+    @property
+    def outstanding(self) -> int:
+        return self.expected - self.received
+    
+    @property
+    def weighted_average_score(self) -> float:
+        return self.weighted_sum / self.weight_total if self.weight_total else 0.0
+    
+    @property
+    def agreement_rate(self) -> float:
+        total = sum(self.recommendations.values())
+        return self.recommendations.most_common(1)[0][1] / total if total else 0.0
+    
+    @property
+    def confidence(self) -> float:
+        """Confidence if the outstanding calls were cancelled now (as an early exit does)"""
+        return self.engine._calculate_confidence(
+            self.scores,
+            list(self.recommendations.elements()),
+            len(self.successful),
+            self.agreement_rate,
+            max(RESPONSE_TARGET - self.outstanding, 1)
+        ) * 100
+    
+    def add(self, response: Dict) -> bool:
+        """
+        Fold one response into the running consensus
+        
+        Returns:
+            True once the outcome is settled
+        """
+        self.received += 1
+        if response.get("success", False):
+            self.successful.append(response)
+            content = response.get("content", "")
+            weight = response.get("weight", 1.0)
+            self.weight_total += weight
+            
+            score = self.engine.extract_score(content)
+            if score > 0:
+                self.scores.append(score)
+                self.weighted_sum += score * weight
+            
+            recommendation = self.engine.extract_recommendation(content)
+            if recommendation != "UNKNOWN":
+                self.recommendations[recommendation] += 1
+        return self.settled()
+    
+    def settled(self) -> bool:
+        if self.outstanding <= 0:
+            return True
+        if len(self.successful) < self.quorum:
+            return False
+        
+        ranked = self.recommendations.most_common(2)
+        if ranked:
+            lead = ranked[0][1] - (ranked[1][1] if len(ranked) > 1 else 0)
+            if lead > self.outstanding:
+                return True
+        
+        return self.confidence_bound is not None and self.confidence >= self.confidence_bound
+    
+    def snapshot(self) -> Dict:
+        """Consensus over the responses received so far, in calculate_consensus() form"""
+        cancelled = [{"success": False, "cancelled": True}] * self.outstanding
+        return self.engine.calculate_consensus(self.successful + cancelled)
+
+
+class StreamingScoreExtractor:
+    """
+    Watches a streamed answer for its score and recommendation.
+    
+    Each chunk is scanned together with a short tail of the text before it,
+    so a field split across chunks is still found and the text is not
+    rescanned from the start. A match touching the end of the buffer is not
+    trusted yet: "score: 1" may still become "score: 10".
+    """
+    
+    OVERLAP = 40
+    
+    def __init__(self):
+        self.text = ""
+        self.score: Optional[float] = None
+        self.recommendation: Optional[str] = None
+    
+    @property
+    def done(self) -> bool:
+        return self.score is not None and self.recommendation is not None
+    
+    def _search(self, pattern: re.Pattern, window: str) -> Optional[re.Match]:
+        match = pattern.search(window)
+        return match if match and match.end() < len(window) else None
+    
+    def feed(self, chunk: str) -> bool:
+        """
+        Append a chunk of the answer
+        
+        Returns:
+            True once both the score and the recommendation have been parsed
+        """
+        start = max(0, len(self.text) - self.OVERLAP)
+        self.text += chunk.lower()
+        window = self.text[start:]
+        
+        if self.score is None:
+            for pattern in SCORE_PATTERNS:
+                match = self._search(pattern, window)
+                if match:
+                    self.score = min(10.0, max(1.0, float(match.group(1))))
+                    break
+        if self.recommendation is None:
+            match = self._search(RECOMMENDATION_PATTERN, window)
+            if match:
+                self.recommendation = match.group(1).upper()
+        return self.done
+
+
 def create_consensus(responses: List[Dict]) -> Dict:
     """Convenience function to create consensus"""
     engine = ConsensusEngine()
@@ -1,14 +1,26 @@
 """
 AI Model Manager
 Manages AI model usage, statistics, and fallback mechanisms
+
+Besides call counts it keeps, per model, an EWMA and p95 of latency, an
+EWMA error rate and a circuit breaker. The verifier routes on these: it
+skips models whose breaker is open, picks the smallest subset of models
+whose weight meets a target, and hedges a call to a spare model once the
+primary runs past its p95. Statistics persist to a JSON file across restarts.
 """
 
 import os
+import atexit
+import logging
+import threading
+import time
 from datetime import datetime
-from typing import Dict, List, Optional
-from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict, deque
 import json
 
+import numpy as np
+
 from backend.ai.config.models_config import (
     get_all_models,
     get_active_models,
@@ -16,10 +28,54 @@ from backend.ai.config.models_config import (
     get_trading_models
 )
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../data/cache/model_stats.json'))
+
+# Circuit breaker states
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
 class ModelManager:
     """Manages AI models, tracks usage, and implements fallback logic"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        persist_path: Optional[str] = None,
+        ewma_alpha: float = 0.2,
+        latency_window: int = 200,
+        failure_threshold: int = 3,
+        error_rate_threshold: float = 0.5,
+        breaker_cooldown: float = 60.0,
+        min_latency_samples: int = 5,
+        save_interval: float = 30.0
+    ):
+        """
+        Args:
+            persist_path: JSON file to load stats from and save them to (None keeps them in memory)
+            ewma_alpha: Smoothing factor for latency and error-rate EWMAs
+            latency_window: Recent latencies kept per model for the p95
+            failure_threshold: Consecutive failures that open a model's breaker
+            error_rate_threshold: EWMA error rate that opens the breaker
+            breaker_cooldown: Seconds an open breaker waits before allowing a trial call
+            min_latency_samples: Samples needed before the p95 is trusted
+            save_interval: Minimum seconds between automatic saves
+        """
+        self.persist_path = persist_path
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.min_latency_samples = min_latency_samples
+        self.save_interval = save_interval
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._save_thread: Optional[threading.Thread] = None
+        self._last_save = 0.0
+        self._dirty = False
+        self.latencies = defaultdict(lambda: deque(maxlen=latency_window))
         self.usage_stats = defaultdict(lambda: {
             "total_calls": 0,
             "successful_calls": 0,
@@ -28,7 +84,13 @@ class ModelManager:
             "average_duration": 0.0,
             "last_used": None,
             "error_count": 0,
-            "rate_limit_hits": 0
+            "rate_limit_hits": 0,
+            "ewma_duration": None,
+            "p95_duration": None,
+            "error_rate": 0.0,
+            "consecutive_failures": 0,
+            "breaker_state": BREAKER_CLOSED,
+            "breaker_opened_at": None
         })
         self.rate_limits = defaultdict(lambda: {
             "calls_per_minute": 0,
@@ -46,25 +108,192 @@ class ModelManager:
             success: Whether the request was successful
             error: Error message if failed
         """
-        stats = self.usage_stats[model_id]
-        
-        stats["total_calls"] += 1
-        stats["total_duration"] += duration
-        stats["last_used"] = datetime.now().isoformat()
+        with self._lock:
+            stats = self.usage_stats[model_id]
+            
+            stats["total_calls"] += 1
+            stats["total_duration"] += duration
+            stats["last_used"] = datetime.now().isoformat()
+            
+            if success:
+                stats["successful_calls"] += 1
+            else:
+                stats["failed_calls"] += 1
+                stats["error_count"] += 1
+            
+            # Update average duration
+            if stats["total_calls"] > 0:
+                stats["average_duration"] = stats["total_duration"] / stats["total_calls"]
+            
+            # Check if it's a rate limit error
+            if error and ("rate" in error.lower() or "limit" in error.lower()):
+                stats["rate_limit_hits"] += 1
+            
+            # Latency of failures says little about the model, so only successes count
+            alpha = self.ewma_alpha
+            if success:
+                samples = self.latencies[model_id]
+                samples.append(duration)
+                stats["ewma_duration"] = (
+                    duration if stats["ewma_duration"] is None
+                    else alpha * duration + (1 - alpha) * stats["ewma_duration"]
+                )
+                stats["p95_duration"] = float(np.percentile(samples, 95))
+            stats["error_rate"] = alpha * (0.0 if success else 1.0) + (1 - alpha) * stats["error_rate"]
+            self._update_breaker(stats, success)
+            self._dirty = True
         
+        self._maybe_save()
+    
+    # ===== Circuit breaker =====
+    
+    def _update_breaker(self, stats: Dict, success: bool):
         if success:
-            stats["successful_calls"] += 1
-        else:
-            stats["failed_calls"] += 1
-            stats["error_count"] += 1
+            stats["consecutive_failures"] = 0
+            if stats["breaker_state"] != BREAKER_CLOSED:
+                stats["breaker_state"] = BREAKER_CLOSED
+                stats["breaker_opened_at"] = None
+            return
         
-        # Update average duration
-        if stats["total_calls"] > 0:
-            stats["average_duration"] = stats["total_duration"] / stats["total_calls"]
+        stats["consecutive_failures"] += 1
+        tripped = (
+            stats["breaker_state"] == BREAKER_HALF_OPEN
+            or stats["consecutive_failures"] >= self.failure_threshold
+            or stats["error_rate"] >= self.error_rate_threshold
+        )
+        if tripped:
+            stats["breaker_state"] = BREAKER_OPEN
+            stats["breaker_opened_at"] = time.time()
+    
+    def is_available(self, model_id: str) -> bool:
+        """
+        Whether a model may be called. After the cooldown an open breaker goes
+        half-open and admits one trial call; if that call never reports back
+        (e.g. it was cancelled), another is admitted after a further cooldown.
+        """
+        with self._lock:
+            stats = self.usage_stats.get(model_id)
+            if stats is None or stats["breaker_state"] == BREAKER_CLOSED:
+                return True
+            now = time.time()
+            if now - (stats["breaker_opened_at"] or 0.0) >= self.breaker_cooldown:
+                stats["breaker_state"] = BREAKER_HALF_OPEN
+                stats["breaker_opened_at"] = now
+                return True
+            return False
+    
+    # ===== Routing =====
+    
+    def hedge_delay(self, model_id: str, default: Optional[float] = None, floor: float = 0.0) -> Optional[float]:
+        """
+        Seconds to wait on a model before hedging to a spare: its p95 latency
+        once enough samples exist, else `default`
+        """
+        with self._lock:
+            stats = self.usage_stats.get(model_id)
+            if stats is None or len(self.latencies[model_id]) < self.min_latency_samples:
+                return default
+            return max(stats["p95_duration"], floor)
+    
+    def select_models(
+        self,
+        models: List[Dict],
+        target_weight: Optional[float] = None
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Choose which models to call
+        
+        Args:
+            models: Candidate model configs
+            target_weight: Total weight (discounted by each model's error rate)
+                the chosen models must reach; None chooses every available model
+            
+        Returns:
+            (primaries, spares): models to call, and the remaining available
+            models fastest first, for hedging and fallback
+        """
+        available = [m for m in models if self.is_available(m["id"])]
+        if not available:
+            # Everything is tripped; calling all beats calling none
+            logger.warning("All model circuit breakers are open, calling every model")
+            available = list(models)
         
-        # Check if it's a rate limit error
-        if error and ("rate" in error.lower() or "limit" in error.lower()):
-            stats["rate_limit_hits"] += 1
+        with self._lock:
+            def effective_weight(model):
+                return model["weight"] * (1.0 - self.usage_stats[model["id"]]["error_rate"]) \
+                    if model["id"] in self.usage_stats else model["weight"]
+            
+            def latency(model):
+                stats = self.usage_stats.get(model["id"])
+                return stats["p95_duration"] if stats and stats["p95_duration"] is not None else float("inf")
+            
+            if target_weight is None:
+                return available, []
+            
+            # Heaviest first gives the fewest models; faster wins ties
+            ranked = sorted(available, key=lambda m: (-effective_weight(m), latency(m)))
+            primaries, total = [], 0.0
+            for model in ranked:
+                if total >= target_weight:
+                    break
+                primaries.append(model)
+                total += effective_weight(model)
+            spares = sorted((m for m in ranked if m not in primaries), key=latency)
+            return primaries, spares
+    
+    # ===== Persistence =====
+    
+    def save(self, path: Optional[str] = None):
+        """Write usage stats and latency samples to JSON"""
+        path = path or self.persist_path
+        if not path or not self._dirty:
+            return
+        with self._lock:
+            self._dirty = False
+            state = {
+                "saved_at": datetime.now().isoformat(),
+                "usage_stats": {k: dict(v) for k, v in self.usage_stats.items()},
+                "latencies": {k: list(v) for k, v in self.latencies.items()}
+            }
+            self._last_save = time.time()
+        try:
+            # One writer at a time: the background save and the atexit save share the tmp file
+            with self._save_lock:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(state, f)
+                os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Failed to save model stats: {e}")
+    
+    def load(self, path: Optional[str] = None):
+        """Restore stats saved by save(); missing or unreadable files are ignored"""
+        path = path or self.persist_path
+        if not path or not os.path.exists(path):
+            return
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load model stats: {e}")
+            return
+        with self._lock:
+            for model_id, stats in state.get("usage_stats", {}).items():
+                self.usage_stats[model_id].update(stats)
+            for model_id, samples in state.get("latencies", {}).items():
+                self.latencies[model_id].extend(samples)
+    
+    def _maybe_save(self):
+        """Start a background save once save_interval has passed; record_usage runs on the verifier's event loop"""
+        if not self.persist_path or time.time() - self._last_save < self.save_interval:
+            return
+        with self._lock:
+            if self._save_thread is not None and self._save_thread.is_alive():
+                return
+            self._last_save = time.time()
+            self._save_thread = threading.Thread(target=self.save, name="model-stats-save", daemon=True)
+            self._save_thread.start()
     
     def get_model_stats(self, model_id: Optional[str] = None) -> Dict:
         """
@@ -76,9 +305,10 @@ class ModelManager:
         Returns:
             Dictionary of statistics
         """
-        if model_id:
-            return dict(self.usage_stats.get(model_id, {}))
-        return dict(self.usage_stats)
+        with self._lock:
+            if model_id:
+                return dict(self.usage_stats.get(model_id, {}))
+            return {k: dict(v) for k, v in self.usage_stats.items()}
     
     def get_best_performing_models(self, top_n: int = 5) -> List[Dict]:
         """
@@ -196,11 +426,13 @@ class ModelManager:
     
     def reset_stats(self, model_id: Optional[str] = None):
         """Reset statistics for a model or all models"""
-        if model_id:
-            if model_id in self.usage_stats:
-                del self.usage_stats[model_id]
-        else:
-            self.usage_stats.clear()
+        with self._lock:
+            if model_id:
+                self.usage_stats.pop(model_id, None)
+                self.latencies.pop(model_id, None)
+            else:
+                self.usage_stats.clear()
+                self.latencies.clear()
     
     def export_stats(self, filepath: str):
         """Export statistics to JSON file"""
@@ -236,7 +468,9 @@ class ModelManager:
 
 
 # Global model manager instance
-model_manager = ModelManager()
+model_manager = ModelManager(persist_path=DEFAULT_STATS_PATH)
+model_manager.load()
+atexit.register(model_manager.save)
 
 
 if __name__ == "__main__":
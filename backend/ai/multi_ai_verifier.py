@@ -1,12 +1,46 @@
 """
 Multi-AI Verifier
 Coordinates multiple AI models to verify trading strategies
+
+One verifier per process (get_verifier()) owns a pooled aiohttp
+ClientSession per event loop, so TLS handshakes and DNS lookups are paid once
+and every later model call reuses a kept-alive connection. Async callers
+await verify_strategy_async() on their own loop; sync callers go through
+verify_strategy(), which runs on a dedicated background loop thread instead
+of spinning up a new loop (and session) per call.
+
+Successful model responses are cached on disk (see verification_cache), so
+re-verifying a strategy only calls the models that have no fresh entry.
+
+With a quorum or confidence bound configured, responses are consumed as they
+complete and the remaining calls are cancelled once the consensus is settled.
+A sample of early exits lets the outstanding calls finish in the background
+to measure how often the early decision matches the full-gather one.
+
+Calls to each model are capped at `model_concurrency` per event loop, so many
+strategies verified concurrently cannot pile onto one slow model.
+
+Routing goes through ModelManager: models with an open circuit breaker are
+skipped, `target_weight` limits the fan-out to the smallest subset that
+carries that much weight, and a primary that runs past its p95 latency (or
+fails outright) is backed by a call to a spare model.
+
+In streaming mode the prompt asks for the score and recommendation first;
+each answer is read as server-sent events and the stream is closed as soon
+as both fields have been parsed, so the rest of the analysis is never
+generated or paid for.
 """
 
 import os
 import asyncio
+import hashlib
+import json
+import logging
+import random
+import threading
 import aiohttp
-from typing import List, Dict, Optional
+from collections import deque
+from typing import Any, Coroutine, List, Dict, Optional, Tuple
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -15,25 +49,212 @@ from backend.ai.config.models_config import (
     get_trading_models,
     get_model_by_id
 )
+from backend.ai.consensus_engine import ConsensusEngine, IncrementalConsensus, StreamingScoreExtractor
+from backend.ai.model_manager import ModelManager, model_manager as default_model_manager
+from backend.ai.verification_cache import VerificationCache, strategy_hash, verification_cache
+from backend.config import Config
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are an expert trading strategy analyst. Analyze the given strategy and provide: 1) Viability score (1-10), 2) Key strengths, 3) Key risks, 4) Recommendation (VIABLE/MODERATE/RISKY). Be concise but thorough."
+USER_PROMPT_TEMPLATE = "Analyze this trading strategy:\n\n{strategy}\n\nProvide a viability score (1-10) and your analysis."
+
+# Streaming asks for the fields the consensus needs up front, so the stream can stop there
+STREAM_SYSTEM_PROMPT = "You are an expert trading strategy analyst. Start your answer with exactly one line of the form 'Viability score: N/10. Recommendation: VIABLE|MODERATE|RISKY.' Then give the key strengths and key risks. Be concise but thorough."
+
+
+def _prompt_version(system_prompt: str) -> str:
+    return hashlib.sha256(f"{system_prompt}\x1f{USER_PROMPT_TEMPLATE}".encode()).hexdigest()[:12]
+
+
+# Changes whenever the prompts change, so cached answers to old prompts are not reused
+PROMPT_VERSION = _prompt_version(SYSTEM_PROMPT)
+STREAM_PROMPT_VERSION = _prompt_version(STREAM_SYSTEM_PROMPT)
+
+
+def _env_number(name: str, cast):
+    value = os.getenv(name)
+    return cast(value) if value else None
+
+
+class BackgroundLoop:
+    """An asyncio event loop running forever on a daemon thread."""
+
+    def __init__(self, name: str = "ai-verifier-loop"):
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self.loop is None or self.loop.is_closed():
+                self.loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self.loop.run_forever, name=self.name, daemon=True)
+                self._thread.start()
+            return self.loop
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the background loop and block for its result."""
+        loop = self._ensure_started()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coro.close()
+            raise RuntimeError("BackgroundLoop.run() called from its own loop; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+    def stop(self):
+        with self._lock:
+            if self.loop is not None and self.loop.is_running():
+                self.loop.call_soon_threadsafe(self.loop.stop)
+                self._thread.join(timeout=5)
+                self.loop.close()
+            self.loop = None
+
+
 class MultiAIVerifier:
     """Verifies trading strategies using multiple AI models"""
     
-    def __init__(self):
-        self.api_key = os.getenv("OPENROUTER_API_KEY")
-        self.base_url = "https://openrouter.ai/api/v1"
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        connection_limit: int = 64,
+        limit_per_host: int = 16,
+        keepalive_timeout: float = 60.0,
+        dns_cache_ttl: int = 300,
+        cache: Optional[VerificationCache] = verification_cache,
+        quorum: Optional[int] = None,
+        confidence_bound: Optional[float] = None,
+        audit_rate: Optional[float] = None,
+        decision_threshold: Optional[float] = None,
+        model_concurrency: Optional[int] = None,
+        router: Optional[ModelManager] = default_model_manager,
+        target_weight: Optional[float] = None,
+        hedge_floor: float = 0.5,
+        cold_hedge_delay: Optional[float] = 10.0,
+        request_timeout: float = 30.0,
+        stream: Optional[bool] = None
+    ):
+        self.api_key = api_key or os.getenv("OPENROUTER_API_KEY")
+        self.base_url = base_url or os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
         
         if not self.api_key:
             raise ValueError("OPENROUTER_API_KEY not found in environment variables")
+
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "HTTP-Referer": "https://gitta-trader-ai.com",
+            "X-Title": "Gitta Trader AI",
+            "Content-Type": "application/json"
+        }
+        self.connector_options = {
+            "limit": connection_limit,
+            "limit_per_host": limit_per_host,
+            "keepalive_timeout": keepalive_timeout,
+            "ttl_dns_cache": dns_cache_ttl,
+            "use_dns_cache": True
+        }
+        # ClientSessions are bound to the loop they were created on
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._background = BackgroundLoop()
+        # cache=None always calls every model
+        self.cache = cache
+        self._scorer = ConsensusEngine(cache=None)
+        # Early exit is off unless a quorum or confidence bound is set
+        self.quorum = quorum if quorum is not None else _env_number("AI_VERIFY_QUORUM", int)
+        self.confidence_bound = (confidence_bound if confidence_bound is not None
+                                 else _env_number("AI_VERIFY_CONFIDENCE_BOUND", float))
+        self.audit_rate = audit_rate if audit_rate is not None else float(os.getenv("AI_VERIFY_AUDIT_RATE", "0.1"))
+        # Confidence (%) a strategy needs to be verified, as in BaseCollectorAgent; audits compare this decision
+        self.decision_threshold = (decision_threshold if decision_threshold is not None
+                                   else float(os.getenv("AI_VERIFY_DECISION_THRESHOLD", "70")))
+        self._audits = set()
+        # Calls in flight per model, shared by every strategy verified on a loop
+        self.model_concurrency = model_concurrency or Config.AI_MODEL_CONCURRENCY
+        self._model_slots: Dict[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]] = {}
+        # router=None calls every model and records nothing
+        self.router = router
+        self.target_weight = (target_weight if target_weight is not None
+                              else _env_number("AI_ROUTING_TARGET_WEIGHT", float))
+        self.hedge_floor = hedge_floor
+        self.cold_hedge_delay = cold_hedge_delay
+        self.request_timeout = request_timeout
+        self.stream = stream if stream is not None else os.getenv("AI_VERIFY_STREAM", "false").lower() == "true"
+        self.system_prompt = STREAM_SYSTEM_PROMPT if self.stream else SYSTEM_PROMPT
+        self.prompt_version = STREAM_PROMPT_VERSION if self.stream else PROMPT_VERSION
+        self._latencies = deque(maxlen=1000)
+        self.stats = {
+            "sessions_created": 0,
+            "requests": 0,
+            "cached_responses": 0,
+            "verifications": 0,
+            "early_exits": 0,
+            "cancelled_calls": 0,
+            "audits": 0,
+            "audit_agreements": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "fallbacks": 0,
+            "streams_closed_early": 0
+        }
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Pooled session for the running event loop, created on first use."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(**self.connector_options),
+                headers=self.headers
+            )
+            self._sessions[loop] = session
+            self.stats["sessions_created"] += 1
+            # Forget sessions of loops that have since been closed
+            for stale in [l for l in self._sessions if l.is_closed()]:
+                del self._sessions[stale]
+        return session
+
+    def _model_slot(self, model_id: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slots = self._model_slots.get(loop)
+        if slots is None:
+            slots = self._model_slots[loop] = {}
+            for stale in [l for l in self._model_slots if l.is_closed()]:
+                del self._model_slots[stale]
+        if model_id not in slots:
+            slots[model_id] = asyncio.Semaphore(self.model_concurrency)
+        return slots[model_id]
+    
+    def run_sync(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the verifier's background loop (and its pooled session)"""
+        return self._background.run(coro, timeout)
+    
+    async def aclose(self):
+        """Close the session owned by the running loop."""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+
+    def close(self):
+        """Close the background loop's session and stop its thread."""
+        loop = self._background.loop
+        if loop is not None and loop.is_running():
+            self._background.run(self.aclose(), timeout=10)
+        self._background.stop()
     
     async def _call_single_model(
         self,
         session: aiohttp.ClientSession,
         model_config: Dict,
         messages: List[Dict],
-        timeout: int = 30
+        timeout: Optional[float] = None,
+        stream: Optional[bool] = None
     ) -> Dict:
         """
         Call a single AI model asynchronously
@@ -42,19 +263,15 @@ class MultiAIVerifier:
             session: aiohttp session
             model_config: Model configuration dict
             messages: Chat messages
-            timeout: Request timeout in seconds
+            timeout: Request timeout in seconds (defaults to request_timeout)
+            stream: Stream the answer and stop once it is scored (defaults to the verifier's mode)
             
         Returns:
             Response dict with model analysis
         """
         url = f"{self.base_url}/chat/completions"
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "HTTP-Referer": "https://gitta-trader-ai.com",
-            "X-Title": "Gitta Trader AI",
-            "Content-Type": "application/json"
-        }
+        timeout = timeout or self.request_timeout
+        stream = self.stream if stream is None else stream
         
         payload = {
             "model": model_config["id"],
@@ -62,18 +279,39 @@ class MultiAIVerifier:
             "temperature": 0.7,
             "max_tokens": 1000
         }
+        if stream:
+            payload["stream"] = True
         
+        async with self._model_slot(model_config["id"]):
+            response = await self._post_chat(session, model_config, url, payload, timeout)
+        if self.router is not None:
+            self.router.record_usage(model_config["id"], response["duration"], response["success"], response.get("error"))
+        return response
+    
+    async def _post_chat(
+        self,
+        session: aiohttp.ClientSession,
+        model_config: Dict,
+        url: str,
+        payload: Dict,
+        timeout: int
+    ) -> Dict:
+        """POST one chat completion; holds the model's concurrency slot throughout"""
         start_time = datetime.now()
+        self.stats["requests"] += 1
         
         try:
             async with session.post(
                 url,
-                headers=headers,
                 json=payload,
                 timeout=aiohttp.ClientTimeout(total=timeout)
             ) as response:
                 response.raise_for_status()
-                data = await response.json()
+                if payload.get("stream"):
+                    content, usage = await self._read_stream(response)
+                else:
+                    data = await response.json()
+                    content, usage = data["choices"][0]["message"]["content"], data.get("usage", {})
                 
                 end_time = datetime.now()
                 duration = (end_time - start_time).total_seconds()
@@ -84,11 +322,11 @@ class MultiAIVerifier:
                     "role": model_config["role"].value,
                     "specialty": model_config["specialty"],
                     "weight": model_config["weight"],
-                    "content": data["choices"][0]["message"]["content"],
+                    "content": content,
                     "success": True,
                     "duration": duration,
                     "timestamp": datetime.now().isoformat(),
-                    "usage": data.get("usage", {})
+                    "usage": usage
                 }
                 
         except asyncio.TimeoutError:
@@ -114,10 +352,214 @@ class MultiAIVerifier:
                 "timestamp": datetime.now().isoformat()
             }
     
+    async def _read_stream(self, response: aiohttp.ClientResponse) -> Tuple[str, Dict]:
+        """
+        Read an SSE chat completion until its score and recommendation are parsed
+        
+        Returns:
+            (content received, usage if the stream ran to the end)
+        """
+        extractor = StreamingScoreExtractor()
+        parts = []
+        usage = {}
+        async for raw_line in response.content:
+            line = raw_line.decode("utf-8", "ignore").strip()
+            # Skip event separators and ": OPENROUTER PROCESSING" keep-alives
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            if "error" in chunk:
+                raise RuntimeError(chunk["error"].get("message", "Stream error"))
+            usage = chunk.get("usage") or usage
+            choices = chunk.get("choices") or []
+            delta = (choices[0].get("delta") or {}).get("content") if choices else None
+            if not delta:
+                continue
+            parts.append(delta)
+            if extractor.feed(delta):
+                # Dropping the connection stops the generation upstream
+                self.stats["streams_closed_early"] += 1
+                response.close()
+                break
+        return "".join(parts), usage
+    
+    async def _call_routed(
+        self,
+        session: aiohttp.ClientSession,
+        model_config: Dict,
+        messages: List[Dict],
+        spares: List[Dict]
+    ) -> Dict:
+        """
+        Call a primary model, backed by spares
+        
+        If the primary fails, the next spare is called in its place; if it is
+        still running after its hedge delay (p95 latency), the next spare is
+        called alongside it and the first successful answer wins.
+        
+        Args:
+            session: aiohttp session
+            model_config: Primary model
+            messages: Chat messages
+            spares: Shared, fastest-first list of spare models; consumed as used
+            
+        Returns:
+            Response dict, with requested_model set to the primary's id
+        """
+        tasks = [asyncio.ensure_future(self._call_single_model(session, model_config, messages))]
+        delay = None
+        if spares and self.router is not None:
+            delay = self.router.hedge_delay(model_config["id"], default=self.cold_hedge_delay, floor=self.hedge_floor)
+        
+        try:
+            await asyncio.wait(tasks, timeout=delay)
+            if tasks[0].done():
+                response = tasks[0].result()
+                if not response["success"] and spares:
+                    self.stats["fallbacks"] += 1
+                    response = await self._call_single_model(session, spares.pop(0), messages)
+                return dict(response, requested_model=model_config["id"])
+            
+            if not spares:  # another primary took the last one
+                return dict(await tasks[0], requested_model=model_config["id"])
+            
+            self.stats["hedges"] += 1
+            tasks.append(asyncio.ensure_future(self._call_single_model(session, spares.pop(0), messages)))
+            pending = set(tasks)
+            first_failure = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    response = task.result()
+                    if response["success"]:
+                        if task is tasks[1]:
+                            self.stats["hedge_wins"] += 1
+                        return dict(response, requested_model=model_config["id"])
+                    first_failure = first_failure or response
+            return dict(first_failure, requested_model=model_config["id"])
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    @staticmethod
+    def _slot(response: Dict) -> str:
+        """Primary model a response answers for (a hedge may have produced it)"""
+        return response.get("requested_model", response["model_id"])
+    
+    @staticmethod
+    def _cancelled_response(model_config: Dict) -> Dict:
+        return {
+            "model_id": model_config["id"],
+            "model_name": model_config["name"],
+            "role": model_config["role"].value,
+            "content": None,
+            "success": False,
+            "cancelled": True,
+            "error": "Cancelled after early consensus",
+            "duration": 0.0,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    async def _gather_until_settled(
+        self,
+        tasks: Dict[asyncio.Task, Dict],
+        tracker: IncrementalConsensus,
+        strategy_text: str
+    ) -> List[Dict]:
+        """
+        Consume model calls as they complete until the consensus is settled
+        
+        Args:
+            tasks: Running model calls, mapped to their model config
+            tracker: Consensus already holding any cached responses
+            strategy_text: Strategy being verified (for caching audited responses)
+            
+        Returns:
+            Completed responses, plus a cancelled placeholder per abandoned call
+        """
+        responses = []
+        for next_done in asyncio.as_completed(list(tasks)):
+            response = await next_done
+            responses.append(response)
+            if tracker.add(response):
+                break
+        
+        # Calls that finished alongside the deciding one still count
+        seen = {self._slot(r) for r in responses}
+        for task in tasks:
+            if task.done() and tasks[task]["id"] not in seen:
+                responses.append(task.result())
+                tracker.add(task.result())
+        
+        remaining = [task for task in tasks if not task.done()]
+        if not remaining:
+            return responses
+        
+        self.stats["early_exits"] += 1
+        if random.random() < self.audit_rate:
+            # Let the stragglers finish off the critical path and compare decisions
+            audit = asyncio.ensure_future(self._audit_early_decision(tracker, remaining, strategy_text))
+            self._audits.add(audit)
+            audit.add_done_callback(self._audits.discard)
+        else:
+            for task in remaining:
+                task.cancel()
+            await asyncio.gather(*remaining, return_exceptions=True)
+            self.stats["cancelled_calls"] += len(remaining)
+        
+        return responses + [self._cancelled_response(tasks[task]) for task in remaining]
+    
+    async def _audit_early_decision(
+        self,
+        tracker: IncrementalConsensus,
+        remaining: List[asyncio.Task],
+        strategy_text: str
+    ):
+        """Compare the verify decision of an early consensus with the one over every response"""
+        early = tracker.snapshot()
+        rest = [r for r in await asyncio.gather(*remaining, return_exceptions=True) if isinstance(r, dict)]
+        if self.cache is not None:
+            self.cache.put_responses(strategy_text, rest, self.prompt_version, score_fn=self._scorer.extract_score)
+        
+        full = self._scorer.calculate_consensus(tracker.successful + rest)
+        early_verified = early.get("confidence", 0.0) >= self.decision_threshold
+        full_verified = full.get("confidence", 0.0) >= self.decision_threshold
+        self.stats["audits"] += 1
+        if early_verified == full_verified:
+            self.stats["audit_agreements"] += 1
+        else:
+            logger.info(
+                f"Early decision verified={early_verified} ({early.get('confidence')}%, "
+                f"{early.get('consensus_recommendation')}) differs from full decision verified={full_verified} "
+                f"({full.get('confidence')}%, {full.get('consensus_recommendation')})"
+            )
+    
+    async def wait_for_audits(self):
+        """Wait for background early-exit audits started on the running loop"""
+        if self._audits:
+            await asyncio.gather(*list(self._audits), return_exceptions=True)
+    
+    def get_stats(self) -> Dict:
+        """Call counts, early-exit agreement rate and verification latency percentiles"""
+        stats = dict(self.stats)
+        latencies = sorted(self._latencies)
+        percentile = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 3) if latencies else 0.0
+        stats["latency_p50"] = percentile(0.50)
+        stats["latency_p95"] = percentile(0.95)
+        stats["early_exit_agreement_rate"] = (
+            round(stats["audit_agreements"] / stats["audits"], 3) if stats["audits"] else None
+        )
+        return stats
+    
     async def verify_strategy_async(
         self,
         strategy_text: str,
-        use_trading_models_only: bool = True
+        use_trading_models_only: bool = True,
+        quorum: Optional[int] = None,
+        confidence_bound: Optional[float] = None
     ) -> Dict:
         """
         Verify a trading strategy using multiple AI models (async)
@@ -125,6 +567,10 @@ class MultiAIVerifier:
         Args:
             strategy_text: Description of the trading strategy
             use_trading_models_only: If True, use only active trading models
+            quorum: Successful responses required before returning early
+                (defaults to the verifier's setting)
+            confidence_bound: Consensus confidence (%) at which to return early
+                (defaults to the verifier's setting)
             
         Returns:
             Dict with all model responses and consensus
@@ -138,36 +584,78 @@ class MultiAIVerifier:
         if not models:
             raise ValueError("No active models configured")
         
+        # Drop tripped models and, with a target weight, trim the fan-out
+        spares = []
+        if self.router is not None:
+            models, spares = self.router.select_models(models, self.target_weight)
+        
         # Prepare messages
         system_message = {
             "role": "system",
-            "content": "You are an expert trading strategy analyst. Analyze the given strategy and provide: 1) Viability score (1-10), 2) Key strengths, 3) Key risks, 4) Recommendation (VIABLE/MODERATE/RISKY). Be concise but thorough."
+            "content": self.system_prompt
         }
         
         user_message = {
             "role": "user",
-            "content": f"Analyze this trading strategy:\n\n{strategy_text}\n\nProvide a viability score (1-10) and your analysis."
+            "content": USER_PROMPT_TEMPLATE.format(strategy=strategy_text)
         }
         
         messages = [system_message, user_message]
         
-        # Call all models in parallel
+        # Serve what we can from the cache, call only the remaining models
         start_time = datetime.now()
         
-        async with aiohttp.ClientSession() as session:
-            tasks = [
-                self._call_single_model(session, model, messages)
-                for model in models
-            ]
-            
-            responses = await asyncio.gather(*tasks)
+        cached = {}
+        if self.cache is not None:
+            cached = self.cache.get_responses(strategy_text, [m["id"] for m in models], self.prompt_version)
+            self.stats["cached_responses"] += len(cached)
+        
+        quorum = quorum if quorum is not None else self.quorum
+        confidence_bound = confidence_bound if confidence_bound is not None else self.confidence_bound
+        tracker = None
+        if quorum is not None or confidence_bound is not None:
+            tracker = IncrementalConsensus(len(models), quorum, confidence_bound, engine=self._scorer)
+            for response in cached.values():
+                tracker.add(response)
+        
+        pending = [model for model in models if model["id"] not in cached]
+        fresh = []
+        if pending:
+            session = await self.get_session()
+            if tracker is not None and tracker.settled():
+                # Cached responses alone already settle it
+                fresh = [self._cancelled_response(model) for model in pending]
+            elif tracker is None:
+                fresh = await asyncio.gather(*[
+                    self._call_routed(session, model, messages, spares)
+                    for model in pending
+                ])
+            else:
+                tasks = {
+                    asyncio.ensure_future(self._call_routed(session, model, messages, spares)): model
+                    for model in pending
+                }
+                fresh = await self._gather_until_settled(tasks, tracker, strategy_text)
+            if self.cache is not None:
+                self.cache.put_responses(strategy_text, fresh, self.prompt_version, score_fn=self._scorer.extract_score)
+        
+        by_model = {self._slot(r): r for r in fresh}
+        for model_id, response in cached.items():
+            response = dict(response, cached=True)
+            response.pop("requested_model", None)
+            by_model[model_id] = response
+        responses = [by_model[model["id"]] for model in models]
         
         end_time = datetime.now()
         total_duration = (end_time - start_time).total_seconds()
         
+        self.stats["verifications"] += 1
+        self._latencies.append(total_duration)
+        
         # Count successes
         successful = [r for r in responses if r["success"]]
-        failed = [r for r in responses if not r["success"]]
+        cancelled = [r for r in responses if r.get("cancelled")]
+        failed = [r for r in responses if not r["success"] and not r.get("cancelled")]
         
         return {
             "strategy": strategy_text,
@@ -175,7 +663,11 @@ class MultiAIVerifier:
             "total_models": len(models),
             "successful_responses": len(successful),
             "failed_responses": len(failed),
+            "cancelled_responses": len(cancelled),
+            "early_exit": bool(cancelled),
             "total_duration": total_duration,
+            "cached_responses": len(cached),
+            "cache_key": strategy_hash(strategy_text),
             "responses": responses,
             "status": "completed"
         }
@@ -195,17 +687,17 @@ class MultiAIVerifier:
         Returns:
             Dict with all model responses and consensus
         """
-        return asyncio.run(
+        return self._background.run(
             self.verify_strategy_async(strategy_text, use_trading_models_only)
         )
     
-    def analyze_with_model(
+    async def analyze_with_model_async(
         self,
         model_id: str,
         prompt: str
     ) -> Dict:
         """
-        Analyze with a specific model
+        Analyze with a specific model (async)
         
         Args:
             model_id: Model ID to use
@@ -219,19 +711,45 @@ class MultiAIVerifier:
             return {"error": f"Model {model_id} not found"}
         
         messages = [{"role": "user", "content": prompt}]
+        session = await self.get_session()
+        # Free-form prompts have no score to stop at
+        return await self._call_single_model(session, model_config, messages, stream=False)
+    
+    def analyze_with_model(
+        self,
+        model_id: str,
+        prompt: str
+    ) -> Dict:
+        """
+        Analyze with a specific model (sync wrapper)
         
-        async def call():
-            async with aiohttp.ClientSession() as session:
-                return await self._call_single_model(session, model_config, messages)
-        
-        return asyncio.run(call())
+        Args:
+            model_id: Model ID to use
+            prompt: Analysis prompt
+            
+        Returns:
+            Analysis result
+        """
+        return self._background.run(self.analyze_with_model_async(model_id, prompt))
+
+
+_verifier: Optional[MultiAIVerifier] = None
+_verifier_lock = threading.Lock()
+
+
+def get_verifier() -> MultiAIVerifier:
+    """Process-wide verifier, so every caller shares one connection pool"""
+    global _verifier
+    with _verifier_lock:
+        if _verifier is None:
+            _verifier = MultiAIVerifier()
+        return _verifier
 
 
 # Convenience function
 def verify_trading_strategy(strategy_text: str) -> Dict:
     """Quick verification of a trading strategy"""
-    verifier = MultiAIVerifier()
-    return verifier.verify_strategy(strategy_text)
+    return get_verifier().verify_strategy(strategy_text)
 
 
 if __name__ == "__main__":
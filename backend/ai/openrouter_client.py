@@ -17,7 +17,7 @@ class OpenRouterClient:
     
     def __init__(self):
         self.api_key = os.getenv("OPENROUTER_API_KEY")
-        self.base_url = "https://openrouter.ai/api/v1"
+        self.base_url = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
         self.default_model = "google/gemma-3-27b-it:free"  # Free model
         
         if not self.api_key:
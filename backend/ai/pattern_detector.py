@@ -1,29 +1,233 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Union
+
 import numpy as np
-from typing import Dict, List, Optional
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
 from backend.utils.logger import logger
 
+OHLC = ('open', 'high', 'low', 'close')
+
+# Signed confidence each pattern adds to a bar's pattern_score
+PATTERN_WEIGHTS = {
+    'hammer': 0.7,
+    'bullish_engulfing': 0.75,
+    'bearish_engulfing': -0.75,
+    'double_top': -0.8,
+    'double_bottom': 0.8
+}
+
+
+def _shift(values: np.ndarray) -> np.ndarray:
+    """Previous bar's values along the time axis (first bar: NaN)"""
+    shifted = np.empty_like(values, dtype=float)
+    shifted[0] = np.nan
+    shifted[1:] = values[:-1]
+    return shifted
+
+
+def _rolling(values: np.ndarray, window: int, reducer) -> np.ndarray:
+    """Trailing-window reduction along the time axis (NaN until the window is full)"""
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        out[window - 1:] = reducer(sliding_window_view(values, window, axis=0), axis=-1)
+    return out
+
+
+def _double_pattern(close: np.ndarray, tolerance: float, min_bars: int, top: bool) -> np.ndarray:
+    """
+    Double top (or bottom) state at every bar of one close series.
+
+    A peak at i (strictly above both neighbours) is known at bar i + 1. From
+    then on the bar's state is decided by the last two known peaks: similar
+    levels within `tolerance` and a trough between them at least 5% below the
+    first peak. Troughs and a 5% rally for double bottoms.
+    """
+    count = len(close)
+    state = np.zeros(count, dtype=bool)
+    if count < 3:
+        return state
+
+    values = close if top else -close
+    inner = values[1:-1]
+    extrema = np.flatnonzero((inner > values[:-2]) & (inner > values[2:])) + 1
+    if len(extrema) < 2:
+        return state
+
+    first, second = close[extrema[:-1]], close[extrema[1:]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        similar = np.abs(first - second) / first <= tolerance
+    if top:
+        between = np.minimum.reduceat(close, extrema)[:-1]
+        confirmed = similar & (between < first * 0.95)
+    else:
+        between = np.maximum.reduceat(close, extrema)[:-1]
+        confirmed = similar & (between > first * 1.05)
+
+    # Hold each pair's verdict from the bar its second extremum is known until the next one is
+    known = np.zeros(count, dtype=np.int64)
+    known[extrema + 1] = np.arange(1, len(extrema) + 1)
+    latest = np.maximum.accumulate(known)
+    verdicts = np.concatenate(([False, False], confirmed))
+    state = verdicts[latest]
+    state[:min_bars - 1] = False
+    return state
+
+
 class PatternDetector:
     """
     Detects chart patterns and candlestick formations in price data.
+
+    scan() evaluates every pattern at every bar of an OHLC series, or of a
+    time x symbol panel, in a few array passes, so the same results feed
+    backtests, ML features and the latest-bar analysis. Scans are kept per
+    symbol in a small LRU and reused while the data is unchanged.
     """
-    
-    def __init__(self):
+
+    def __init__(self, max_cached_symbols: int = 256):
         self.patterns_detected = []
-    
+        self.max_cached_symbols = max_cached_symbols
+        # symbol -> (data fingerprint, scan)
+        self._scans: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'scans': 0, 'cache_hits': 0}
+
+    # ===== Vectorized scanning =====
+
+    def scan(
+        self,
+        open_: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        sr_window: int = 20,
+        tolerance: float = 0.02,
+        proximity_pct: float = 1.0,
+        min_bars: int = 20
+    ) -> Dict[str, np.ndarray]:
+        """
+        Evaluate every pattern at every bar.
+
+        Args:
+            open_, high, low, close: Arrays of shape (T,) or (T, symbols)
+            sr_window: Bars in the support/resistance window
+            tolerance: Max relative gap between the two tops (bottoms)
+            proximity_pct: Distance (%) within which price is near support/resistance
+            min_bars: History needed before double tops/bottoms are reported
+
+        Returns:
+            Arrays shaped like close: boolean patterns, support/resistance
+            levels and distances (%), and a signed pattern_score
+        """
+        open_, high, low, close = (np.asarray(a, dtype=float) for a in (open_, high, low, close))
+        self.stats['scans'] += 1
+
+        body = np.abs(close - open_)
+        range_size = high - low
+        upper_shadow = high - np.maximum(open_, close)
+        lower_shadow = np.minimum(open_, close) - low
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            doji = (range_size != 0) & (body / range_size < 0.1)
+        hammer = (body != 0) & (lower_shadow > 2 * body) & (upper_shadow < body)
+
+        prev_open, prev_close = _shift(open_), _shift(close)
+        prev_body = np.abs(prev_close - prev_open)
+        bullish_engulfing = ((prev_close < prev_open) & (close > open_) & (body > prev_body)
+                             & (close > prev_open) & (open_ < prev_close))
+        bearish_engulfing = ((prev_close > prev_open) & (close < open_) & (body > prev_body)
+                             & (close < prev_open) & (open_ > prev_close))
+
+        columns = close.reshape(len(close), -1)
+        double_top = np.column_stack([_double_pattern(c, tolerance, min_bars, top=True) for c in columns.T])
+        double_bottom = np.column_stack([_double_pattern(c, tolerance, min_bars, top=False) for c in columns.T])
+        double_top, double_bottom = double_top.reshape(close.shape), double_bottom.reshape(close.shape)
+
+        support = _rolling(close, sr_window, np.min)
+        resistance = _rolling(close, sr_window, np.max)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distance_to_support = (close - support) / support * 100
+            distance_to_resistance = (resistance - close) / close * 100
+
+        result = {
+            'doji': doji,
+            'hammer': hammer,
+            'bullish_engulfing': bullish_engulfing,
+            'bearish_engulfing': bearish_engulfing,
+            'double_top': double_top,
+            'double_bottom': double_bottom,
+            'support': support,
+            'resistance': resistance,
+            'distance_to_support': distance_to_support,
+            'distance_to_resistance': distance_to_resistance,
+            'near_support': distance_to_support <= proximity_pct,
+            'near_resistance': distance_to_resistance <= proximity_pct
+        }
+        result['pattern_score'] = sum(weight * result[name] for name, weight in PATTERN_WEIGHTS.items())
+        return result
+
+    def scan_frame(self, df: pd.DataFrame, **kwargs) -> pd.DataFrame:
+        """
+        Pattern columns for an OHLC DataFrame ('Open'/'open', ... columns),
+        indexed like df, e.g. to join onto backtest or ML feature frames.
+        """
+        return pd.DataFrame(self.scan(*self._ohlc_arrays(df), **kwargs), index=df.index)
+
+    def scan_symbol(self, symbol: str, price_data: Union[List[Dict], Dict, pd.DataFrame], **kwargs) -> Dict[str, np.ndarray]:
+        """scan() for one symbol's history, reused while the data is unchanged"""
+        return self._cached_scan(symbol, self._ohlc_arrays(price_data), **kwargs)
+
+    def _cached_scan(self, symbol: str, arrays: List[np.ndarray], **kwargs) -> Dict[str, np.ndarray]:
+        digest = hashlib.sha1()
+        for array in arrays:
+            digest.update(array.tobytes())
+        digest.update(repr(sorted(kwargs.items())).encode())
+        fingerprint = digest.hexdigest()
+
+        with self._lock:
+            cached = self._scans.get(symbol)
+            if cached is not None and cached[0] == fingerprint:
+                self._scans.move_to_end(symbol)
+                self.stats['cache_hits'] += 1
+                return cached[1]
+
+        result = self.scan(*arrays, **kwargs)
+        with self._lock:
+            self._scans[symbol] = (fingerprint, result)
+            self._scans.move_to_end(symbol)
+            while len(self._scans) > self.max_cached_symbols:
+                self._scans.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _ohlc_arrays(price_data: Union[List[Dict], Dict, pd.DataFrame]) -> List[np.ndarray]:
+        """OHLC arrays from a list of candles, a dict of arrays or a DataFrame"""
+        if isinstance(price_data, pd.DataFrame):
+            columns = {c.lower(): c for c in price_data.columns}
+            return [price_data[columns[name]].to_numpy(dtype=float) for name in OHLC]
+        if isinstance(price_data, dict):
+            return [np.asarray(price_data[name], dtype=float) for name in OHLC]
+        return [np.fromiter((d[name] for d in price_data), dtype=float, count=len(price_data)) for name in OHLC]
+
+    # ===== Single-bar checks =====
+
     def detect_support_resistance(self, prices: List[float], window=20) -> Dict:
         """
         Detect support and resistance levels.
         """
         if len(prices) < window:
             return {'support': None, 'resistance': None}
-        
+
         recent_prices = prices[-window:]
-        
+
         # Simple approach: recent min/max
         support = min(recent_prices)
         resistance = max(recent_prices)
         current = prices[-1]
-        
+
         return {
             'support': round(support, 2),
             'resistance': round(resistance, 2),
@@ -31,7 +235,7 @@ class PatternDetector:
             'distance_to_support': round(((current - support) / support) * 100, 2),
             'distance_to_resistance': round(((resistance - current) / current) * 100, 2)
         }
-    
+
     def detect_doji(self, open_price: float, high: float, low: float, close: float) -> bool:
         """
         Detect Doji candlestick pattern.
@@ -39,13 +243,13 @@ class PatternDetector:
         """
         body = abs(close - open_price)
         range_size = high - low
-        
+
         if range_size == 0:
             return False
-        
+
         # Doji if body is less than 10% of range
         return (body / range_size) < 0.1
-    
+
     def detect_hammer(self, open_price: float, high: float, low: float, close: float) -> bool:
         """
         Detect Hammer candlestick pattern (bullish reversal).
@@ -54,13 +258,13 @@ class PatternDetector:
         body = abs(close - open_price)
         lower_shadow = min(open_price, close) - low
         upper_shadow = high - max(open_price, close)
-        
+
         if body == 0:
             return False
-        
+
         # Hammer: lower shadow at least 2x body, small upper shadow
         return lower_shadow > (2 * body) and upper_shadow < body
-    
+
     def detect_engulfing(self, prev_candle: Dict, curr_candle: Dict) -> Optional[str]:
         """
         Detect Engulfing pattern (bullish or bearish).
@@ -68,7 +272,7 @@ class PatternDetector:
         """
         prev_body = abs(prev_candle['close'] - prev_candle['open'])
         curr_body = abs(curr_candle['close'] - curr_candle['open'])
-        
+
         # Bullish engulfing: prev red, curr green, curr engulfs prev
         if (prev_candle['close'] < prev_candle['open'] and
             curr_candle['close'] > curr_candle['open'] and
@@ -76,7 +280,7 @@ class PatternDetector:
             curr_candle['close'] > prev_candle['open'] and
             curr_candle['open'] < prev_candle['close']):
             return 'bullish_engulfing'
-        
+
         # Bearish engulfing: prev green, curr red, curr engulfs prev
         if (prev_candle['close'] > prev_candle['open'] and
             curr_candle['close'] < curr_candle['open'] and
@@ -84,9 +288,9 @@ class PatternDetector:
             curr_candle['close'] < prev_candle['open'] and
             curr_candle['open'] > prev_candle['close']):
             return 'bearish_engulfing'
-        
+
         return None
-    
+
     def detect_double_top(self, prices: List[float], tolerance=0.02) -> bool:
         """
         Detect Double Top pattern (bearish).
@@ -94,28 +298,8 @@ class PatternDetector:
         """
         if len(prices) < 20:
             return False
-        
-        # Find peaks (local maxima)
-        peaks = []
-        for i in range(1, len(prices) - 1):
-            if prices[i] > prices[i-1] and prices[i] > prices[i+1]:
-                peaks.append((i, prices[i]))
-        
-        if len(peaks) < 2:
-            return False
-        
-        # Check last two peaks
-        peak1, peak2 = peaks[-2], peaks[-1]
-        
-        # Peaks should be at similar levels (within tolerance)
-        if abs(peak1[1] - peak2[1]) / peak1[1] <= tolerance:
-            # Should have a trough between
-            trough_prices = prices[peak1[0]:peak2[0]]
-            if trough_prices and min(trough_prices) < peak1[1] * 0.95:
-                return True
-        
-        return False
-    
+        return bool(_double_pattern(np.asarray(prices, dtype=float), tolerance, 20, top=True)[-1])
+
     def detect_double_bottom(self, prices: List[float], tolerance=0.02) -> bool:
         """
         Detect Double Bottom pattern (bullish).
@@ -123,82 +307,77 @@ class PatternDetector:
         """
         if len(prices) < 20:
             return False
-        
-        # Find troughs (local minima)
-        troughs = []
-        for i in range(1, len(prices) - 1):
-            if prices[i] < prices[i-1] and prices[i] < prices[i+1]:
-                troughs.append((i, prices[i]))
-        
-        if len(troughs) < 2:
-            return False
-        
-        # Check last two troughs
-        trough1, trough2 = troughs[-2], troughs[-1]
-        
-        # Troughs should be at similar levels
-        if abs(trough1[1] - trough2[1]) / trough1[1] <= tolerance:
-            # Should have a peak between
-            peak_prices = prices[trough1[0]:trough2[0]]
-            if peak_prices and max(peak_prices) > trough1[1] * 1.05:
-                return True
-        
-        return False
-    
-    def analyze_patterns(self, price_data: List[Dict]) -> Dict:
-        """
-        Comprehensive pattern analysis on OHLC data.
-        price_data: List of {'open', 'high', 'low', 'close', 'timestamp'}
-        """
-        if len(price_data) < 2:
+        return bool(_double_pattern(np.asarray(prices, dtype=float), tolerance, 20, top=False)[-1])
+
+    def analyze_patterns(
+        self,
+        price_data: Union[List[Dict], Dict, pd.DataFrame],
+        symbol: Optional[str] = None,
+        timestamp: Optional[str] = None
+    ) -> Dict:
+        """
+        Comprehensive pattern analysis of the latest bar of OHLC data.
+        price_data: List of {'open', 'high', 'low', 'close', 'timestamp'},
+        a dict of OHLC arrays or an OHLC DataFrame. With a symbol the
+        full-history scan is cached and reused.
+        """
+        arrays = self._ohlc_arrays(price_data)
+        if len(arrays[3]) < 2:
             return {'patterns': [], 'signals': []}
-        
+
+        scan = self._cached_scan(symbol, arrays) if symbol is not None else self.scan(*arrays)
+        if timestamp is None and isinstance(price_data, list):
+            timestamp = price_data[-1].get('timestamp')
+
         patterns = []
         signals = []
-        
-        # Get prices for pattern detection
-        closes = [d['close'] for d in price_data]
-        
+
         # Support/Resistance
-        sr_levels = self.detect_support_resistance(closes)
+        if np.isnan(scan['support'][-1]):
+            sr_levels = {'support': None, 'resistance': None}
+        else:
+            current = float(arrays[3][-1])
+            sr_levels = {
+                'support': round(float(scan['support'][-1]), 2),
+                'resistance': round(float(scan['resistance'][-1]), 2),
+                'current': round(current, 2),
+                'distance_to_support': round(float(scan['distance_to_support'][-1]), 2),
+                'distance_to_resistance': round(float(scan['distance_to_resistance'][-1]), 2)
+            }
         patterns.append({
             'type': 'support_resistance',
             'data': sr_levels
         })
-        
+
         # Candlestick patterns on most recent candle
-        latest = price_data[-1]
-        
-        if self.detect_doji(latest['open'], latest['high'], latest['low'], latest['close']):
+        if scan['doji'][-1]:
             patterns.append({'type': 'doji', 'signal': 'indecision', 'confidence': 0.6})
             signals.append('indecision')
-        
-        if self.detect_hammer(latest['open'], latest['high'], latest['low'], latest['close']):
+
+        if scan['hammer'][-1]:
             patterns.append({'type': 'hammer', 'signal': 'bullish_reversal', 'confidence': 0.7})
             signals.append('bullish')
-        
-        # Engulfing (need 2 candles)
-        if len(price_data) >= 2:
-            engulfing = self.detect_engulfing(price_data[-2], price_data[-1])
-            if engulfing:
+
+        for engulfing in ('bullish_engulfing', 'bearish_engulfing'):
+            if scan[engulfing][-1]:
                 signal = 'bullish' if 'bullish' in engulfing else 'bearish'
                 patterns.append({'type': engulfing, 'signal': signal, 'confidence': 0.75})
                 signals.append(signal)
-        
+
         # Chart patterns
-        if self.detect_double_top(closes):
+        if scan['double_top'][-1]:
             patterns.append({'type': 'double_top', 'signal': 'bearish', 'confidence': 0.8})
             signals.append('bearish')
-        
-        if self.detect_double_bottom(closes):
+
+        if scan['double_bottom'][-1]:
             patterns.append({'type': 'double_bottom', 'signal': 'bullish', 'confidence': 0.8})
             signals.append('bullish')
-        
+
         # Aggregate signal
         if signals:
             bullish_count = signals.count('bullish')
             bearish_count = signals.count('bearish')
-            
+
             if bullish_count > bearish_count:
                 overall_signal = 'bullish'
             elif bearish_count > bullish_count:
@@ -207,10 +386,14 @@ class PatternDetector:
                 overall_signal = 'neutral'
         else:
             overall_signal = 'neutral'
-        
+
         return {
             'patterns': patterns,
             'overall_signal': overall_signal,
             'pattern_count': len(patterns),
-            'timestamp': price_data[-1].get('timestamp')
+            'timestamp': timestamp
         }
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, cached_symbols=len(self._scans))
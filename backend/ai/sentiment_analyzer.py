@@ -1,76 +1,322 @@
-from typing import Dict, List
-from datetime import datetime, timedelta
+import os
+import re
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+
+import numpy as np
+
 try:
     from textblob import TextBlob
     TEXTBLOB_AVAILABLE = True
 except ImportError:
     TEXTBLOB_AVAILABLE = False
-    
+
 from backend.utils.logger import logger
 
+# "don't" -> "do", "n't", so contracted negations are seen
+_TOKEN = re.compile(r"n't|[a-z]+?(?=n't)|[a-z]+(?:'[a-z]+)?")
+NEGATIONS = ('no', 'not', "n't", 'never')
+
+# Market vocabulary the general-purpose lexicon lacks: word -> (polarity, subjectivity)
+FINANCE_LEXICON = {
+    'bullish': (0.6, 0.6), 'rally': (0.4, 0.4), 'rallies': (0.4, 0.4), 'surge': (0.5, 0.4),
+    'surges': (0.5, 0.4), 'soars': (0.6, 0.4), 'jumps': (0.4, 0.3), 'gains': (0.3, 0.3),
+    'beat': (0.3, 0.3), 'beats': (0.3, 0.3), 'upgrade': (0.5, 0.4), 'upgraded': (0.5, 0.4),
+    'outperform': (0.5, 0.5), 'record': (0.3, 0.3), 'profit': (0.3, 0.2),
+    'bearish': (-0.6, 0.6), 'plunge': (-0.6, 0.4), 'plunges': (-0.6, 0.4), 'slump': (-0.5, 0.4),
+    'slumps': (-0.5, 0.4), 'tumbles': (-0.5, 0.4), 'falls': (-0.3, 0.3), 'drops': (-0.3, 0.3),
+    'downgrade': (-0.5, 0.4), 'downgraded': (-0.5, 0.4), 'miss': (-0.3, 0.3), 'misses': (-0.3, 0.3),
+    'loss': (-0.4, 0.3), 'losses': (-0.4, 0.3), 'selloff': (-0.5, 0.4), 'fraud': (-0.8, 0.6),
+    'default': (-0.6, 0.4), 'probe': (-0.3, 0.3), 'underperform': (-0.5, 0.5)
+}
+
+
+def _classify(polarity: float) -> str:
+    if polarity > 0.1:
+        return 'positive'
+    if polarity < -0.1:
+        return 'negative'
+    return 'neutral'
+
+
+def _sentiment_result(polarity: float, subjectivity: float) -> Dict:
+    return {
+        'polarity': round(polarity, 3),
+        'subjectivity': round(subjectivity, 3),
+        'sentiment': _classify(polarity),
+        'confidence': abs(polarity)
+    }
+
+
+class SymbolMatcher:
+    """
+    Aho-Corasick automaton over symbol names: one pass over a headline finds
+    every symbol it mentions, however many symbols are tracked. Matching is
+    case-insensitive substring matching, like `symbol in headline`.
+    """
+
+    def __init__(self, symbols: Iterable[str]):
+        self.symbols = list(dict.fromkeys(s for s in symbols if s))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        for index, symbol in enumerate(self.symbols):
+            node = 0
+            for ch in symbol.upper():
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] += (index,)
+
+        # Breadth-first, so a node's failure link is final before its children need it
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> set:
+        """Indices (into self.symbols) of the symbols mentioned in text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        node = 0
+        for ch in text.upper():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+    def route(self, texts: List[str]) -> List[List[int]]:
+        """For each symbol, the indices of the texts that mention it"""
+        routed: List[List[int]] = [[] for _ in self.symbols]
+        for position, text in enumerate(texts):
+            for index in self.find(text):
+                routed[index].append(position)
+        return routed
+
+
+class LexiconScorer:
+    """
+    Vectorized word-lexicon sentiment, an approximation of TextBlob's
+    PatternAnalyzer: the polarity and subjectivity of a text are the means
+    over its lexicon words, an intensifier before a word scales it and a
+    negation before a word flips it (x -0.5). A batch of texts is scored with
+    one lookup per distinct word and a handful of numpy reductions.
+    """
+
+    def __init__(self, lexicon: Optional[Dict[str, Tuple[float, float]]] = None,
+                 intensifiers: Optional[Dict[str, float]] = None):
+        if lexicon is None:
+            lexicon, default_intensifiers = self._default_lexicon()
+            intensifiers = intensifiers if intensifiers is not None else default_intensifiers
+        self.intensifiers = intensifiers or {}
+
+        words = sorted(set(lexicon) | set(self.intensifiers) | set(NEGATIONS))
+        self._ids = {word: i + 1 for i, word in enumerate(words)}  # 0 = unknown word
+        size = len(words) + 1
+        self._polarity = np.zeros(size)
+        self._subjectivity = np.zeros(size)
+        self._scored = np.zeros(size, dtype=bool)
+        self._intensity = np.ones(size)
+        self._negation = np.zeros(size, dtype=bool)
+        for word, (polarity, subjectivity) in lexicon.items():
+            self._polarity[self._ids[word]] = polarity
+            self._subjectivity[self._ids[word]] = subjectivity
+            self._scored[self._ids[word]] = True
+        for word, intensity in self.intensifiers.items():
+            self._intensity[self._ids[word]] = intensity
+        for word in NEGATIONS:
+            self._negation[self._ids[word]] = True
+
+    @staticmethod
+    def _default_lexicon() -> Tuple[Dict[str, Tuple[float, float]], Dict[str, float]]:
+        lexicon: Dict[str, Tuple[float, float]] = {}
+        intensifiers: Dict[str, float] = {}
+        if TEXTBLOB_AVAILABLE:
+            from textblob.en import sentiment as pattern_lexicon
+            for word, senses in pattern_lexicon.items():
+                polarity, subjectivity, intensity = senses.get(None) or next(iter(senses.values()))
+                if polarity or subjectivity:
+                    lexicon[word] = (polarity, subjectivity)
+                if intensity != 1.0 and 'RB' in senses:
+                    intensifiers[word] = intensity
+        lexicon.update(FINANCE_LEXICON)
+        return lexicon, intensifiers
+
+    def score(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score a batch of texts
+
+        Returns:
+            (polarity, subjectivity) arrays, one value per text
+        """
+        count = len(texts)
+        tokenized = [_TOKEN.findall(text.lower()) for text in texts]
+        lengths = np.fromiter((len(t) for t in tokenized), dtype=np.int64, count=count)
+        tokens = [token for tokens in tokenized for token in tokens]
+        if not tokens:
+            return np.zeros(count), np.zeros(count)
+
+        vocabulary, inverse = np.unique(np.array(tokens), return_inverse=True)
+        ids = np.array([self._ids.get(word, 0) for word in vocabulary.tolist()])[inverse]
+        owner = np.repeat(np.arange(count), lengths)
+
+        # Modifiers apply to the next word of the same text
+        previous = np.roll(ids, 1)
+        same_text = np.roll(owner, 1) == owner
+        same_text[0] = False
+        factor = np.where(same_text, self._intensity[previous], 1.0)
+        factor = np.where(same_text & self._negation[previous], -0.5, factor)
+        # ... and a negation reaches past an intensifier ("not very good")
+        negated_modifier = same_text & np.roll(same_text, 1) & self._negation[np.roll(ids, 2)] \
+            & (self._intensity[previous] != 1.0)
+        factor = np.where(negated_modifier, factor * -0.5, factor)
+
+        # An intensifier that modifies the next word is not scored on its own
+        scored = self._scored[ids]
+        modifies_next = np.roll(same_text, -1) & np.roll(scored, -1)
+        modifies_next[-1] = False
+        scored &= ~((self._intensity[ids] != 1.0) & modifies_next)
+        owner, ids, factor = owner[scored], ids[scored], factor[scored]
+        hits = np.bincount(owner, minlength=count)
+        polarity = np.bincount(owner, weights=self._polarity[ids] * factor, minlength=count)
+        subjectivity = np.bincount(owner, weights=self._subjectivity[ids] * np.abs(factor), minlength=count)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            polarity = np.where(hits > 0, polarity / hits, 0.0)
+            subjectivity = np.where(hits > 0, subjectivity / hits, 0.0)
+        return np.clip(polarity, -1.0, 1.0), np.clip(subjectivity, 0.0, 1.0)
+
+
 class SentimentAnalyzer:
     """
     Analyzes sentiment from news headlines and market commentary.
-    Uses TextBlob for lightweight, local sentiment analysis.
+    Uses TextBlob for lightweight, local sentiment analysis, or the
+    vectorized LexiconScorer (backend='lexicon') for large batches.
+
+    Each distinct headline is scored once and memoized in a bounded LRU, and
+    headlines are routed to symbols with a SymbolMatcher, so a whole universe
+    can be scored against a large batch of headlines in one pass.
     """
-    
-    def __init__(self):
-        if not TEXTBLOB_AVAILABLE:
-            logger.warning("TextBlob not available. Install with: pip install textblob")
-        self.sentiment_cache = {}
-        
-    def analyze_text(self, text: str) -> Dict:
+
+    def __init__(self, backend: Optional[str] = None, max_cache_entries: int = 10000):
         """
-        Analyze sentiment of a single text.
-        Returns: {
-            'polarity': float (-1 to 1, negative to positive),
-            'subjectivity': float (0 to 1, objective to subjective),
-            'sentiment': str ('positive', 'negative', 'neutral')
-        }
+        Args:
+            backend: 'textblob' or 'lexicon' (defaults to SENTIMENT_BACKEND, else 'textblob')
+            max_cache_entries: Headline scores kept in the LRU
         """
-        if not TEXTBLOB_AVAILABLE:
-            return {'polarity': 0.0, 'subjectivity': 0.5, 'sentiment': 'neutral'}
-        
+        self.backend = backend or os.getenv('SENTIMENT_BACKEND', 'textblob')
+        if self.backend == 'textblob' and not TEXTBLOB_AVAILABLE:
+            logger.warning("TextBlob not available, using the lexicon backend. Install with: pip install textblob")
+            self.backend = 'lexicon'
+        if self.backend not in ('textblob', 'lexicon'):
+            raise ValueError(f"Unknown sentiment backend: {self.backend}")
+        self._lexicon: Optional[LexiconScorer] = None
+
+        self.max_cache_entries = max_cache_entries
+        # Headline -> analyze_text() result, least recently used first
+        self.sentiment_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._matcher: Optional[SymbolMatcher] = None
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @property
+    def lexicon(self) -> LexiconScorer:
+        if self._lexicon is None:
+            self._lexicon = LexiconScorer()
+        return self._lexicon
+
+    def _score_textblob(self, text: str) -> Dict:
         try:
             blob = TextBlob(text)
-            polarity = blob.sentiment.polarity
-            subjectivity = blob.sentiment.subjectivity
-            
-            # Classify sentiment
-            if polarity > 0.1:
-                sentiment = 'positive'
-            elif polarity < -0.1:
-                sentiment = 'negative'
-            else:
-                sentiment = 'neutral'
-            
-            return {
-                'polarity': round(polarity, 3),
-                'subjectivity': round(subjectivity, 3),
-                'sentiment': sentiment,
-                'confidence': abs(polarity)
-            }
+            return _sentiment_result(blob.sentiment.polarity, blob.sentiment.subjectivity)
         except Exception as e:
             logger.error(f"Sentiment analysis failed: {e}")
             return {'polarity': 0.0, 'subjectivity': 0.5, 'sentiment': 'neutral'}
-    
-    def analyze_headlines(self, headlines: List[str]) -> Dict:
+
+    def score_headlines(self, headlines: List[str]) -> List[Dict]:
         """
-        Analyze multiple headlines and aggregate sentiment.
+        Score headlines, each distinct one only once
+
+        Returns:
+            analyze_text() result per headline, in order
         """
-        if not headlines:
+        unique = list(dict.fromkeys(headlines))
+        scores: Dict[str, Dict] = {}
+        with self._lock:
+            for text in unique:
+                cached = self.sentiment_cache.get(text)
+                if cached is not None:
+                    self.sentiment_cache.move_to_end(text)
+                    scores[text] = cached
+            self.stats['hits'] += len(scores)
+
+        missing = [text for text in unique if text not in scores]
+        if missing:
+            if self.backend == 'lexicon':
+                polarity, subjectivity = self.lexicon.score(missing)
+                fresh = [_sentiment_result(float(p), float(s)) for p, s in zip(polarity, subjectivity)]
+            else:
+                fresh = [self._score_textblob(text) for text in missing]
+            scores.update(zip(missing, fresh))
+
+            with self._lock:
+                self.stats['misses'] += len(missing)
+                for text, result in zip(missing, fresh):
+                    self.sentiment_cache[text] = result
+                while len(self.sentiment_cache) > self.max_cache_entries:
+                    self.sentiment_cache.popitem(last=False)
+                    self.stats['evictions'] += 1
+
+        return [scores[text] for text in headlines]
+
+    def analyze_text(self, text: str) -> Dict:
+        """
+        Analyze sentiment of a single text.
+        Returns: {
+            'polarity': float (-1 to 1, negative to positive),
+            'subjectivity': float (0 to 1, objective to subjective),
+            'sentiment': str ('positive', 'negative', 'neutral')
+        }
+        """
+        return dict(self.score_headlines([text])[0])
+
+    @staticmethod
+    def _aggregate(sentiments: List[Dict], weights: Optional[np.ndarray] = None) -> Dict:
+        """Aggregate per-headline results; weights count repeated headlines"""
+        if weights is None:
+            weights = np.ones(len(sentiments))
+        total = int(weights.sum())
+        if not total:
             return {'avg_polarity': 0.0, 'sentiment': 'neutral', 'count': 0}
-        
-        sentiments = [self.analyze_text(h) for h in headlines]
-        
-        avg_polarity = sum(s['polarity'] for s in sentiments) / len(sentiments)
-        avg_subjectivity = sum(s['subjectivity'] for s in sentiments) / len(sentiments)
-        
+
+        polarity = np.array([s['polarity'] for s in sentiments])
+        subjectivity = np.array([s['subjectivity'] for s in sentiments])
+        labels = np.array([s['sentiment'] for s in sentiments])
+        avg_polarity = float(polarity @ weights) / total
+        avg_subjectivity = float(subjectivity @ weights) / total
+
         # Count sentiment distribution
-        positive_count = sum(1 for s in sentiments if s['sentiment'] == 'positive')
-        negative_count = sum(1 for s in sentiments if s['sentiment'] == 'negative')
-        neutral_count = sum(1 for s in sentiments if s['sentiment'] == 'neutral')
-        
+        positive_count = int(weights[labels == 'positive'].sum())
+        negative_count = int(weights[labels == 'negative'].sum())
+        neutral_count = int(weights[labels == 'neutral'].sum())
+
         # Overall sentiment based on majority
         if positive_count > negative_count and positive_count > neutral_count:
             overall = 'positive'
@@ -78,7 +324,7 @@ class SentimentAnalyzer:
             overall = 'negative'
         else:
             overall = 'neutral'
-        
+
         return {
             'avg_polarity': round(avg_polarity, 3),
             'avg_subjectivity': round(avg_subjectivity, 3),
@@ -86,37 +332,70 @@ class SentimentAnalyzer:
             'positive_count': positive_count,
             'negative_count': negative_count,
             'neutral_count': neutral_count,
-            'total_count': len(headlines),
+            'total_count': total,
             'sentiment_strength': round(abs(avg_polarity), 3)
         }
-    
+
+    def analyze_headlines(self, headlines: List[str]) -> Dict:
+        """
+        Analyze multiple headlines and aggregate sentiment.
+        """
+        if not headlines:
+            return {'avg_polarity': 0.0, 'sentiment': 'neutral', 'count': 0}
+        return self._aggregate(self.score_headlines(headlines))
+
+    def _matcher_for(self, symbols: List[str]) -> SymbolMatcher:
+        matcher = self._matcher
+        if matcher is None or matcher.symbols != list(dict.fromkeys(s for s in symbols if s)):
+            matcher = self._matcher = SymbolMatcher(symbols)
+        return matcher
+
+    def get_universe_sentiment(self, symbols: List[str], headlines: List[str]) -> Dict[str, Dict]:
+        """
+        Sentiment for many symbols from one batch of headlines.
+
+        Headlines are routed to the symbols they mention in a single pass and
+        each distinct headline is scored once. A symbol without any headline
+        of its own gets the sentiment of the whole batch.
+        """
+        unique = list(dict.fromkeys(headlines))
+        position = {text: i for i, text in enumerate(unique)}
+        multiplicity = np.bincount([position[text] for text in headlines], minlength=len(unique)).astype(float)
+
+        sentiments = self.score_headlines(unique)
+        matcher = self._matcher_for(symbols)
+        routed = matcher.route(unique)
+        market = self._aggregate(sentiments, multiplicity) if unique else self.analyze_headlines([])
+        timestamp = datetime.now().isoformat()
+
+        results = {}
+        for symbol, rows in zip(matcher.symbols, routed):
+            if rows:
+                result = self._aggregate([sentiments[row] for row in rows], multiplicity[rows])
+            else:
+                # Use general market sentiment if no symbol-specific news
+                result = dict(market)
+            result['symbol'] = symbol
+            result['timestamp'] = timestamp
+            results[symbol] = result
+        return results
+
     def get_symbol_sentiment(self, symbol: str, headlines: List[str]) -> Dict:
         """
         Get sentiment for a specific symbol from news headlines.
-        Caches results for performance.
-        """
-        cache_key = f"{symbol}_{datetime.now().strftime('%Y%m%d_%H')}"
-        
-        if cache_key in self.sentiment_cache:
-            return self.sentiment_cache[cache_key]
-        
-        # Filter headlines mentioning the symbol
-        relevant_headlines = [h for h in headlines if symbol.upper() in h.upper()]
-        
-        if not relevant_headlines:
-            # Use general market sentiment if no symbol-specific news
-            result = self.analyze_headlines(headlines)
-        else:
-            result = self.analyze_headlines(relevant_headlines)
-        
-        result['symbol'] = symbol
-        result['timestamp'] = datetime.now().isoformat()
-        
-        # Cache result
-        self.sentiment_cache[cache_key] = result
-        
-        return result
-    
+        Headline scores are cached for performance.
+        """
+        return self.get_universe_sentiment([symbol], headlines)[symbol]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['cached_headlines'] = len(self.sentiment_cache)
+        stats['backend'] = self.backend
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
+
     def get_trading_signal(self, sentiment_data: Dict) -> str:
         """
         Convert sentiment to trading signal.
@@ -124,7 +403,7 @@ class SentimentAnalyzer:
         """
         polarity = sentiment_data.get('avg_polarity', 0)
         strength = sentiment_data.get('sentiment_strength', 0)
-        
+
         # Require strong sentiment for signal
         if polarity > 0.2 and strength > 0.2:
             return 'bullish'
@@ -0,0 +1,227 @@
+"""
+Verification Cache
+SQLite-backed cache of multi-AI strategy verifications, so a strategy that
+collectors rediscover is not sent to every model again.
+
+Model responses are keyed by a hash of the normalized strategy text, the
+model id and the prompt template version; each row keeps the raw response,
+its parsed score and token usage. Consensus results are keyed by the same
+strategy hash plus a signature of the responses they were computed from.
+Rows expire after `ttl` seconds and the least recently used rows are evicted
+once a table exceeds `max_entries`.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../data/cache/ai_verification.db'))
+
+# Rough blended OpenRouter price used to report savings; free models cost 0
+DEFAULT_COST_PER_1K_TOKENS = float(os.getenv("OPENROUTER_COST_PER_1K_TOKENS", "0.002"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS model_responses (
+    key TEXT PRIMARY KEY,
+    text_hash TEXT NOT NULL,
+    model_id TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    response TEXT NOT NULL,
+    score REAL,
+    tokens INTEGER DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_model_responses_access ON model_responses(last_access);
+CREATE TABLE IF NOT EXISTS consensus (
+    key TEXT PRIMARY KEY,
+    text_hash TEXT NOT NULL,
+    consensus TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_consensus_access ON consensus(last_access);
+"""
+
+_LITERAL_NEWLINES = re.compile(r"\\[nrt]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_strategy_text(text: str) -> str:
+    """Case-fold and collapse whitespace so cosmetic differences share an entry."""
+    text = _LITERAL_NEWLINES.sub(" ", text or "")
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def strategy_hash(text: str) -> str:
+    return hashlib.sha256(normalize_strategy_text(text).encode()).hexdigest()
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def responses_signature(responses: Iterable[Dict[str, Any]]) -> str:
+    """Identifies the set of successful responses a consensus was built from."""
+    items = sorted((r.get("model_id", ""), r.get("content") or "") for r in responses if r.get("success"))
+    return _digest(*(f"{model}\x1e{content}" for model, content in items))
+
+
+class VerificationCache:
+    """
+    TTL + LRU bounded cache of model responses and consensus results.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, ttl: float = 7 * 24 * 3600.0,
+                 max_entries: int = 50_000, cost_per_1k_tokens: float = DEFAULT_COST_PER_1K_TOKENS):
+        # path=None keeps the cache in memory (tests, ephemeral workers)
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cost_per_1k_tokens = cost_per_1k_tokens
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.stats = {"response_hits": 0, "response_misses": 0, "consensus_hits": 0, "consensus_misses": 0,
+                      "stores": 0, "evictions": 0, "tokens_saved": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path or ":memory:", check_same_thread=False, timeout=20.0)
+            if self.path:
+                self._conn.execute("PRAGMA journal_mode=WAL;")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    # ===== Model responses =====
+
+    def get_responses(self, text: str, model_ids: List[str], prompt_version: str) -> Dict[str, Dict[str, Any]]:
+        """Cached successful responses for the given models, keyed by model id."""
+        text_hash = strategy_hash(text)
+        keys = {_digest(text_hash, model_id, prompt_version): model_id for model_id in model_ids}
+        now = time.time()
+        found: Dict[str, Dict[str, Any]] = {}
+        try:
+            with self._lock:
+                conn = self._connection()
+                placeholders = ",".join("?" * len(keys))
+                rows = conn.execute(
+                    f"SELECT key, response, tokens FROM model_responses WHERE key IN ({placeholders}) AND created_at > ?",
+                    (*keys, now - self.ttl)
+                ).fetchall() if keys else []
+                for key, response, tokens in rows:
+                    found[keys[key]] = json.loads(response)
+                    self.stats["tokens_saved"] += tokens or 0
+                if rows:
+                    conn.executemany("UPDATE model_responses SET last_access = ? WHERE key = ?",
+                                     [(now, key) for key, _, _ in rows])
+                    conn.commit()
+                self.stats["response_hits"] += len(found)
+                self.stats["response_misses"] += len(keys) - len(found)
+        except sqlite3.Error as e:
+            logger.error(f"Verification cache read failed: {e}")
+        return found
+
+    def put_responses(self, text: str, responses: List[Dict[str, Any]], prompt_version: str,
+                      score_fn=None):
+        """Store successful responses (failures are never cached)."""
+        text_hash = strategy_hash(text)
+        now = time.time()
+        rows = []
+        for response in responses:
+            if not response.get("success"):
+                continue
+            usage = response.get("usage") or {}
+            score = score_fn(response.get("content", "")) if score_fn else None
+            rows.append((_digest(text_hash, response["model_id"], prompt_version), text_hash, response["model_id"],
+                         prompt_version, json.dumps(response), score, int(usage.get("total_tokens") or 0), now, now))
+        if not rows:
+            return
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.executemany("INSERT OR REPLACE INTO model_responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self.stats["stores"] += len(rows)
+                self._evict(conn, "model_responses")
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Verification cache write failed: {e}")
+
+    # ===== Consensus =====
+
+    def get_consensus(self, text_hash: str, signature: str) -> Optional[Dict[str, Any]]:
+        key = _digest(text_hash, signature)
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute("SELECT consensus FROM consensus WHERE key = ? AND created_at > ?",
+                                   (key, time.time() - self.ttl)).fetchone()
+                if row is None:
+                    self.stats["consensus_misses"] += 1
+                    return None
+                conn.execute("UPDATE consensus SET last_access = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+                self.stats["consensus_hits"] += 1
+                return json.loads(row[0])
+        except sqlite3.Error as e:
+            logger.error(f"Verification cache read failed: {e}")
+            return None
+
+    def put_consensus(self, text_hash: str, signature: str, consensus: Dict[str, Any]):
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute("INSERT OR REPLACE INTO consensus VALUES (?, ?, ?, ?, ?)",
+                             (_digest(text_hash, signature), text_hash, json.dumps(consensus), now, now))
+                self._evict(conn, "consensus")
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Verification cache write failed: {e}")
+
+    # ===== Maintenance =====
+
+    def _evict(self, conn: sqlite3.Connection, table: str):
+        """Drop expired rows, then least recently used rows beyond max_entries."""
+        expired = conn.execute(f"DELETE FROM {table} WHERE created_at <= ?", (time.time() - self.ttl,)).rowcount
+        overflow = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(f"DELETE FROM {table} WHERE key IN "
+                         f"(SELECT key FROM {table} ORDER BY last_access ASC LIMIT ?)", (overflow,))
+        self.stats["evictions"] += max(expired, 0) + max(overflow, 0)
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM model_responses")
+            conn.execute("DELETE FROM consensus")
+            conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            try:
+                conn = self._connection()
+                stats["cached_responses"] = conn.execute("SELECT COUNT(*) FROM model_responses").fetchone()[0]
+                stats["cached_consensus"] = conn.execute("SELECT COUNT(*) FROM consensus").fetchone()[0]
+            except sqlite3.Error:
+                pass
+        lookups = stats["response_hits"] + stats["response_misses"]
+        stats["hit_rate"] = round(stats["response_hits"] / lookups, 3) if lookups else 0.0
+        # Every response hit is one model call not made
+        stats["api_calls_saved"] = stats["response_hits"]
+        stats["estimated_cost_saved_usd"] = round(stats["tokens_saved"] / 1000 * self.cost_per_1k_tokens, 4)
+        return stats
+
+
+# Global instance
+verification_cache = VerificationCache()
@@ -188,13 +188,11 @@ def get_dashboard_ticker():
 def get_dashboard_screens():
     """Get active trading screens/signals."""
     try:
-        # Mock data for screens
-        screens = [
-            {"id": "1", "name": "Bullish MACD Crossover", "type": "Bullish", "count": 12, "icon": "📈"},
-            {"id": "2", "name": "RSI Oversold (<30)", "type": "Bullish", "count": 5, "icon": "📉"},
-            {"id": "3", "name": "Resistance Breakout", "type": "Bullish", "count": 8, "icon": "🚀"},
-            {"id": "4", "name": "Bearish Engulfing", "type": "Bearish", "count": 3, "icon": "🔻"}
-        ]
+        from backend.intelligence.screener import screener
+        screens = screener.get_results(
+            ["macd_bullish_cross", "rsi_oversold", "resistance_breakout", "bearish_engulfing"],
+            include_symbols=request.args.get('symbols', 'true').lower() != 'false'
+        )
         return jsonify({"screens": screens})
     except Exception as e:
         logger.error(f"Error fetching screens: {e}")
@@ -742,12 +740,12 @@ def get_scheduled_jobs():
 
 # ===== Multi-AI Verification Endpoints =====
 try:
-    from backend.ai.multi_ai_verifier import MultiAIVerifier
+    from backend.ai.multi_ai_verifier import get_verifier
     from backend.ai.consensus_engine import ConsensusEngine
     from backend.ai.config.models_config import get_model_stats, get_trading_models
     
     multi_ai_available = True
-    multi_ai_verifier = MultiAIVerifier()
+    multi_ai_verifier = get_verifier()
     consensus_engine = ConsensusEngine()
 except Exception as e:
     logger.warning(f"Multi-AI system not available: {e}")
@@ -770,7 +768,7 @@ def verify_strategy_ai():
         result = multi_ai_verifier.verify_strategy(strategy_text)
         
         # Calculate consensus
-        consensus = consensus_engine.calculate_consensus(result['responses'])
+        consensus = consensus_engine.calculate_consensus(result['responses'], cache_key=result.get('cache_key'))
         
         # Combine results
         return jsonify({
@@ -829,10 +827,15 @@ def get_ai_stats():
         # Get per-model stats
         all_stats = model_manager.get_model_stats()
         
+        # Hit rate and estimated API spend avoided by the verification cache
+        from backend.ai.verification_cache import verification_cache
+        
         return jsonify({
             "summary": summary,
             "best_performers": best_models,
             "model_stats": all_stats,
+            "verification_cache": verification_cache.get_stats(),
+            "verifier": multi_ai_verifier.get_stats(),
             "timestamp": datetime.now().isoformat()
         })
     except Exception as e:
@@ -973,7 +976,7 @@ def demo_multi_ai():
         result = multi_ai_verifier.verify_strategy(demo_strategy)
         
         # Calculate consensus
-        consensus = consensus_engine.calculate_consensus(result['responses'])
+        consensus = consensus_engine.calculate_consensus(result['responses'], cache_key=result.get('cache_key'))
         
         # Save demo output to file
         try:
@@ -1423,6 +1426,25 @@ def get_sentiment(symbol):
         logger.error(f"Sentiment analysis failed: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/ai/sentiment/batch', methods=['POST'])
+def get_batch_sentiment():
+    """Sentiment for many symbols from one batch of headlines."""
+    try:
+        data = request.get_json() or {}
+        symbols = data.get('symbols') or []
+        headlines = data.get('headlines') or []
+        if not symbols:
+            return jsonify({"error": "symbols is required"}), 400
+
+        results = sentiment_analyzer.get_universe_sentiment(symbols, headlines)
+        for result in results.values():
+            result['trading_signal'] = sentiment_analyzer.get_trading_signal(result)
+
+        return jsonify({'results': results, 'stats': sentiment_analyzer.get_stats()}), 200
+    except Exception as e:
+        logger.error(f"Batch sentiment analysis failed: {e}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/ai/patterns/<symbol>', methods=['GET'])
 def get_patterns(symbol):
     """Detect chart patterns for a symbol."""
@@ -1438,7 +1460,8 @@ def get_patterns(symbol):
                 'timestamp': f"2024-01-{i+1:02d}"
             })
         
-        result = pattern_detector.analyze_patterns(mock_prices)
+        # Keyed by symbol: the full-history scan is reused until the data changes
+        result = pattern_detector.analyze_patterns(mock_prices, symbol=symbol)
         result['symbol'] = symbol
         
         return jsonify(result), 200
@@ -1492,6 +1515,7 @@ def get_market_regime():
 # from backend.utils.profiler import profiler  # DISABLED
 # from backend.utils.cache import cache_manager  # DISABLED
 # from backend.tasks.queue import task_queue  # DISABLED
+from backend.intelligence.backtest_cache import backtest_cache
 
 # Start task queue
 # task_queue.start()  # DISABLED: Causes Flask to crash on startup
@@ -1517,8 +1541,12 @@ def get_performance_metrics():
 def get_cache_stats():
     """Get cache statistics and info."""
     try:
-        # cache_info = cache_manager.get_cache_info()  # DISABLED
-        cache_info = {'status': 'disabled'}
+        # The general response cache (cache_manager) is disabled; the backtest cache is live
+        stats = backtest_cache.get_stats()
+        cache_info = {
+            'status': stats['status'],
+            'backtest_cache': stats
+        }
         return jsonify(cache_info), 200
     except Exception as e:
         logger.error(f"Failed to get cache stats: {e}")
@@ -1529,7 +1557,7 @@ def clear_cache():
     """Clear all cache."""
     try:
         # cache_manager.clear()  # DISABLED
-        pass
+        backtest_cache.clear()
         return jsonify({"message": "Cache cleared successfully"}), 200
     except Exception as e:
         logger.error(f"Failed to clear cache: {e}")
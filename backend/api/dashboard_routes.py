@@ -7,22 +7,17 @@ from datetime import datetime, timedelta
 from backend.database.db import db
 from backend.utils.angel_one_helper import angel_helper
 from backend.data.tickers import NIFTY_50_TICKERS
+from backend.intelligence.screener import screener
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
 @dashboard_bp.route('/screens', methods=['GET'])
 def get_trading_screens():
-    """Get technical analysis screeners."""
-    # TODO: Implement real technical analysis using TA-Lib or pandas-ta on DB data
-    # Returning 0 counts to avoid showing dummy data
-    screens = [
-        {'id': '1', 'name': 'Resistance breakouts', 'type': 'Bullish', 'count': 0},
-        {'id': '2', 'name': 'MACD above signal line', 'type': 'Bullish', 'count': 0},
-        {'id': '3', 'name': 'RSI overbought', 'type': 'Bearish', 'count': 0},
-        {'id': '4', 'name': 'RSI oversold', 'type': 'Bullish', 'count': 0},
-        {'id': '5', 'name': 'Support breakdowns', 'type': 'Bearish', 'count': 0},
-        {'id': '6', 'name': 'Golden cross', 'type': 'Bullish', 'count': 0},
-    ]
+    """Get technical analysis screeners (cached results from the screener engine)."""
+    screens = screener.get_results([
+        'resistance_breakout', 'macd_above_signal', 'rsi_overbought',
+        'rsi_oversold', 'support_breakdown', 'golden_cross'
+    ])
     return jsonify({'screens': screens}), 200
 
 @dashboard_bp.route('/news', methods=['GET'])
@@ -81,6 +81,8 @@ class Config:
     RATE_LIMIT_DELAY_SECONDS = int(os.getenv('RATE_LIMIT_DELAY_SECONDS', '2'))
     MAX_CONCURRENT_COLLECTORS = int(os.getenv('MAX_CONCURRENT_COLLECTORS', '10'))
     MAX_CONCURRENT_TESTERS = int(os.getenv('MAX_CONCURRENT_TESTERS', '5'))
+    MAX_VERIFICATIONS_IN_FLIGHT = int(os.getenv('MAX_VERIFICATIONS_IN_FLIGHT', '4'))  # strategies per collector
+    AI_MODEL_CONCURRENCY = int(os.getenv('AI_MODEL_CONCURRENCY', '4'))  # concurrent calls per model
     
     # ========== ERROR HANDLING ==========
     MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
@@ -2,6 +2,8 @@ import os
 from typing import Dict, List, Optional
 import pandas as pd
 from .base_provider import BaseDataProvider
+from backend.utils.broker_session import broker_session
+from backend.utils.market_data_gateway import market_data_gateway
 # from SmartApi import SmartConnect # Uncomment when installed
 
 class AngelOneDataProvider(BaseDataProvider):
@@ -24,30 +26,20 @@ class AngelOneDataProvider(BaseDataProvider):
         
         try:
             try:
-                from SmartApi import SmartConnect
-                import pyotp
+                import SmartApi  # noqa: F401
+                import pyotp  # noqa: F401
             except ImportError:
                 print("SmartApi or pyotp not installed. Run `pip install smartapi-python pyotp`")
                 return False
 
-            self.obj = SmartConnect(api_key=self.api_key)
-            
-            # Generate TOTP
-            try:
-                totp = pyotp.TOTP(self.totp_secret).now()
-            except Exception as e:
-                print(f"Error generating TOTP: {e}")
-                return False
-
-            data = self.obj.generateSession(self.client_code, self.password, totp)
-            
-            if data['status'] == False:
-                print(f"Angel One Login Failed: {data['message']}")
+            # Reuse the process-wide session instead of logging in per provider
+            if not broker_session.ensure_session():
+                print(f"Angel One Login Failed: {broker_session.last_error}")
                 return False
 
-            self.refreshToken = data['data']['refreshToken']
-            self.feedToken = self.obj.getfeedToken()
-            # self.userProfile = self.obj.getProfile(self.refreshToken)
+            self.obj = broker_session.client
+            self.refreshToken = broker_session.refresh_token
+            self.feedToken = broker_session.feed_token
             print("Angel One connected successfully.")
             return True
         except Exception as e:
@@ -57,8 +49,13 @@ class AngelOneDataProvider(BaseDataProvider):
     def get_live_price(self, symbol: str) -> Optional[float]:
         if not self.obj:
             return None
-        # Implementation for fetching live price
-        return None
+        return market_data_gateway.get_price(symbol)
+
+    def get_live_prices(self, symbols: List[str]) -> Dict[str, float]:
+        if not self.obj:
+            return {}
+        # One batched getMarketData call instead of one request per symbol
+        return market_data_gateway.get_prices(symbols)
 
     def get_historical_data(self, symbol: str, period: str = "1mo", interval: str = "1d") -> Optional[pd.DataFrame]:
         if not self.obj:
@@ -24,6 +24,19 @@ class BaseDataProvider(ABC):
         """
         pass
 
+    def get_live_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Get live prices for several symbols at once.
+        Providers with a batch quote API should override this; symbols with
+        no price are left out of the result.
+        """
+        prices = {}
+        for symbol in symbols:
+            price = self.get_live_price(symbol)
+            if price is not None:
+                prices[symbol] = price
+        return prices
+
     @abstractmethod
     def get_historical_data(self, symbol: str, period: str = "1mo", interval: str = "1d") -> Optional[pd.DataFrame]:
         """
@@ -34,6 +34,13 @@ class DataProviderManager:
             return None
         return self.active_provider.get_live_price(symbol)
 
+    def get_live_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Get live prices for several symbols using the active provider."""
+        if self.active_provider is None:
+            print(f"No active provider for {len(symbols)} symbols")
+            return {}
+        return self.active_provider.get_live_prices(symbols)
+
     def get_historical_data(self, symbol: str, period: str = "1mo", interval: str = "1d") -> Optional[pd.DataFrame]:
         """Get historical data using the active provider."""
         if self.active_provider is None:
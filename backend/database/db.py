@@ -148,6 +148,43 @@ class DatabaseManager:
             print(f"Error inserting strategy: {e}")
             return None
 
+    def insert_strategies_batch(self, strategies):
+        """Insert many collected strategies in one transaction, in order. Returns their ids."""
+        if not strategies:
+            return []
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                collected_at = datetime.now().isoformat()
+                ids = []
+                for s in strategies:
+                    content = s.get('content', '')
+                    verification_data = s.get('verification_data')
+                    cursor.execute(
+                        """
+                        INSERT INTO strategies 
+                        (source, content, title, url, verification_data, verified, confidence_score, collector_id, collected_at) 
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (
+                            s.get('source'),
+                            json.dumps(content) if isinstance(content, (dict, list)) else content,
+                            s.get('title'),
+                            s.get('url'),
+                            json.dumps(verification_data) if verification_data else None,
+                            s.get('verified', True),
+                            s.get('confidence_score', 100.0),
+                            s.get('collector_id'),
+                            collected_at
+                        )
+                    )
+                    ids.append(cursor.lastrowid)
+                conn.commit()
+                return ids
+        except Exception as e:
+            print(f"Error inserting strategy batch: {e}")
+            return []
+
     def insert_test_result(self, strategy_id, agent_name, metrics, recommendation):
         """Insert a test result."""
         try:
@@ -635,6 +672,21 @@ class DatabaseManager:
             print(f"Error fetching strategies: {e}")
             return []
 
+    def iter_strategy_texts(self, batch_size=10000):
+        """Yield (id, title, content) for every strategy, fetching in batches."""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT id, title, content FROM strategies ORDER BY id")
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield row[0], row[1], row[2]
+        except Exception as e:
+            print(f"Error iterating strategies: {e}")
+
     def get_tester_statistics(self, agent_name):
         """Get aggregated statistics for a tester agent."""
         try:
@@ -808,6 +860,31 @@ class DatabaseManager:
             print(f"Error saving market data: {e}")
             return False
 
+    def save_market_data_batch(self, bars):
+        """Save many bars (dicts with symbol/timestamp/OHLCV/timeframe) in one transaction."""
+        if not bars:
+            return True
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
+                    """
+                    INSERT OR REPLACE INTO market_data
+                    (symbol, timestamp, open, high, low, close, volume, timeframe)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (b['symbol'], b['timestamp'], b['open'], b['high'], b['low'],
+                         b['close'], b['volume'], b.get('timeframe', '1m'))
+                        for b in bars
+                    ]
+                )
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"Error saving market data batch: {e}")
+            return False
+
     def get_latest_market_data(self, symbol):
         """Get latest market data for a symbol."""
         try:
@@ -828,6 +905,106 @@ class DatabaseManager:
             print(f"Error fetching market data: {e}")
             return None
     
+    def get_market_data_history(self, symbol, limit=500, timeframe='1m'):
+        """Get the most recent `limit` bars for a symbol, oldest first."""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT * FROM (
+                        SELECT * FROM market_data
+                        WHERE symbol = ? AND timeframe = ?
+                        ORDER BY timestamp DESC
+                        LIMIT ?
+                    ) ORDER BY timestamp ASC
+                    """,
+                    (symbol, timeframe, limit)
+                )
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Error fetching market data history: {e}")
+            return []
+
+    def get_market_data_panel(self, symbols=None, limit=5, timeframe='1d'):
+        """
+        Get the most recent `limit` bars for many symbols (every stored symbol
+        when symbols is None) in one query per 500 symbols, oldest first.
+        """
+        rows = []
+        if symbols is None:
+            chunks = [None]
+        else:
+            symbols = list(symbols)
+            chunks = [symbols[i:i + 500] for i in range(0, len(symbols), 500)]
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                for chunk in chunks:
+                    where, params = "timeframe = ?", [timeframe]
+                    if chunk is not None:
+                        where += f" AND symbol IN ({','.join('?' * len(chunk))})"
+                        params.extend(chunk)
+                    cursor.execute(
+                        f"""
+                        SELECT symbol, timestamp, open, high, low, close, volume FROM (
+                            SELECT symbol, timestamp, open, high, low, close, volume,
+                                   ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY timestamp DESC) AS rn
+                            FROM market_data
+                            WHERE {where}
+                        ) WHERE rn <= ?
+                        ORDER BY symbol, timestamp ASC
+                        """,
+                        (*params, limit)
+                    )
+                    rows.extend(dict(row) for row in cursor.fetchall())
+            return rows
+        except Exception as e:
+            print(f"Error fetching market data panel: {e}")
+            return []
+
+    def save_order_book_snapshots(self, rows):
+        """Save (symbol, timestamp, bid_depth, ask_depth, imbalance) rows in one transaction."""
+        if not rows:
+            return True
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
+                    """
+                    INSERT INTO order_book_snapshots
+                    (symbol, timestamp, bid_depth, ask_depth, imbalance)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    rows
+                )
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"Error saving order book snapshots: {e}")
+            return False
+
+    def get_order_book_snapshots(self, symbol, limit=100):
+        """Get the most recent order book snapshots for a symbol, oldest first."""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT * FROM (
+                        SELECT * FROM order_book_snapshots
+                        WHERE symbol = ?
+                        ORDER BY timestamp DESC, id DESC
+                        LIMIT ?
+                    ) ORDER BY timestamp ASC, id ASC
+                    """,
+                    (symbol, limit)
+                )
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Error fetching order book snapshots: {e}")
+            return []
+    
     # ===== Validation Session Methods =====
     
     def create_validation_session(self, session_id, start_time, end_time, num_strategies):
@@ -118,8 +118,8 @@ CREATE TABLE IF NOT EXISTS system_health (
 CREATE TABLE IF NOT EXISTS order_book_snapshots (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     symbol TEXT NOT NULL,
-    bid_depth TEXT, -- JSON
-    ask_depth TEXT, -- JSON
+    bid_depth BLOB, -- packed (price f8, qty u4) levels, best first; older rows hold JSON
+    ask_depth BLOB,
     imbalance REAL,
     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
 );
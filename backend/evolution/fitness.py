@@ -64,3 +64,20 @@ class FitnessCalculator:
         except Exception as e:
             logger.error(f"Error calculating fitness: {e}")
             return 0.0
+
+    def calculate_backtest_fitness(self, results: Dict[str, Any]) -> float:
+        """
+        Calculate fitness straight from a BacktestEngine result dict.
+        Failed backtests (with an "error" key) score 0.0.
+        """
+        if not results or "error" in results:
+            return 0.0
+
+        metrics = {
+            "sharpe_ratio": results.get("sharpe_ratio", 0),
+            "sortino_ratio": results.get("sortino_ratio", 0),
+            "win_rate": results.get("win_rate", 0),
+            "max_drawdown": results.get("max_drawdown_pct", 100),
+            "total_trades": results.get("total_trades", 0)
+        }
+        return self.calculate_fitness(metrics)
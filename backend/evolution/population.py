@@ -1,5 +1,5 @@
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import random
 import uuid
 from backend.evolution.organism import TradingOrganism
@@ -15,13 +15,13 @@ class Population:
     Manages a population of TradingOrganisms and handles the evolution process.
     """
     
-    def __init__(self, population_size: int = 100):
+    def __init__(self, population_size: int = 100, backtester: Optional[BacktestEngine] = None):
         self.population_size = population_size
         self.organisms: List[TradingOrganism] = []
         self.generation = 0
         self.fitness_calculator = FitnessCalculator()
         self.db = DatabaseManager()
-        self.backtester = BacktestEngine()
+        self.backtester = backtester or BacktestEngine()
         
     def create_initial_population(self):
         """Generate the first generation of random organisms."""
@@ -116,21 +116,8 @@ class Population:
                     strategy_params=org.dna
                 )
                 
-                if "error" in results:
-                    # If backtest fails (e.g. no data), assign 0 fitness
-                    # logger.warning(f"Backtest failed for organism {org.id}: {results['error']}")
-                    org.fitness = 0.0
-                else:
-                    # Calculate fitness from results
-                    # Map backtest results to what FitnessCalculator expects
-                    metrics = {
-                        "sharpe_ratio": results.get("sharpe_ratio", 0),
-                        "sortino_ratio": results.get("sortino_ratio", 0),
-                        "win_rate": results.get("win_rate", 0),
-                        "max_drawdown": results.get("max_drawdown_pct", 100),
-                        "total_trades": results.get("total_trades", 0)
-                    }
-                    org.fitness = self.fitness_calculator.calculate_fitness(metrics)
+                # Failed backtests (e.g. no data) score 0 fitness
+                org.fitness = self.fitness_calculator.calculate_backtest_fitness(results)
                     
             except Exception as e:
                 logger.error(f"Error evaluating organism {org.id}: {e}")
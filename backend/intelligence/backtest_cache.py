@@ -0,0 +1,301 @@
+"""
+Backtest Result Cache
+Content-addressed cache in front of BacktestEngine.run_backtest. A result is
+keyed by a fingerprint of the OHLCV data it ran on plus the strategy, its
+normalized parameters, the initial capital and the engine version, so the
+same backtest requested by the API, the testers and the evolution loop is
+only simulated once.
+
+Two tiers: a bounded in-memory LRU and a JSON-on-disk tier with entry and
+byte caps. When a (symbol, period) series comes back with a new fingerprint
+(new bars appended, corrected history) every result cached for the old data
+is dropped from both tiers.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../data/cache/backtests'))
+FINGERPRINT_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def fingerprint_dataframe(df: pd.DataFrame) -> str:
+    """Stable hash of the OHLCV values and index of a price frame."""
+    columns = [c for c in FINGERPRINT_COLUMNS if c in df.columns]
+    hashed = pd.util.hash_pandas_object(df[columns], index=True).values
+    digest = hashlib.sha256(hashed.tobytes())
+    digest.update(",".join(columns).encode())
+    return digest.hexdigest()
+
+
+def normalize_params(params: Optional[Dict[str, Any]], defaults: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fill strategy defaults and drop keys the strategy never reads, so
+    None, {} and an explicit copy of the defaults share one cache entry.
+    Integral floats are folded to ints (20.0 and 20 are the same window).
+    """
+    params = params or {}
+    normalized = {}
+    for name, default in defaults.items():
+        value = params.get(name, default)
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        normalized[name] = value
+    return normalized
+
+
+class BacktestCache:
+    """
+    Two-tier (memory LRU + disk) cache for backtest results.
+    """
+
+    def __init__(self, max_memory_entries: int = 256, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 max_disk_entries: int = 2000, max_disk_bytes: int = 200 * 1024 * 1024):
+        self.max_memory_entries = max_memory_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # series id -> (fingerprint, keys cached for that fingerprint)
+        self._series: Dict[str, Tuple[str, set]] = {}
+        # key -> bytes on disk, least recently used first; seeded from the directory once,
+        # then kept in step with reads, writes and evictions
+        self._disk_sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.RLock()
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'invalidations': 0
+        }
+
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"Backtest disk cache disabled ({self.cache_dir}): {e}")
+                self.cache_dir = None
+        self._scan_disk()
+
+    # ===== Keys =====
+
+    @staticmethod
+    def make_key(fingerprint: str, strategy: str, params: Dict[str, Any], initial_capital: float,
+                 engine_version: str) -> str:
+        payload = json.dumps({
+            "data": fingerprint,
+            "strategy": strategy,
+            "params": params,
+            "capital": float(initial_capital),
+            "engine": engine_version
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def series_id(symbol: str, period: str, interval: str = "1d") -> str:
+        return f"{symbol}|{period}|{interval}"
+
+    # ===== Lookup / store =====
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return self._memory[key]
+
+            result = self._read_disk(key)
+            if result is not None:
+                self.stats['disk_hits'] += 1
+                self._remember(key, result)
+                return result
+
+            self.stats['misses'] += 1
+            return None
+
+    def set(self, key: str, result: Dict[str, Any], series: Optional[str] = None,
+            fingerprint: Optional[str] = None):
+        # Errors are cheap to recompute and may be transient (provider down)
+        if not result or "error" in result:
+            return
+        with self._lock:
+            self._remember(key, result)
+            self._write_disk(key, result)
+            self.stats['stores'] += 1
+            if series and fingerprint:
+                self._series.setdefault(series, (fingerprint, set()))[1].add(key)
+
+    def observe_series(self, series: str, fingerprint: str):
+        """
+        Record the fingerprint a series was just fetched with; results
+        cached for an older fingerprint of the same series are dropped.
+        """
+        with self._lock:
+            previous = self._series.get(series)
+            if previous is None or previous[0] == fingerprint:
+                if previous is None:
+                    self._series[series] = (fingerprint, set())
+                return
+
+            stale = previous[1]
+            for key in stale:
+                self._forget(key)
+            self.stats['invalidations'] += len(stale)
+            self._series[series] = (fingerprint, set())
+            logger.info(f"Backtest cache: {series} changed, invalidated {len(stale)} results")
+
+    def clear(self):
+        with self._lock:
+            count = len(self._memory)
+            self._memory.clear()
+            self._series.clear()
+            for path in self._disk_files():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._disk_sizes.clear()
+            self._disk_bytes = 0
+            logger.info(f"Backtest cache cleared: {count} in-memory results removed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.stats['memory_hits'] + self.stats['disk_hits']
+            total = hits + self.stats['misses']
+            return {
+                **self.stats,
+                # The disk tier turns itself off if its directory cannot be created
+                'status': 'memory+disk' if self.cache_dir else 'memory_only',
+                'hits': hits,
+                'total_requests': total,
+                'hit_rate_percent': round(hits / total * 100, 2) if total else 0,
+                'memory_entries': len(self._memory),
+                'memory_capacity': self.max_memory_entries,
+                'disk_entries': len(self._disk_sizes),
+                'disk_bytes': self._disk_bytes,
+                'tracked_series': len(self._series)
+            }
+
+    # ===== Memory tier =====
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _forget(self, key: str):
+        self._memory.pop(key, None)
+        path = self._disk_path(key)
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._disk_bytes -= self._disk_sizes.pop(key, 0)
+
+    # ===== Disk tier =====
+
+    def _disk_path(self, key: str) -> Optional[str]:
+        return os.path.join(self.cache_dir, f"{key}.json") if self.cache_dir else None
+
+    def _scan_disk(self):
+        """Seed the size index from the directory, oldest mtime first."""
+        entries = []
+        for path in self._disk_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, os.path.basename(path)[:-len(".json")], stat.st_size))
+        entries.sort()
+        self._disk_sizes = OrderedDict((key, size) for _, key, size in entries)
+        self._disk_bytes = sum(self._disk_sizes.values())
+
+    def _disk_files(self):
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return []
+        return [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir) if f.endswith(".json")]
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._disk_path(key)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                result = json.load(f)
+            os.utime(path)  # LRU order on disk follows mtime
+            if key in self._disk_sizes:
+                self._disk_sizes.move_to_end(key)
+            else:  # written by another process sharing the directory
+                self._disk_sizes[key] = os.path.getsize(path)
+                self._disk_bytes += self._disk_sizes[key]
+            return result
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable backtest cache entry {key[:12]}: {e}")
+            self._forget(key)
+            return None
+
+    def _write_disk(self, key: str, result: Dict[str, Any]):
+        path = self._disk_path(key)
+        if not path:
+            return
+        tmp_path = f"{path}.tmp"
+        try:
+            data = json.dumps(result, default=float).encode()
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not persist backtest result {key[:12]}: {e}")
+            return
+        self._disk_bytes += len(data) - self._disk_sizes.pop(key, 0)
+        self._disk_sizes[key] = len(data)
+        self._enforce_disk_caps()
+
+    def _enforce_disk_caps(self):
+        # Evicts from the in-memory index; the directory is never rescanned
+        while self._disk_sizes and (len(self._disk_sizes) > self.max_disk_entries or
+                                    self._disk_bytes > self.max_disk_bytes):
+            key, size = self._disk_sizes.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(self._disk_path(key))
+                self.stats['evictions'] += 1
+            except FileNotFoundError:
+                pass  # already removed (e.g. by another process sharing the directory)
+            except OSError as e:
+                logger.warning(f"Could not evict backtest cache entry {key[:12]}: {e}")
+
+
+# Global backtest cache instance
+backtest_cache = BacktestCache()
+
+
+if __name__ == "__main__":
+    import numpy as np
+    from backend.intelligence.backtester import BacktestEngine
+
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, 750)))
+    df = pd.DataFrame({"Close": close}, index=pd.bdate_range("2021-01-01", periods=750))
+    engine = BacktestEngine(cache=BacktestCache(cache_dir=None))
+    for label in ("cold", "warm"):
+        start = time.perf_counter()
+        engine.run_backtest_on_data(df, "SMA_CROSSOVER", use_cache=True)
+        print(f"{label}: {(time.perf_counter() - start) * 1000:.2f} ms")
+    print(engine.cache.get_stats())
@@ -1,14 +1,36 @@
+import copy
 import pandas as pd
 import numpy as np
 from backend.data_providers.manager import DataProviderManager
+from backend.intelligence.backtest_cache import backtest_cache, fingerprint_dataframe, normalize_params
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bump whenever signal or trade simulation logic changes so cached results
+# from an older engine are never served.
+ENGINE_VERSION = "1"
+
+# Parameters each strategy reads, with the values used when they are omitted
+STRATEGY_DEFAULTS = {
+    "SMA_CROSSOVER": {"ma_fast": 50, "ma_slow": 200},
+    "RSI_STRATEGY": {"rsi_period": 14, "rsi_overbought": 70, "rsi_oversold": 30},
+    "EVOLUTION_DNA": {"rsi_period": 14, "rsi_overbought": 70, "rsi_oversold": 30, "ma_fast": 20, "ma_slow": 50},
+}
+
 class BacktestEngine:
-    def __init__(self):
-        self.data_provider = DataProviderManager()
+    def __init__(self, data_provider=None, cache=None):
+        # The provider is created lazily so engines that only run on
+        # pre-loaded data (walk-forward workers, benchmarks) never log in.
+        self._data_provider = data_provider
+        self.cache = cache if cache is not None else backtest_cache
+
+    @property
+    def data_provider(self):
+        if self._data_provider is None:
+            self._data_provider = DataProviderManager()
+        return self._data_provider
 
     def run_backtest(self, symbol, strategy="SMA_CROSSOVER", period="1y", initial_capital=100000, strategy_params=None):
         """
@@ -21,18 +43,53 @@ class BacktestEngine:
         if df is None or df.empty:
             return {"error": "No historical data found"}
 
+        series = self.cache.series_id(symbol, period)
+        return self.run_backtest_on_data(df, strategy, initial_capital, strategy_params,
+                                         use_cache=True, series=series)
+
+    def run_backtest_on_data(self, df, strategy="SMA_CROSSOVER", initial_capital=100000, strategy_params=None,
+                             include_curve=False, use_cache=False, series=None):
+        """
+        Runs a backtest on an already loaded OHLCV DataFrame.
+        With use_cache=True the result is looked up in / stored to the
+        backtest cache; series names the (symbol, period) the frame was
+        fetched for so newer data invalidates older results.
+        Curve output is never cached.
+        """
+        if df is None or df.empty:
+            return {"error": "No historical data found"}
+
         # Ensure we have Close price
         if 'Close' not in df.columns:
              return {"error": "Data missing 'Close' column"}
 
+        if use_cache and not include_curve:
+            return self._run_cached(df, strategy, initial_capital, strategy_params, series)
+
         # 2. Apply Strategy Logic
         df = self._apply_strategy(df, strategy, strategy_params)
         
         # 3. Simulate Trades
-        results = self._simulate_trades(df, initial_capital)
+        results = self._simulate_trades(df, initial_capital, include_curve=include_curve)
         
         return results
 
+    def _run_cached(self, df, strategy, initial_capital, strategy_params, series):
+        fingerprint = fingerprint_dataframe(df)
+        if series:
+            self.cache.observe_series(series, fingerprint)
+
+        params = normalize_params(strategy_params, STRATEGY_DEFAULTS.get(strategy, {}))
+        key = self.cache.make_key(fingerprint, strategy, params, initial_capital, ENGINE_VERSION)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"Backtest cache hit for {series or 'dataframe'} {strategy}")
+            return copy.deepcopy(cached)
+
+        results = self._simulate_trades(self._apply_strategy(df, strategy, params), initial_capital)
+        self.cache.set(key, results, series=series, fingerprint=fingerprint)
+        return copy.deepcopy(results)
+
     def _apply_strategy(self, df, strategy, params=None):
         """
         Calculates indicators and generates signals (1=Buy, -1=Sell, 0=Hold).
@@ -40,14 +97,13 @@ class BacktestEngine:
         df = df.copy()
         df['Signal'] = 0
         
-        # Default parameters if none provided
-        if params is None:
-            params = {}
+        # Fill defaults for anything not provided
+        params = {**STRATEGY_DEFAULTS.get(strategy, {}), **(params or {})}
 
         if strategy == "SMA_CROSSOVER":
             # Simple Moving Average Crossover (Golden Cross)
-            fast = params.get('ma_fast', 50)
-            slow = params.get('ma_slow', 200)
+            fast = params['ma_fast']
+            slow = params['ma_slow']
             
             df['SMA_Fast'] = df['Close'].rolling(window=fast).mean()
             df['SMA_Slow'] = df['Close'].rolling(window=slow).mean()
@@ -59,9 +115,9 @@ class BacktestEngine:
             
         elif strategy == "RSI_STRATEGY":
             # Simple RSI Strategy
-            period = params.get('rsi_period', 14)
-            overbought = params.get('rsi_overbought', 70)
-            oversold = params.get('rsi_oversold', 30)
+            period = params['rsi_period']
+            overbought = params['rsi_overbought']
+            oversold = params['rsi_oversold']
             
             delta = df['Close'].diff()
             gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
@@ -77,9 +133,9 @@ class BacktestEngine:
             # We can combine multiple indicators based on DNA
             
             # 1. RSI Component
-            rsi_period = params.get('rsi_period', 14)
-            rsi_ob = params.get('rsi_overbought', 70)
-            rsi_os = params.get('rsi_oversold', 30)
+            rsi_period = params['rsi_period']
+            rsi_ob = params['rsi_overbought']
+            rsi_os = params['rsi_oversold']
             
             delta = df['Close'].diff()
             gain = (delta.where(delta > 0, 0)).rolling(window=rsi_period).mean()
@@ -88,8 +144,8 @@ class BacktestEngine:
             df['RSI'] = 100 - (100 / (1 + rs))
             
             # 2. MA Component
-            ma_fast_period = params.get('ma_fast', 20)
-            ma_slow_period = params.get('ma_slow', 50)
+            ma_fast_period = params['ma_fast']
+            ma_slow_period = params['ma_slow']
             
             df['MA_Fast'] = df['Close'].rolling(window=ma_fast_period).mean()
             df['MA_Slow'] = df['Close'].rolling(window=ma_slow_period).mean()
@@ -106,13 +162,16 @@ class BacktestEngine:
 
         return df
 
-    def _simulate_trades(self, df, initial_capital):
+    def _simulate_trades(self, df, initial_capital, include_curve=False):
         """
         Iterates through signals to execute trades and calculate equity.
+        With include_curve=True the daily equity curve, per-bar exposure and
+        the full list of closed-trade PnLs are returned as well.
         """
         cash = initial_capital
         position = 0 # Quantity
         equity_curve = []
+        exposure = []
         trades = []
         
         for i in range(len(df)):
@@ -148,6 +207,7 @@ class BacktestEngine:
             # Calculate Daily Equity
             current_equity = cash + (position * price)
             equity_curve.append(current_equity)
+            exposure.append(1 if position > 0 else 0)
 
         # Metrics
         final_equity = equity_curve[-1]
@@ -179,7 +239,7 @@ class BacktestEngine:
         winning_trades = [t for t in trades if t.get('pnl', 0) > 0]
         win_rate = (len(winning_trades) / len(trades) * 100) if len(trades) > 0 else 0.0
 
-        return {
+        results = {
             "initial_capital": initial_capital,
             "final_equity": round(final_equity, 2),
             "total_return_pct": round(total_return, 2),
@@ -190,3 +250,11 @@ class BacktestEngine:
             "total_trades": len(trades),
             "trades": trades[-50:] # Return last 50 trades to avoid huge payload
         }
+
+        if include_curve:
+            results["equity_curve"] = [float(v) for v in equity_curve]
+            results["dates"] = [str(d) for d in df.index]
+            results["exposure"] = exposure
+            results["trade_pnls"] = [float(t["pnl"]) for t in trades if "pnl" in t]
+
+        return results
@@ -1,20 +1,111 @@
 import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+
+import numpy as np
 import pandas as pd
-from typing import List, Dict
 from backend.data.tickers import ALL_TICKERS
 from backend.data_providers.manager import DataProviderManager
 from backend.database.db import DatabaseManager
 from backend.notifications.telegram_bot import TelegramBot
 
+OHLCV_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def build_panel(frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """
+    Align per-symbol OHLCV frames into one time x symbol DataFrame per field.
+    Dates a symbol did not trade are NaN in its column.
+    """
+    frames = {symbol: df for symbol, df in frames.items() if df is not None and not df.empty}
+    if not frames:
+        return {field: pd.DataFrame() for field in OHLCV_FIELDS}
+    return {
+        field: pd.concat({symbol: df[field] for symbol, df in frames.items()}, axis=1).sort_index()
+        for field in OHLCV_FIELDS
+    }
+
+
+def screen_momentum(panel: Dict[str, pd.DataFrame], volume_multiplier: float = 1.2) -> pd.DataFrame:
+    """
+    Bullish momentum screen over the whole panel at once: each symbol's last
+    candle is green and its volume exceeds `volume_multiplier` times the
+    symbol's average over the window. Returns matches sorted by volume.
+    """
+    close = panel["Close"]
+    if close.empty:
+        return pd.DataFrame(columns=["symbol", "last_price", "volume"])
+
+    # Row of each symbol's own last bar (symbols may stop trading early)
+    valid = close.notna().to_numpy()
+    last_row = len(close) - 1 - np.argmax(valid[::-1], axis=0)
+    cols = np.arange(close.shape[1])
+
+    def last(field: str) -> np.ndarray:
+        return panel[field].to_numpy(dtype=float)[last_row, cols]
+
+    last_close, last_open, last_volume = last("Close"), last("Open"), last("Volume")
+    avg_volume = panel["Volume"].mean().to_numpy(dtype=float)
+
+    mask = valid.any(axis=0) & (last_close > last_open) & (last_volume > avg_volume * volume_multiplier)
+    picks = pd.DataFrame({"symbol": close.columns[mask], "last_price": last_close[mask], "volume": last_volume[mask]})
+    return picks.sort_values("volume", ascending=False, kind="stable").reset_index(drop=True)
+
+
 class MorningScanner:
     """
     Scans the market at 8:00 AM to identify potential opportunities.
     """
 
-    def __init__(self):
+    def __init__(self, max_workers: int = 16, lookback_days: int = 5):
         self.data_manager = DataProviderManager()
         self.db = DatabaseManager()
         self.bot = TelegramBot()
+        self.max_workers = max_workers
+        self.lookback_days = lookback_days
+
+    def _load_from_store(self, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+        """Daily bars already collected locally, read in one batched query."""
+        # Collectors store bare names ("RELIANCE"), tickers.py uses "RELIANCE.NS"
+        names = {}
+        for symbol in symbols:
+            names[symbol] = symbol
+            names.setdefault(symbol.rsplit(".", 1)[0], symbol)
+        rows = self.db.get_market_data_panel(list(names), limit=self.lookback_days, timeframe='1d')
+        if not rows:
+            return {}
+        df = pd.DataFrame(rows)
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        df = df.rename(columns={"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"})
+        frames = {}
+        for name, group in df.groupby("symbol"):
+            symbol = names[name]
+            if symbol not in frames:
+                frames[symbol] = group.set_index("timestamp")[OHLCV_FIELDS]
+        return frames
+
+    def _fetch_remote(self, symbol: str) -> Optional[pd.DataFrame]:
+        try:
+            return self.data_manager.get_historical_data(symbol, period=f"{self.lookback_days}d")
+        except Exception as e:
+            print(f"Error scanning {symbol}: {e}")
+            return None
+
+    def fetch_universe(self, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        History for every symbol: the local store first, then the provider
+        for whatever is missing. Provider calls run concurrently; broker rate
+        limits are enforced by the shared session's token buckets.
+        """
+        frames = self._load_from_store(symbols)
+        missing = [s for s in symbols if s not in frames]
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for symbol, df in zip(missing, pool.map(self._fetch_remote, missing)):
+                    if df is not None and not df.empty:
+                        frames[symbol] = df.tail(self.lookback_days)
+        return frames
 
     def scan_market(self) -> str:
         """
@@ -22,50 +113,25 @@ class MorningScanner:
         Returns the generated report content.
         """
         print("--- Starting Morning Scan ---")
-        opportunities = []
+        started = time.perf_counter()
         
         # Use ALL_TICKERS from updated tickers.py
         total_tickers = len(ALL_TICKERS)
         print(f"Scanning {total_tickers} symbols...")
 
-        import time
-        
-        for i, symbol in enumerate(ALL_TICKERS):
-            try:
-                # Rate Limiting: Sleep every 10 requests to be safe with Yahoo
-                if i % 10 == 0 and i > 0:
-                    time.sleep(1)
-
-                # 1. Get Historical Data (Last 5 days)
-                df = self.data_manager.get_historical_data(symbol, period="5d")
-                if df is None or df.empty:
-                    continue
-
-                # 2. Analyze (Simple Momentum Strategy)
-                # Condition: Close > Open (Green Candle) AND Volume > Average Volume
-                last_candle = df.iloc[-1]
-                avg_volume = df['Volume'].mean()
-                
-                is_bullish = last_candle['Close'] > last_candle['Open']
-                high_volume = last_candle['Volume'] > (avg_volume * 1.2) # 20% above average
-                
-                # Additional check: Price above 50-day MA (if we had enough data, for now simple check)
-                # price_change = (last_candle['Close'] - df.iloc[0]['Close']) / df.iloc[0]['Close']
-                
-                if is_bullish and high_volume:
-                    opportunities.append({
-                        "symbol": symbol,
-                        "last_price": last_candle['Close'],
-                        "volume": last_candle['Volume'],
-                        "reason": "Bullish Momentum + High Volume (>20% avg)"
-                    })
-            except Exception as e:
-                print(f"Error scanning {symbol}: {e}")
+        # 1. Get Historical Data (last few days) for the whole universe
+        frames = self.fetch_universe(list(ALL_TICKERS))
+
+        # 2. Analyze (Simple Momentum Strategy), vectorized across symbols
+        # Condition: Close > Open (Green Candle) AND Volume > Average Volume
+        picks = screen_momentum(build_panel(frames))
+        picks["reason"] = "Bullish Momentum + High Volume (>20% avg)"
+        print(f"Scanned {len(frames)}/{total_tickers} symbols in {time.perf_counter() - started:.1f}s, "
+              f"{len(picks)} matches")
 
         # 3. Select Top 50 (Sort by Volume for now as a proxy for liquidity/interest)
         # In a real app, we'd sort by 'Momentum Score'
-        opportunities.sort(key=lambda x: x['volume'], reverse=True)
-        top_picks = opportunities[:50]
+        top_picks = picks.head(50).to_dict("records")
         
         # 4. Save Predictions to DB (Mock table for now, or use existing strategies table)
         self._save_predictions(top_picks)
@@ -0,0 +1,499 @@
+"""
+Screener Engine
+Screens are declared as expressions over price and indicator columns:
+
+    rsi < 30
+    crosses_above(macd, macd_signal)
+    close > highest(prev(high), 20)
+    prev(close) > prev(open) and close < open and open >= prev(close) and close <= prev(open)
+
+Expressions are parsed with `ast` against a whitelist (column names, numeric
+constants, comparisons, boolean and arithmetic operators, and the window
+functions below) and compiled once into closures over time x symbol numpy
+matrices, so one evaluation screens the whole universe.
+
+The engine holds a rolling panel of daily bars plus indicator matrices from
+indicator_batch, loaded from stored 1d bars or, when the store has none,
+fetched from the data provider for a default universe. New bars are
+appended as one row, with indicators advanced by an
+IncrementalIndicatorEngine, and every screen is re-evaluated on only the
+trailing rows its lookback needs. Results are cached per screen, so
+readers never compute anything.
+
+Window functions:
+    prev(x, n=1)          value n bars ago
+    highest(x, n)         rolling max over the last n bars
+    lowest(x, n)          rolling min over the last n bars
+    sma(x, n)             rolling mean over the last n bars
+    crosses_above(a, b)   a moved from <= b to > b on this bar
+    crosses_below(a, b)   a moved from >= b to < b on this bar
+    abs(x)
+"""
+
+import ast
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backend.agents.collectors import indicator_batch
+from backend.agents.collectors.indicator_engine import IncrementalIndicatorEngine
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+INDICATOR_COLUMNS = ("rsi", "ema_20", "ema_50", "macd", "macd_signal", "macd_histogram",
+                     "bb_upper", "bb_middle", "bb_lower", "atr", "plus_di", "minus_di", "adx")
+COLUMNS = PRICE_COLUMNS + INDICATOR_COLUMNS
+
+DEFAULT_SCREENS = [
+    {"id": "macd_bullish_cross", "name": "Bullish MACD Crossover", "type": "Bullish", "icon": "📈",
+     "expression": "crosses_above(macd, macd_signal)"},
+    {"id": "rsi_oversold", "name": "RSI Oversold (<30)", "type": "Bullish", "icon": "📉",
+     "expression": "rsi < 30"},
+    {"id": "resistance_breakout", "name": "Resistance Breakout", "type": "Bullish", "icon": "🚀",
+     "expression": "close > highest(prev(high), 20)"},
+    {"id": "bearish_engulfing", "name": "Bearish Engulfing", "type": "Bearish", "icon": "🔻",
+     "expression": "prev(close) > prev(open) and close < open and open >= prev(close) and close <= prev(open)"},
+    {"id": "macd_above_signal", "name": "MACD above signal line", "type": "Bullish", "icon": "📈",
+     "expression": "macd > macd_signal"},
+    {"id": "rsi_overbought", "name": "RSI overbought", "type": "Bearish", "icon": "📈",
+     "expression": "rsi > 70"},
+    {"id": "support_breakdown", "name": "Support breakdowns", "type": "Bearish", "icon": "🔻",
+     "expression": "close < lowest(prev(low), 20)"},
+    {"id": "golden_cross", "name": "Golden cross", "type": "Bullish", "icon": "✨",
+     "expression": "crosses_above(sma(close, 50), sma(close, 200))"}
+]
+
+
+# ===== Window functions (operate down axis 0 of time x symbol matrices) =====
+
+def _shift(x: np.ndarray, n: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if n < x.shape[0]:
+        out[n:] = x[:x.shape[0] - n]
+    return out
+
+
+def _rolling(x: np.ndarray, n: int, reduce) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if n <= x.shape[0]:
+        windows = np.lib.stride_tricks.sliding_window_view(x.astype(float), n, axis=0)
+        out[n - 1:] = reduce(windows, axis=-1)
+    return out
+
+
+def _compare_nan_safe(op, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore"):
+        return op(a, b)
+
+
+_COMPARE = {
+    ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater,
+    ast.GtE: np.greater_equal, ast.Eq: np.equal, ast.NotEq: np.not_equal
+}
+_ARITH = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide}
+
+
+class ScreenCompileError(ValueError):
+    """Raised for expressions outside the screener grammar."""
+
+
+class CompiledScreen:
+    """A parsed screen: kernel(columns) -> boolean matrix, plus the rows it needs."""
+
+    def __init__(self, definition: Dict[str, Any]):
+        self.definition = dict(definition)
+        self.id = definition["id"]
+        self.expression = definition["expression"]
+        try:
+            tree = ast.parse(self.expression, mode="eval").body
+        except SyntaxError as e:
+            raise ScreenCompileError(f"{self.id}: {e}") from e
+        self.kernel, self.lookback = self._compile(tree)
+        # Rows needed to evaluate the newest bar exactly
+        self.window = self.lookback + 1
+
+    def _int_arg(self, node: ast.AST) -> int:
+        if isinstance(node, ast.Constant) and isinstance(node.value, int) and node.value > 0:
+            return node.value
+        raise ScreenCompileError(f"{self.id}: window lengths must be positive integer literals")
+
+    def _compile(self, node: ast.AST):
+        """Returns (kernel, lookback in bars)."""
+        if isinstance(node, ast.Name):
+            if node.id not in COLUMNS:
+                raise ScreenCompileError(f"{self.id}: unknown column '{node.id}'")
+            name = node.id
+            return (lambda cols: cols[name]), 0
+
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            value = float(node.value)
+            return (lambda cols: value), 0
+
+        if isinstance(node, ast.UnaryOp):
+            operand, lookback = self._compile(node.operand)
+            if isinstance(node.op, ast.Not):
+                return (lambda cols: ~operand(cols).astype(bool)), lookback
+            if isinstance(node.op, ast.USub):
+                return (lambda cols: -operand(cols)), lookback
+            raise ScreenCompileError(f"{self.id}: unsupported operator {type(node.op).__name__}")
+
+        if isinstance(node, ast.BoolOp):
+            parts = [self._compile(v) for v in node.values]
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+
+            def boolop(cols, parts=parts, combine=combine):
+                result = parts[0][0](cols)
+                for kernel, _ in parts[1:]:
+                    result = combine(result, kernel(cols))
+                return result
+            return boolop, max(lb for _, lb in parts)
+
+        if isinstance(node, ast.Compare):
+            operands = [self._compile(node.left)] + [self._compile(c) for c in node.comparators]
+            ops = []
+            for op in node.ops:
+                if type(op) not in _COMPARE:
+                    raise ScreenCompileError(f"{self.id}: unsupported comparison {type(op).__name__}")
+                ops.append(_COMPARE[type(op)])
+
+            def compare(cols, operands=operands, ops=ops):
+                values = [kernel(cols) for kernel, _ in operands]
+                result = _compare_nan_safe(ops[0], values[0], values[1])
+                for i, op in enumerate(ops[1:], start=1):
+                    result = result & _compare_nan_safe(op, values[i], values[i + 1])
+                return result
+            return compare, max(lb for _, lb in operands)
+
+        if isinstance(node, ast.BinOp):
+            if type(node.op) not in _ARITH:
+                raise ScreenCompileError(f"{self.id}: unsupported operator {type(node.op).__name__}")
+            left, lb_left = self._compile(node.left)
+            right, lb_right = self._compile(node.right)
+            op = _ARITH[type(node.op)]
+
+            def arith(cols):
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    return op(left(cols), right(cols))
+            return arith, max(lb_left, lb_right)
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            return self._compile_call(node.func.id, node.args)
+
+        raise ScreenCompileError(f"{self.id}: unsupported syntax {type(node).__name__}")
+
+    def _compile_call(self, name: str, args: List[ast.AST]):
+        if name == "prev" and len(args) in (1, 2):
+            x, lb = self._compile(args[0])
+            n = self._int_arg(args[1]) if len(args) == 2 else 1
+            return (lambda cols: _shift(np.asarray(x(cols), dtype=float), n)), lb + n
+        if name in ("highest", "lowest", "sma") and len(args) == 2:
+            x, lb = self._compile(args[0])
+            n = self._int_arg(args[1])
+            reduce = {"highest": np.max, "lowest": np.min, "sma": np.mean}[name]
+            return (lambda cols: _rolling(np.asarray(x(cols), dtype=float), n, reduce)), lb + n - 1
+        if name in ("crosses_above", "crosses_below") and len(args) == 2:
+            (a, lb_a), (b, lb_b) = self._compile(args[0]), self._compile(args[1])
+            above = name == "crosses_above"
+
+            def cross(cols):
+                a_now, b_now = np.asarray(a(cols), dtype=float), np.asarray(b(cols), dtype=float)
+                diff_now = a_now - b_now
+                diff_prev = _shift(diff_now, 1)
+                with np.errstate(invalid="ignore"):
+                    return (diff_now > 0) & (diff_prev <= 0) if above else (diff_now < 0) & (diff_prev >= 0)
+            return cross, max(lb_a, lb_b) + 1
+        if name == "abs" and len(args) == 1:
+            x, lb = self._compile(args[0])
+            return (lambda cols: np.abs(x(cols))), lb
+        raise ScreenCompileError(f"{self.id}: unknown function {name}() with {len(args)} arguments")
+
+    def evaluate(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Boolean time x symbol mask over the given rows."""
+        mask = self.kernel(columns)
+        return np.broadcast_to(np.asarray(mask, dtype=bool), columns["close"].shape)
+
+
+class ScreenerEngine:
+    """
+    Rolling universe panel, compiled screens and cached results.
+    """
+
+    def __init__(self, screens: Optional[Sequence[Dict[str, Any]]] = None, history: int = 260,
+                 max_age: float = 300.0, db=None, data_provider=None,
+                 universe: Optional[Sequence[str]] = None, max_workers: int = 16):
+        self.history = history
+        self.max_age = max_age
+        self.db = db
+        # Provider fallback when market_data holds no daily bars
+        self._data_provider = data_provider
+        self.universe = universe
+        self.max_workers = max_workers
+        self.symbols: List[str] = []
+        self.timestamps: List[Any] = []
+        self._columns: Dict[str, np.ndarray] = {}
+        self.engine = IncrementalIndicatorEngine()
+
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self.loaded_at = 0.0
+        # Time of the last load attempt, successful or not; stale reads retry at most once per max_age
+        self.attempted_at = 0.0
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._schedule_lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self.stats = {"full_loads": 0, "incremental_updates": 0, "evaluations": 0, "last_eval_ms": 0.0}
+
+        self.screens: Dict[str, CompiledScreen] = {}
+        for definition in (screens if screens is not None else DEFAULT_SCREENS):
+            self.add_screen(definition)
+
+    # ===== Screens =====
+
+    def add_screen(self, definition: Dict[str, Any]) -> CompiledScreen:
+        """Compile and register a screen (raises ScreenCompileError on bad expressions)."""
+        screen = CompiledScreen(definition)
+        with self._lock:
+            self.screens[screen.id] = screen
+            # Keep enough rows for the longest lookback (e.g. a 200-bar SMA cross)
+            self.history = max(self.history, screen.window)
+            self._evaluate([screen])
+        return screen
+
+    # ===== Panel =====
+
+    def load_panel(self, panel: Dict[str, pd.DataFrame]):
+        """
+        Replace the universe with a field -> (time x symbol) DataFrame panel
+        (Open/High/Low/Close/Volume, as built by scanner.build_panel).
+        """
+        with self._lock:
+            close = panel["Close"].tail(self.history)
+            self.symbols = list(close.columns)
+            self.timestamps = list(close.index)
+            matrices = {name.lower(): panel[name].reindex(index=close.index, columns=close.columns)
+                        .to_numpy(dtype=float) for name in ("Open", "High", "Low", "Close", "Volume")}
+
+            indicators = indicator_batch.compute_indicators(matrices["high"], matrices["low"], matrices["close"])
+            self._columns = {**matrices, **{name: indicators[name] for name in INDICATOR_COLUMNS}}
+
+            # Seed the streaming engine so on_bars continues the same series
+            self.engine = IncrementalIndicatorEngine(capacity=max(len(self.symbols), 1))
+            valid = np.isfinite(matrices["high"]) & np.isfinite(matrices["low"]) & np.isfinite(matrices["close"])
+            for col, symbol in enumerate(self.symbols):
+                rows = valid[:, col]
+                self.engine.initialize(symbol, matrices["high"][rows, col], matrices["low"][rows, col],
+                                       matrices["close"][rows, col])
+
+            self.loaded_at = self.attempted_at = time.time()
+            self.stats["full_loads"] += 1
+            self._evaluate(self.screens.values())
+
+    def load_from_store(self, db=None, symbols: Optional[List[str]] = None, timeframe: str = '1d') -> bool:
+        """Load the last `history` daily bars of every stored symbol from market_data."""
+        db = db or self.db
+        if db is None:
+            from backend.database.db import db
+        rows = db.get_market_data_panel(symbols, limit=self.history, timeframe=timeframe)
+        if not rows:
+            logger.warning("Screener: no stored bars to screen")
+            return False
+        df = pd.DataFrame(rows)
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        wide = df.pivot_table(index="timestamp", columns="symbol",
+                              values=["open", "high", "low", "close", "volume"], aggfunc="last")
+        self.load_panel({name.capitalize(): wide[name] for name in ("open", "high", "low", "close", "volume")})
+        return True
+
+    @property
+    def data_provider(self):
+        if self._data_provider is None:
+            from backend.data_providers.manager import DataProviderManager
+            self._data_provider = DataProviderManager()
+        return self._data_provider
+
+    def _fetch_daily(self, symbol: str) -> Optional[pd.DataFrame]:
+        try:
+            return self.data_provider.get_historical_data(symbol, period="2y", interval="1d")
+        except Exception as e:
+            logger.error(f"Screener: fetching {symbol} failed: {e}")
+            return None
+
+    def load_from_provider(self, symbols: Optional[Sequence[str]] = None) -> bool:
+        """
+        Load daily bars for `symbols` (default: the engine's universe, else
+        NIFTY 50) from the data provider, fetched concurrently. Symbols are
+        keyed by bare name ("RELIANCE.NS" -> "RELIANCE") like stored bars.
+        """
+        from backend.intelligence.scanner import build_panel
+        if symbols is None:
+            if self.universe is None:
+                from backend.data.tickers import NIFTY_50_TICKERS
+                self.universe = NIFTY_50_TICKERS
+            symbols = self.universe
+        symbols = list(symbols)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(symbols)))) as pool:
+            frames = {symbol.rsplit(".", 1)[0]: df for symbol, df in zip(symbols, pool.map(self._fetch_daily, symbols))}
+        panel = build_panel(frames)
+        if panel["Close"].empty:
+            logger.warning("Screener: data provider returned no daily bars")
+            return False
+        self.load_panel(panel)
+        return True
+
+    def refresh(self) -> bool:
+        """Reload the panel from stored 1d bars, falling back to the data provider."""
+        with self._refresh_lock:
+            self.attempted_at = time.time()
+            return self.load_from_store() or self.load_from_provider()
+
+    def _needs_refresh(self) -> bool:
+        # Streamed bars keep the panel current; otherwise reload once max_age has passed
+        if self._columns and self.stats["incremental_updates"]:
+            return False
+        return time.time() - self.attempted_at > self.max_age
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Screener: loading panel failed: {e}")
+
+    def schedule_refresh(self) -> Optional[threading.Thread]:
+        """
+        Start refresh() on a background thread if the panel is stale and no
+        refresh is running. Returns the thread, or None if nothing was started.
+        """
+        with self._schedule_lock:
+            if not self._needs_refresh() or (self._refresh_thread is not None and self._refresh_thread.is_alive()):
+                return None
+            self.attempted_at = time.time()
+            self._refresh_thread = threading.Thread(target=self._background_refresh,
+                                                    name="screener-refresh", daemon=True)
+            self._refresh_thread.start()
+            return self._refresh_thread
+
+    def _add_symbols(self, new: List[str]):
+        n = len(self.timestamps)
+        for name, values in self._columns.items():
+            self._columns[name] = np.hstack([values, np.full((n, len(new)), np.nan)])
+        self.symbols.extend(new)
+
+    def on_bars(self, bars: Sequence[Dict[str, Any]], timeframe: Optional[str] = "1d"):
+        """
+        BarAggregator listener: append closed bars as new panel rows and
+        re-evaluate the screens. Bars passed together share one row; a symbol
+        with several bars in the batch gets consecutive rows.
+        """
+        queues: Dict[str, List[Dict[str, Any]]] = {}
+        for bar in bars:
+            if timeframe is None or bar.get("timeframe") == timeframe:
+                queues.setdefault(bar["symbol"], []).append(bar)
+        if not queues:
+            return
+        with self._lock:
+            while queues:
+                step = {symbol: queue.pop(0) for symbol, queue in queues.items()}
+                self._append_row(step)
+                queues = {symbol: queue for symbol, queue in queues.items() if queue}
+            self.stats["incremental_updates"] += 1
+            self._evaluate(self.screens.values())
+
+    def attach(self, aggregator) -> "ScreenerEngine":
+        """Subscribe to a BarAggregator's closed bars."""
+        aggregator.add_bar_listener(self.on_bars)
+        return self
+
+    def _append_row(self, step: Dict[str, Dict[str, Any]]):
+        if not self._columns:
+            self._columns = {name: np.empty((0, 0)) for name in COLUMNS}
+        index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        new = [symbol for symbol in step if symbol not in index]
+        if new:
+            self._add_symbols(new)
+            index.update({symbol: len(self.symbols) - len(new) + i for i, symbol in enumerate(new)})
+
+        symbols = list(step)
+        cols = np.fromiter((index[s] for s in symbols), dtype=np.int64, count=len(symbols))
+        row = {name: np.full(len(self.symbols), np.nan) for name in COLUMNS}
+        for name in PRICE_COLUMNS:
+            row[name][cols] = [float(step[s].get(name, np.nan)) for s in symbols]
+
+        self.engine.update_many(symbols, row["high"][cols], row["low"][cols], row["close"][cols])
+        values = self.engine.values(symbols)
+        for name in INDICATOR_COLUMNS:
+            row[name][cols] = values[name]
+
+        for name in COLUMNS:
+            self._columns[name] = np.vstack([self._columns[name], row[name][None, :]])[-self.history:]
+        self.timestamps = (self.timestamps + [next(iter(step.values())).get("timestamp")])[-self.history:]
+
+    # ===== Evaluation =====
+
+    def _evaluate(self, screens):
+        if not self._columns or not self.timestamps:
+            return
+        started = time.perf_counter()
+        symbols = np.asarray(self.symbols, dtype=object)
+        for screen in screens:
+            tail = {name: values[-screen.window:] for name, values in self._columns.items()}
+            members = symbols[screen.evaluate(tail)[-1]].tolist()
+            self._results[screen.id] = {
+                "id": screen.id,
+                "name": screen.definition.get("name", screen.id),
+                "type": screen.definition.get("type"),
+                "icon": screen.definition.get("icon"),
+                "expression": screen.expression,
+                "count": len(members),
+                "symbols": sorted(members),
+                "as_of": str(self.timestamps[-1])
+            }
+            self.stats["evaluations"] += 1
+        self.stats["last_eval_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+    def mask(self, screen_id: str) -> pd.DataFrame:
+        """Full-history boolean mask of one screen (time x symbol), e.g. for backtests."""
+        with self._lock:
+            result = self.screens[screen_id].evaluate(self._columns)
+            return pd.DataFrame(result, index=self.timestamps, columns=self.symbols)
+
+    # ===== Reads =====
+
+    def get_results(self, screen_ids: Optional[Sequence[str]] = None, include_symbols: bool = True,
+                    refresh: bool = True) -> List[Dict[str, Any]]:
+        """
+        Cached screen results in declaration order. With refresh=True a stale
+        panel is reloaded in the background (see schedule_refresh()); the call
+        never waits for it and serves the cached, possibly empty, results.
+        """
+        if refresh:
+            self.schedule_refresh()
+
+        ids = screen_ids if screen_ids is not None else list(self.screens)
+        results = []
+        for screen_id in ids:
+            screen = self.screens.get(screen_id)
+            if screen is None:
+                continue
+            result = self._results.get(screen_id) or {
+                "id": screen_id, "name": screen.definition.get("name", screen_id),
+                "type": screen.definition.get("type"), "icon": screen.definition.get("icon"),
+                "expression": screen.expression, "count": 0, "symbols": [], "as_of": None
+            }
+            if not include_symbols:
+                result = {k: v for k, v in result.items() if k != "symbols"}
+            results.append(result)
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "symbols": len(self.symbols), "rows": len(self.timestamps),
+                "screens": len(self.screens)}
+
+
+# Global instance
+screener = ScreenerEngine()
@@ -0,0 +1,269 @@
+"""
+Streaming Backtest
+Bar-by-bar version of BacktestEngine for paper trading and live dashboards.
+Indicator, position and metric state is carried between bars so on_bar()
+costs O(1) instead of re-running the whole history.
+
+Signals, fills and metrics follow BacktestEngine exactly (rolling-mean RSI,
+integer share fills at the close, ddof=1 Sharpe/Sortino), so after N bars
+results() matches run_backtest_on_data on the same N bars.
+"""
+
+import logging
+import math
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from backend.intelligence.backtester import STRATEGY_DEFAULTS
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+
+
+class RollingMean:
+    """Fixed-window mean with a Kahan-compensated running sum."""
+
+    def __init__(self, window: int):
+        self.window = int(window)
+        self.values = deque()
+        self._sum = 0.0
+        self._comp = 0.0
+
+    def _add(self, x: float):
+        y = x - self._comp
+        t = self._sum + y
+        self._comp = (t - self._sum) - y
+        self._sum = t
+
+    def update(self, x: float) -> Optional[float]:
+        self.values.append(x)
+        self._add(x)
+        if len(self.values) > self.window:
+            self._add(-self.values.popleft())
+        return self.value
+
+    @property
+    def value(self) -> Optional[float]:
+        if len(self.values) < self.window:
+            return None
+        return self._sum / self.window
+
+
+class RunningStats:
+    """Welford mean / sample variance."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, x: float):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (x - self.mean)
+
+    @property
+    def std(self) -> float:
+        if self.n < 2:
+            return float("nan")
+        return math.sqrt(self._m2 / (self.n - 1))
+
+
+class StreamingRSI:
+    """
+    RSI from rolling means of gains and losses, as BacktestEngine computes
+    it. The first bar contributes a zero change, matching the batch
+    engine's fill of the leading NaN diff.
+    """
+
+    def __init__(self, period: int):
+        self.gain = RollingMean(period)
+        self.loss = RollingMean(period)
+        self.prev_close = None
+
+    def update(self, close: float) -> Optional[float]:
+        change = 0.0 if self.prev_close is None else close - self.prev_close
+        self.prev_close = close
+        avg_gain = self.gain.update(max(change, 0.0))
+        avg_loss = self.loss.update(max(-change, 0.0))
+        if avg_gain is None:
+            return None
+        if avg_loss == 0:
+            # gain/0 -> inf -> RSI 100; 0/0 -> NaN, which never triggers a signal
+            return 100.0 if avg_gain > 0 else None
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+class StreamingBacktest:
+    """
+    Incremental backtest for SMA_CROSSOVER, RSI_STRATEGY and EVOLUTION_DNA.
+    """
+
+    def __init__(self, strategy: str = "SMA_CROSSOVER", strategy_params: Optional[Dict[str, Any]] = None,
+                 initial_capital: float = 100000, symbol: Optional[str] = None):
+        if strategy not in STRATEGY_DEFAULTS:
+            raise ValueError(f"Streaming backtest does not support strategy {strategy}")
+        self.strategy = strategy
+        self.params = {**STRATEGY_DEFAULTS[strategy], **(strategy_params or {})}
+        self.initial_capital = initial_capital
+        self.symbol = symbol
+
+        # Indicator state
+        self.ma_fast = RollingMean(self.params["ma_fast"]) if "ma_fast" in self.params else None
+        self.ma_slow = RollingMean(self.params["ma_slow"]) if "ma_slow" in self.params else None
+        self.rsi = StreamingRSI(self.params["rsi_period"]) if "rsi_period" in self.params else None
+
+        # Position state
+        self.cash = initial_capital
+        self.position = 0
+        self.trades: List[Dict[str, Any]] = []
+        self.winning_trades = 0
+
+        # Metric state
+        self.bars = 0
+        self.equity = initial_capital
+        self.peak = None
+        self.max_drawdown = 0.0
+        self.returns = RunningStats()
+        self.downside = RunningStats()
+
+    # ===== Feed =====
+
+    def on_bar(self, bar: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Consume one bar ({'close': ..., 'timestamp': ...}; 'Close'/'date'
+        are accepted too) and return the signal, any fill and the equity.
+        """
+        close = float(bar.get("close", bar.get("Close")))
+        timestamp = bar.get("timestamp", bar.get("date", datetime.now()))
+
+        signal = self._signal(close)
+        fill = self._execute(signal, close, timestamp)
+        self._update_metrics(self.cash + self.position * close)
+
+        return {
+            "timestamp": str(timestamp),
+            "close": close,
+            "signal": signal,
+            "fill": fill,
+            "position": self.position,
+            "equity": self.equity
+        }
+
+    def warm_up(self, df) -> "StreamingBacktest":
+        """Replay an OHLCV DataFrame (e.g. history before going live)."""
+        for timestamp, close in zip(df.index, df["Close"].values):
+            self.on_bar({"close": close, "timestamp": timestamp})
+        return self
+
+    def attach(self, collector, symbol: Optional[str] = None) -> "StreamingBacktest":
+        """Subscribe to an NSEDataCollector's bar feed for one symbol."""
+        symbol = symbol or self.symbol
+        if symbol is None:
+            raise ValueError("A symbol is required to attach to a collector")
+        self.symbol = symbol
+
+        def _listener(bar_symbol: str, bar: Dict[str, Any]):
+            if bar_symbol == symbol:
+                self.on_bar(bar)
+
+        collector.add_bar_listener(_listener)
+        return self
+
+    # ===== Strategy =====
+
+    def _signal(self, close: float) -> int:
+        fast = self.ma_fast.update(close) if self.ma_fast else None
+        slow = self.ma_slow.update(close) if self.ma_slow else None
+        rsi = self.rsi.update(close) if self.rsi else None
+
+        if self.strategy == "SMA_CROSSOVER":
+            if fast is None or slow is None:
+                return 0
+            if fast > slow:
+                return 1
+            if fast < slow:
+                return -1
+            return 0
+
+        if self.strategy == "RSI_STRATEGY":
+            if rsi is None:
+                return 0
+            if rsi > self.params["rsi_overbought"]:
+                return -1
+            if rsi < self.params["rsi_oversold"]:
+                return 1
+            return 0
+
+        # EVOLUTION_DNA: the sell condition wins, as it is applied last in batch
+        above_trend = slow is not None and close > slow
+        below_trend = slow is not None and close < slow
+        if (rsi is not None and rsi > self.params["rsi_overbought"]) or below_trend:
+            return -1
+        if rsi is not None and rsi < self.params["rsi_oversold"] and above_trend:
+            return 1
+        return 0
+
+    def _execute(self, signal: int, price: float, timestamp) -> Optional[Dict[str, Any]]:
+        if signal == 1 and self.position == 0:
+            self.position = self.cash // price
+            cost = self.position * price
+            self.cash -= cost
+            trade = {"type": "BUY", "date": str(timestamp), "price": price,
+                     "quantity": self.position, "value": cost}
+        elif signal == -1 and self.position > 0:
+            revenue = self.position * price
+            self.cash += revenue
+            pnl = revenue - self.trades[-1]["value"]
+            trade = {"type": "SELL", "date": str(timestamp), "price": price,
+                     "quantity": self.position, "value": revenue, "pnl": pnl}
+            if pnl > 0:
+                self.winning_trades += 1
+            self.position = 0
+        else:
+            return None
+
+        self.trades.append(trade)
+        return trade
+
+    def _update_metrics(self, equity: float):
+        if self.bars > 0 and self.equity != 0:
+            r = (equity - self.equity) / self.equity
+            self.returns.update(r)
+            if r < 0:
+                self.downside.update(r)
+        self.bars += 1
+        self.equity = equity
+
+        self.peak = equity if self.peak is None else max(self.peak, equity)
+        self.max_drawdown = min(self.max_drawdown, (equity - self.peak) / self.peak)
+
+    # ===== Results =====
+
+    def results(self) -> Dict[str, Any]:
+        """Current metrics in the same shape as BacktestEngine results."""
+        if self.bars == 0:
+            return {"error": "No bars processed yet"}
+
+        std = self.returns.std
+        sharpe = self.returns.mean / std * math.sqrt(TRADING_DAYS) if std > 0 else 0.0
+        down_std = self.downside.std
+        sortino = self.returns.mean / down_std * math.sqrt(TRADING_DAYS) if self.downside.n > 0 and down_std > 0 else 0.0
+        win_rate = self.winning_trades / len(self.trades) * 100 if self.trades else 0.0
+
+        return {
+            "initial_capital": self.initial_capital,
+            "final_equity": round(self.equity, 2),
+            "total_return_pct": round((self.equity - self.initial_capital) / self.initial_capital * 100, 2),
+            "max_drawdown_pct": round(self.max_drawdown * 100, 2),
+            "sharpe_ratio": round(sharpe, 2),
+            "sortino_ratio": round(sortino, 2),
+            "win_rate": round(win_rate, 2),
+            "total_trades": len(self.trades),
+            "trades": self.trades[-50:],
+            "bars": self.bars,
+            "position": self.position
+        }
@@ -0,0 +1,404 @@
+"""
+Walk-Forward Optimizer
+Splits price history into rolling train/test folds, optimizes strategy
+parameters on each train fold in its own worker process and scores the
+winner on the unseen test fold that follows it.
+"""
+
+import itertools
+import logging
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.evolution.fitness import FitnessCalculator
+from backend.evolution.organism import TradingOrganism
+from backend.intelligence.backtester import BacktestEngine
+from backend.intelligence.robustness import MonteCarloRobustness
+
+logger = logging.getLogger(__name__)
+
+# Keys that only exist on include_curve results; kept out of fold summaries
+CURVE_KEYS = ("trades", "equity_curve", "dates", "exposure", "trade_pnls")
+
+# Grid searched per strategy when no explicit grid is supplied
+DEFAULT_PARAM_GRIDS = {
+    "SMA_CROSSOVER": {
+        "ma_fast": [10, 20, 50],
+        "ma_slow": [100, 150, 200]
+    },
+    "RSI_STRATEGY": {
+        "rsi_period": [7, 14, 21],
+        "rsi_oversold": [20, 30],
+        "rsi_overbought": [70, 80]
+    },
+    "EVOLUTION_DNA": {
+        "rsi_period": [7, 14, 21],
+        "rsi_oversold": [25, 30],
+        "rsi_overbought": [70, 75],
+        "ma_fast": [10, 20],
+        "ma_slow": [50, 100]
+    }
+}
+
+
+@dataclass
+class WalkForwardFold:
+    """Bar offsets of one train/test split (end offsets are exclusive)."""
+    index: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+def make_folds(n_bars: int, train_bars: int, test_bars: int,
+               step_bars: Optional[int] = None, anchored: bool = False) -> List[WalkForwardFold]:
+    """
+    Build rolling (or anchored/expanding) train/test folds over n_bars.
+
+    Each test window starts right after its train window, so test windows
+    never overlap when step_bars == test_bars (the default).
+    """
+    if train_bars <= 0 or test_bars <= 0:
+        raise ValueError("train_bars and test_bars must be positive")
+
+    step = step_bars or test_bars
+    folds = []
+    start = 0
+    while start + train_bars + test_bars <= n_bars:
+        train_start = 0 if anchored else start
+        train_end = start + train_bars
+        folds.append(WalkForwardFold(
+            index=len(folds),
+            train_start=train_start,
+            train_end=train_end,
+            test_start=train_end,
+            test_end=train_end + test_bars
+        ))
+        start += step
+    return folds
+
+
+def expand_grid(param_grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Expand a {param: [values]} grid into a list of parameter dicts."""
+    keys = list(param_grid.keys())
+    candidates = []
+    for values in itertools.product(*(param_grid[k] for k in keys)):
+        params = dict(zip(keys, values))
+        # Fast MA must stay below slow MA, like TradingOrganism enforces
+        if "ma_fast" in params and "ma_slow" in params and params["ma_fast"] >= params["ma_slow"]:
+            continue
+        candidates.append(params)
+    return candidates
+
+
+def _rank_key(fitness: float, results: Dict[str, Any]):
+    # FitnessCalculator returns 0.0 for short folds with few trades, so
+    # break ties on risk-adjusted and then absolute return.
+    return (fitness, results.get("sharpe_ratio", 0.0), results.get("total_return_pct", 0.0))
+
+
+def _score(engine: BacktestEngine, calculator: FitnessCalculator, data: pd.DataFrame,
+           strategy: str, params: Dict[str, Any], initial_capital: float,
+           robustness: Optional[MonteCarloRobustness] = None):
+    if robustness is None:
+        results = engine.run_backtest_on_data(data, strategy, initial_capital, params)
+        return calculator.calculate_backtest_fitness(results), results
+
+    results = engine.run_backtest_on_data(data, strategy, initial_capital, params, include_curve=True)
+    return robustness.robust_fitness(results, calculator=calculator), results
+
+
+def _grid_search(engine, calculator, train_df, task):
+    best = None
+    for params in task["candidates"]:
+        fitness, results = _score(engine, calculator, train_df, task["strategy"], params,
+                                  task["initial_capital"], task["robustness"])
+        key = _rank_key(fitness, results)
+        if best is None or key > best[0]:
+            best = (key, params, fitness, results)
+    return best[1], best[2], best[3], len(task["candidates"])
+
+
+def _evolve(engine, calculator, train_df, task):
+    """
+    Small in-process genetic search mirroring Population.evolve:
+    top 50% survive, top 10% are kept unchanged, the rest are children.
+    """
+    rng_state = random.getstate()
+    random.seed(task["seed"])
+    try:
+        size = max(4, task["population_size"])
+        organisms = [
+            TradingOrganism.create_random(generation=0, organism_id=f"wf{task['fold'].index}-{i}")
+            for i in range(size)
+        ]
+        scored = {}
+        evaluations = 0
+
+        def evaluate(org):
+            nonlocal evaluations
+            key = tuple(sorted(org.dna.items()))
+            if key not in scored:
+                scored[key] = _score(engine, calculator, train_df, task["strategy"], org.dna,
+                                     task["initial_capital"], task["robustness"])
+                evaluations += 1
+            fitness, results = scored[key]
+            org.fitness = fitness
+            return _rank_key(fitness, results)
+
+        for generation in range(task["generations"]):
+            organisms.sort(key=evaluate, reverse=True)
+            survivors = organisms[:size // 2]
+            new_population = organisms[:max(1, int(size * 0.10))]
+            while len(new_population) < size:
+                parent1, parent2 = random.sample(survivors, 2)
+                child = parent1.crossover(parent2, f"wf{task['fold'].index}-g{generation}-{len(new_population)}")
+                child.mutate(mutation_rate=0.1)
+                new_population.append(child)
+            organisms = new_population
+
+        best = max(organisms, key=evaluate)
+        fitness, results = scored[tuple(sorted(best.dna.items()))]
+        return dict(best.dna), fitness, results, evaluations
+    finally:
+        random.setstate(rng_state)
+
+
+def _optimize_fold(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Worker entry point: optimize on the train slice, then score the winning
+    parameters on the test slice. Runs in a separate process, so it only
+    receives plain data and builds its own engine.
+    """
+    fold = task["fold"]
+    history = task["history"]
+    train_len = fold.train_end - fold.train_start
+    train_df = history.iloc[:train_len]
+
+    engine = BacktestEngine()
+    calculator = FitnessCalculator()
+    robustness = None
+    if task["objective"] == "robust":
+        robustness = MonteCarloRobustness(n_resamples=task["robust_resamples"], seed=task["seed"])
+    task = dict(task, robustness=robustness)
+
+    if task["method"] == "evolution":
+        best_params, is_fitness, is_results, evaluations = _evolve(engine, calculator, train_df, task)
+    else:
+        best_params, is_fitness, is_results, evaluations = _grid_search(engine, calculator, train_df, task)
+
+    # Indicators are computed over train+test so the test window starts with
+    # warmed-up values; only the test rows are traded. Every indicator looks
+    # backwards, so this does not leak future data into the test window.
+    signals = engine._apply_strategy(history, task["strategy"], best_params)
+    oos_results = engine._simulate_trades(signals.iloc[train_len:], task["initial_capital"], include_curve=True)
+
+    return {
+        "fold": asdict(fold),
+        "train_period": [str(history.index[0]), str(history.index[train_len - 1])],
+        "test_period": [str(history.index[train_len]), str(history.index[-1])],
+        "best_params": best_params,
+        "evaluations": evaluations,
+        "in_sample_fitness": is_fitness,
+        "in_sample": {k: v for k, v in is_results.items() if k not in CURVE_KEYS},
+        "out_of_sample_fitness": calculator.calculate_backtest_fitness(oos_results),
+        "out_of_sample": {k: v for k, v in oos_results.items() if k not in CURVE_KEYS},
+        "oos_equity_curve": oos_results["equity_curve"],
+        "oos_dates": oos_results["dates"]
+    }
+
+
+class WalkForwardOptimizer:
+    """
+    Runs walk-forward optimization: grid search or evolution on each train
+    fold, out-of-sample scoring on the following test fold, then a stitched
+    OOS equity curve and a parameter-stability report.
+
+    objective="robust" ranks train-fold candidates by Monte Carlo robust
+    fitness (pessimistic bootstrap bounds) instead of the single-path score.
+    """
+
+    def __init__(self, strategy: str = "EVOLUTION_DNA", method: str = "grid",
+                 train_bars: int = 252, test_bars: int = 63, step_bars: Optional[int] = None,
+                 anchored: bool = False, param_grid: Optional[Dict[str, List[Any]]] = None,
+                 population_size: int = 30, generations: int = 5,
+                 initial_capital: float = 100000, max_workers: Optional[int] = None,
+                 seed: int = 42, engine: Optional[BacktestEngine] = None,
+                 objective: str = "fitness", robust_resamples: int = 1000):
+        if method not in ("grid", "evolution"):
+            raise ValueError(f"Unknown optimization method: {method}")
+        if objective not in ("fitness", "robust"):
+            raise ValueError(f"Unknown objective: {objective}")
+
+        self.strategy = strategy
+        self.method = method
+        self.train_bars = train_bars
+        self.test_bars = test_bars
+        self.step_bars = step_bars
+        self.anchored = anchored
+        self.param_grid = param_grid or DEFAULT_PARAM_GRIDS.get(strategy, {})
+        self.population_size = population_size
+        self.generations = generations
+        self.initial_capital = initial_capital
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.seed = seed
+        self.engine = engine or BacktestEngine()
+        self.objective = objective
+        self.robust_resamples = robust_resamples
+
+    def run(self, symbol: str, period: str = "5y") -> Dict[str, Any]:
+        """Fetch daily history for symbol and run the walk-forward analysis."""
+        df = self.engine.data_provider.get_historical_data(symbol, period=period, interval="1d")
+        if df is None or df.empty:
+            return {"error": "No historical data found"}
+        result = self.run_on_data(df)
+        result["symbol"] = symbol
+        return result
+
+    def run_on_data(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Run the walk-forward analysis on an OHLCV DataFrame."""
+        if df is None or df.empty or "Close" not in df.columns:
+            return {"error": "Data missing 'Close' column"}
+
+        folds = make_folds(len(df), self.train_bars, self.test_bars, self.step_bars, self.anchored)
+        if not folds:
+            return {"error": f"Need at least {self.train_bars + self.test_bars} bars, got {len(df)}"}
+
+        candidates = expand_grid(self.param_grid) if self.method == "grid" else []
+        if self.method == "grid" and not candidates:
+            return {"error": f"Empty parameter grid for strategy {self.strategy}"}
+
+        tasks = [{
+            "fold": fold,
+            "history": df.iloc[fold.train_start:fold.test_end],
+            "strategy": self.strategy,
+            "method": self.method,
+            "candidates": candidates,
+            "population_size": self.population_size,
+            "generations": self.generations,
+            "initial_capital": self.initial_capital,
+            "seed": self.seed + fold.index,
+            "objective": self.objective,
+            "robust_resamples": self.robust_resamples
+        } for fold in folds]
+
+        workers = min(self.max_workers, len(tasks))
+        logger.info(f"Walk-forward: {len(folds)} folds ({self.method}) on {workers} worker(s)")
+
+        if workers <= 1:
+            fold_results = [_optimize_fold(task) for task in tasks]
+        else:
+            # Folds share nothing, so each one is an independent process task
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                fold_results = list(executor.map(_optimize_fold, tasks))
+
+        curve = self._stitch_equity(fold_results)
+        return {
+            "strategy": self.strategy,
+            "method": self.method,
+            "objective": self.objective,
+            "total_folds": len(fold_results),
+            "folds": [{k: v for k, v in r.items() if k not in ("oos_equity_curve", "oos_dates")} for r in fold_results],
+            "oos_equity_curve": curve,
+            "oos_metrics": self._curve_metrics([point["equity"] for point in curve]),
+            "parameter_stability": self.parameter_stability(fold_results)
+        }
+
+    def _stitch_equity(self, fold_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Chain the per-fold OOS curves: each fold is re-based onto the equity
+        the previous fold finished with.
+        """
+        stitched = []
+        equity = float(self.initial_capital)
+        for result in fold_results:
+            curve = np.asarray(result["oos_equity_curve"], dtype=float)
+            if curve.size == 0:
+                continue
+            scaled = curve * (equity / self.initial_capital)
+            stitched.extend(
+                {"date": date, "equity": round(float(value), 2)}
+                for date, value in zip(result["oos_dates"], scaled)
+            )
+            equity = float(scaled[-1])
+        return stitched
+
+    def _curve_metrics(self, equity: List[float]) -> Dict[str, float]:
+        if len(equity) < 2:
+            return {"total_return_pct": 0.0, "max_drawdown_pct": 0.0, "sharpe_ratio": 0.0}
+
+        curve = np.asarray(equity, dtype=float)
+        returns = np.diff(curve) / curve[:-1]
+        peak = np.maximum.accumulate(curve)
+        std = returns.std(ddof=1)
+        return {
+            "total_return_pct": round((curve[-1] / self.initial_capital - 1) * 100, 2),
+            "max_drawdown_pct": round(float(((curve - peak) / peak).min()) * 100, 2),
+            "sharpe_ratio": round(float(returns.mean() / std * np.sqrt(252)), 2) if std > 0 else 0.0
+        }
+
+    @staticmethod
+    def parameter_stability(fold_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Summarize how much the winning parameters move between folds.
+        Numeric params report mean/std/coefficient of variation; categorical
+        params report the most common value and its share.
+        """
+        params = {}
+        keys = sorted({k for r in fold_results for k in r["best_params"]})
+        for key in keys:
+            values = [r["best_params"][key] for r in fold_results if key in r["best_params"]]
+            if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                arr = np.asarray(values, dtype=float)
+                mean = float(arr.mean())
+                std = float(arr.std())
+                cv = std / abs(mean) if mean else 0.0
+                params[key] = {
+                    "mean": round(mean, 4),
+                    "std": round(std, 4),
+                    "min": float(arr.min()),
+                    "max": float(arr.max()),
+                    "cv": round(cv, 4),
+                    "stable": cv <= 0.25
+                }
+            else:
+                mode, count = Counter(map(str, values)).most_common(1)[0]
+                params[key] = {
+                    "mode": mode,
+                    "mode_share": round(count / len(values), 4),
+                    "stable": count / len(values) >= 0.5
+                }
+
+        is_fitness = [r["in_sample_fitness"] for r in fold_results]
+        oos_fitness = [r["out_of_sample_fitness"] for r in fold_results]
+        is_mean = float(np.mean(is_fitness)) if is_fitness else 0.0
+        oos_mean = float(np.mean(oos_fitness)) if oos_fitness else 0.0
+
+        return {
+            "params": params,
+            "in_sample_fitness_mean": round(is_mean, 4),
+            "out_of_sample_fitness_mean": round(oos_mean, 4),
+            # OOS / IS fitness; values well below 1.0 indicate overfitting
+            "walk_forward_efficiency": round(oos_mean / is_mean, 4) if is_mean > 0 else None,
+            "profitable_oos_folds": sum(1 for r in fold_results if r["out_of_sample"].get("total_return_pct", 0) > 0)
+        }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    optimizer = WalkForwardOptimizer(strategy="SMA_CROSSOVER")
+    report = optimizer.run("^NSEI", period="5y")
+    if "error" in report:
+        print(f"Walk-forward failed: {report['error']}")
+    else:
+        print(f"Folds: {report['total_folds']}")
+        print(f"OOS metrics: {report['oos_metrics']}")
+        print(f"Stability: {report['parameter_stability']}")
@@ -62,3 +62,19 @@ class FeatureEngineer:
         df['BB_Lower'] = sma20 - (std20 * 2)
         
         return df
+
+    def add_pattern_features(self, df):
+        """
+        Adds per-bar candlestick/chart pattern columns (needs Open, High, Low, Close).
+        Not part of the default feature set, so existing models keep their inputs.
+        """
+        from backend.ai.pattern_detector import PatternDetector
+        
+        patterns = PatternDetector().scan_frame(df)
+        for name in ['doji', 'hammer', 'bullish_engulfing', 'bearish_engulfing', 'double_top', 'double_bottom',
+                     'near_support', 'near_resistance']:
+            df[f'Pattern_{name}'] = patterns[name].astype(int)
+        df['Pattern_Score'] = patterns['pattern_score']
+        df['Dist_Support'] = patterns['distance_to_support']
+        df['Dist_Resistance'] = patterns['distance_to_resistance']
+        return df
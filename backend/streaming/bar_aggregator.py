@@ -0,0 +1,297 @@
+"""
+Tick-to-Bar Aggregator
+Builds OHLCV + VWAP bars for many symbols and timeframes at once from the
+tick stream. Per-symbol state lives in numpy array slots indexed by a
+symbol id (one row per timeframe), so a tick costs a handful of scalar
+updates. Closing every due bar on a clock tick is one vectorized mask.
+
+Bars are aligned to the NSE session (09:15-15:30 IST, weekends and listed
+holidays closed), so 15m bars start 09:15, 09:30, ... and the last hourly
+bar of the day is 15:15-15:30. Completed bars are emitted in batches to
+listeners such as MarketDataBarWriter.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from backend.streaming.smartapi_protocol import Tick
+
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+_IST_OFFSET = 19800
+_DAY = 86400
+
+TIMEFRAME_SECONDS = {"1m": 60, "3m": 180, "5m": 300, "10m": 600, "15m": 900, "30m": 1800, "1h": 3600}
+
+
+class NSESessionClock:
+    """
+    Exchange clock for bar boundaries. Works in epoch seconds with a fixed
+    IST offset (India has no DST).
+    """
+
+    def __init__(self, open_time: str = "09:15", close_time: str = "15:30",
+                 holidays: Optional[Iterable[date]] = None):
+        self.open_seconds = self._seconds(open_time)
+        self.close_seconds = self._seconds(close_time)
+        self.session_seconds = self.close_seconds - self.open_seconds
+        self.holidays = {(d - date(1970, 1, 1)).days for d in (holidays or [])}
+
+    @staticmethod
+    def _seconds(hhmm: str) -> int:
+        hours, minutes = hhmm.split(":")
+        return int(hours) * 3600 + int(minutes) * 60
+
+    def timeframe_seconds(self, timeframe: str) -> int:
+        if timeframe == "1d":
+            return self.session_seconds
+        if timeframe not in TIMEFRAME_SECONDS:
+            raise ValueError(f"Unsupported timeframe: {timeframe}")
+        return TIMEFRAME_SECONDS[timeframe]
+
+    def is_trading_day(self, day_number: int) -> bool:
+        # Epoch day 0 was a Thursday; Monday == 0
+        return (day_number + 3) % 7 < 5 and day_number not in self.holidays
+
+    def bucket(self, epoch_seconds: float, tf_seconds: int):
+        """
+        (start, end) epoch seconds of the bar containing this instant, or
+        None outside the session. The last bar is cut at the close.
+        """
+        local = int(epoch_seconds) + _IST_OFFSET
+        day_number, second = divmod(local, _DAY)
+        if not self.open_seconds <= second < self.close_seconds or not self.is_trading_day(day_number):
+            return None
+        day_start = day_number * _DAY - _IST_OFFSET
+        offset = (second - self.open_seconds) // tf_seconds * tf_seconds
+        start = day_start + self.open_seconds + offset
+        return start, min(start + tf_seconds, day_start + self.close_seconds)
+
+    def is_open(self, epoch_seconds: float) -> bool:
+        return self.bucket(epoch_seconds, 60) is not None
+
+
+class BarAggregator:
+    """
+    Multi-symbol, multi-timeframe OHLCV/VWAP aggregator.
+    """
+
+    def __init__(self, timeframes: Sequence[str] = ("1m", "5m", "15m"), clock: Optional[NSESessionClock] = None,
+                 capacity: int = 512, flush_size: int = 500, symbol_map: Optional[Dict[str, str]] = None):
+        self.clock = clock or NSESessionClock()
+        self.timeframes = list(timeframes)
+        self.tf_seconds = [self.clock.timeframe_seconds(tf) for tf in self.timeframes]
+        self.flush_size = flush_size
+        # Optional token -> trading symbol so stored bars use readable names
+        self.symbol_map = symbol_map or {}
+
+        self.symbol_ids: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self._allocate(capacity)
+
+        self._pending: List[Dict[str, Any]] = []
+        self._listeners: List[Callable[[List[Dict[str, Any]]], Any]] = []
+        self.stats = {"ticks": 0, "out_of_session": 0, "late_ticks": 0, "bars_emitted": 0, "batches": 0}
+
+    # ===== State slots =====
+
+    def _allocate(self, capacity: int):
+        shape = (len(self.timeframes), capacity)
+        self.start = np.full(shape, -1, dtype=np.int64)   # bar start, -1 = no open bar
+        self.end = np.zeros(shape, dtype=np.int64)
+        self.closed_end = np.zeros(shape, dtype=np.int64)  # end of the last emitted bar
+        self.open = np.zeros(shape)
+        self.high = np.zeros(shape)
+        self.low = np.zeros(shape)
+        self.close = np.zeros(shape)
+        self.volume = np.zeros(shape)
+        self.pv = np.zeros(shape)                          # sum(price * qty) for VWAP
+        self.ticks = np.zeros(shape, dtype=np.int64)
+        self.last_cum_volume = np.full(capacity, -1.0)
+
+    def _grow(self):
+        old = {name: getattr(self, name) for name in
+               ("start", "end", "closed_end", "open", "high", "low", "close", "volume", "pv", "ticks")}
+        old_cum = self.last_cum_volume
+        capacity = old_cum.shape[0]
+        self._allocate(capacity * 2)
+        for name, values in old.items():
+            getattr(self, name)[:, :capacity] = values
+        self.last_cum_volume[:capacity] = old_cum
+
+    def symbol_id(self, symbol: str) -> int:
+        sid = self.symbol_ids.get(symbol)
+        if sid is None:
+            sid = len(self.symbols)
+            if sid >= self.last_cum_volume.shape[0]:
+                self._grow()
+            self.symbol_ids[symbol] = sid
+            self.symbols.append(symbol)
+        return sid
+
+    # ===== Ingestion =====
+
+    def on_tick(self, tick: Tick):
+        """TickBus listener. Quote ticks carry cumulative day volume."""
+        sid = self.symbol_id(tick.token)
+        qty = 0.0
+        if tick.volume is not None:
+            previous = self.last_cum_volume[sid]
+            if previous < 0:
+                qty = float(tick.last_traded_qty or 0)
+            elif tick.volume >= previous:
+                qty = float(tick.volume - previous)
+            else:
+                qty = float(tick.volume)  # counter reset at a new session
+            self.last_cum_volume[sid] = tick.volume
+        self.update(sid, tick.exchange_ts / 1000.0, tick.ltp, qty)
+
+    def update(self, sid: int, epoch_seconds: float, price: float, qty: float = 0.0):
+        """Apply one trade to every timeframe of symbol slot `sid`."""
+        self.stats["ticks"] += 1
+        late = False
+        for t, tf_seconds in enumerate(self.tf_seconds):
+            bucket = self.clock.bucket(epoch_seconds, tf_seconds)
+            if bucket is None:
+                self.stats["out_of_session"] += 1
+                return
+            start = self.start[t, sid]
+            # A bar already emitted (or older than the open one) is never reopened
+            if bucket[0] < self.closed_end[t, sid] or bucket[0] < start:
+                late = True
+                continue
+            if start != bucket[0]:
+                if start >= 0:
+                    self._pending.append(self._bar(t, sid))
+                    self.closed_end[t, sid] = self.end[t, sid]
+                self.start[t, sid] = bucket[0]
+                self.end[t, sid] = bucket[1]
+                self.open[t, sid] = self.high[t, sid] = self.low[t, sid] = price
+                self.volume[t, sid] = self.pv[t, sid] = 0.0
+                self.ticks[t, sid] = 0
+            else:
+                if price > self.high[t, sid]:
+                    self.high[t, sid] = price
+                elif price < self.low[t, sid]:
+                    self.low[t, sid] = price
+            self.close[t, sid] = price
+            self.volume[t, sid] += qty
+            self.pv[t, sid] += price * qty
+            self.ticks[t, sid] += 1
+        if late:
+            self.stats["late_ticks"] += 1
+
+        if len(self._pending) >= self.flush_size:
+            self.flush()
+
+    # ===== Time-based closing =====
+
+    def advance(self, now_epoch_seconds: float) -> int:
+        """Close every open bar whose end is at or before `now`, then flush."""
+        due = (self.start >= 0) & (self.end <= now_epoch_seconds)
+        rows, cols = np.nonzero(due)
+        for t, sid in zip(rows.tolist(), cols.tolist()):
+            self._pending.append(self._bar(t, sid))
+        self.closed_end[due] = self.end[due]
+        self.start[due] = -1
+        self.flush()
+        return len(rows)
+
+    async def run_clock(self, interval: float = 1.0):
+        """Close bars on wall-clock boundaries even when a symbol stops ticking."""
+        while True:
+            self.advance(datetime.now(timezone.utc).timestamp())
+            await asyncio.sleep(interval)
+
+    # ===== Output =====
+
+    def _bar(self, t: int, sid: int) -> Dict[str, Any]:
+        volume = float(self.volume[t, sid])
+        close = float(self.close[t, sid])
+        token = self.symbols[sid]
+        return {
+            "symbol": self.symbol_map.get(token, token),
+            "timeframe": self.timeframes[t],
+            "timestamp": datetime.fromtimestamp(int(self.start[t, sid]), IST).replace(tzinfo=None),
+            "open": float(self.open[t, sid]),
+            "high": float(self.high[t, sid]),
+            "low": float(self.low[t, sid]),
+            "close": close,
+            "volume": int(volume),
+            "vwap": float(self.pv[t, sid]) / volume if volume > 0 else close,
+            "ticks": int(self.ticks[t, sid])
+        }
+
+    def current_bar(self, symbol: str, timeframe: str) -> Optional[Dict[str, Any]]:
+        """The still-forming bar for a symbol, if any."""
+        sid = self.symbol_ids.get(symbol)
+        if sid is None:
+            return None
+        t = self.timeframes.index(timeframe)
+        return self._bar(t, sid) if self.start[t, sid] >= 0 else None
+
+    def add_bar_listener(self, callback: Callable[[List[Dict[str, Any]]], Any]):
+        """callback(bars) receives each batch of completed bars."""
+        self._listeners.append(callback)
+
+    def attach(self, bus, tokens: Optional[Iterable[str]] = None) -> "BarAggregator":
+        bus.add_listener(self.on_tick, tokens=tokens)
+        return self
+
+    def flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        self.stats["bars_emitted"] += len(batch)
+        self.stats["batches"] += 1
+        for callback in self._listeners:
+            try:
+                callback(batch)
+            except Exception as e:
+                logger.error(f"Bar listener failed: {e}")
+
+
+class MarketDataBarWriter:
+    """
+    Bar listener that persists batches to market_data on a background
+    thread, so SQLite latency never stalls the tick path. VWAP and tick
+    counts are not stored; market_data only has OHLCV columns.
+    """
+
+    def __init__(self, db=None, max_pending_batches: int = 1000):
+        if db is None:
+            from backend.database.db import db as default_db
+            db = default_db
+        self.db = db
+        self._queue: "queue.Queue[Optional[List[Dict[str, Any]]]]" = queue.Queue(maxsize=max_pending_batches)
+        self.written = 0
+        self.dropped_batches = 0
+        self._thread = threading.Thread(target=self._run, name="bar-writer", daemon=True)
+        self._thread.start()
+
+    def __call__(self, bars: List[Dict[str, Any]]):
+        try:
+            self._queue.put_nowait(bars)
+        except queue.Full:
+            self.dropped_batches += 1
+            logger.error(f"Bar writer backlog full, dropped {len(bars)} bars")
+
+    def _run(self):
+        while True:
+            bars = self._queue.get()
+            if bars is None:
+                break
+            if self.db.save_market_data_batch(bars):
+                self.written += len(bars)
+            self._queue.task_done()
+
+    def close(self, timeout: float = 5.0):
+        self._queue.put(None)
+        self._thread.join(timeout)
@@ -0,0 +1,212 @@
+"""
+Tick Replay Server
+Local stand-in for the SmartAPI WebSocket 2.0 endpoint. It speaks the same
+handshake headers, subscribe/unsubscribe JSON, ping/pong heartbeat and
+binary packet layout, and streams either recorded ticks (JSONL) or a
+synthetic random walk per subscribed token at a configurable rate.
+
+    python -m backend.streaming.replay_server --port 8765 --rate 5000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Dict, Iterable, List, Optional
+
+from aiohttp import web, WSMsgType
+
+from backend.streaming.smartapi_protocol import (
+    ACTION_SUBSCRIBE, DEPTH_LEVELS, MODE_QUOTE, MODE_SNAP_QUOTE, Tick, encode_tick
+)
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_HEADERS = ("Authorization", "x-api-key", "x-client-code", "x-feed-token")
+# Ticks are sent in small bursts; 100 bursts per second keeps timing smooth
+BURSTS_PER_SECOND = 100
+
+
+def load_ticks(path: str) -> List[Tick]:
+    """Read recorded ticks, one JSON object with Tick field names per line."""
+    ticks = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                ticks.append(Tick(**json.loads(line)))
+    return ticks
+
+
+class _Session:
+    """Per-connection state: subscribed tokens and the replay cursor."""
+
+    def __init__(self, ws: web.WebSocketResponse, seed: int):
+        self.ws = ws
+        self.tokens: Dict[str, int] = {}  # token -> exchange type
+        self.mode = MODE_QUOTE
+        self.rng = random.Random(seed)
+        # token -> [open, high, low, last, volume] of the synthetic session
+        self.state: Dict[str, List[float]] = {}
+        self.sequence = 0
+        self.cursor = 0
+        self.sent = 0
+
+
+class TickReplayServer:
+    """
+    Minimal SmartAPI-compatible tick server for development and load tests.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, rate: int = 1000,
+                 ticks: Optional[Iterable[Tick]] = None, seed: int = 7):
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.recorded = list(ticks) if ticks is not None else None
+        self.seed = seed
+        self.sessions: List[_Session] = []
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application()
+        self.app.router.add_get("/smart-stream", self._handle)
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/smart-stream"
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"Tick replay server listening on {self.url} at {self.rate} ticks/s")
+
+    async def stop(self):
+        for session in list(self.sessions):
+            await session.ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    # ===== Connection handling =====
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        missing = [h for h in REQUIRED_HEADERS if not request.headers.get(h)]
+        if missing:
+            return web.Response(status=401, text=f"Missing headers: {', '.join(missing)}")
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        session = _Session(ws, self.seed + len(self.sessions))
+        self.sessions.append(session)
+        pump = asyncio.create_task(self._pump(session))
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT:
+                    if msg.data == "ping":
+                        await ws.send_str("pong")
+                    else:
+                        self._on_request(session, msg.data)
+                elif msg.type == WSMsgType.ERROR:
+                    break
+        finally:
+            pump.cancel()
+            self.sessions.remove(session)
+        return ws
+
+    def _on_request(self, session: _Session, raw: str):
+        try:
+            request = json.loads(raw)
+            params = request["params"]
+        except (ValueError, KeyError):
+            logger.warning(f"Ignoring malformed request: {raw[:200]}")
+            return
+
+        session.mode = params.get("mode", session.mode)
+        for entry in params.get("tokenList", []):
+            for token in entry.get("tokens", []):
+                if request.get("action") == ACTION_SUBSCRIBE:
+                    session.tokens[str(token)] = entry.get("exchangeType", 1)
+                else:
+                    session.tokens.pop(str(token), None)
+
+    # ===== Tick generation =====
+
+    async def _pump(self, session: _Session):
+        interval = 1.0 / BURSTS_PER_SECOND
+        owed = 0.0
+        next_at = time.perf_counter()
+        while not session.ws.closed:
+            next_at += interval
+            owed += self.rate / BURSTS_PER_SECOND
+            burst = int(owed)
+            owed -= burst
+            if session.tokens and burst:
+                for _ in range(burst):
+                    tick = self._next_tick(session)
+                    if tick is None:
+                        break
+                    await session.ws.send_bytes(encode_tick(tick))
+                    session.sent += 1
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+
+    def _next_tick(self, session: _Session) -> Optional[Tick]:
+        session.sequence += 1
+        if self.recorded:
+            # Replay recorded ticks for subscribed tokens, looping at the end
+            for _ in range(len(self.recorded)):
+                tick = self.recorded[session.cursor % len(self.recorded)]
+                session.cursor += 1
+                if tick.token in session.tokens:
+                    return tick._replace(sequence=session.sequence, mode=session.mode)
+            return None
+
+        tokens = list(session.tokens)
+        token = tokens[session.cursor % len(tokens)]
+        session.cursor += 1
+        state = session.state.get(token)
+        if state is None:
+            start = round(session.rng.uniform(100, 3000), 2)
+            state = session.state[token] = [start, start, start, start, 0]
+        price = round(max(0.05, state[3] * (1 + session.rng.gauss(0, 0.0005))), 2)
+        qty = session.rng.randint(1, 500)
+        state[1] = max(state[1], price)
+        state[2] = min(state[2], price)
+        state[3] = price
+        state[4] += qty
+        depth = None
+        if session.mode == MODE_SNAP_QUOTE:
+            # Five ticks either side of the last price
+            bids = tuple((round(price - 0.05 * (i + 1), 2), session.rng.randint(1, 2000), session.rng.randint(1, 20))
+                         for i in range(DEPTH_LEVELS))
+            asks = tuple((round(price + 0.05 * (i + 1), 2), session.rng.randint(1, 2000), session.rng.randint(1, 20))
+                         for i in range(DEPTH_LEVELS))
+            depth = (bids, asks)
+        return Tick(token, session.tokens[token], session.mode, session.sequence, int(time.time() * 1000),
+                    price, qty, price, state[4], 0.0, 0.0, state[0], state[1], state[2], state[0], None, depth)
+
+
+async def _serve(args):
+    ticks = load_ticks(args.ticks) if args.ticks else None
+    server = TickReplayServer(args.host, args.port, args.rate, ticks)
+    await server.start()
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local SmartAPI tick replay server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=int, default=1000, help="Ticks per second per connection")
+    parser.add_argument("--ticks", help="JSONL file of recorded ticks to replay")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_serve(parser.parse_args()))
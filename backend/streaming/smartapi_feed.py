@@ -0,0 +1,177 @@
+"""
+SmartAPI WebSocket Feed
+One WebSocket session streaming binary ticks for hundreds of tokens,
+replacing per-index ltpData polling. Decoded ticks are published to a
+TickBus. Disconnects are retried with exponential backoff and the full
+subscription set is replayed on every reconnect.
+
+Point `url` at a TickReplayServer to develop or load-test without the broker.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+import aiohttp
+
+from backend.streaming.smartapi_protocol import (
+    SMARTAPI_WS_URL, MODE_QUOTE, ACTION_SUBSCRIBE, ACTION_UNSUBSCRIBE, ProtocolError,
+    auth_headers, decode_tick, subscribe_messages
+)
+from backend.streaming.tick_bus import TickBus
+
+logger = logging.getLogger(__name__)
+
+
+class SmartAPIFeed:
+    """
+    Async SmartAPI WebSocket 2.0 client.
+    """
+
+    def __init__(self, auth_token: str, api_key: str, client_code: str, feed_token: str,
+                 bus: Optional[TickBus] = None, url: str = SMARTAPI_WS_URL, mode: int = MODE_QUOTE,
+                 heartbeat_interval: float = 10.0, max_backoff: float = 30.0):
+        self.headers = auth_headers(auth_token, api_key, client_code, feed_token)
+        self.bus = bus or TickBus()
+        self.url = url
+        self.mode = mode
+        self.heartbeat_interval = heartbeat_interval
+        self.max_backoff = max_backoff
+
+        self.subscriptions: Dict[int, set] = defaultdict(set)
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._stopping = False
+        self.connected = asyncio.Event()
+
+        self.stats = {
+            "ticks": 0,
+            "bytes": 0,
+            "decode_errors": 0,
+            "connects": 0,
+            "reconnects": 0,
+            "last_tick_at": None,
+            "started_at": None
+        }
+
+    @classmethod
+    def from_collector(cls, collector, bus: Optional[TickBus] = None, **kwargs) -> "SmartAPIFeed":
+        """Build a feed from an NSEDataCollector that has already logged in."""
+        if not getattr(collector, "feed_token", None):
+            raise ValueError("Collector has no feed token; Angel One login is required first")
+        return cls(collector.auth_token, collector.api_key, collector.client_id, collector.feed_token,
+                   bus=bus, **kwargs)
+
+    # ===== Subscriptions =====
+
+    def add_tokens(self, tokens: Dict[int, Iterable[str]]) -> Dict[int, List[str]]:
+        """Record {exchange_type: [tokens]} to subscribe; returns the ones not already held."""
+        fresh = {}
+        for exchange_type, token_list in tokens.items():
+            new = [str(t) for t in token_list if str(t) not in self.subscriptions[exchange_type]]
+            self.subscriptions[exchange_type].update(new)
+            if new:
+                fresh[exchange_type] = new
+        return fresh
+
+    async def subscribe(self, tokens: Dict[int, Iterable[str]]):
+        """Add tokens; sent immediately when connected and replayed on every reconnect."""
+        fresh = self.add_tokens(tokens)
+        if fresh and self._ws is not None and not self._ws.closed:
+            await self._send_requests(fresh)
+
+    async def unsubscribe(self, tokens: Dict[int, Iterable[str]]):
+        removed = {}
+        for exchange_type, token_list in tokens.items():
+            gone = [str(t) for t in token_list if str(t) in self.subscriptions[exchange_type]]
+            self.subscriptions[exchange_type].difference_update(gone)
+            if gone:
+                removed[exchange_type] = gone
+        if removed and self._ws is not None and not self._ws.closed:
+            await self._send_requests(removed, action=ACTION_UNSUBSCRIBE)
+
+    async def _send_requests(self, tokens: Dict[int, List[str]], action: int = ACTION_SUBSCRIBE):
+        for message in subscribe_messages(tokens, mode=self.mode, action=action):
+            await self._ws.send_str(message)
+
+    # ===== Connection loop =====
+
+    async def run(self):
+        """Connect and stream until stop() is called."""
+        self._stopping = False
+        self.stats["started_at"] = time.time()
+        backoff = 1.0
+        async with aiohttp.ClientSession() as session:
+            while not self._stopping:
+                try:
+                    await self._stream(session)
+                    backoff = 1.0
+                except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError) as e:
+                    logger.warning(f"Tick feed disconnected: {e}")
+                finally:
+                    self.connected.clear()
+                    self._ws = None
+
+                if self._stopping:
+                    break
+                self.stats["reconnects"] += 1
+                logger.info(f"Reconnecting tick feed in {backoff:.1f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    async def _stream(self, session: aiohttp.ClientSession):
+        async with session.ws_connect(self.url, headers=self.headers, heartbeat=None,
+                                      max_msg_size=0) as ws:
+            self._ws = ws
+            self.stats["connects"] += 1
+            active = {ex: sorted(tokens) for ex, tokens in self.subscriptions.items() if tokens}
+            if active:
+                await self._send_requests(active)
+            self.connected.set()
+            logger.info(f"Tick feed connected to {self.url} ({sum(map(len, active.values()))} tokens)")
+
+            heartbeat = asyncio.create_task(self._heartbeat(ws))
+            try:
+                async for msg in ws:
+                    if msg.type == aiohttp.WSMsgType.BINARY:
+                        self._on_packet(msg.data)
+                    elif msg.type == aiohttp.WSMsgType.TEXT:
+                        if msg.data != "pong":
+                            logger.warning(f"Tick feed message: {msg.data[:200]}")
+                    elif msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                        break
+            finally:
+                heartbeat.cancel()
+
+    async def _heartbeat(self, ws):
+        # SmartAPI drops idle sessions unless it sees a text "ping"
+        while not ws.closed:
+            await asyncio.sleep(self.heartbeat_interval)
+            await ws.send_str("ping")
+
+    def _on_packet(self, packet: bytes):
+        try:
+            tick = decode_tick(packet)
+        except (ProtocolError, UnicodeDecodeError) as e:
+            self.stats["decode_errors"] += 1
+            logger.debug(f"Bad tick packet: {e}")
+            return
+        self.stats["ticks"] += 1
+        self.stats["bytes"] += len(packet)
+        self.stats["last_tick_at"] = time.time()
+        self.bus.publish(tick)
+
+    async def stop(self):
+        self._stopping = True
+        if self._ws is not None and not self._ws.closed:
+            await self._ws.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        elapsed = time.time() - self.stats["started_at"] if self.stats["started_at"] else 0
+        return {
+            **self.stats,
+            "subscribed_tokens": sum(len(t) for t in self.subscriptions.values()),
+            "ticks_per_second": round(self.stats["ticks"] / elapsed, 1) if elapsed else 0.0,
+            "bus": self.bus.get_stats()
+        }
@@ -0,0 +1,193 @@
+"""
+SmartAPI WebSocket 2.0 wire format.
+Binary tick packets are little-endian with prices in paise. Only the
+fixed-size prefix the ingestion path needs is decoded, plus the best-5
+depth carried by snap-quote packets.
+"""
+
+import json
+import struct
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+SMARTAPI_WS_URL = "wss://smartapisocket.angelone.in/smart-stream"
+
+# Subscription modes
+MODE_LTP = 1
+MODE_QUOTE = 2
+MODE_SNAP_QUOTE = 3
+
+# Subscription actions
+ACTION_UNSUBSCRIBE = 0
+ACTION_SUBSCRIBE = 1
+
+# Exchange types
+NSE_CM = 1
+NSE_FO = 2
+BSE_CM = 3
+BSE_FO = 4
+MCX_FO = 5
+NCX_FO = 7
+CDE_FO = 13
+
+EXCHANGE_TYPES = {"NSE": NSE_CM, "NFO": NSE_FO, "BSE": BSE_CM, "BFO": BSE_FO,
+                  "MCX": MCX_FO, "NCDEX": NCX_FO, "CDS": CDE_FO}
+
+# Broker limit on tokens per subscribe request
+MAX_TOKENS_PER_REQUEST = 1000
+
+# Packet layouts (offsets follow the published SmartAPI v2 spec)
+_HEADER = struct.Struct("<bb25sqqq")          # mode, exchange, token, seq, exch ts, ltp   -> 51 bytes
+_QUOTE = struct.Struct("<qqqddqqqq")          # ltq, atp, volume, buy qty, sell qty, OHLC  -> 72 bytes
+_SNAP = struct.Struct("<qqd")                 # last traded ts, open interest, OI change % -> 24 bytes
+_DEPTH_ENTRY = struct.Struct("<hqqh")         # buy flag, qty, price, orders               -> 20 bytes
+_LIMITS = struct.Struct("<qqqq")              # upper/lower circuit, 52-week high/low      -> 32 bytes
+DEPTH_LEVELS = 5
+_DEPTH_SIZE = 2 * DEPTH_LEVELS * _DEPTH_ENTRY.size
+
+# Snap quote: quote prefix (0-123), snap fields (123-147), depth (147-347), limits (347-379)
+LTP_PACKET_SIZE = _HEADER.size
+QUOTE_PACKET_SIZE = _HEADER.size + _QUOTE.size
+_SNAP_OFFSET = QUOTE_PACKET_SIZE
+_DEPTH_OFFSET = _SNAP_OFFSET + _SNAP.size
+_LIMITS_OFFSET = _DEPTH_OFFSET + _DEPTH_SIZE
+SNAP_QUOTE_PACKET_SIZE = _LIMITS_OFFSET + _LIMITS.size
+
+# One side of the book: ((price, qty, orders), ...) best level first
+DepthSide = Tuple[Tuple[float, int, int], ...]
+
+
+class Tick(NamedTuple):
+    """One decoded market tick. Prices are in rupees."""
+    token: str
+    exchange_type: int
+    mode: int
+    sequence: int
+    exchange_ts: int  # epoch milliseconds
+    ltp: float
+    last_traded_qty: Optional[int] = None
+    avg_price: Optional[float] = None
+    volume: Optional[int] = None
+    total_buy_qty: Optional[float] = None
+    total_sell_qty: Optional[float] = None
+    open: Optional[float] = None
+    high: Optional[float] = None
+    low: Optional[float] = None
+    close: Optional[float] = None
+    open_interest: Optional[int] = None
+    depth: Optional[Tuple[DepthSide, DepthSide]] = None  # (bids, asks), snap quotes only
+
+
+class ProtocolError(ValueError):
+    """Raised for packets that do not match the SmartAPI layout."""
+
+
+def decode_tick(packet: bytes, price_divisor: float = 100.0) -> Tick:
+    """
+    Decode one binary tick packet. price_divisor is 100 for equity, F&O and
+    commodity segments (paise); currency derivatives use 10_000_000.
+    """
+    size = len(packet)
+    if size < LTP_PACKET_SIZE:
+        raise ProtocolError(f"Tick packet too short: {size} bytes")
+
+    mode, exchange, raw_token, seq, exch_ts, ltp = _HEADER.unpack_from(packet)
+    token = raw_token.split(b"\x00", 1)[0].decode("ascii")
+
+    if mode == MODE_LTP or size < QUOTE_PACKET_SIZE:
+        return Tick(token, exchange, mode, seq, exch_ts, ltp / price_divisor)
+
+    ltq, atp, volume, buy_qty, sell_qty, o, h, l, c = _QUOTE.unpack_from(packet, LTP_PACKET_SIZE)
+    open_interest = None
+    depth = None
+    if mode == MODE_SNAP_QUOTE and size >= _SNAP_OFFSET + _SNAP.size:
+        _, open_interest, _ = _SNAP.unpack_from(packet, _SNAP_OFFSET)
+        if size >= _LIMITS_OFFSET:
+            depth = _decode_depth(packet, price_divisor)
+
+    return Tick(token, exchange, mode, seq, exch_ts, ltp / price_divisor,
+                ltq, atp / price_divisor, volume, buy_qty, sell_qty,
+                o / price_divisor, h / price_divisor, l / price_divisor, c / price_divisor,
+                open_interest, depth)
+
+
+def _decode_depth(packet: bytes, price_divisor: float) -> Optional[Tuple[DepthSide, DepthSide]]:
+    bids, asks = [], []
+    for i in range(2 * DEPTH_LEVELS):
+        buy, qty, price, orders = _DEPTH_ENTRY.unpack_from(packet, _DEPTH_OFFSET + i * _DEPTH_ENTRY.size)
+        if price > 0:
+            (bids if buy == 1 else asks).append((price / price_divisor, qty, orders))
+    if not bids and not asks:
+        return None
+    return tuple(bids), tuple(asks)
+
+
+def encode_tick(tick: Tick, price_divisor: float = 100.0) -> bytes:
+    """
+    Encode a Tick in the broker's binary layout (used by the replay server
+    and tests). Missing quote fields are sent as zero.
+    """
+    def paise(value):
+        return int(round((value or 0.0) * price_divisor))
+
+    header = _HEADER.pack(tick.mode, tick.exchange_type, tick.token.encode("ascii"),
+                          tick.sequence, tick.exchange_ts, paise(tick.ltp))
+    if tick.mode == MODE_LTP:
+        return header
+
+    quote = _QUOTE.pack(tick.last_traded_qty or 0, paise(tick.avg_price), tick.volume or 0,
+                        float(tick.total_buy_qty or 0), float(tick.total_sell_qty or 0),
+                        paise(tick.open), paise(tick.high), paise(tick.low), paise(tick.close))
+    if tick.mode == MODE_QUOTE:
+        return header + quote
+
+    snap = _SNAP.pack(tick.exchange_ts, tick.open_interest or 0, 0.0)
+    entries = []
+    if tick.depth is not None:
+        bids, asks = tick.depth
+        for flag, side in ((1, bids), (0, asks)):
+            entries.extend(_DEPTH_ENTRY.pack(flag, qty, paise(price), orders)
+                           for price, qty, orders in side[:DEPTH_LEVELS])
+    depth = b"".join(entries).ljust(_DEPTH_SIZE, b"\x00")
+    limits = bytes(_LIMITS.size)
+    return header + quote + snap + depth + limits
+
+
+def subscribe_messages(tokens: Dict[int, List[str]], mode: int = MODE_QUOTE,
+                       action: int = ACTION_SUBSCRIBE, correlation_id: str = "gitta") -> List[str]:
+    """
+    Build subscribe/unsubscribe JSON requests for {exchange_type: [tokens]},
+    split so no request carries more than MAX_TOKENS_PER_REQUEST tokens.
+    """
+    messages = []
+    batch: List[Dict] = []
+    count = 0
+    for exchange_type, token_list in tokens.items():
+        remaining = list(token_list)
+        while remaining:
+            room = MAX_TOKENS_PER_REQUEST - count
+            take, remaining = remaining[:room], remaining[room:]
+            batch.append({"exchangeType": exchange_type, "tokens": take})
+            count += len(take)
+            if count == MAX_TOKENS_PER_REQUEST:
+                messages.append(_request(batch, mode, action, correlation_id))
+                batch, count = [], 0
+    if batch:
+        messages.append(_request(batch, mode, action, correlation_id))
+    return messages
+
+
+def _request(token_list: Iterable[Dict], mode: int, action: int, correlation_id: str) -> str:
+    return json.dumps({
+        "correlationID": correlation_id,
+        "action": action,
+        "params": {"mode": mode, "tokenList": list(token_list)}
+    })
+
+
+def auth_headers(auth_token: str, api_key: str, client_code: str, feed_token: str) -> Dict[str, str]:
+    return {
+        "Authorization": auth_token if auth_token.startswith("Bearer ") else f"Bearer {auth_token}",
+        "x-api-key": api_key,
+        "x-client-code": client_code,
+        "x-feed-token": feed_token
+    }
@@ -0,0 +1,138 @@
+"""
+Tick Bus
+In-process fan-out of decoded ticks. Every subscriber owns a bounded queue;
+when a slow consumer falls behind, its oldest ticks are dropped (and
+counted) so memory stays bounded and the feed never blocks.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from backend.streaming.smartapi_protocol import Tick
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Queue-backed subscriber. Iterate with `async for tick in subscription`."""
+
+    def __init__(self, name: str, tokens: Optional[Set[str]], maxsize: int):
+        self.name = name
+        self.tokens = tokens
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.delivered = 0
+        self.dropped = 0
+
+    def offer(self, tick: Tick):
+        try:
+            self.queue.put_nowait(tick)
+        except asyncio.QueueFull:
+            # Drop-oldest: the newest price is what a lagging consumer needs
+            self.queue.get_nowait()
+            self.queue.put_nowait(tick)
+            self.dropped += 1
+        self.delivered += 1
+
+    async def get(self) -> Tick:
+        return await self.queue.get()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Tick:
+        return await self.queue.get()
+
+
+class TickBus:
+    """
+    Routes each tick to queue subscribers and synchronous listeners that
+    asked for its token (or for all tokens), and keeps the latest tick per
+    token for snapshot reads.
+    """
+
+    def __init__(self, default_maxsize: int = 10000):
+        self.default_maxsize = default_maxsize
+        self.latest: Dict[str, Tick] = {}
+        self._by_token: Dict[str, List[Subscription]] = defaultdict(list)
+        self._wildcard: List[Subscription] = []
+        self._listeners: Dict[Optional[str], List[Callable[[Tick], Any]]] = defaultdict(list)
+        self.published = 0
+        self.listener_errors = 0
+
+    # ===== Subscribers =====
+
+    def subscribe(self, tokens: Optional[Iterable[str]] = None, maxsize: Optional[int] = None,
+                  name: Optional[str] = None) -> Subscription:
+        token_set = set(tokens) if tokens is not None else None
+        sub = Subscription(name or f"sub-{self.subscriber_count + 1}", token_set, maxsize or self.default_maxsize)
+        if token_set is None:
+            self._wildcard.append(sub)
+        else:
+            for token in token_set:
+                self._by_token[token].append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        if sub.tokens is None:
+            if sub in self._wildcard:
+                self._wildcard.remove(sub)
+            return
+        for token in sub.tokens:
+            subs = self._by_token.get(token, [])
+            if sub in subs:
+                subs.remove(sub)
+            if not subs:
+                self._by_token.pop(token, None)
+
+    def add_listener(self, callback: Callable[[Tick], Any], tokens: Optional[Iterable[str]] = None):
+        """Synchronous callback run inline for every matching tick (keep it cheap)."""
+        for token in (tokens if tokens is not None else [None]):
+            self._listeners[token].append(callback)
+
+    def remove_listener(self, callback: Callable[[Tick], Any]):
+        for callbacks in self._listeners.values():
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    @property
+    def subscriber_count(self) -> int:
+        unique = {id(s) for subs in self._by_token.values() for s in subs}
+        return len(unique) + len(self._wildcard)
+
+    # ===== Publishing =====
+
+    def publish(self, tick: Tick):
+        self.latest[tick.token] = tick
+        self.published += 1
+
+        for sub in self._by_token.get(tick.token, ()):
+            sub.offer(tick)
+        for sub in self._wildcard:
+            sub.offer(tick)
+
+        for key in (tick.token, None):
+            for callback in self._listeners.get(key, ()):
+                try:
+                    callback(tick)
+                except Exception as e:
+                    self.listener_errors += 1
+                    logger.error(f"Tick listener failed for {tick.token}: {e}")
+
+    def publish_many(self, ticks: Iterable[Tick]):
+        for tick in ticks:
+            self.publish(tick)
+
+    def get_stats(self) -> Dict[str, Any]:
+        subs = {id(s): s for subs in self._by_token.values() for s in subs}
+        subs.update({id(s): s for s in self._wildcard})
+        return {
+            "published": self.published,
+            "tokens_seen": len(self.latest),
+            "listener_errors": self.listener_errors,
+            "subscribers": [
+                {"name": s.name, "queued": s.queue.qsize(), "delivered": s.delivered, "dropped": s.dropped}
+                for s in subs.values()
+            ]
+        }
@@ -21,13 +21,16 @@ class PaperTradingEngine:
         portfolio_value = 0.0
         holdings = []
 
+        # Price every holding in one batched quote request
+        prices = self.data_provider.get_live_prices([item['symbol'] for item in portfolio]) if portfolio else {}
+
         for item in portfolio:
             symbol = item['symbol']
             qty = item['quantity']
             avg_price = item['avg_price']
             
             # Get real-time price
-            current_price = self.data_provider.get_live_price(symbol)
+            current_price = prices.get(symbol)
             if not current_price:
                 current_price = avg_price # Fallback if API fails
             
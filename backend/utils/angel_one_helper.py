@@ -2,10 +2,10 @@
 Angel One API Helper - Provides real-time market data
 """
 import os
-from SmartApi import SmartConnect
-import pyotp
 from typing import Dict, List, Optional
 import logging
+from backend.utils.broker_session import broker_session
+from backend.utils.market_data_gateway import market_data_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -21,26 +21,18 @@ class AngelOneHelper:
         self._is_connected = False
         
     def connect(self) -> bool:
-        """Establish connection to Angel One API."""
-        if self._is_connected:
+        """Attach to the shared Angel One session."""
+        if self._is_connected and broker_session.is_authenticated:
             return True
             
         try:
-            self.smart_api = SmartConnect(api_key=self.api_key)
-            totp = pyotp.TOTP(self.totp_secret).now()
-            
-            session = self.smart_api.generateSession(
-                self.client_id,
-                self.password,
-                totp
-            )
-            
-            if session and session.get('status'):
+            if broker_session.ensure_session():
+                self.smart_api = broker_session.client
                 self._is_connected = True
                 logger.info("✅ Connected to Angel One API")
                 return True
             else:
-                logger.error("❌ Failed to connect to Angel One API")
+                logger.error(f"❌ Failed to connect to Angel One API: {broker_session.last_error}")
                 return False
                 
         except Exception as e:
@@ -54,7 +46,7 @@ class AngelOneHelper:
                 return None
         
         try:
-            data = self.smart_api.ltpData(exchange, trading_symbol, symbol_token)
+            data = broker_session.call("ltpData", exchange, trading_symbol, symbol_token)
             if data and data.get('status'):
                 return data.get('data')
             return None
@@ -63,22 +55,13 @@ class AngelOneHelper:
             return None
     
     def get_market_data(self, exchange: str, symbol_token: str, trading_symbol: str) -> Optional[Dict]:
-        """Get comprehensive market data for a symbol."""
+        """Get comprehensive market data for a symbol (cached and coalesced by the gateway)."""
         if not self._is_connected:
             if not self.connect():
                 return None
         
         try:
-            data = self.smart_api.getMarketData(
-                mode="FULL",
-                exchangeTokens={exchange: [symbol_token]}
-            )
-            
-            if data and data.get('status') and data.get('data'):
-                fetched = data['data'].get('fetched', [])
-                if fetched:
-                    return fetched[0]
-            return None
+            return market_data_gateway.get_quote(exchange, symbol_token)
         except Exception as e:
             logger.error(f"Error fetching market data for {trading_symbol}: {e}")
             return None
@@ -106,7 +89,7 @@ class AngelOneHelper:
                 "exchange": exchange,
                 "searchscrip": symbol
             }
-            data = self.smart_api.searchScrip(exchange, symbol)
+            data = broker_session.call("searchScrip", exchange, symbol)
             
             if data and data.get('status') and data.get('data'):
                 # Return the first match's token
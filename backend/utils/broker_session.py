@@ -0,0 +1,295 @@
+"""
+Broker Session Manager
+One authenticated Angel One SmartAPI session per process, shared by every
+component that talks to the broker. It logs in with TOTP once, refreshes the
+JWT with the refresh token shortly before it expires, and only falls back to
+a full login when the refresh is rejected.
+
+Every REST call goes through call(endpoint, ...), which waits on a
+per-endpoint token bucket sized to SmartAPI's published limits and retries
+once after re-authenticating when the broker reports an invalid token.
+
+Set ANGEL_ONE_API_ROOT (or pass root=) to point at a FakeSmartAPIServer.
+"""
+
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Requests per second and burst size per SmartConnect method
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, float]] = {
+    "generateSession": (1, 1),
+    "generateToken": (1, 1),
+    "getProfile": (3, 3),
+    "ltpData": (10, 10),
+    "getMarketData": (10, 10),
+    "getCandleData": (3, 3),
+    "searchScrip": (1, 1),
+    "placeOrder": (10, 10),
+    "modifyOrder": (10, 10),
+    "cancelOrder": (10, 10),
+    "orderBook": (1, 1),
+    "tradeBook": (1, 1),
+    "position": (1, 1),
+    "holding": (1, 1),
+    "rmsLimit": (2, 2)
+}
+FALLBACK_RATE_LIMIT = (5, 5)
+
+# SmartAPI error codes for expired or invalid JWTs
+TOKEN_ERROR_CODES = {"AG8001", "AG8002", "AG8003", "AB8050", "AB8051"}
+RATE_LIMIT_MESSAGE = "exceeding access rate"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.updated = clock()
+        self.waits = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token, going negative if needed; returns how long the caller must wait."""
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a token is available (False if that would exceed timeout)."""
+        wait = self._reserve()
+        if timeout is not None and wait > timeout:
+            with self._lock:
+                self.tokens += 1  # give the reservation back
+            return False
+        if wait > 0:
+            self.waits += 1
+            time.sleep(wait)
+        return True
+
+
+def jwt_expiry(token: Optional[str]) -> Optional[float]:
+    """`exp` claim of a JWT (epoch seconds), without verifying it."""
+    if not token:
+        return None
+    try:
+        payload = token.replace("Bearer ", "").split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, ValueError, TypeError):
+        return None
+
+
+class BrokerSession:
+    """
+    Process-wide Angel One session with token refresh and rate limiting.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, client_id: Optional[str] = None,
+                 password: Optional[str] = None, totp_secret: Optional[str] = None,
+                 root: Optional[str] = None, rate_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 refresh_margin: float = 600.0, token_ttl: float = 8 * 3600.0,
+                 client_factory: Optional[Callable[..., Any]] = None,
+                 totp_factory: Optional[Callable[[str], str]] = None):
+        # Explicit values win; otherwise the environment is read at login time,
+        # so the global instance sees variables loaded after import
+        self._explicit = {"ANGEL_ONE_API_KEY": api_key, "ANGEL_ONE_CLIENT_ID": client_id,
+                          "ANGEL_ONE_PASSWORD": password, "ANGEL_ONE_TOTP_SECRET": totp_secret,
+                          "ANGEL_ONE_API_ROOT": root}
+        self.refresh_margin = refresh_margin
+        # Used when the JWT carries no readable exp claim
+        self.token_ttl = token_ttl
+        self._client_factory = client_factory
+        self._totp_factory = totp_factory
+
+        self.rate_limits = {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+        self.client = None
+        self.auth_token: Optional[str] = None
+        self.refresh_token: Optional[str] = None
+        self.feed_token: Optional[str] = None
+        self.expires_at = 0.0
+        self.last_error: Optional[str] = None
+        self._lock = threading.RLock()
+
+        self.stats = {"logins": 0, "refreshes": 0, "login_failures": 0, "calls": 0,
+                      "token_retries": 0, "rate_limited_retries": 0}
+
+    def _setting(self, name: str) -> Optional[str]:
+        return self._explicit[name] or os.getenv(name)
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return self._setting("ANGEL_ONE_API_KEY")
+
+    @property
+    def client_id(self) -> Optional[str]:
+        return self._setting("ANGEL_ONE_CLIENT_ID")
+
+    @property
+    def password(self) -> Optional[str]:
+        return self._setting("ANGEL_ONE_PASSWORD")
+
+    @property
+    def totp_secret(self) -> Optional[str]:
+        return self._setting("ANGEL_ONE_TOTP_SECRET")
+
+    @property
+    def root(self) -> Optional[str]:
+        return self._setting("ANGEL_ONE_API_ROOT")
+
+    # ===== Authentication =====
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key and self.client_id and self.password and self.totp_secret)
+
+    @property
+    def is_authenticated(self) -> bool:
+        return self.auth_token is not None and time.time() < self.expires_at
+
+    def _new_client(self):
+        if self._client_factory is not None:
+            return self._client_factory(api_key=self.api_key, root=self.root)
+        from SmartApi import SmartConnect
+        return SmartConnect(api_key=self.api_key, root=self.root)
+
+    def _totp(self) -> str:
+        if self._totp_factory is not None:
+            return self._totp_factory(self.totp_secret)
+        import pyotp
+        return pyotp.TOTP(self.totp_secret).now()
+
+    def _store_tokens(self, data: Dict[str, Any]):
+        self.auth_token = data["jwtToken"].replace("Bearer ", "")
+        self.refresh_token = data.get("refreshToken", self.refresh_token)
+        self.feed_token = data.get("feedToken", self.feed_token)
+        self.expires_at = jwt_expiry(self.auth_token) or time.time() + self.token_ttl
+        self.last_error = None
+
+    def ensure_session(self) -> bool:
+        """Make sure a valid session exists, refreshing or logging in only when needed."""
+        with self._lock:
+            if self.is_authenticated and time.time() < self.expires_at - self.refresh_margin:
+                return True
+            if not self.configured:
+                self.last_error = "Angel One credentials not found in environment"
+                return False
+            if self.client is not None and self.refresh_token and self._refresh():
+                return True
+            return self._login()
+
+    def _login(self) -> bool:
+        try:
+            self._bucket("generateSession").acquire()
+            client = self._new_client()
+            data = client.generateSession(self.client_id, self.password, self._totp())
+            if not data or not data.get("status"):
+                raise ValueError(data.get("message", "Unknown error") if data else "Empty response")
+            self.client = client
+            self._store_tokens(data["data"])
+            self.stats["logins"] += 1
+            logger.info(f"Angel One session established for {self.client_id}")
+            return True
+        except Exception as e:
+            self.stats["login_failures"] += 1
+            self.last_error = str(e)
+            self.invalidate()
+            logger.error(f"Angel One login failed: {e}")
+            return False
+
+    def _refresh(self) -> bool:
+        try:
+            self._bucket("generateToken").acquire()
+            data = self.client.generateToken(self.refresh_token)
+            if not data or not data.get("status"):
+                return False
+            self._store_tokens(data["data"])
+            self.stats["refreshes"] += 1
+            logger.info("Angel One session token refreshed")
+            return True
+        except Exception as e:
+            logger.warning(f"Angel One token refresh failed, logging in again: {e}")
+            return False
+
+    def invalidate(self):
+        """Forget the current JWT so the next call refreshes or logs in."""
+        with self._lock:
+            self.auth_token = None
+            self.expires_at = 0.0
+
+    def get_client(self):
+        """Authenticated SmartConnect, or None when login is not possible."""
+        return self.client if self.ensure_session() else None
+
+    # ===== Rate-limited calls =====
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(endpoint)
+                if bucket is None:
+                    rate, burst = self.rate_limits.get(endpoint, FALLBACK_RATE_LIMIT)
+                    bucket = self._buckets[endpoint] = TokenBucket(rate, burst)
+        return bucket
+
+    def call(self, endpoint: str, *args, **kwargs) -> Any:
+        """
+        Call SmartConnect.<endpoint>(*args, **kwargs) on the shared session.
+        Returns None when no session can be established.
+        """
+        for attempt in range(3):
+            if not self.ensure_session():
+                return None
+            self._bucket(endpoint).acquire()
+            self.stats["calls"] += 1
+            try:
+                response = getattr(self.client, endpoint)(*args, **kwargs)
+            except Exception as e:
+                if RATE_LIMIT_MESSAGE in str(e) and attempt < 2:
+                    # Another process shares the broker quota; back off one bucket interval
+                    self.stats["rate_limited_retries"] += 1
+                    rate, _ = self.rate_limits.get(endpoint, FALLBACK_RATE_LIMIT)
+                    time.sleep(1.0 / rate)
+                    continue
+                if type(e).__name__ == "TokenException" and attempt == 0:
+                    self.stats["token_retries"] += 1
+                    self.invalidate()
+                    continue
+                raise
+            if isinstance(response, dict) and response.get("errorcode") in TOKEN_ERROR_CODES and attempt == 0:
+                self.stats["token_retries"] += 1
+                self.invalidate()
+                continue
+            return response
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "authenticated": self.is_authenticated,
+            "expires_in": round(self.expires_at - time.time(), 1) if self.is_authenticated else 0,
+            "last_error": self.last_error,
+            "throttle_waits": {name: b.waits for name, b in self._buckets.items() if b.waits}
+        }
+
+
+# Global instance
+broker_session = BrokerSession()
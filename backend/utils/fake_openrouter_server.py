@@ -0,0 +1,321 @@
+"""
+Fake OpenRouter Server
+Local stand-in for the OpenRouter chat-completions API, so the verification
+path (MultiAIVerifier, OpenRouterClient, collectors) can be exercised and
+load-tested without keys, network or cost.
+
+Each model gets a profile: a lognormal latency distribution, an error rate
+(HTTP 500, or 429 for rate limits), a timeout rate (the request hangs past
+the client's timeout) and how noisy its scores are. Answers are scripted in
+the shape the consensus engine parses ("Viability score: N/10 ... VIABLE").
+Requests with "stream": true get the answer as server-sent events, a word
+per chunk with the latency spread across them, and stop early if the client
+hangs up.
+The score is derived from a hash of the prompt, so every model sees the same
+underlying quality for a strategy and repeated runs agree.
+
+    server = FakeOpenRouterServer(default_profile=ModelProfile(median_latency=0.8)).start()
+    verifier = MultiAIVerifier(api_key="test", base_url=server.url)
+
+    python -m backend.utils.fake_openrouter_server --port 8767 --median-latency 1.5
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHAT_PATH = "/api/v1/chat/completions"
+MODELS_PATH = "/api/v1/models"
+
+
+class ModelProfile:
+    """Behaviour of one fake model"""
+
+    def __init__(self, median_latency: float = 0.5, latency_sigma: float = 0.4, error_rate: float = 0.0,
+                 rate_limit_share: float = 0.5, timeout_rate: float = 0.0, hang_seconds: float = 60.0,
+                 score_noise: int = 1, script: Optional[List[str]] = None):
+        """
+        Args:
+            median_latency: Median response time in seconds
+            latency_sigma: Lognormal shape; 0 makes every call take the median
+            error_rate: Share of calls that fail
+            rate_limit_share: Share of failures returned as 429 instead of 500
+            timeout_rate: Share of calls that hang for hang_seconds
+            hang_seconds: How long a timed-out call hangs
+            score_noise: Max points a model's score strays from the strategy's base score
+            script: Fixed answers to cycle through instead of generated ones
+        """
+        self.median_latency = median_latency
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_share = rate_limit_share
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.score_noise = score_noise
+        self.script = script
+
+    def sample_latency(self, rng: random.Random) -> float:
+        if self.latency_sigma <= 0:
+            return self.median_latency
+        return rng.lognormvariate(math.log(max(self.median_latency, 1e-6)), self.latency_sigma)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients drop connections on timeouts and cancelled calls; that is expected here
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            logger.debug(f"Client {client_address} disconnected")
+            return
+        super().handle_error(request, client_address)
+
+
+def recommendation_for(score: int) -> str:
+    if score >= 7:
+        return "VIABLE"
+    if score >= 5:
+        return "MODERATE"
+    return "RISKY"
+
+
+class FakeOpenRouterServer:
+    """
+    Threaded HTTP server speaking the OpenRouter chat-completions dialect.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 profiles: Optional[Dict[str, ModelProfile]] = None,
+                 default_profile: Optional[ModelProfile] = None, seed: int = 7):
+        self.host = host
+        self.port = port
+        self.profiles = profiles or {}
+        self.default_profile = default_profile or ModelProfile()
+        self.rng = random.Random(seed)
+
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.timeouts: Dict[str, int] = defaultdict(int)
+        # Completion tokens actually sent (streams cut short by the client count what went out)
+        self.completion_tokens: Dict[str, int] = defaultdict(int)
+        self.streams_closed: Dict[str, int] = defaultdict(int)
+        self._script_position: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._httpd: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL, as passed to clients in place of https://openrouter.ai/api/v1"""
+        return f"http://{self.host}:{self.port}/api/v1"
+
+    @property
+    def requests(self) -> int:
+        return sum(self.counts.values())
+
+    def profile(self, model: str) -> ModelProfile:
+        return self.profiles.get(model, self.default_profile)
+
+    def start(self) -> "FakeOpenRouterServer":
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+            def do_POST(self):
+                server._dispatch(self)
+
+            def do_GET(self):
+                server._dispatch(self)
+
+            def log_message(self, fmt, *args):
+                logger.debug(fmt % args)
+
+        self._httpd = _Server((self.host, self.port), Handler)
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-openrouter", daemon=True)
+        self._thread.start()
+        logger.info(f"Fake OpenRouter listening on {self.url}")
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    # ===== Request handling =====
+
+    def _dispatch(self, handler: BaseHTTPRequestHandler):
+        path = handler.path.split("?", 1)[0]
+        length = int(handler.headers.get("Content-Length") or 0)
+        raw = handler.rfile.read(length) if length else b""
+
+        if path == MODELS_PATH:
+            models = sorted(set(self.profiles) | set(self.counts))
+            return self._send(handler, 200, {"data": [{"id": m} for m in models]})
+        if path != CHAT_PATH or handler.command != "POST":
+            return self._send(handler, 404, {"error": {"code": 404, "message": "Not found"}})
+        if not handler.headers.get("Authorization", "").startswith("Bearer "):
+            return self._send(handler, 401, {"error": {"code": 401, "message": "No auth credentials found"}})
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            return self._send(handler, 400, {"error": {"code": 400, "message": "Invalid JSON"}})
+
+        model = body.get("model", "")
+        profile = self.profile(model)
+        with self._lock:
+            self.counts[model] += 1
+            roll = self.rng.random()
+            latency = profile.sample_latency(self.rng)
+            failure_roll = self.rng.random()
+
+        if roll < profile.timeout_rate:
+            with self._lock:
+                self.timeouts[model] += 1
+            time.sleep(profile.hang_seconds)
+            return self._send(handler, 504, {"error": {"code": 504, "message": "Upstream timeout"}})
+
+        stream = bool(body.get("stream"))
+        # A stream's latency is spread over its chunks; a fifth of it goes before the first token
+        time.sleep(latency * 0.2 if stream else latency)
+        if roll < profile.timeout_rate + profile.error_rate:
+            with self._lock:
+                self.errors[model] += 1
+            if failure_roll < profile.rate_limit_share:
+                return self._send(handler, 429, {"error": {"code": 429, "message": "Rate limit exceeded"}})
+            return self._send(handler, 500, {"error": {"code": 500, "message": "Provider returned error"}})
+
+        content = self._answer(model, profile, body.get("messages") or [])
+        if stream:
+            return self._stream(handler, model, content, latency * 0.8)
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages") or []) // 4
+        completion_tokens = len(content) // 4
+        with self._lock:
+            self.completion_tokens[model] += completion_tokens
+        return self._send(handler, 200, {
+            "id": f"gen-{uuid.uuid4().hex[:16]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens}
+        })
+
+    def _answer(self, model: str, profile: ModelProfile, messages: List[Dict[str, Any]]) -> str:
+        if profile.script:
+            with self._lock:
+                position = self._script_position[model]
+                self._script_position[model] = position + 1
+            return profile.script[position % len(profile.script)]
+
+        prompt = str(messages[-1].get("content", "")) if messages else ""
+        digest = hashlib.sha256(prompt.encode()).digest()
+        base = 1 + digest[0] % 10
+        with self._lock:
+            noise = self.rng.randint(-profile.score_noise, profile.score_noise) if profile.score_noise else 0
+        score = min(10, max(1, base + noise))
+        return (f"Viability score: {score}/10. Recommendation: {recommendation_for(score)}.\n"
+                f"Key strengths: clear entry and exit rules, and the signal is simple to backtest.\n"
+                f"Key risks: regime changes, slippage around news and crowded entries near "
+                f"obvious levels; size positions conservatively until live results confirm the edge.")
+    
+    def _stream(self, handler: BaseHTTPRequestHandler, model: str, content: str, duration: float):
+        """Send an answer as OpenRouter-style SSE chunks, a word at a time"""
+        words = re.findall(r"\S+\s*", content)
+        pause = duration / max(len(words), 1)
+        generation = f"gen-{uuid.uuid4().hex[:16]}"
+        
+        def event(payload) -> bytes:
+            data = payload if isinstance(payload, str) else json.dumps(payload)
+            return f"data: {data}\n\n".encode()
+        
+        def write_chunk(data: bytes):
+            handler.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            handler.wfile.flush()
+        
+        sent = 0
+        try:
+            handler.send_response(200)
+            handler.send_header("Content-Type", "text/event-stream")
+            handler.send_header("Transfer-Encoding", "chunked")
+            handler.end_headers()
+            write_chunk(b": OPENROUTER PROCESSING\n\n")
+            for word in words:
+                time.sleep(pause)
+                write_chunk(event({"id": generation, "object": "chat.completion.chunk", "model": model,
+                                   "choices": [{"index": 0, "delta": {"content": word}}]}))
+                sent += 1
+            write_chunk(event({"id": generation, "object": "chat.completion.chunk", "model": model,
+                               "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                               "usage": {"completion_tokens": sent, "total_tokens": sent}}))
+            write_chunk(event("[DONE]"))
+            write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            with self._lock:
+                self.streams_closed[model] += 1
+            handler.close_connection = True
+        finally:
+            with self._lock:
+                self.completion_tokens[model] += sent
+
+    @staticmethod
+    def _send(handler: BaseHTTPRequestHandler, status: int, payload: Dict[str, Any]):
+        data = json.dumps(payload).encode()
+        try:
+            handler.send_response(status)
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", str(len(data)))
+            handler.end_headers()
+            handler.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (timeout, or a cancelled hedge / early-quorum call)
+            pass
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--median-latency", type=float, default=0.5, help="Median seconds per completion")
+    parser.add_argument("--latency-sigma", type=float, default=0.4, help="Lognormal latency shape")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=60.0)
+    parser.add_argument("--score-noise", type=int, default=1)
+
+
+def profile_from_args(args: argparse.Namespace) -> ModelProfile:
+    return ModelProfile(median_latency=args.median_latency, latency_sigma=args.latency_sigma,
+                        error_rate=args.error_rate, timeout_rate=args.timeout_rate,
+                        hang_seconds=args.hang_seconds, score_noise=args.score_noise)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local fake OpenRouter chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8767)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    fake = FakeOpenRouterServer(args.host, args.port, default_profile=profile_from_args(args)).start()
+    print(f"Fake OpenRouter running at {fake.url} (set OPENROUTER_BASE_URL to use it)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
@@ -0,0 +1,306 @@
+"""
+Fake SmartAPI Server
+Local stand-in for the Angel One REST API so the broker session, data
+providers and collectors can be exercised without credentials or network.
+It implements login, token refresh, profile, LTP, quote, candle and scrip
+search routes with the real URL paths and response envelopes. It issues
+JWTs with a short configurable lifetime, rejects expired tokens with
+AG8001, and enforces per-route rate limits with the broker's 403 response.
+
+    server = FakeSmartAPIServer(token_ttl=60).start()
+    session = BrokerSession(..., root=server.url)
+
+    python -m backend.utils.fake_smartapi_server --port 8766
+"""
+
+import argparse
+import base64
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+AUTH = "/rest/auth/angelbroking"
+SECURE = "/rest/secure/angelbroking"
+
+# Route -> requests allowed per second (mirrors broker limits)
+ROUTE_LIMITS = {
+    f"{AUTH}/user/v1/loginByPassword": 1,
+    f"{AUTH}/jwt/v1/generateTokens": 1,
+    f"{SECURE}/user/v1/getProfile": 3,
+    f"{SECURE}/order/v1/getLtpData": 10,
+    f"{SECURE}/market/v1/quote": 10,
+    f"{SECURE}/historical/v1/getCandleData": 3,
+    f"{SECURE}/order/v1/searchScrip": 1,
+    f"{SECURE}/user/v1/logout": 1
+}
+
+# Tokens and base prices the fake market knows about
+INSTRUMENTS = {
+    "99926000": ("NSE", "Nifty 50", 24500.0),
+    "99926009": ("NSE", "Nifty Bank", 52000.0),
+    "2885": ("NSE", "RELIANCE-EQ", 2450.0),
+    "1594": ("NSE", "INFY-EQ", 1500.0),
+    "11536": ("NSE", "TCS-EQ", 3900.0)
+}
+
+
+def _b64(data: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+def make_jwt(subject: str, ttl: float) -> str:
+    """Unsigned JWT with an exp claim, enough for clients that read expiry."""
+    now = int(time.time())
+    return ".".join([_b64({"alg": "none", "typ": "JWT"}),
+                     _b64({"sub": subject, "iat": now, "exp": now + int(ttl), "jti": uuid.uuid4().hex}),
+                     "fake"])
+
+
+class FakeSmartAPIServer:
+    """
+    Threaded HTTP server speaking the SmartAPI REST dialect.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, token_ttl: float = 3600.0,
+                 enforce_rate_limits: bool = True, latency: float = 0.0, seed: int = 11):
+        self.host = host
+        self.port = port
+        self.token_ttl = token_ttl
+        self.enforce_rate_limits = enforce_rate_limits
+        # Artificial per-request delay, to model broker round trips
+        self.latency = latency
+        self.rng = random.Random(seed)
+
+        self.tokens: Dict[str, float] = {}        # jwt -> expiry
+        self.refresh_tokens: Dict[str, str] = {}  # refresh token -> client code
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.rejected: Dict[str, int] = defaultdict(int)
+        self._recent: Dict[str, deque] = defaultdict(deque)
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def logins(self) -> int:
+        return self.counts[f"{AUTH}/user/v1/loginByPassword"]
+
+    @property
+    def refreshes(self) -> int:
+        return self.counts[f"{AUTH}/jwt/v1/generateTokens"]
+
+    def start(self) -> "FakeSmartAPIServer":
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                server._dispatch(self)
+
+            def do_GET(self):
+                server._dispatch(self)
+
+            def log_message(self, fmt, *args):
+                logger.debug(fmt % args)
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-smartapi", daemon=True)
+        self._thread.start()
+        logger.info(f"Fake SmartAPI listening on {self.url}")
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def expire_all_tokens(self):
+        """Invalidate every issued JWT (refresh tokens stay valid)."""
+        with self._lock:
+            self.tokens.clear()
+
+    # ===== Request handling =====
+
+    def _dispatch(self, handler: BaseHTTPRequestHandler):
+        path = handler.path.split("?", 1)[0]
+        length = int(handler.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(handler.rfile.read(length) or b"{}") if length else {}
+        except ValueError:
+            body = {}
+
+        with self._lock:
+            self.counts[path] += 1
+            limited = self.enforce_rate_limits and self._over_limit(path)
+            if limited:
+                self.rejected[path] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if limited:
+            # The broker answers throttled calls with plain text, not JSON
+            self._send(handler, 403, "Access denied because of exceeding access rate", "text/plain")
+            return
+
+        routes = {
+            f"{AUTH}/user/v1/loginByPassword": self._login,
+            f"{AUTH}/jwt/v1/generateTokens": self._generate_tokens,
+            f"{SECURE}/user/v1/getProfile": self._profile,
+            f"{SECURE}/order/v1/getLtpData": self._ltp,
+            f"{SECURE}/market/v1/quote": self._quote,
+            f"{SECURE}/historical/v1/getCandleData": self._candles,
+            f"{SECURE}/order/v1/searchScrip": self._search,
+            f"{SECURE}/user/v1/logout": self._logout
+        }
+        route = routes.get(path)
+        if route is None:
+            self._send(handler, 404, {"status": False, "message": "Not Found", "errorcode": "AB1000", "data": None})
+            return
+        if path.startswith(SECURE) and not self._authorized(handler):
+            self._send(handler, 200, {"status": False, "message": "Invalid Token", "errorcode": "AG8001", "data": None})
+            return
+        self._send(handler, 200, route(body))
+
+    def _over_limit(self, path: str) -> bool:
+        limit = ROUTE_LIMITS.get(path)
+        if limit is None:
+            return False
+        now = time.monotonic()
+        recent = self._recent[path]
+        while recent and now - recent[0] >= 1.0:
+            recent.popleft()
+        if len(recent) >= limit:
+            return True
+        recent.append(now)
+        return False
+
+    def _authorized(self, handler: BaseHTTPRequestHandler) -> bool:
+        token = (handler.headers.get("Authorization") or "").replace("Bearer ", "")
+        with self._lock:
+            expiry = self.tokens.get(token)
+        return expiry is not None and time.time() < expiry
+
+    @staticmethod
+    def _send(handler: BaseHTTPRequestHandler, status: int, payload, content_type: str = "application/json"):
+        body = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    @staticmethod
+    def _ok(data) -> Dict[str, Any]:
+        return {"status": True, "message": "SUCCESS", "errorcode": "", "data": data}
+
+    # ===== Routes =====
+
+    def _issue(self, client_code: str) -> Dict[str, str]:
+        jwt = make_jwt(client_code, self.token_ttl)
+        refresh = uuid.uuid4().hex
+        with self._lock:
+            self.tokens[jwt] = time.time() + self.token_ttl
+            self.refresh_tokens[refresh] = client_code
+        return {"jwtToken": f"Bearer {jwt}", "refreshToken": refresh, "feedToken": uuid.uuid4().hex}
+
+    def _login(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        if not (body.get("clientcode") and body.get("password") and body.get("totp")):
+            return {"status": False, "message": "Invalid totp", "errorcode": "AB1050", "data": None}
+        return self._ok(self._issue(body["clientcode"]))
+
+    def _generate_tokens(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            client_code = self.refresh_tokens.pop(body.get("refreshToken"), None)
+        if client_code is None:
+            return {"status": False, "message": "Invalid Refresh Token", "errorcode": "AB8051", "data": None}
+        return self._ok(self._issue(client_code))
+
+    def _profile(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return self._ok({"clientcode": "FAKE001", "name": "Fake Client", "exchanges": ["NSE", "BSE", "NFO"]})
+
+    def _logout(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return self._ok(None)
+
+    def _price(self, token: str) -> Tuple[str, str, float]:
+        exchange, symbol, base = INSTRUMENTS.get(token, ("NSE", f"TOKEN{token}", 1000.0))
+        return exchange, symbol, round(base * (1 + self.rng.gauss(0, 0.002)), 2)
+
+    def _ltp(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        exchange, symbol, ltp = self._price(str(body.get("symboltoken")))
+        return self._ok({"exchange": body.get("exchange", exchange), "tradingsymbol": body.get("tradingsymbol", symbol),
+                         "symboltoken": body.get("symboltoken"), "open": ltp, "high": ltp, "low": ltp,
+                         "close": ltp, "ltp": ltp})
+
+    def _quote(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        fetched = []
+        for exchange, tokens in (body.get("exchangeTokens") or {}).items():
+            for token in tokens:
+                _, symbol, ltp = self._price(str(token))
+                close = round(ltp * (1 - self.rng.uniform(-0.02, 0.02)), 2)
+                fetched.append({
+                    "exchange": exchange, "tradingSymbol": symbol, "symbolToken": str(token),
+                    "ltp": ltp, "open": close, "high": max(ltp, close) * 1.005, "low": min(ltp, close) * 0.995,
+                    "close": close, "netChange": round(ltp - close, 2),
+                    "percentChange": round((ltp - close) / close * 100, 2),
+                    "tradeVolume": self.rng.randint(10_000, 5_000_000),
+                    "depth": {"buy": [{"price": round(ltp - 0.05 * (i + 1), 2), "quantity": self.rng.randint(1, 2000),
+                                       "orders": self.rng.randint(1, 20)} for i in range(5)],
+                              "sell": [{"price": round(ltp + 0.05 * (i + 1), 2), "quantity": self.rng.randint(1, 2000),
+                                        "orders": self.rng.randint(1, 20)} for i in range(5)]}
+                })
+        return self._ok({"fetched": fetched, "unfetched": []})
+
+    def _candles(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        minutes = {"ONE_MINUTE": 1, "FIVE_MINUTE": 5, "FIFTEEN_MINUTE": 15, "ONE_HOUR": 60,
+                   "ONE_DAY": 1440}.get(body.get("interval", "ONE_DAY"), 1440)
+        try:
+            start = datetime.strptime(body["fromdate"], "%Y-%m-%d %H:%M")
+            end = datetime.strptime(body["todate"], "%Y-%m-%d %H:%M")
+        except (KeyError, ValueError):
+            return {"status": False, "message": "Invalid date", "errorcode": "AB1012", "data": None}
+        _, _, price = self._price(str(body.get("symboltoken")))
+        candles, t = [], start
+        while t <= end and len(candles) < 5000:
+            if minutes < 1440 or t.weekday() < 5:
+                o = price
+                price = round(price * (1 + self.rng.gauss(0, 0.004)), 2)
+                candles.append([t.strftime("%Y-%m-%dT%H:%M:%S+05:30"), o, max(o, price) * 1.002,
+                                min(o, price) * 0.998, price, self.rng.randint(1_000, 1_000_000)])
+            t += timedelta(minutes=minutes)
+        return self._ok(candles)
+
+    def _search(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        query = str(body.get("searchscrip", "")).upper()
+        matches = [{"exchange": exchange, "tradingsymbol": symbol, "symboltoken": token}
+                   for token, (exchange, symbol, _) in INSTRUMENTS.items() if query and query in symbol.upper()]
+        return self._ok(matches)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local fake Angel One SmartAPI REST server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--token-ttl", type=float, default=3600.0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    fake = FakeSmartAPIServer(args.host, args.port, token_ttl=args.token_ttl, latency=args.latency).start()
+    print(f"Fake SmartAPI running at {fake.url} (set ANGEL_ONE_API_ROOT to use it)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
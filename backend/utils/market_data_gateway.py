@@ -0,0 +1,318 @@
+"""
+Market Data Gateway
+Single entry point for broker quotes. Callers ask for any number of
+instruments and the gateway:
+
+- serves quotes younger than `ttl` seconds from memory,
+- coalesces concurrent requests for the same instrument into one in-flight
+  fetch (single-flight), so N dashboards polling NIFTY cost one broker call,
+- packs the remaining instruments into multi-token getMarketData requests of
+  up to `batch_size` tokens,
+- sends everything through the shared BrokerSession, whose token buckets
+  keep us under SmartAPI's per-endpoint limits.
+
+Symbols in the Yahoo style used by backend.data.tickers ("RELIANCE.NS",
+"SBIN.BO") are resolved to broker tokens once and remembered, either from
+the published instrument master (load_instrument_master) or, for symbols
+it does not cover, via searchScrip.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from backend.utils.broker_session import broker_session
+
+logger = logging.getLogger(__name__)
+
+Instrument = Tuple[str, str]  # (exchange, symbol token)
+
+# SmartAPI accepts at most 50 tokens per getMarketData request
+MAX_BATCH_SIZE = 50
+
+SUFFIX_EXCHANGES = {".NS": "NSE", ".BO": "BSE"}
+
+# Angel One's daily scrip master: [{"token", "symbol", "name", "exch_seg", ...}]
+INSTRUMENT_MASTER_URL = "https://margincalculator.angelbroking.com/OpenAPI_File/files/OpenAPIScripMaster.json"
+
+
+class SingleFlight:
+    """
+    Tracks in-flight work by key. The first caller for a key owns the fetch;
+    later callers get the owner's Future and wait on it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def claim(self, keys: Iterable[Hashable]) -> Tuple[List[Hashable], Dict[Hashable, Future]]:
+        """Split keys into ones this caller must fetch and futures to wait on."""
+        owned, waiting = [], {}
+        with self._lock:
+            for key in keys:
+                future = self._calls.get(key)
+                if future is None:
+                    self._calls[key] = Future()
+                    owned.append(key)
+                else:
+                    waiting[key] = future
+        return owned, waiting
+
+    def resolve(self, key: Hashable, value: Any):
+        with self._lock:
+            future = self._calls.pop(key, None)
+        if future is not None:
+            future.set_result(value)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+def split_symbol(symbol: str, default_exchange: str = "NSE") -> Tuple[str, str]:
+    """'RELIANCE.NS' -> ('NSE', 'RELIANCE'); bare names use default_exchange."""
+    for suffix, exchange in SUFFIX_EXCHANGES.items():
+        if symbol.upper().endswith(suffix):
+            return exchange, symbol[:-len(suffix)]
+    return default_exchange, symbol
+
+
+class MarketDataGateway:
+    """
+    Cached, coalescing, batching front for getMarketData.
+    """
+
+    def __init__(self, session=None, ttl: float = 2.0, batch_size: int = MAX_BATCH_SIZE,
+                 mode: str = "FULL", wait_timeout: float = 15.0, miss_ttl: float = 300.0,
+                 resolve_workers: int = 8):
+        self.session = session or broker_session
+        self.ttl = ttl
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        self.mode = mode
+        self.wait_timeout = wait_timeout
+        # Symbols searchScrip did not know are retried after miss_ttl seconds
+        self.miss_ttl = miss_ttl
+        self.resolve_workers = resolve_workers
+
+        self._quotes: Dict[Instrument, Tuple[float, Dict[str, Any]]] = {}
+        self._tokens: Dict[Tuple[str, str], str] = {}
+        self._token_misses: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+        self._quote_flight = SingleFlight()
+        self._token_flight = SingleFlight()
+
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "fetched": 0,
+                      "broker_calls": 0, "errors": 0}
+
+    # ===== Quotes =====
+
+    def _cached(self, key: Instrument) -> Optional[Dict[str, Any]]:
+        entry = self._quotes.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def get_quotes(self, instruments: Iterable[Instrument]) -> Dict[Instrument, Dict[str, Any]]:
+        """
+        Quotes for (exchange, token) pairs. Instruments the broker did not
+        return are absent from the result.
+        """
+        keys = list(dict.fromkeys((exchange, str(token)) for exchange, token in instruments))
+        result: Dict[Instrument, Dict[str, Any]] = {}
+        missing = []
+        with self._lock:
+            self.stats["requests"] += len(keys)
+            for key in keys:
+                quote = self._cached(key)
+                if quote is not None:
+                    result[key] = quote
+                    self.stats["cache_hits"] += 1
+                else:
+                    missing.append(key)
+        if not missing:
+            return result
+
+        owned, waiting = self._quote_flight.claim(missing)
+        with self._lock:
+            self.stats["coalesced"] += len(waiting)
+        if owned:
+            result.update(self._fetch(owned))
+
+        for key, future in waiting.items():
+            try:
+                quote = future.result(timeout=self.wait_timeout)
+            except Exception:
+                quote = None
+            if quote is not None:
+                result[key] = quote
+        return result
+
+    def get_quote(self, exchange: str, token: str) -> Optional[Dict[str, Any]]:
+        return self.get_quotes([(exchange, token)]).get((exchange, str(token)))
+
+    def _fetch(self, keys: List[Instrument]) -> Dict[Instrument, Dict[str, Any]]:
+        """Fetch owned keys in broker-sized batches and release their waiters."""
+        results: Dict[Instrument, Dict[str, Any]] = {}
+        done = 0
+        try:
+            for start in range(0, len(keys), self.batch_size):
+                chunk = keys[start:start + self.batch_size]
+                fetched = self._request(chunk)
+                expires = time.monotonic() + self.ttl
+                with self._lock:
+                    for key, quote in fetched.items():
+                        self._quotes[key] = (expires, quote)
+                    self.stats["fetched"] += len(fetched)
+                for key in chunk:
+                    self._quote_flight.resolve(key, fetched.get(key))
+                done += len(chunk)
+                results.update(fetched)
+        finally:
+            # Never leave waiters hanging if a batch raised
+            for key in keys[done:]:
+                self._quote_flight.resolve(key, None)
+        return results
+
+    def _request(self, chunk: List[Instrument]) -> Dict[Instrument, Dict[str, Any]]:
+        exchange_tokens: Dict[str, List[str]] = {}
+        for exchange, token in chunk:
+            exchange_tokens.setdefault(exchange, []).append(token)
+        with self._lock:
+            self.stats["broker_calls"] += 1
+        try:
+            response = self.session.call("getMarketData", mode=self.mode, exchangeTokens=exchange_tokens)
+        except Exception as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            logger.error(f"getMarketData failed for {len(chunk)} instruments: {e}")
+            return {}
+        if not response or not response.get("status") or not response.get("data"):
+            with self._lock:
+                self.stats["errors"] += 1
+            return {}
+        return {(q.get("exchange"), str(q.get("symbolToken"))): q for q in response["data"].get("fetched", [])}
+
+    # ===== Symbols =====
+
+    def resolve_token(self, symbol: str, default_exchange: str = "NSE") -> Optional[Instrument]:
+        """
+        Broker (exchange, token) for a ticker. Found tokens are kept for the
+        process; unknown symbols for miss_ttl seconds; failed searches not at all.
+        """
+        key = split_symbol(symbol, default_exchange)
+        token = self._tokens.get(key)
+        if token is None:
+            if self._token_misses.get(key, 0.0) > time.monotonic():
+                return None
+            owned, waiting = self._token_flight.claim([key])
+            if owned:
+                token = None
+                try:
+                    token, known = self._search(*key)
+                    if token:
+                        self._tokens[key] = token
+                    elif known:
+                        self._token_misses[key] = time.monotonic() + self.miss_ttl
+                finally:
+                    self._token_flight.resolve(key, token)
+            else:
+                try:
+                    token = waiting[key].result(timeout=self.wait_timeout)
+                except Exception:
+                    token = None
+        return (key[0], token) if token else None
+
+    def _search(self, exchange: str, name: str) -> Tuple[Optional[str], bool]:
+        """(token, answered): answered is False when the search itself failed."""
+        try:
+            data = self.session.call("searchScrip", exchange, name)
+        except Exception as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            logger.error(f"searchScrip failed for {name}: {e}")
+            return None, False
+        if not data or not data.get("status"):
+            with self._lock:
+                self.stats["errors"] += 1
+            return None, False
+        matches = data.get("data") or []
+        for scrip in matches:
+            if scrip.get("tradingsymbol") in (f"{name}-EQ", name):
+                return scrip.get("symboltoken"), True
+        return (matches[0].get("symboltoken") if matches else None), True
+
+    def load_instrument_master(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Preload symbol tokens from scrip master records so get_prices never
+        waits on searchScrip for them. "-EQ" series win over other series of
+        the same name. Returns the number of symbols loaded.
+        """
+        loaded: Dict[Tuple[str, str], str] = {}
+        for record in records:
+            exchange, symbol, token = record.get("exch_seg"), record.get("symbol"), record.get("token")
+            if not (exchange and symbol and token):
+                continue
+            equity = symbol.endswith("-EQ")
+            key = (exchange, symbol[:-3] if equity else symbol)
+            if equity or key not in loaded:
+                loaded[key] = str(token)
+        self._tokens.update(loaded)
+        return len(loaded)
+
+    def fetch_instrument_master(self, url: str = INSTRUMENT_MASTER_URL, timeout: float = 30.0) -> int:
+        """Download the broker's scrip master and preload it; returns symbols loaded (0 on failure)."""
+        import requests
+        try:
+            response = requests.get(url, timeout=timeout)
+            response.raise_for_status()
+            return self.load_instrument_master(response.json())
+        except Exception as e:
+            logger.error(f"Instrument master download failed: {e}")
+            return 0
+
+    def get_prices(self, symbols: Iterable[str], default_exchange: str = "NSE") -> Dict[str, float]:
+        """Last traded price per ticker symbol, fetched in as few calls as possible."""
+        symbols = list(dict.fromkeys(symbols))
+        cold = [s for s in symbols if split_symbol(s, default_exchange) not in self._tokens]
+        resolved: Dict[str, Optional[Instrument]] = {}
+        if len(cold) > 1:
+            # Overlap the searches; the session's searchScrip bucket still paces them
+            with ThreadPoolExecutor(max_workers=min(len(cold), self.resolve_workers)) as pool:
+                resolved = dict(zip(cold, pool.map(lambda s: self.resolve_token(s, default_exchange), cold)))
+        instruments = {}
+        for symbol in symbols:
+            instrument = resolved[symbol] if symbol in resolved else self.resolve_token(symbol, default_exchange)
+            if instrument:
+                instruments[symbol] = instrument
+        quotes = self.get_quotes(instruments.values())
+        prices = {}
+        for symbol, instrument in instruments.items():
+            quote = quotes.get(instrument)
+            if quote and quote.get("ltp") is not None:
+                prices[symbol] = float(quote["ltp"])
+        return prices
+
+    def get_price(self, symbol: str, default_exchange: str = "NSE") -> Optional[float]:
+        return self.get_prices([symbol], default_exchange).get(symbol)
+
+    # ===== Maintenance =====
+
+    def invalidate(self):
+        """Drop cached quotes (symbol tokens are kept)."""
+        with self._lock:
+            self._quotes.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["cached_quotes"] = len(self._quotes)
+        stats["in_flight"] = self._quote_flight.in_flight()
+        stats["hit_rate"] = round(stats["cache_hits"] / stats["requests"], 3) if stats["requests"] else 0.0
+        return stats
+
+
+# Global instance
+market_data_gateway = MarketDataGateway()
@@ -0,0 +1,288 @@
+"""
+Strategy Deduplication
+Near-duplicate detection for collected strategies using MinHash + LSH.
+
+Each strategy's title and content are normalized and cut into word
+shingles; a MinHash signature estimates the Jaccard similarity between
+shingle sets. Signatures are split into bands and every band is hashed into
+a bucket, so a lookup only compares against strategies sharing at least one
+bucket instead of scanning the table. Candidates are confirmed against the
+stored signature before being reported as duplicates.
+
+The index lives in memory as numpy arrays (about 230 bytes per strategy):
+each band's uint64 bucket keys are kept sorted and looked up with
+searchsorted, and strategies added since the last sort sit in small
+per-band dicts until they are merged in. The global instance rebuilds
+itself from the strategies table on first use and is kept current as
+strategies are saved.
+"""
+
+import logging
+import re
+import threading
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(title: Optional[str], content: Optional[str]) -> str:
+    text = f"{title or ''} {content or ''}".lower()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+class StrategyDeduplicator:
+    """
+    In-memory MinHash/LSH index of strategy texts.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 8,
+        threshold: float = 0.8,
+        shingle_size: int = 3,
+        seed: int = 1,
+        loader: Optional[Callable[[], Iterable[Tuple[int, str, str]]]] = None
+    ):
+        """
+        Args:
+            num_perm: MinHash signature length
+            bands: LSH bands (num_perm / bands rows each); more bands find
+                less similar candidates
+            threshold: Estimated Jaccard similarity at which a strategy is a duplicate
+            shingle_size: Words per shingle
+            seed: Seed for the hash permutations
+            loader: Yields (id, title, content) for existing strategies; read once on first use
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.loader = loader
+        self.loaded = loader is None
+
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: odd 64-bit multipliers, keep the high 32 bits
+        self._a = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+
+        # Per-band multipliers folding a band's rows into one uint64 bucket key
+        self._band_mult = rng.integers(1, 2 ** 63, (bands, self.rows), dtype=np.uint64) | np.uint64(1)
+
+        self._lock = threading.RLock()
+        self._count = 0
+        # Low 16 bits of each signature value; enough to confirm candidates
+        self._signatures = np.zeros((1024, num_perm), dtype=np.uint16)
+        self._ids = np.full(1024, -1, dtype=np.int64)  # -1: not saved yet
+        # Bucket keys of every band sorted once, with the row each key came from
+        self._sorted_keys = np.empty((bands, 0), dtype=np.uint64)
+        self._sorted_rows = np.empty((bands, 0), dtype=np.int32)
+        # Rows added since the last sort: band -> {key: [rows]}
+        self._recent: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+        self._recent_rows: List[int] = []
+        self._recent_keys: List[np.ndarray] = []
+        self.stats = {"lookups": 0, "duplicates": 0, "candidates_checked": 0}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _shingle_hashes(self, title: Optional[str], content: Optional[str]) -> List[int]:
+        words = normalize_text(title, content).split()
+        k = self.shingle_size
+        shingles = {" ".join(words[i:i + k]) for i in range(max(len(words) - k + 1, 1))}
+        return [zlib.crc32(s.encode()) for s in shingles]
+
+    def _minhash(self, hashes: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+        # (num_perm, shingles) so the per-document min runs over contiguous memory
+        permuted = self._a[:, None] * hashes
+        permuted += self._b[:, None]
+        permuted >>= np.uint64(32)
+        return np.minimum.reduceat(permuted, offsets, axis=1).T.astype(np.uint32)
+
+    def signature(self, title: Optional[str], content: Optional[str]) -> np.ndarray:
+        """MinHash signature (uint32[num_perm]) of a strategy's text"""
+        hashes = np.array(self._shingle_hashes(title, content), dtype=np.uint64)
+        return self._minhash(hashes, np.zeros(1, dtype=np.int64))[0]
+
+    def signatures(self, texts: List[Tuple[Optional[str], Optional[str]]]) -> np.ndarray:
+        """Signatures of many (title, content) pairs in one vectorized pass"""
+        shingled = [self._shingle_hashes(title, content) for title, content in texts]
+        lengths = np.fromiter((len(h) for h in shingled), dtype=np.int64, count=len(shingled))
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        hashes = np.fromiter((h for hs in shingled for h in hs), dtype=np.uint64, count=int(lengths.sum()))
+        return self._minhash(hashes, offsets)
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """Bucket keys (uint64[..., bands]) of one or many signatures"""
+        bands = signatures.reshape(*signatures.shape[:-1], self.bands, self.rows).astype(np.uint64)
+        return (bands * self._band_mult).sum(axis=-1, dtype=np.uint64)
+
+    def _candidates(self, keys: np.ndarray) -> set:
+        rows = set()
+        for band, key in enumerate(keys):
+            sorted_keys = self._sorted_keys[band]
+            lo = sorted_keys.searchsorted(key, "left")
+            hi = sorted_keys.searchsorted(key, "right")
+            if hi > lo:
+                rows.update(self._sorted_rows[band, lo:hi].tolist())
+            rows.update(self._recent[band].get(int(key), ()))
+        return rows
+
+    def _match(self, signature: np.ndarray, keys: np.ndarray) -> Optional[int]:
+        candidates = self._candidates(keys)
+        if not candidates:
+            return None
+        self.stats["candidates_checked"] += len(candidates)
+        rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (self._signatures[rows] == signature.astype(np.uint16)).mean(axis=1)
+        best = int(similarity.argmax())
+        return int(rows[best]) if similarity[best] >= self.threshold else None
+
+    def _append(self, signatures: np.ndarray, strategy_ids: np.ndarray) -> np.ndarray:
+        start, end = self._count, self._count + len(signatures)
+        if end > len(self._signatures):
+            capacity = max(end, 2 * len(self._signatures))
+            self._signatures = np.resize(self._signatures, (capacity, self.num_perm))
+            self._ids = np.resize(self._ids, capacity)
+        self._signatures[start:end] = signatures.astype(np.uint16)
+        self._ids[start:end] = strategy_ids
+        self._count = end
+        return np.arange(start, end, dtype=np.int32)
+
+    def _merge(self, rows: np.ndarray, keys: np.ndarray):
+        """Fold rows (with keys[len(rows), bands]) into the sorted band arrays"""
+        all_keys = np.concatenate([self._sorted_keys, keys.T], axis=1)
+        all_rows = np.concatenate([self._sorted_rows, np.broadcast_to(rows, (self.bands, len(rows)))], axis=1)
+        order = all_keys.argsort(axis=1, kind="stable")
+        self._sorted_keys = np.take_along_axis(all_keys, order, axis=1)
+        self._sorted_rows = np.take_along_axis(all_rows, order, axis=1)
+
+    def _flush_recent(self):
+        if not self._recent_rows:
+            return
+        self._merge(np.array(self._recent_rows, dtype=np.int32), np.stack(self._recent_keys))
+        self._recent = [{} for _ in range(self.bands)]
+        self._recent_rows, self._recent_keys = [], []
+
+    def _insert(self, strategy_id: Optional[int], signature: np.ndarray, keys: np.ndarray):
+        row = int(self._append(signature[None], np.array([-1 if strategy_id is None else strategy_id]))[0])
+        for bucket, key in zip(self._recent, keys.tolist()):
+            bucket.setdefault(key, []).append(row)
+        self._recent_rows.append(row)
+        self._recent_keys.append(keys)
+        # Re-sort once the dict side holds ~1/8 of the index: amortized O(log n) per insert
+        if len(self._recent_rows) > max(1024, self._count // 8):
+            self._flush_recent()
+
+    def index_signatures(self, signatures: np.ndarray, strategy_ids: Iterable[Optional[int]]):
+        """Index precomputed signatures (uint32[n, num_perm]) as-is, without duplicate checks"""
+        ids = np.fromiter((-1 if i is None else i for i in strategy_ids), dtype=np.int64, count=len(signatures))
+        # Keys in chunks: the uint64 widening would otherwise double the signatures' size several times over
+        keys = np.concatenate([self._band_keys(signatures[i:i + 65536])
+                               for i in range(0, len(signatures), 65536)] or [np.empty((0, self.bands), np.uint64)])
+        with self._lock:
+            self._flush_recent()
+            self._merge(self._append(signatures, ids), keys)
+
+    def _insert_many(self, rows: List[Tuple[int, str, str]]) -> Tuple[np.ndarray, np.ndarray]:
+        signatures = self.signatures([(title, content) for _, title, content in rows])
+        ids = np.fromiter((strategy_id for strategy_id, _, _ in rows), dtype=np.int64, count=len(rows))
+        return self._append(signatures, ids), self._band_keys(signatures)
+
+    def ensure_loaded(self, chunk_size: int = 1000):
+        """Rebuild the index from the loader once (saved duplicates are indexed too)"""
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            chunk, added = [], []
+            try:
+                for row in self.loader():
+                    chunk.append(row)
+                    if len(chunk) >= chunk_size:
+                        added.append(self._insert_many(chunk))
+                        chunk = []
+                if chunk:
+                    added.append(self._insert_many(chunk))
+                if added:
+                    # One sort for the whole table instead of one per chunk
+                    self._merge(np.concatenate([rows for rows, _ in added]),
+                                np.concatenate([keys for _, keys in added]))
+                logger.info(f"Strategy dedup index rebuilt with {self._count} strategies")
+            except Exception as e:
+                logger.error(f"Failed to rebuild strategy dedup index: {e}")
+            self.loaded = True
+
+    def find(self, title: Optional[str], content: Optional[str]) -> Optional[int]:
+        """
+        Look up a near-duplicate of a strategy
+
+        Returns:
+            Index row of the matching strategy (see strategy_id()), or None
+        """
+        self.ensure_loaded()
+        signature = self.signature(title, content)
+        keys = self._band_keys(signature)
+        with self._lock:
+            self.stats["lookups"] += 1
+            row = self._match(signature, keys)
+            if row is not None:
+                self.stats["duplicates"] += 1
+            return row
+
+    def add(self, title: Optional[str], content: Optional[str], strategy_id: Optional[int] = None) -> Optional[int]:
+        """
+        Register a strategy unless it near-duplicates one already indexed
+
+        Args:
+            title: Strategy title
+            content: Strategy content
+            strategy_id: Database id, if the strategy has been saved
+
+        Returns:
+            None if the strategy was added, else the index row it duplicates
+        """
+        self.ensure_loaded()
+        signature = self.signature(title, content)
+        keys = self._band_keys(signature)
+        with self._lock:
+            self.stats["lookups"] += 1
+            row = self._match(signature, keys)
+            if row is not None:
+                self.stats["duplicates"] += 1
+                if self._ids[row] < 0 and strategy_id is not None:
+                    self._ids[row] = strategy_id
+                return row
+            self._insert(strategy_id, signature, keys)
+            return None
+
+    def strategy_id(self, row: int) -> Optional[int]:
+        strategy_id = int(self._ids[row])
+        return None if strategy_id < 0 else strategy_id
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["indexed"] = self._count
+            stats["index_bytes"] = int(self._signatures[:self._count].nbytes + self._ids[:self._count].nbytes +
+                                       self._sorted_keys.nbytes + self._sorted_rows.nbytes)
+            stats["loaded"] = self.loaded
+            return stats
+
+
+def _load_saved_strategies() -> Iterable[Tuple[int, str, str]]:
+    from backend.database.db import db
+    return db.iter_strategy_texts()
+
+
+# Global instance
+strategy_deduplicator = StrategyDeduplicator(loader=_load_saved_strategies)
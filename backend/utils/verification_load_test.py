@@ -0,0 +1,174 @@
+"""
+Verification Load Test
+Drives the verification -> consensus path at a fixed concurrency and reports
+throughput and latency percentiles, so pool sizes, per-model concurrency,
+quorum and routing settings can be tuned offline against the fake OpenRouter
+server (or any OpenRouter-compatible endpoint).
+
+    python -m backend.utils.verification_load_test --requests 200 --concurrency 20 \\
+        --median-latency 1.0 --timeout-rate 0.02 --quorum 5 --stream
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.ai.consensus_engine import ConsensusEngine
+from backend.ai.model_manager import ModelManager
+from backend.ai.multi_ai_verifier import MultiAIVerifier
+from backend.utils.fake_openrouter_server import (
+    FakeOpenRouterServer,
+    add_profile_arguments,
+    profile_from_args
+)
+
+logger = logging.getLogger(__name__)
+
+INDICATORS = ["RSI", "MACD", "Bollinger Band", "VWAP", "SuperTrend", "EMA crossover", "ADX", "Stochastic"]
+
+
+def synthetic_strategies(count: int) -> List[str]:
+    """Distinct strategy texts, so neither cache nor dedup short-circuits the run"""
+    return [
+        f"Strategy #{i}: enter long when {INDICATORS[i % len(INDICATORS)]} confirms a breakout "
+        f"above the {10 + i % 40}-bar high on {5 * (1 + i % 6)}-minute candles; "
+        f"stop loss {1 + i % 3}% and take profit {2 + i % 5}%."
+        for i in range(count)
+    ]
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    array = np.asarray(values)
+    report = {f"p{q}": round(float(np.percentile(array, q)), 4) for q in (50, 90, 95, 99)}
+    report["mean"] = round(float(array.mean()), 4)
+    report["max"] = round(float(array.max()), 4)
+    return report
+
+
+async def run_load_test(
+    verifier: MultiAIVerifier,
+    strategies: List[str],
+    concurrency: int,
+    consensus_engine: Optional[ConsensusEngine] = None
+) -> Dict:
+    """
+    Verify every strategy with at most `concurrency` verifications in flight
+
+    Args:
+        verifier: Verifier pointed at the endpoint under test
+        strategies: Strategy texts to verify
+        concurrency: Verifications in flight at once
+        consensus_engine: Engine computing each consensus (uncached by default)
+
+    Returns:
+        Report with throughput, latency percentiles and outcome counts
+    """
+    engine = consensus_engine or ConsensusEngine(cache=None)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    model_latencies: List[float] = []
+    outcomes: Counter = Counter()
+    recommendations: Counter = Counter()
+
+    async def verify_one(text: str):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await verifier.verify_strategy_async(text)
+                consensus = engine.calculate_consensus(result["responses"], cache_key=result.get("cache_key"))
+            except Exception as e:
+                outcomes["errors"] += 1
+                logger.warning(f"Verification failed: {e}")
+                return
+            latencies.append(time.perf_counter() - started)
+            outcomes["model_calls_ok"] += result["successful_responses"]
+            outcomes["model_calls_failed"] += result["failed_responses"]
+            outcomes["model_calls_cancelled"] += result.get("cancelled_responses", 0)
+            outcomes["early_exits"] += int(result.get("early_exit", False))
+            model_latencies.extend(r["duration"] for r in result["responses"] if r["success"] and not r.get("cached"))
+            recommendations[consensus.get("consensus_recommendation", "FAILED")] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(verify_one(text) for text in strategies))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "verifications": len(latencies),
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "verification_latency": percentiles(latencies),
+        "model_latency": percentiles(model_latencies),
+        "outcomes": dict(outcomes),
+        "recommendations": dict(recommendations),
+        "verifier": verifier.get_stats()
+    }
+
+
+async def _main(args: argparse.Namespace) -> Dict:
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = FakeOpenRouterServer(default_profile=profile_from_args(args), seed=args.seed).start()
+        base_url = server.url
+
+    verifier = MultiAIVerifier(
+        api_key=args.api_key,
+        base_url=base_url,
+        connection_limit=args.connection_limit,
+        limit_per_host=args.limit_per_host,
+        cache=None,
+        quorum=args.quorum,
+        confidence_bound=args.confidence_bound,
+        audit_rate=args.audit_rate,
+        model_concurrency=args.model_concurrency,
+        router=ModelManager(),
+        target_weight=args.target_weight,
+        request_timeout=args.request_timeout,
+        stream=args.stream
+    )
+    try:
+        report = await run_load_test(verifier, synthetic_strategies(args.requests), args.concurrency)
+        # Let sampled early-exit audits finish so the agreement rate is reported
+        await verifier.wait_for_audits()
+        report["verifier"] = verifier.get_stats()
+        if server is not None:
+            report["server"] = {"requests": server.requests, "errors": sum(server.errors.values()),
+                                "timeouts": sum(server.timeouts.values()),
+                                "completion_tokens": sum(server.completion_tokens.values()),
+                                "streams_closed": sum(server.streams_closed.values())}
+        return report
+    finally:
+        await verifier.aclose()
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the multi-AI verification path")
+    parser.add_argument("--base-url", default=None, help="Endpoint under test (default: in-process fake server)")
+    parser.add_argument("--api-key", default="load-test")
+    parser.add_argument("--requests", type=int, default=100, help="Strategies to verify")
+    parser.add_argument("--concurrency", type=int, default=10, help="Verifications in flight")
+    parser.add_argument("--connection-limit", type=int, default=64)
+    parser.add_argument("--limit-per-host", type=int, default=16)
+    parser.add_argument("--model-concurrency", type=int, default=4)
+    parser.add_argument("--quorum", type=int, default=None)
+    parser.add_argument("--confidence-bound", type=float, default=None)
+    parser.add_argument("--audit-rate", type=float, default=0.1)
+    parser.add_argument("--target-weight", type=float, default=None)
+    parser.add_argument("--request-timeout", type=float, default=30.0)
+    parser.add_argument("--stream", action="store_true", help="Stream answers and stop once they are scored")
+    parser.add_argument("--seed", type=int, default=7)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    print(json.dumps(asyncio.run(_main(args)), indent=2))
@@ -0,0 +1,126 @@
+"""
+Benchmark harness: timing, peak memory, JSON results and baseline comparison.
+"""
+
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+def measure(fn: Callable[[Any], Any], repeats: int = 5, warmup: int = 1,
+            setup: Optional[Callable[[], Any]] = None, items: int = 1) -> Dict[str, Any]:
+    """
+    Time fn(setup()) `repeats` times after `warmup` untimed calls. Setup runs
+    outside the timed region. Peak memory comes from one extra traced run so
+    tracemalloc overhead never leaks into the latency numbers.
+    """
+    setup = setup or (lambda: None)
+    for _ in range(warmup):
+        fn(setup())
+
+    timings: List[float] = []
+    for _ in range(repeats):
+        arg = setup()
+        start = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - start)
+
+    arg = setup()
+    tracemalloc.start()
+    try:
+        fn(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    mean = statistics.fmean(timings)
+    return {
+        "repeats": repeats,
+        "items": items,
+        "p50_ms": round(_percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(_percentile(timings, 95) * 1000, 3),
+        "mean_ms": round(mean * 1000, 3),
+        "min_ms": round(timings[0] * 1000, 3),
+        "throughput_per_s": round(items / mean, 2) if mean > 0 else None,
+        "peak_memory_kb": round(peak / 1024, 1)
+    }
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+def save_results(results: Dict[str, Any], path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def new_run(label: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "label": label,
+        "timestamp": datetime.now().isoformat(),
+        "environment": environment(),
+        "cases": {}
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], time_threshold: float = 0.15,
+            memory_threshold: float = 0.25) -> List[Dict[str, Any]]:
+    """
+    Compare two runs case by case. A case regresses when its p50 latency or
+    peak memory grows by more than the given fraction over the baseline.
+    """
+    rows = []
+    for name, base in baseline.get("cases", {}).items():
+        cur = current.get("cases", {}).get(name)
+        if "skipped" in base or (cur is not None and "skipped" in cur):
+            rows.append({"case": name, "status": "skipped"})
+            continue
+        if cur is None or "p50_ms" not in base or "p50_ms" not in cur:
+            rows.append({"case": name, "status": "missing"})
+            continue
+
+        time_ratio = cur["p50_ms"] / base["p50_ms"] if base["p50_ms"] else 1.0
+        mem_ratio = cur["peak_memory_kb"] / base["peak_memory_kb"] if base["peak_memory_kb"] else 1.0
+        if time_ratio > 1 + time_threshold or mem_ratio > 1 + memory_threshold:
+            status = "regression"
+        elif time_ratio < 1 - time_threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({
+            "case": name,
+            "status": status,
+            "baseline_p50_ms": base["p50_ms"],
+            "current_p50_ms": cur["p50_ms"],
+            "time_ratio": round(time_ratio, 3),
+            "memory_ratio": round(mem_ratio, 3)
+        })
+    return rows
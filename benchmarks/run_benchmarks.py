@@ -0,0 +1,226 @@
+"""
+Offline benchmark suite for the backtest, evolution and ML hot paths.
+
+Usage:
+    python benchmarks/run_benchmarks.py run [--quick] [--only backtest] [--output results.json]
+    python benchmarks/run_benchmarks.py compare benchmarks/baseline.json results.json [--threshold 0.15]
+
+`run` writes a JSON report (p50/p95 latency, throughput, peak memory per
+case). `compare` exits non-zero when any case regressed against the
+baseline, so it can gate CI.
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep every benchmark on a throwaway SQLite file, never the real database
+_BENCH_DB_DIR = tempfile.mkdtemp(prefix="gitta_bench_")
+os.environ["DATABASE_URL"] = ""
+os.environ["SQLITE_PATH"] = os.path.join(_BENCH_DB_DIR, "bench.db")
+
+from benchmarks.harness import measure, new_run, save_results, load_results, compare  # noqa: E402
+from benchmarks.synthetic import SyntheticDataProvider, synthetic_ohlcv  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+STRATEGIES = ["SMA_CROSSOVER", "RSI_STRATEGY", "EVOLUTION_DNA"]
+POPULATION_SIZES = [50, 500, 5000]
+
+
+def _engine(cached: bool = False):
+    from backend.intelligence.backtester import BacktestEngine
+    from backend.intelligence.backtest_cache import BacktestCache
+
+    # An uncached engine measures the simulation itself, not cache lookups
+    cache = BacktestCache(cache_dir=None) if cached else BacktestCache(max_memory_entries=0, cache_dir=None)
+    return BacktestEngine(data_provider=SyntheticDataProvider(), cache=cache)
+
+
+def backtest_cases(quick: bool):
+    repeats = 5 if quick else 30
+    for strategy in STRATEGIES:
+        engine = _engine()
+        yield f"backtest.run_backtest[{strategy}]", lambda engine=engine, strategy=strategy: measure(
+            lambda _: engine.run_backtest("BENCH", strategy, "2y"), repeats=repeats)
+
+    cached_engine = _engine(cached=True)
+    yield "backtest.run_backtest[cached]", lambda: measure(
+        lambda _: cached_engine.run_backtest("BENCH", "SMA_CROSSOVER", "2y"), repeats=repeats)
+
+    sim_engine = _engine()
+    signals = sim_engine._apply_strategy(synthetic_ohlcv(1260), "EVOLUTION_DNA")
+    yield "backtest._simulate_trades[5y]", lambda: measure(
+        lambda _: sim_engine._simulate_trades(signals, 100000), repeats=repeats, items=len(signals))
+
+
+class _NullEvolutionLog:
+    """Population.evolve logs every generation; keep DB latency out of the GA numbers."""
+
+    def log_evolution(self, **kwargs):
+        pass
+
+
+def evolution_cases(quick: bool):
+    from backend.evolution.population import Population
+
+    sizes = POPULATION_SIZES[:2] if quick else POPULATION_SIZES
+    for size in sizes:
+        def _setup(size=size):
+            random.seed(size)
+            population = Population(population_size=size, backtester=_engine())
+            population.db = _NullEvolutionLog()
+            population.create_initial_population()
+            return population
+
+        repeats = 1 if size >= 5000 or quick else 3
+        yield f"evolution.Population.evolve[{size}]", lambda _setup=_setup, size=size, repeats=repeats: measure(
+            lambda population: population.evolve(), repeats=repeats, warmup=0, setup=_setup, items=size)
+
+
+def tester_cases(quick: bool):
+    from backend.agents.testers.tester_manager import TesterManager
+    from backend.evolution.organism import TradingOrganism
+
+    n = 5 if quick else 20
+    random.seed(0)
+    organisms = [TradingOrganism.create_random(generation=0, organism_id=f"bench_{i}") for i in range(n)]
+    manager = TesterManager(backtester=_engine())
+    yield f"testers.TesterManager.test_population[{n}]", lambda: measure(
+        lambda _: manager.test_population(organisms), repeats=2 if quick else 3, warmup=0, items=n)
+
+
+def ml_cases(quick: bool):
+    from backend.ml.feature_engineering import FeatureEngineer
+
+    engineer = FeatureEngineer()
+    df = synthetic_ohlcv(1260)
+    yield "ml.FeatureEngineer.prepare_data[5y]", lambda: measure(
+        lambda _: engineer.prepare_data(df), repeats=5 if quick else 30, items=len(df))
+
+
+def screener_cases(quick: bool):
+    from backend.intelligence.screener import ScreenerEngine
+
+    n = 100 if quick else 500
+    engine = ScreenerEngine(data_provider=SyntheticDataProvider(), universe=[f"S{i}.NS" for i in range(n)])
+    engine.load_from_provider()
+    # Dashboard reads are served from the per-screen result cache
+    yield f"screener.get_results[cached,{n}]", lambda: measure(
+        lambda _: engine.get_results(refresh=False), repeats=100 if quick else 1000, items=len(engine.screens))
+    # Default dashboard path: staleness check, then the same cache
+    yield f"screener.get_results[refresh,{n}]", lambda: measure(
+        lambda _: engine.get_results(), repeats=100 if quick else 1000, items=len(engine.screens))
+
+
+def dedup_cases(quick: bool):
+    import numpy as np
+    from backend.utils.strategy_dedup import StrategyDeduplicator
+
+    n = 2000 if quick else 20000
+    rng = np.random.default_rng(1)
+    words = np.array([f"w{i}" for i in range(5000)])
+    corpus = [(i, f"strategy {i}", " ".join(words[row])) for i, row in enumerate(rng.integers(0, 5000, (n, 40)))]
+    index = StrategyDeduplicator(loader=lambda: corpus)
+    index.ensure_loaded()
+    probes = [(title, content + " extra") for _, title, content in corpus[:500]]
+    yield f"dedup.StrategyDeduplicator.find[{n}]", lambda: measure(
+        lambda _: [index.find(title, content) for title, content in probes], repeats=3 if quick else 10,
+        items=len(probes))
+
+    # Table-scale index from synthetic signatures (text shingling is covered above). The
+    # build's peak memory is the index itself plus the band sort's scratch arrays
+    big = 1_000_000
+    sig_rng = np.random.default_rng(2)
+    big_index = StrategyDeduplicator()
+    signatures = sig_rng.integers(0, 2 ** 32, (big, big_index.num_perm), dtype=np.uint32)
+    yield f"dedup.StrategyDeduplicator.index_signatures[{big}]", lambda: measure(
+        lambda sigs: StrategyDeduplicator().index_signatures(sigs, range(big)), setup=lambda: signatures,
+        repeats=1 if quick else 3, warmup=0, items=big)
+
+    big_index.index_signatures(signatures, range(big))
+    big_probes = signatures[:500].copy()
+    big_probes[:, :4] += np.uint32(1)  # near duplicates: 4 of 64 values differ
+    yield f"dedup.StrategyDeduplicator.match[{big}]", lambda: measure(
+        lambda _: [big_index._match(sig, big_index._band_keys(sig)) for sig in big_probes],
+        repeats=3 if quick else 10, items=len(big_probes))
+
+SUITES = {
+    "backtest": backtest_cases,
+    "evolution": evolution_cases,
+    "testers": tester_cases,
+    "ml": ml_cases,
+    "screener": screener_cases,
+    "dedup": dedup_cases
+}
+
+
+def run(args) -> int:
+    report = new_run(args.label)
+    for suite_name, suite in SUITES.items():
+        if args.only and args.only not in suite_name:
+            continue
+        try:
+            cases = list(suite(args.quick))
+        except ImportError as e:
+            # Suites whose modules need the full backend environment are
+            # recorded as skipped rather than failing the whole run
+            report["cases"][suite_name] = {"skipped": str(e)}
+            print(f"{suite_name:<45} skipped: {e}")
+            continue
+
+        for name, bench in cases:
+            result = bench()
+            report["cases"][name] = result
+            print(f"{name:<45} p50 {result['p50_ms']:>10.3f} ms  p95 {result['p95_ms']:>10.3f} ms  "
+                  f"{result['throughput_per_s']:>10} /s  peak {result['peak_memory_kb']:>9.1f} KB")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    save_results(report, output)
+    print(f"\nResults saved to {output}")
+    return 0
+
+
+def compare_cmd(args) -> int:
+    rows = compare(load_results(args.baseline), load_results(args.current),
+                   time_threshold=args.threshold, memory_threshold=args.memory_threshold)
+    regressions = 0
+    for row in rows:
+        if row["status"] in ("missing", "skipped"):
+            print(f"{row['case']:<45} {row['status']}")
+            continue
+        print(f"{row['case']:<45} {row['baseline_p50_ms']:>10.3f} -> {row['current_p50_ms']:>10.3f} ms "
+              f"(x{row['time_ratio']:.2f}, mem x{row['memory_ratio']:.2f})  {row['status'].upper()}")
+        regressions += row["status"] == "regression"
+    print(f"\n{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Run benchmarks and save a JSON report")
+    run_parser.add_argument("--quick", action="store_true", help="Fewer repeats, skip the 5000 population")
+    run_parser.add_argument("--only", help="Only run suites whose name contains this string")
+    run_parser.add_argument("--output", help="Path of the JSON report")
+    run_parser.add_argument("--label", help="Free-form label stored in the report")
+
+    cmp_parser = sub.add_parser("compare", help="Flag regressions against a baseline report")
+    cmp_parser.add_argument("baseline")
+    cmp_parser.add_argument("current")
+    cmp_parser.add_argument("--threshold", type=float, default=0.15, help="Allowed p50 slowdown (fraction)")
+    cmp_parser.add_argument("--memory-threshold", type=float, default=0.25, help="Allowed peak memory growth")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    return run(args) if args.command == "run" else compare_cmd(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
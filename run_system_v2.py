@@ -26,6 +26,7 @@ sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
 from backend.agents.collectors.market_data import NSEDataCollector
 from backend.database.db import db
+from backend.utils.strategy_dedup import strategy_deduplicator
 
 # File Paths
 STATUS_FILE = os.path.join(os.path.dirname(__file__), 'backend/data/status.json')
@@ -92,14 +93,18 @@ def log_activity(agent_id, activity_type, description):
         print(f"Log Error: {e}")
 
 def save_collected_strategy(collector_id, source, title, content):
-    """Save a collected strategy to the database."""
+    """Save a collected strategy to the database, skipping near-duplicates of saved ones."""
+    if strategy_deduplicator.find(title, content) is not None:
+        return None
     try:
         with sqlite3.connect(DB_PATH, timeout=10.0) as conn:
-            conn.execute(
+            cursor = conn.execute(
                 "INSERT INTO strategies (collector_id, source, title, content, status, collected_at) VALUES (?, ?, ?, ?, 'new', ?)", 
                 (collector_id, source, title, content, datetime.now())
             )
             conn.commit()
+            strategy_deduplicator.add(title, content, cursor.lastrowid)
+            return cursor.lastrowid
     except Exception as e:
         print(f"Strategy Save Error: {e}")
 
@@ -269,6 +274,9 @@ async def main():
     
     # Create tasks for all agents
     tasks = [
+        # Index saved strategies off the loop while agents start; the first dedupe waits for it if needed
+        asyncio.to_thread(strategy_deduplicator.ensure_loaded),
+        
         run_market_data_agent(),
         run_technical_agent(),
         run_order_book_agent(),
@@ -0,0 +1,92 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from backend.intelligence.backtester import BacktestEngine
+from backend.intelligence.backtest_cache import BacktestCache, normalize_params
+
+
+def _prices(n=300, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n)))
+    return pd.DataFrame({"Close": close, "Volume": 1000}, index=pd.bdate_range("2022-01-01", periods=n))
+
+
+class _StaticProvider:
+    def __init__(self, df):
+        self.df = df
+        self.calls = 0
+
+    def get_historical_data(self, symbol, period="1y", interval="1d"):
+        self.calls += 1
+        return self.df
+
+
+def test_normalize_params_fills_defaults_and_drops_unused():
+    defaults = {"ma_fast": 50, "ma_slow": 200}
+    assert normalize_params(None, defaults) == normalize_params({"ma_fast": 50.0, "extra": 1}, defaults)
+
+
+def test_repeat_backtest_hits_memory_then_disk(tmp_path):
+    provider = _StaticProvider(_prices())
+    cache = BacktestCache(cache_dir=str(tmp_path))
+    engine = BacktestEngine(data_provider=provider, cache=cache)
+
+    first = engine.run_backtest("TCS", "SMA_CROSSOVER", "1y", strategy_params={"ma_fast": 10, "ma_slow": 30})
+    second = engine.run_backtest("TCS", "SMA_CROSSOVER", "1y", strategy_params={"ma_fast": 10, "ma_slow": 30})
+    assert first == second
+    assert cache.stats["memory_hits"] == 1
+
+    # A fresh process only has the disk tier
+    cold = BacktestEngine(data_provider=provider, cache=BacktestCache(cache_dir=str(tmp_path)))
+    assert cold.run_backtest("TCS", "SMA_CROSSOVER", "1y", strategy_params={"ma_fast": 10, "ma_slow": 30}) == first
+    assert cold.cache.stats["disk_hits"] == 1
+
+
+def test_new_bars_invalidate_series(tmp_path):
+    df = _prices()
+    provider = _StaticProvider(df.iloc[:-1])
+    cache = BacktestCache(cache_dir=str(tmp_path))
+    engine = BacktestEngine(data_provider=provider, cache=cache)
+
+    engine.run_backtest("INFY", "RSI_STRATEGY", "1y")
+    provider.df = df
+    engine.run_backtest("INFY", "RSI_STRATEGY", "1y")
+
+    stats = cache.get_stats()
+    assert stats["invalidations"] == 1
+    assert stats["misses"] == 2
+    assert stats["disk_entries"] == 1
+
+
+def test_memory_and_disk_caps(tmp_path):
+    cache = BacktestCache(max_memory_entries=2, cache_dir=str(tmp_path), max_disk_entries=3)
+    for i in range(5):
+        cache.set(f"key{i}", {"final_equity": i})
+    stats = cache.get_stats()
+    assert stats["memory_entries"] == 2
+    assert stats["disk_entries"] == 3
+    assert stats["status"] == "memory+disk"
+    assert BacktestCache(cache_dir=None).get_stats()["status"] == "memory_only"
+
+
+def test_disk_caps_are_tracked_without_rescanning(tmp_path, monkeypatch):
+    BacktestCache(cache_dir=str(tmp_path)).set("old", {"final_equity": 0})
+    cache = BacktestCache(max_memory_entries=0, cache_dir=str(tmp_path), max_disk_bytes=100)
+    assert cache.get_stats()["disk_entries"] == 1  # seeded from the directory
+
+    def no_listdir(path):
+        raise AssertionError("disk tier rescanned")
+
+    monkeypatch.setattr("backend.intelligence.backtest_cache.os.listdir", no_listdir)
+    for i in range(10):
+        cache.set(f"key{i}", {"final_equity": i, "trades": [1.0, 2.0]})
+    stats = cache.get_stats()
+    assert stats["disk_bytes"] <= 100 and stats["disk_bytes"] == sum(p.stat().st_size for p in tmp_path.glob("*.json"))
+    assert not (tmp_path / "old.json").exists() and (tmp_path / "key9.json").exists()
+    assert cache.get("key9")["final_equity"] == 9
@@ -0,0 +1,94 @@
+import sys
+import os
+import time
+from datetime import datetime, date
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.streaming.bar_aggregator import BarAggregator, NSESessionClock, IST
+from backend.streaming.smartapi_protocol import Tick, MODE_QUOTE, NSE_CM
+
+
+def _epoch(hh, mm, ss=0, day=(2024, 3, 4)):
+    return datetime(*day, hh, mm, ss, tzinfo=IST).timestamp()  # 2024-03-04 is a Monday
+
+
+def test_clock_aligns_bars_to_session_open():
+    clock = NSESessionClock(holidays=[date(2024, 3, 8)])
+    start, end = clock.bucket(_epoch(9, 31), 900)
+    assert start == _epoch(9, 30) and end == _epoch(9, 45)
+
+    # Last hourly bar is cut at the 15:30 close
+    start, end = clock.bucket(_epoch(15, 20), 3600)
+    assert start == _epoch(15, 15) and end == _epoch(15, 30)
+
+    assert clock.bucket(_epoch(9, 14, 59), 60) is None
+    assert clock.bucket(_epoch(15, 30), 60) is None
+    assert clock.bucket(_epoch(10, 0, day=(2024, 3, 9)), 60) is None   # Saturday
+    assert clock.bucket(_epoch(10, 0, day=(2024, 3, 8)), 60) is None   # holiday
+
+
+def test_ohlcv_vwap_and_batched_emission():
+    agg = BarAggregator(timeframes=["1m", "5m"], capacity=2)
+    batches = []
+    agg.add_bar_listener(batches.append)
+
+    # Cumulative day volume as the broker sends it
+    ticks = [(9, 15, 5, 100.0, 1000), (9, 15, 30, 102.0, 1100), (9, 15, 50, 99.0, 1300), (9, 16, 1, 101.0, 1400)]
+    for hh, mm, ss, price, cum in ticks:
+        agg.on_tick(Tick("2885", NSE_CM, MODE_QUOTE, 1, int(_epoch(hh, mm, ss) * 1000), price, 10, None, cum))
+    for token in range(5):  # force slot growth past capacity
+        agg.on_tick(Tick(f"T{token}", NSE_CM, MODE_QUOTE, 1, int(_epoch(9, 16) * 1000), 50.0, 1, None, 1))
+    agg.flush()
+
+    first = batches[0][0]
+    assert (first["timeframe"], first["open"], first["high"], first["low"], first["close"]) == ("1m", 100.0, 102.0, 99.0, 99.0)
+    assert first["volume"] == 10 + 100 + 200
+    assert abs(first["vwap"] - (100 * 10 + 102 * 100 + 99 * 200) / 310) < 1e-9
+    assert first["timestamp"] == datetime(2024, 3, 4, 9, 15)
+
+    five = agg.current_bar("2885", "5m")
+    assert five["open"] == 100.0 and five["close"] == 101.0 and five["volume"] == 410
+
+
+def test_advance_closes_idle_bars():
+    agg = BarAggregator(timeframes=["1m", "15m"])
+    emitted = []
+    agg.add_bar_listener(emitted.extend)
+    agg.update(agg.symbol_id("NIFTY"), _epoch(9, 20, 10), 22000.0, 5)
+    assert agg.advance(_epoch(9, 21)) == 1
+    assert agg.advance(_epoch(9, 30)) == 1
+    assert [b["timeframe"] for b in emitted] == ["1m", "15m"]
+    assert agg.current_bar("NIFTY", "1m") is None
+
+
+def test_late_tick_does_not_reopen_closed_bar():
+    agg = BarAggregator(timeframes=["1m", "5m"])
+    emitted = []
+    agg.add_bar_listener(emitted.extend)
+    sid = agg.symbol_id("NIFTY")
+    agg.update(sid, _epoch(9, 20, 10), 22000.0, 5)
+    agg.advance(_epoch(9, 21))
+    agg.update(sid, _epoch(9, 20, 50), 22010.0, 5)   # arrives after its 1m bar closed
+    agg.update(sid, _epoch(9, 21, 5), 22005.0, 5)
+    agg.advance(_epoch(9, 25))
+
+    one_minute = [b["timestamp"] for b in emitted if b["timeframe"] == "1m"]
+    assert one_minute == [datetime(2024, 3, 4, 9, 20), datetime(2024, 3, 4, 9, 21)]
+    assert agg.stats["late_ticks"] == 1
+    # The 5m bar was still open, so it keeps the late trade
+    five = [b for b in emitted if b["timeframe"] == "5m"][0]
+    assert five["high"] == 22010.0 and five["volume"] == 15
+
+
+def test_nifty500_throughput():
+    agg = BarAggregator(timeframes=["1m", "5m", "15m"], capacity=500)
+    ids = [agg.symbol_id(f"S{i}") for i in range(500)]
+    base = _epoch(10, 0)
+    n = 50000
+    start = time.perf_counter()
+    for i in range(n):
+        agg.update(ids[i % 500], base + i * 0.01, 100.0 + (i % 7), 1)
+    rate = n / (time.perf_counter() - start)
+    assert rate > 20000
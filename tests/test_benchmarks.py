@@ -0,0 +1,26 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import compare, measure
+
+
+def _run(p50, peak=100.0):
+    return {"cases": {"case": {"p50_ms": p50, "peak_memory_kb": peak}}}
+
+
+def test_measure_reports_latency_and_memory():
+    result = measure(lambda _: sum(range(1000)), repeats=5, items=1000)
+    assert result["p50_ms"] <= result["p95_ms"]
+    assert result["throughput_per_s"] > 0
+    assert result["peak_memory_kb"] >= 0
+
+
+def test_compare_flags_regressions():
+    assert compare(_run(10.0), _run(10.5))[0]["status"] == "ok"
+    assert compare(_run(10.0), _run(12.0))[0]["status"] == "regression"
+    assert compare(_run(10.0), _run(5.0))[0]["status"] == "improved"
+    assert compare(_run(10.0, peak=100), _run(10.0, peak=200))[0]["status"] == "regression"
+    assert compare(_run(10.0), {"cases": {}})[0]["status"] == "missing"
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("SmartApi")
+
+from backend.utils.broker_session import BrokerSession, TokenBucket, jwt_expiry
+from backend.utils.fake_smartapi_server import FakeSmartAPIServer
+
+
+@pytest.fixture
+def fake(tmp_path, monkeypatch):
+    # SmartConnect writes its log folder into the working directory
+    monkeypatch.chdir(tmp_path)
+    server = FakeSmartAPIServer(token_ttl=3600, enforce_rate_limits=True).start()
+    yield server
+    server.stop()
+
+
+def _session(server, **kwargs):
+    return BrokerSession(api_key="key", client_id="C1", password="1234", totp_secret="SECRET",
+                         root=server.url, totp_factory=lambda secret: "123456", **kwargs)
+
+
+def test_one_login_serves_every_caller(fake):
+    session = _session(fake)
+    for _ in range(5):
+        quote = session.call("ltpData", "NSE", "Nifty 50", "99926000")
+        assert quote["status"] and quote["data"]["ltp"] > 0
+    market = session.call("getMarketData", mode="FULL", exchangeTokens={"NSE": ["2885", "1594"]})
+    assert len(market["data"]["fetched"]) == 2
+
+    assert fake.logins == 1
+    assert session.get_stats()["logins"] == 1
+    assert jwt_expiry(session.auth_token) == pytest.approx(time.time() + 3600, abs=5)
+
+
+def test_refreshes_before_expiry_instead_of_logging_in(fake):
+    fake.token_ttl = 30
+    session = _session(fake, refresh_margin=60)  # every token is already "near expiry"
+    assert session.ensure_session()
+    first = session.auth_token
+    time.sleep(1.0)  # generateTokens is limited to 1/s on the server
+    assert session.ensure_session()
+
+    assert session.auth_token != first
+    assert fake.logins == 1 and fake.refreshes == 1
+
+
+def test_invalid_token_is_retried_after_reauth(fake):
+    session = _session(fake)
+    assert session.call("ltpData", "NSE", "RELIANCE-EQ", "2885")["status"]
+    fake.expire_all_tokens()
+    time.sleep(1.0)
+
+    response = session.call("ltpData", "NSE", "RELIANCE-EQ", "2885")
+    assert response["status"]
+    assert session.stats["token_retries"] == 1
+    assert fake.refreshes == 1 and fake.logins == 1
+
+
+def test_buckets_keep_calls_under_broker_limits(fake):
+    session = _session(fake)  # searchScrip: 1 request/s, same as the server
+    session.ensure_session()
+    start = time.monotonic()
+    for _ in range(3):
+        assert session.call("searchScrip", "NSE", "INFY")["status"]
+    assert time.monotonic() - start >= 1.9
+    # Arrival jitter can still trip the server's window; those 403s are retried
+    assert sum(fake.rejected.values()) == session.stats["rate_limited_retries"] <= 1
+    assert session.get_stats()["throttle_waits"]["searchScrip"] == 2
+
+
+def test_missing_credentials_return_none(monkeypatch):
+    for name in ("ANGEL_ONE_API_KEY", "ANGEL_ONE_CLIENT_ID", "ANGEL_ONE_PASSWORD", "ANGEL_ONE_TOTP_SECRET"):
+        monkeypatch.delenv(name, raising=False)
+    session = BrokerSession()
+    assert session.call("ltpData", "NSE", "X", "1") is None
+    assert "credentials" in session.last_error
+
+
+def test_token_bucket_reports_wait_for_empty_bucket():
+    now = [0.0]
+    bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+    assert bucket._reserve() == 0 and bucket._reserve() == 0
+    assert bucket._reserve() == pytest.approx(0.5)
+    assert bucket.acquire(timeout=0.1) is False
+    now[0] += 1.0
+    assert bucket._reserve() == 0
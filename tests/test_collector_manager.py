@@ -0,0 +1,155 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.agents.collectors.collector_manager import CollectorManager
+
+
+def _overlap(gate):
+    # Every collector sharing the gate must be in flight at once to pass it
+    if gate is not None:
+        gate.wait()
+
+
+class SlowMarket:
+    name, status = "NSEDataCollector", "running"
+
+    def __init__(self, delay, gate=None):
+        self.delay = delay
+        self.gate = gate
+
+    def get_indices(self):
+        _overlap(self.gate)
+        time.sleep(self.delay)
+        return {"NIFTY 50": {"price": 24500.0}}
+
+
+class News:
+    name, status = "NewsEventCollector", "running"
+
+    def __init__(self, delay=0.0, gate=None):
+        self.delay = delay
+        self.gate = gate
+
+    def get_economic_calendar(self):
+        _overlap(self.gate)
+        time.sleep(self.delay)
+        return [{"event": "RBI Policy"}, {"event": "CPI"}]
+
+    def get_market_sentiment(self):
+        return {"sentiment": "NEUTRAL"}
+
+
+class OrderBook:
+    name, status = "OrderBookAnalyzer", "running"
+
+    def __init__(self, delay=0.0, gate=None):
+        self.delay = delay
+        self.gate = gate
+
+    def get_order_book(self, symbol):
+        _overlap(self.gate)
+        time.sleep(self.delay)
+        return {"symbol": symbol, "bids": [], "asks": []}
+
+    def persist(self):
+        return 0
+
+
+class BrokenTechnical:
+    name, status = "TechnicalIndicatorCollector", "running"
+
+    def get_indicators(self, symbol):
+        raise RuntimeError("database locked")
+
+
+def test_cycle_runs_collectors_concurrently():
+    # A serial cycle would leave the first collector waiting alone until the barrier breaks
+    gate = threading.Barrier(3, timeout=2.0)
+    manager = CollectorManager(collectors={
+        "market_data": SlowMarket(0.3, gate), "news": News(0.3, gate), "order_book": OrderBook(0.3, gate)
+    })
+    summary = asyncio.run(manager.run_all_collectors())
+
+    assert summary["status"] == "success"
+    assert not gate.broken
+    assert summary["details"] == {"market_data": "active", "news": 2, "order_book": "captured"}
+    assert summary["market"]["NIFTY 50"]["price"] == 24500.0
+    assert set(summary["latency_ms"]) == {"market_data", "news", "order_book"}
+    assert all(ms >= 250 for ms in summary["latency_ms"].values())
+    manager.shutdown()
+
+
+def test_deadline_and_failure_return_partial_summary():
+    manager = CollectorManager(
+        collectors={"market_data": SlowMarket(2.0), "news": News(), "technical": BrokenTechnical()},
+        deadlines={"market_data": 0.2}
+    )
+    started = time.perf_counter()
+    summary = asyncio.run(manager.run_all_collectors())
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.0
+    assert summary["status"] == "partial"
+    assert summary["details"]["market_data"] == "timeout"
+    assert summary["details"]["technical"] == "failed"
+    assert summary["details"]["news"] == 2
+    assert "database locked" in summary["errors"]["technical"]
+    assert "market" not in summary
+
+    stats = manager.get_latency_stats()
+    assert stats["market_data"]["samples"] == 1
+    assert 150 <= stats["market_data"]["last"] < 1000
+    manager.shutdown()
+
+
+class FeedMarket(SlowMarket):
+    """Market collector whose tick feed points at a local replay server."""
+
+    def __init__(self):
+        super().__init__(0.0)
+
+    def create_tick_feed(self, tokens=None, bus=None, url=None, mode=None):
+        from backend.streaming.smartapi_feed import SmartAPIFeed
+        feed = SmartAPIFeed("jwt", "key", "A123", "feed", bus=bus, url=url, mode=mode)
+        feed.add_tokens(tokens)
+        return feed
+
+
+def test_depth_feed_fills_the_order_book():
+    from backend.agents.collectors.order_book import OrderBookAnalyzer
+    from backend.streaming.replay_server import TickReplayServer
+    from backend.streaming.smartapi_protocol import NSE_FO
+
+    class MemoryDB:
+        def save_order_book_snapshots(self, rows):
+            return True
+
+    async def scenario():
+        server = TickReplayServer(port=0, rate=2000)
+        await server.start()
+        analyzer = OrderBookAnalyzer()
+        analyzer.persist = lambda: analyzer.store.persist(MemoryDB())
+        manager = CollectorManager(collectors={"market_data": FeedMarket(), "order_book": analyzer})
+        assert (await manager.run_all_collectors())["details"]["order_book"] == "no_feed"
+
+        task = asyncio.create_task(manager.run_depth_feed({"NIFTY": (NSE_FO, "35001")}, url=server.url))
+        try:
+            for _ in range(100):
+                if analyzer.get_order_book("NIFTY"):
+                    break
+                await asyncio.sleep(0.05)
+            summary = await manager.run_all_collectors()
+        finally:
+            await manager.depth_feed.stop()
+            await asyncio.wait_for(task, 5)
+            await server.stop()
+            manager.shutdown()
+        return summary
+
+    summary = asyncio.run(scenario())
+    assert summary["details"]["order_book"] == "captured"
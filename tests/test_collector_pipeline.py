@@ -0,0 +1,96 @@
+import asyncio
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.agents.collectors.base_collector import BaseCollectorAgent
+from backend.utils.strategy_dedup import StrategyDeduplicator
+
+
+class _Collector(BaseCollectorAgent):
+    max_in_flight = 3
+    reorder_window = 5
+    persist_batch_size = 4
+
+    def __init__(self, strategies):
+        super().__init__("collector_test", "test")
+        self.deduplicator = StrategyDeduplicator()
+        self.strategies = strategies
+        self.in_flight = self.peak_in_flight = 0
+        self.pending_persist = self.peak_pending = 0
+        self.batches = []
+
+    def collect(self):
+        return [dict(s) for s in self.strategies]
+
+    async def verify_strategy_async(self, strategy):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        await asyncio.sleep(random.uniform(0, 0.02) + (0.1 if strategy["title"] == "s1" else 0))
+        self.in_flight -= 1
+        verified = int(strategy["title"][1:]) % 3 != 0
+        if verified:
+            self.pending_persist += 1
+            self.peak_pending = max(self.peak_pending, self.pending_persist)
+        return {"verified": verified, "confidence": 80.0}
+
+    def _persist_batch(self, batch):
+        self.pending_persist -= len(batch)
+        self.batches.append([s["title"] for s in batch])
+        return len(batch)
+
+    def _annotate(self, strategy, verification):
+        strategy["verification"] = verification
+
+    def _collect_and_log(self):
+        return self.collect()
+
+
+def _strategies(n):
+    return [{"title": f"s{i}", "content": f"rule {i}"} for i in range(n)]
+
+
+def test_pipeline_bounds_concurrency_and_persists_in_order():
+    collector = _Collector(_strategies(20) + [{"title": "S3", "content": "Rule  3"}])
+    result = asyncio.run(collector.run_async(persist=True))
+
+    assert result["total_collected"] == 20  # the case/whitespace duplicate was dropped
+    expected = [f"s{i}" for i in range(20) if i % 3 != 0]
+    assert [t for batch in collector.batches for t in batch] == expected
+    assert all(len(batch) <= 4 for batch in collector.batches)
+    assert result["persisted"] == len(expected)
+    assert collector.peak_in_flight == 3
+    # s1 is slow, so later strategies pile up behind it, but only up to the
+    # window plus a partly filled batch
+    assert collector.peak_pending <= collector.reorder_window + collector.persist_batch_size - 1
+
+
+def test_pipeline_without_persist_or_strategies():
+    collector = _Collector(_strategies(4))
+    result = asyncio.run(collector.run_async())
+    assert result["persisted"] == 0 and collector.batches == []
+    assert [s["title"] for s in result["verified"]] == ["s1", "s2"]
+
+    assert asyncio.run(_Collector([]).run_async())["total_collected"] == 0
+
+
+def test_insert_strategies_batch_keeps_order(monkeypatch, tmp_path):
+    from backend.config import Config
+    from backend.database.db import DatabaseManager
+    monkeypatch.setattr(Config, "DATABASE_TYPE", "sqlite")
+    monkeypatch.setattr(Config, "DATABASE_PATH", str(tmp_path / "strategies.db"))
+    monkeypatch.setattr(DatabaseManager, "_instance", None)
+    db = DatabaseManager()
+
+    ids = db.insert_strategies_batch([
+        {"title": f"s{i}", "content": {"rule": i}, "source": "test", "verification_data": {"confidence": 80}}
+        for i in range(5)
+    ])
+    assert ids == sorted(ids) and len(ids) == 5
+    with db._get_connection() as conn:
+        titles = [row["title"] for row in conn.execute("SELECT title FROM strategies ORDER BY id")]
+    assert titles == [f"s{i}" for i in range(5)]
+    assert [row[:2] for row in db.iter_strategy_texts(batch_size=2)] == list(zip(ids, titles))
+    assert db.insert_strategies_batch([]) == []
@@ -0,0 +1,75 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.ai.consensus_engine import ConsensusEngine, IncrementalConsensus, StreamingScoreExtractor
+
+
+def _response(content, weight=1.0):
+    return {"content": content, "weight": weight, "success": True}
+
+
+def test_incremental_waits_until_leader_cannot_be_overtaken():
+    tracker = IncrementalConsensus(expected=6, quorum=3)
+    assert not tracker.add(_response("Score: 8/10. VIABLE."))
+    assert not tracker.add(_response("Score: 3/10. RISKY."))
+    assert not tracker.add(_response("Score: 7/10. VIABLE."))
+    assert not tracker.add(_response("Score: 8/10. VIABLE."))  # lead 2, 2 outstanding
+    assert tracker.add(_response("Score: 9/10. VIABLE."))
+
+
+def test_incremental_matches_batch_consensus():
+    responses = [_response("Score: 8/10. VIABLE.", 1.2), _response("7 out of 10, moderate"),
+                 {"success": False, "content": None}, _response("Rating: 6. VIABLE.", 0.9)]
+    tracker = IncrementalConsensus(expected=len(responses))
+    for response in responses:
+        tracker.add(response)
+
+    batch = ConsensusEngine(cache=None).calculate_consensus(responses)
+    assert round(tracker.weighted_average_score, 2) == batch["weighted_average_score"]
+    assert round(tracker.agreement_rate * 100, 1) == batch["agreement_rate"]
+    assert round(tracker.confidence, 1) == batch["confidence"]
+
+
+def test_confidence_bound_settles_early():
+    tracker = IncrementalConsensus(expected=8, quorum=2, confidence_bound=40.0)
+    tracker.add(_response("Score: 8/10. VIABLE."))
+    assert tracker.add(_response("Score: 8/10. VIABLE."))
+
+
+def test_early_exit_confidence_ignores_cancelled_calls():
+    # Quorum of 5 out of 8: the 3 cancelled calls must not drag confidence down
+    tracker = IncrementalConsensus(expected=8, quorum=5)
+    for _ in range(5):
+        settled = tracker.add(_response("Score: 8/10. VIABLE."))
+    assert settled and tracker.outstanding == 3
+
+    early = tracker.snapshot()
+    full = ConsensusEngine(cache=None).calculate_consensus([_response("Score: 8/10. VIABLE.")] * 8)
+    assert early["confidence"] == full["confidence"] == 100.0
+    assert round(tracker.confidence, 1) == early["confidence"]
+
+    # Failed calls still count against it
+    failed = ConsensusEngine(cache=None).calculate_consensus(
+        [_response("Score: 8/10. VIABLE.")] * 5 + [{"success": False, "content": None}] * 3)
+    assert failed["confidence"] == 92.5
+
+
+def test_streaming_extractor_waits_for_complete_fields():
+    extractor = StreamingScoreExtractor()
+    assert not extractor.feed("Viability score: 1")
+    assert not extractor.feed("0/10. Recommendation: VIA")
+    assert extractor.score == 10.0
+    assert not extractor.feed("BLE")
+    assert extractor.feed(".\nKey strengths: ")
+    assert extractor.recommendation == "VIABLE"
+
+
+def test_streaming_extractor_agrees_with_batch_score():
+    text = "Viability score: 6/10. Recommendation: MODERATE.\nKey risks: whipsaws."
+    extractor = StreamingScoreExtractor()
+    for i in range(0, len(text), 3):
+        extractor.feed(text[i:i + 3])
+    assert extractor.score == ConsensusEngine(cache=None).extract_score(text)
+    assert extractor.recommendation == "MODERATE"
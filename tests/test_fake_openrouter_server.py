@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("dotenv")
+
+from backend.ai.config.models_config import get_trading_models
+from backend.ai.consensus_engine import ConsensusEngine
+from backend.ai.model_manager import ModelManager
+from backend.ai.multi_ai_verifier import MultiAIVerifier
+from backend.utils.fake_openrouter_server import FakeOpenRouterServer, ModelProfile
+from backend.utils.verification_load_test import run_load_test, synthetic_strategies
+
+
+@pytest.fixture
+def fake():
+    server = FakeOpenRouterServer(default_profile=ModelProfile(median_latency=0.01, latency_sigma=0)).start()
+    yield server
+    server.stop()
+
+
+def _verifier(fake, **kwargs):
+    kwargs.setdefault("router", ModelManager())
+    return MultiAIVerifier(api_key="test", base_url=fake.url, cache=None, audit_rate=0, **kwargs)
+
+
+def test_scripted_answers_reach_the_verifier(fake):
+    models = [m["id"] for m in get_trading_models()]
+    fake.profiles[models[0]] = ModelProfile(median_latency=0, script=["Viability score: 2/10. RISKY."])
+    verifier = _verifier(fake, quorum=len(models), target_weight=float("inf"))
+    try:
+        result = verifier.verify_strategy("Buy when RSI < 30")
+    finally:
+        verifier.close()
+
+    answers = {r["model_id"]: r["content"] for r in result["responses"] if r["success"]}
+    assert answers[models[0]] == "Viability score: 2/10. RISKY."
+    assert all("Viability score:" in text for text in answers.values())
+    assert fake.requests == len(models)
+
+
+def test_failures_and_hangs_are_reported_as_failed_calls(fake):
+    models = [m["id"] for m in get_trading_models()]
+    fake.profiles[models[0]] = ModelProfile(median_latency=0, error_rate=1.0)
+    fake.profiles[models[1]] = ModelProfile(median_latency=0, timeout_rate=1.0, hang_seconds=2)
+    verifier = _verifier(fake, quorum=len(models), target_weight=float("inf"), request_timeout=0.3)
+    try:
+        result = verifier.verify_strategy("Sell when MACD crosses below signal")
+    finally:
+        verifier.close()
+
+    failed = {r["model_id"] for r in result["responses"] if not r["success"]}
+    assert {models[0], models[1]} <= failed
+    assert fake.errors[models[0]] == 1
+    assert fake.timeouts[models[1]] == 1
+
+
+def test_load_test_reports_throughput_and_percentiles(fake):
+    verifier = _verifier(fake)
+
+    async def run():
+        try:
+            return await run_load_test(verifier, synthetic_strategies(8), concurrency=4)
+        finally:
+            await verifier.aclose()
+
+    report = asyncio.run(run())
+
+    assert report["verifications"] == 8
+    assert report["throughput_per_second"] > 0
+    assert {"p50", "p95", "p99"} <= set(report["verification_latency"])
+    assert sum(report["recommendations"].values()) == 8
+
+
+def test_streaming_stops_once_the_answer_is_scored(fake):
+    fake.default_profile = ModelProfile(median_latency=1.0, latency_sigma=0)
+    verifier = _verifier(fake, target_weight=float("inf"), stream=True)
+    try:
+        result = verifier.verify_strategy("Buy when price closes above VWAP")
+    finally:
+        verifier.close()
+
+    successful = [r for r in result["responses"] if r["success"]]
+    assert len(successful) == result["total_models"]
+    engine = ConsensusEngine(cache=None)
+    for response in successful:
+        assert engine.extract_score(response["content"]) > 0
+        assert engine.extract_recommendation(response["content"]) != "UNKNOWN"
+        assert "Key risks" not in response["content"]
+        assert response["duration"] < 0.8
+    assert verifier.get_stats()["streams_closed_early"] == len(successful)
@@ -0,0 +1,208 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.agents.collectors import indicator_batch
+from backend.agents.collectors.indicator_engine import IncrementalIndicatorEngine
+from backend.agents.collectors.technical import TechnicalIndicatorCollector
+
+
+def _ohlc(n, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    high = close + rng.random(n)
+    low = close - rng.random(n)
+    return high, low, close
+
+
+def _same(a, b):
+    for key, value in a.items():
+        if key == "symbol":
+            continue
+        if value is None or b[key] is None:
+            assert value is None and b[key] is None, key
+        else:
+            assert value == pytest.approx(b[key], rel=1e-9, abs=1e-9), key
+
+
+def _reference_rsi(closes, period=14):
+    deltas = np.diff(closes)
+    gains, losses = np.maximum(deltas, 0), np.maximum(-deltas, 0)
+    up, down = gains[:period].mean(), losses[:period].mean()
+    for g, l in zip(gains[period:], losses[period:]):
+        up = (up * (period - 1) + g) / period
+        down = (down * (period - 1) + l) / period
+    return 100 - 100 / (1 + up / down)
+
+
+@pytest.mark.parametrize("n", [1, 10, 20, 27, 28, 60, 400])
+def test_initialize_matches_incremental_updates(n):
+    high, low, close = _ohlc(n)
+    streamed = IncrementalIndicatorEngine(capacity=1)
+    for i in range(n):
+        streamed.update("X", high[i], low[i], close[i])
+    seeded = IncrementalIndicatorEngine(capacity=1)
+    seeded.initialize("X", high, low, close)
+
+    _same(streamed.snapshot("X"), seeded.snapshot("X"))
+
+    # Both keep advancing identically after the seed
+    for engine in (streamed, seeded):
+        engine.update("X", close[-1] + 2, close[-1] - 1, close[-1] + 1)
+    _same(streamed.snapshot("X"), seeded.snapshot("X"))
+
+
+def test_values_match_batch_definitions():
+    high, low, close = _ohlc(300)
+    engine = IncrementalIndicatorEngine()
+    engine.initialize("X", high[:100], low[:100], close[:100])
+    for i in range(100, 300):
+        engine.update("X", high[i], low[i], close[i])
+    snap = engine.snapshot("X")
+
+    assert snap["bars"] == 300
+    assert snap["rsi"] == pytest.approx(_reference_rsi(close))
+    assert snap["ema_20"] == pytest.approx(pd.Series(close).ewm(span=20, adjust=False).mean().iloc[-1])
+    window = close[-20:]
+    assert snap["bb_middle"] == pytest.approx(window.mean())
+    assert snap["bb_upper"] == pytest.approx(window.mean() + 2 * window.std())
+    assert snap["support"] == pytest.approx(low[-20:].min())
+    assert snap["resistance"] == pytest.approx(high[-20:].max())
+    assert 0 <= snap["adx"] <= 100
+
+
+def test_update_many_is_independent_per_symbol():
+    data = {s: _ohlc(80, seed=i) for i, s in enumerate(["A", "B", "C"])}
+    batched = IncrementalIndicatorEngine(capacity=1)  # forces slot growth
+    for i in range(80):
+        batched.update_many(list(data), [d[0][i] for d in data.values()],
+                            [d[1][i] for d in data.values()], [d[2][i] for d in data.values()])
+
+    frame = batched.to_frame()
+    assert list(frame.index) == ["A", "B", "C"]
+    for symbol, (high, low, close) in data.items():
+        single = IncrementalIndicatorEngine()
+        single.initialize(symbol, high, low, close)
+        _same(batched.snapshot(symbol), single.snapshot(symbol))
+        assert frame.loc[symbol, "rsi"] == pytest.approx(single.snapshot(symbol)["rsi"])
+
+
+def test_warm_up_reports_none():
+    engine = IncrementalIndicatorEngine()
+    assert engine.snapshot("X") is None
+    for price in (100.0, 101.0, 102.0):
+        engine.update("X", price + 1, price - 1, price)
+    snap = engine.snapshot("X")
+    assert snap["rsi"] is None and snap["adx"] is None and snap["bb_middle"] is None
+    assert snap["ema_20"] is not None
+
+
+def test_on_bars_consumes_aggregator_batches():
+    engine = IncrementalIndicatorEngine()
+    bars = [{"symbol": "X", "timeframe": "1m", "high": 11, "low": 9, "close": 10},
+            {"symbol": "X", "timeframe": "5m", "high": 99, "low": 1, "close": 50},
+            {"symbol": "X", "timeframe": "1m", "high": 12, "low": 10, "close": 11},
+            {"symbol": "Y", "timeframe": "1m", "high": 21, "low": 19, "close": 20}]
+    engine.on_bars(bars)
+    assert engine.snapshot("X")["bars"] == 2
+    assert engine.snapshot("X")["resistance"] == 12
+    assert engine.snapshot("Y")["bars"] == 1
+
+
+def test_collector_uses_real_adx_and_rsi():
+    high, low, close = _ohlc(120)
+    collector = TechnicalIndicatorCollector()
+    assert collector.calculate_rsi(close.tolist()) == pytest.approx(_reference_rsi(close))
+    adx = collector.calculate_adx(high.tolist(), low.tolist(), close.tolist())
+    assert 0 < adx < 100 and adx != 25.0
+
+    collector.initialize_symbol("X", high[:-1], low[:-1], close[:-1])
+    snap = collector.update_bar("X", high[-1], low[-1], close[-1])
+    assert snap["adx"] == pytest.approx(adx)
+
+
+def test_batch_matches_engine_per_symbol():
+    symbols = ["A", "B", "C", "D"]
+    n = 150
+    high, low, close = (np.column_stack(cols) for cols in zip(*[_ohlc(n, seed=i) for i in range(len(symbols))]))
+    frames = [pd.DataFrame(a, columns=symbols) for a in (high, low, close)]
+    # B lists late, C has a halted stretch, D has too little data to warm up
+    for frame in frames:
+        frame.loc[:39, "B"] = np.nan
+        frame.loc[70:79, "C"] = np.nan
+        frame.loc[:139, "D"] = np.nan
+
+    result = indicator_batch.compute_indicators(*frames)
+    assert result["rsi"].shape == (n, len(symbols))
+    assert result["rsi"]["B"].iloc[:40].isna().all()
+    assert np.isnan(result["adx"].loc[75, "C"])  # inside the gap
+
+    for symbol in symbols:
+        rows = frames[2][symbol].notna()
+        engine = IncrementalIndicatorEngine()
+        engine.initialize(symbol, *(f.loc[rows, symbol].to_numpy() for f in frames))
+        snap = engine.snapshot(symbol)
+        for name in ("rsi", "ema_20", "macd", "macd_signal", "bb_upper", "atr", "plus_di", "adx"):
+            expected = snap[name]
+            actual = result[name][symbol].iloc[-1]
+            if expected is None:
+                assert np.isnan(actual), (symbol, name)
+            else:
+                assert actual == pytest.approx(expected, rel=1e-9), (symbol, name)
+
+    table = indicator_batch.latest(result)
+    assert list(table.index) == symbols
+    assert np.isnan(table.loc["D", "rsi"]) and not np.isnan(table.loc["D", "ema_20"])
+
+
+def test_batch_accepts_single_series_arrays():
+    _, _, close = _ohlc(60)
+    out = indicator_batch.rsi(close)
+    assert out.shape == (60, 1)
+    assert out[-1, 0] == pytest.approx(_reference_rsi(close))
+    assert np.isnan(out[:14]).all()
+
+
+def test_collector_streams_one_minute_bars_from_polls(monkeypatch):
+    from datetime import datetime
+    from backend.agents.collectors import market_data
+    from backend.streaming.bar_aggregator import IST
+
+    saved = []
+    monkeypatch.setattr(market_data.db, "save_market_data_batch", lambda bars: saved.extend(bars) or True)
+    collector = market_data.NSEDataCollector()
+    technical = TechnicalIndicatorCollector().attach(collector)
+
+    start = datetime(2024, 3, 4, 10, 0, tzinfo=IST).timestamp()
+    for i in range(60):  # three minutes of 3-second polls
+        collector.record_quote("NIFTY", start + 3 * i, 22000.0 + i)
+    collector.bar_aggregator.advance(start + 180)
+
+    assert [b["timeframe"] for b in saved] == ["1m"] * 3
+    assert saved[0]["open"] == 22000.0 and saved[0]["close"] == 22019.0
+    assert technical.get_indicators("NIFTY")["bars"] == 3
+
+
+def test_attach_seeds_history_before_bars_flow(monkeypatch):
+    from backend.agents.collectors import market_data
+    from backend.database.db import db
+
+    high, low, close = _ohlc(40)
+    stored = [{"high": h, "low": l, "close": c} for h, l, c in zip(high[:39], low[:39], close[:39])]
+    monkeypatch.setattr(db, "get_market_data_history", lambda symbol, limit, timeframe: stored)
+    monkeypatch.setattr(market_data.db, "save_market_data_batch", lambda bars: True)
+    collector = market_data.NSEDataCollector()
+    technical = TechnicalIndicatorCollector().attach(collector, symbols=["NIFTY"])
+    assert technical.get_indicators("NIFTY")["bars"] == 39
+
+    # A live bar continues the seeded series; the cycle never reseeds over it
+    collector._publish_bar("NIFTY", {"high": high[39], "low": low[39], "close": close[39]})
+    assert technical.load_history("NIFTY") == 0
+    reference = IncrementalIndicatorEngine(capacity=1)
+    reference.initialize("NIFTY", high, low, close)
+    assert technical.get_indicators("NIFTY")["rsi"] == pytest.approx(reference.snapshot("NIFTY")["rsi"])
@@ -0,0 +1,149 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.market_data_gateway import MarketDataGateway, split_symbol
+
+
+class RecordingSession:
+    """Stands in for BrokerSession: records calls and answers like SmartAPI."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def call(self, endpoint, *args, **kwargs):
+        with self._lock:
+            self.calls.append((endpoint, args, kwargs))
+        time.sleep(self.delay)
+        if endpoint == "searchScrip":
+            exchange, name = args
+            return {"status": True, "data": [{"tradingsymbol": f"{name}-BE", "symboltoken": "0"},
+                                             {"tradingsymbol": f"{name}-EQ", "symboltoken": str(len(name))}]}
+        fetched = [{"exchange": exchange, "symbolToken": token, "ltp": 100.0 + int(token)}
+                   for exchange, tokens in kwargs["exchangeTokens"].items() for token in tokens]
+        return {"status": True, "data": {"fetched": fetched, "unfetched": []}}
+
+    def market_calls(self):
+        return [kwargs["exchangeTokens"] for endpoint, _, kwargs in self.calls if endpoint == "getMarketData"]
+
+
+def test_concurrent_requests_for_one_symbol_share_a_fetch():
+    session = RecordingSession(delay=0.2)
+    gateway = MarketDataGateway(session=session, ttl=0)  # no cache: only coalescing can help
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        quotes = list(pool.map(lambda _: gateway.get_quote("NSE", "26000"), range(8)))
+
+    assert all(q["ltp"] == 26100.0 for q in quotes)
+    assert len(session.market_calls()) == 1
+    assert gateway.get_stats()["coalesced"] == 7
+
+
+def test_quotes_are_batched_and_cached():
+    session = RecordingSession()
+    gateway = MarketDataGateway(session=session, ttl=60)
+    instruments = [("NSE", str(i)) for i in range(120)] + [("BSE", "1")]
+    quotes = gateway.get_quotes(instruments)
+
+    assert len(quotes) == 121
+    batches = session.market_calls()
+    assert [sum(len(t) for t in b.values()) for b in batches] == [50, 50, 21]
+
+    again = gateway.get_quotes(instruments[:10])
+    assert again == {k: quotes[k] for k in instruments[:10]}
+    assert len(session.market_calls()) == 3
+    assert gateway.get_stats()["cache_hits"] == 10
+
+
+def test_get_prices_resolves_tickers_once():
+    session = RecordingSession()
+    gateway = MarketDataGateway(session=session, ttl=0)
+    assert gateway.get_prices(["INFY.NS", "SBIN.NS", "INFY.NS"]) == {"INFY.NS": 104.0, "SBIN.NS": 104.0}
+    gateway.get_price("INFY.NS")
+
+    searches = [args for endpoint, args, _ in session.calls if endpoint == "searchScrip"]
+    assert sorted(searches) == [("NSE", "INFY"), ("NSE", "SBIN")]
+    assert len(session.market_calls()) == 2
+
+
+def test_cold_symbols_resolve_concurrently():
+    session = RecordingSession(delay=0.2)
+    gate = threading.Barrier(4, timeout=2.0)
+
+    class GatedSession(RecordingSession):
+        def call(self, endpoint, *args, **kwargs):
+            if endpoint == "searchScrip":
+                gate.wait()  # opens only when all four searches are in flight
+            return session.call(endpoint, *args, **kwargs)
+
+    gateway = MarketDataGateway(session=GatedSession(), ttl=0)
+    prices = gateway.get_prices(["INFY.NS", "SBIN.NS", "TCS.NS", "ITC.NS"])
+    assert set(prices) == {"INFY.NS", "SBIN.NS", "TCS.NS", "ITC.NS"}
+    assert len(session.market_calls()) == 1
+
+
+def test_failed_search_is_not_cached_but_unknown_symbol_is():
+    class FlakySession(RecordingSession):
+        def __init__(self):
+            super().__init__()
+            self.down = True
+
+        def call(self, endpoint, *args, **kwargs):
+            if endpoint == "searchScrip" and self.down:
+                with self._lock:
+                    self.calls.append((endpoint, args, kwargs))
+                raise RuntimeError("gateway timeout")
+            if endpoint == "searchScrip" and args[1] == "NOPE":
+                with self._lock:
+                    self.calls.append((endpoint, args, kwargs))
+                return {"status": True, "data": []}
+            return super().call(endpoint, *args, **kwargs)
+
+    session = FlakySession()
+    gateway = MarketDataGateway(session=session, ttl=0)
+    assert gateway.resolve_token("INFY.NS") is None
+    session.down = False
+    assert gateway.resolve_token("INFY.NS") == ("NSE", "4")
+
+    assert gateway.resolve_token("NOPE.NS") is None
+    assert gateway.resolve_token("NOPE.NS") is None
+    searches = [args for endpoint, args, _ in session.calls if endpoint == "searchScrip"]
+    assert searches.count(("NSE", "INFY")) == 2 and searches.count(("NSE", "NOPE")) == 1
+
+
+def test_instrument_master_preload_skips_search():
+    session = RecordingSession()
+    gateway = MarketDataGateway(session=session, ttl=0)
+    loaded = gateway.load_instrument_master([
+        {"token": "2885", "symbol": "RELIANCE-EQ", "name": "RELIANCE", "exch_seg": "NSE"},
+        {"token": "9999", "symbol": "RELIANCE-BL", "name": "RELIANCE", "exch_seg": "NSE"},
+        {"token": "26000", "symbol": "Nifty 50", "name": "NIFTY", "exch_seg": "NSE"},
+    ])
+    assert loaded == 3
+    assert gateway.resolve_token("RELIANCE.NS") == ("NSE", "2885")
+    assert gateway.get_prices(["RELIANCE.NS"]) == {"RELIANCE.NS": 2985.0}
+    assert not [c for c in session.calls if c[0] == "searchScrip"]
+
+
+def test_failed_fetch_releases_waiters():
+    class BrokenSession(RecordingSession):
+        def call(self, endpoint, *args, **kwargs):
+            time.sleep(0.1)
+            raise RuntimeError("broker down")
+
+    gateway = MarketDataGateway(session=BrokenSession())
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(lambda _: gateway.get_quote("NSE", "1"), range(3)))
+    assert results == [None, None, None]
+    assert gateway.get_stats()["in_flight"] == 0
+
+
+def test_split_symbol():
+    assert split_symbol("RELIANCE.NS") == ("NSE", "RELIANCE")
+    assert split_symbol("SBIN.BO") == ("BSE", "SBIN")
+    assert split_symbol("NIFTY", "NFO") == ("NFO", "NIFTY")
@@ -0,0 +1,98 @@
+import json
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.ai.model_manager import BREAKER_HALF_OPEN, BREAKER_OPEN, ModelManager
+
+MODELS = [{"id": "a", "weight": 1.2}, {"id": "b", "weight": 1.0}, {"id": "c", "weight": 1.0}, {"id": "d", "weight": 0.5}]
+
+
+def test_latency_ewma_and_p95():
+    manager = ModelManager(min_latency_samples=5)
+    for duration in [1.0] * 19 + [5.0]:
+        manager.record_usage("a", duration, True)
+    stats = manager.get_model_stats("a")
+    assert 1.0 < stats["ewma_duration"] < 2.0
+    assert 1.0 < stats["p95_duration"] <= 5.0
+    assert manager.hedge_delay("a") == stats["p95_duration"]
+    assert manager.hedge_delay("b", default=7.0) == 7.0
+
+
+def test_breaker_opens_then_admits_one_trial(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("backend.ai.model_manager.time.time", lambda: clock[0])
+    manager = ModelManager(failure_threshold=3, error_rate_threshold=1.1, breaker_cooldown=30)
+
+    for _ in range(3):
+        assert manager.is_available("a")
+        manager.record_usage("a", 0.1, False, "HTTP 500")
+    assert manager.get_model_stats("a")["breaker_state"] == BREAKER_OPEN
+    assert not manager.is_available("a")
+
+    clock[0] += 31
+    assert manager.is_available("a")  # the trial call
+    assert manager.get_model_stats("a")["breaker_state"] == BREAKER_HALF_OPEN
+    assert not manager.is_available("a")
+    manager.record_usage("a", 0.1, False)
+    assert manager.get_model_stats("a")["breaker_state"] == BREAKER_OPEN
+
+    clock[0] += 31
+    assert manager.is_available("a")
+    manager.record_usage("a", 0.1, True)
+    assert manager.is_available("a") and manager.is_available("a")
+
+
+def test_select_smallest_subset_meeting_target_weight():
+    manager = ModelManager()
+    primaries, spares = manager.select_models(MODELS, target_weight=2.0)
+    assert [m["id"] for m in primaries] == ["a", "b"]
+    assert {m["id"] for m in spares} == {"c", "d"}
+
+    # A faster model wins a tie on weight
+    for _ in range(3):
+        manager.record_usage("c", 0.1, True)
+        manager.record_usage("b", 3.0, True)
+    assert [m["id"] for m in manager.select_models(MODELS, target_weight=2.0)[0]] == ["a", "c"]
+
+    assert manager.select_models(MODELS)[0] == MODELS
+
+
+def test_stats_persist_across_restarts(tmp_path):
+    path = str(tmp_path / "model_stats.json")
+    manager = ModelManager(persist_path=path)
+    for _ in range(6):
+        manager.record_usage("a", 0.4, True)
+    manager.record_usage("b", 1.0, False, "rate limit")
+    manager.save()
+
+    restored = ModelManager(persist_path=path)
+    restored.load()
+    assert restored.get_model_stats("a")["total_calls"] == 6
+    assert restored.hedge_delay("a") == manager.hedge_delay("a")
+    assert restored.get_model_stats("b")["rate_limit_hits"] == 1
+    ModelManager(persist_path=str(tmp_path / "missing.json")).load()
+
+
+def test_automatic_saves_run_off_the_calling_thread(tmp_path, monkeypatch):
+    path = tmp_path / "model_stats.json"
+    manager = ModelManager(persist_path=str(path), save_interval=0)
+    release, writers = threading.Event(), []
+    real_save = manager.save
+
+    def slow_save(path=None):
+        writers.append(threading.current_thread())
+        release.wait(2.0)
+        real_save(path)
+
+    monkeypatch.setattr(manager, "save", slow_save)
+    manager.record_usage("a", 0.4, True)
+    manager.record_usage("a", 0.5, True)  # save still in flight: no second writer
+    assert not path.exists()
+
+    release.set()
+    manager._save_thread.join(2.0)
+    assert writers == [manager._save_thread]
+    assert json.loads(path.read_text())["usage_stats"]["a"]["total_calls"] >= 1
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("dotenv")
+
+from backend.ai.config.models_config import get_trading_models
+from backend.ai.consensus_engine import ConsensusEngine
+from backend.ai.model_manager import ModelManager
+from backend.ai.multi_ai_verifier import MultiAIVerifier
+from backend.ai.verification_cache import VerificationCache
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.server.delays.get(body["model"], 0))
+        if body["model"] in self.server.failing:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        payload = json.dumps({"model": body["model"], "choices": [
+            {"message": {"content": "Viability score: 7/10. VIABLE."}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class _CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.connections = 0
+        self.delays = {}
+        self.failing = set()
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+@pytest.fixture
+def server():
+    httpd = _CountingServer()
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _verifier(server, cache=None, **kwargs):
+    kwargs.setdefault("router", ModelManager())
+    return MultiAIVerifier(api_key="test", base_url=f"http://127.0.0.1:{server.server_address[1]}",
+                           cache=cache, **kwargs)
+
+
+def test_sync_calls_reuse_one_session_and_its_connections(server):
+    verifier = _verifier(server)
+    models = len(get_trading_models())
+    try:
+        for _ in range(5):
+            result = verifier.verify_strategy("Buy RSI < 30, sell RSI > 70")
+            assert result["successful_responses"] == models
+        assert verifier.stats["sessions_created"] == 1
+        # Five rounds of parallel calls, but connections are only opened once
+        assert server.connections <= models
+        assert verifier.analyze_with_model(get_trading_models()[0]["id"], "hi")["success"]
+    finally:
+        verifier.close()
+
+
+def test_async_api_runs_on_the_callers_loop(server):
+    verifier = _verifier(server)
+
+    async def main():
+        first = await verifier.verify_strategy_async("strategy A")
+        second = await verifier.verify_strategy_async("strategy B")
+        await verifier.aclose()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first["successful_responses"] == second["successful_responses"] == len(get_trading_models())
+    assert verifier.stats["sessions_created"] == 1
+    assert verifier._background.loop is None  # the sync facade's thread was never started
+
+
+def test_repeat_verification_is_served_from_cache(server):
+    cache = VerificationCache(path=None)
+    verifier = _verifier(server, cache=cache)
+    models = len(get_trading_models())
+    try:
+        first = verifier.verify_strategy("Buy RSI < 30,\n sell RSI > 70")
+        requests = verifier.stats["requests"]
+        second = verifier.verify_strategy("  buy rsi < 30, SELL rsi > 70 ")
+    finally:
+        verifier.close()
+
+    assert requests == models and verifier.stats["requests"] == models
+    assert first["cached_responses"] == 0 and second["cached_responses"] == models
+    assert all(r["cached"] for r in second["responses"])
+    assert first["cache_key"] == second["cache_key"]
+
+    engine = ConsensusEngine(cache=cache)
+    consensus = engine.calculate_consensus(first["responses"], cache_key=first["cache_key"])
+    assert engine.calculate_consensus(second["responses"], cache_key=second["cache_key"]) == consensus
+    stats = cache.get_stats()
+    assert stats["hit_rate"] == 0.5 and stats["consensus_hits"] == 1
+
+
+def test_early_quorum_returns_without_waiting_for_slow_models(server):
+    models = [m["id"] for m in get_trading_models()]
+    server.delays = {models[-1]: 3.0}
+    verifier = _verifier(server)
+    verifier.quorum = 5
+    verifier.audit_rate = 0.0
+
+    async def main():
+        started = time.perf_counter()
+        result = await verifier.verify_strategy_async("Buy RSI < 30, sell RSI > 70")
+        elapsed = time.perf_counter() - started
+        await verifier.aclose()
+        return result, elapsed
+
+    result, elapsed = asyncio.run(main())
+    assert elapsed < 2.0
+    # Settled after 5 agreeing responses; whichever others were still running got cancelled
+    assert result["early_exit"] and result["responses"][-1]["cancelled"]
+    assert result["successful_responses"] + result["cancelled_responses"] == len(models)
+    assert result["successful_responses"] >= 5
+    assert [r["model_id"] for r in result["responses"]] == models
+    stats = verifier.get_stats()
+    assert stats["early_exits"] == 1 and stats["cancelled_calls"] == result["cancelled_responses"]
+
+
+def test_audited_early_exit_measures_agreement(server):
+    models = [m["id"] for m in get_trading_models()]
+    server.delays = {models[0]: 0.5}
+    verifier = _verifier(server)
+    verifier.audit_rate = 1.0
+
+    async def main():
+        result = await verifier.verify_strategy_async("strategy", quorum=5)
+        await asyncio.gather(*verifier._audits)
+        await verifier.aclose()
+        return result
+
+    result = asyncio.run(main())
+    assert result["early_exit"]
+    stats = verifier.get_stats()
+    assert stats["audits"] == 1 and stats["early_exit_agreement_rate"] == 1.0
+    assert stats["cancelled_calls"] == 0 and stats["latency_p95"] < 0.5
+
+
+def test_routing_trims_fan_out_and_hedges_slow_primaries(server):
+    models = get_trading_models()
+    heaviest = max(models, key=lambda m: m["weight"])
+    router = ModelManager(min_latency_samples=2)
+    verifier = _verifier(server, router=router, target_weight=2.0, hedge_floor=0.05)
+
+    async def main():
+        first = await verifier.verify_strategy_async("strategy A")
+        await verifier.verify_strategy_async("strategy B")
+        # The heaviest model becomes slow; its p95 is still from fast calls
+        server.delays = {heaviest["id"]: 2.0}
+        started = time.perf_counter()
+        slow = await verifier.verify_strategy_async("strategy C")
+        elapsed = time.perf_counter() - started
+        await verifier.aclose()
+        return first, slow, elapsed
+
+    first, slow, elapsed = asyncio.run(main())
+    assert first["total_models"] == 2  # the two heaviest models already reach the target weight
+    assert first["responses"][0]["model_id"] == heaviest["id"]
+    hedged = slow["responses"][0]
+    assert hedged["requested_model"] == heaviest["id"] and hedged["model_id"] != heaviest["id"]
+    assert elapsed < 1.0
+    assert verifier.stats["hedges"] >= 1 and verifier.stats["hedge_wins"] >= 1
+
+
+def test_failing_primary_falls_back_and_is_routed_around(server):
+    models = get_trading_models()
+    heaviest = max(models, key=lambda m: m["weight"])
+    server.failing = {heaviest["id"]}
+    verifier = _verifier(server, target_weight=5.0)
+
+    async def main():
+        results = [await verifier.verify_strategy_async(f"strategy {i}") for i in range(2)]
+        await verifier.aclose()
+        return results
+
+    first, second = asyncio.run(main())
+    # The failure was covered by a spare, so every slot still answered
+    assert first["successful_responses"] == first["total_models"]
+    assert first["responses"][0]["requested_model"] == heaviest["id"]
+    assert verifier.stats["fallbacks"] == 1
+    # Its error rate now discounts its weight below the others
+    assert heaviest["id"] not in [r["requested_model"] for r in second["responses"]]
@@ -0,0 +1,154 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.agents.collectors.order_book import OrderBookAnalyzer
+from backend.agents.collectors.order_book_store import (
+    OrderBookStore, pack_depth, unpack_depth, queue_refills
+)
+from backend.streaming.smartapi_protocol import MODE_SNAP_QUOTE, NSE_CM, Tick, decode_tick, encode_tick
+
+
+def _book(mid, bid_qty, ask_qty, step=0.05):
+    bids = [(round(mid - step * (i + 1), 2), q) for i, q in enumerate(bid_qty)]
+    asks = [(round(mid + step * (i + 1), 2), q) for i, q in enumerate(ask_qty)]
+    return bids, asks
+
+
+def test_ring_is_bounded_and_ordered():
+    store = OrderBookStore(capacity=8, levels=3)
+    for i in range(20):
+        store.record("X", *_book(100, [i, 1, 1], [1, 1, 1]), timestamp=float(i))
+    window = store.window("X")
+    assert window["ts"].tolist() == [float(i) for i in range(12, 20)]
+    assert window["bid_qty"][:, 0].tolist() == list(range(12, 20))
+    assert store.window("X", 3)["ts"].tolist() == [17.0, 18.0, 19.0]
+    assert store.latest("X")["bids"][0] == {"price": 99.95, "qty": 19}
+
+
+def test_rolling_imbalance():
+    store = OrderBookStore(levels=2)
+    store.record("X", *_book(100, [300, 0], [100, 0]))   # +0.5
+    store.record("X", *_book(100, [100, 0], [300, 0]))   # -0.5
+    store.record("X", *_book(100, [100, 0], [100, 0]))   # 0
+    assert store.imbalance_series("X").tolist() == pytest.approx([0.5, -0.5, 0.0])
+    assert store.imbalance_series("X", window=2).tolist() == pytest.approx([0.5, 0.0, -0.25])
+    assert store.rolling_imbalance("X", window=2) == pytest.approx(-0.25)
+
+
+def test_iceberg_detected_from_repeated_reloads():
+    store = OrderBookStore(levels=3)
+    # Best bid 99.95 is hit down to 100 then reloads to 500, six times over;
+    # the ask side just fluctuates without being depleted and reloaded
+    for cycle in range(6):
+        for qty in (500, 300, 100):
+            store.record("X", *_book(100, [qty, 800, 900], [400 + cycle, 700, 700]))
+    icebergs = store.detect_icebergs("X")
+    assert len(icebergs) == 1
+    found = icebergs[0]
+    assert found["type"] == "BUY" and found["price"] == pytest.approx(99.95)
+    assert found["refills"] == 5
+    assert found["executed_qty"] == 6 * 400
+    assert found["visible_qty"] == 100
+
+
+def test_refills_follow_price_when_levels_shift():
+    # Level 0 empties, so 99.9 moves from slot 1 to slot 0 and keeps reloading
+    px = np.array([[99.95, 99.9], [99.9, 99.85], [99.9, 99.85], [99.9, 99.85], [99.9, 99.85]])
+    qty = np.array([[100, 500], [200, 50], [500, 50], [200, 50], [500, 50]], dtype=float)
+    stats = queue_refills(px, qty)
+    level = stats["price"].tolist().index(99.9)
+    assert stats["refills"][level] == 2
+    assert stats["depleted"][level] == 300 + 300
+
+
+def test_pack_depth_roundtrip_and_legacy_json():
+    prices = np.array([24500.05, 24500.0, np.nan])
+    qtys = np.array([75, 150, 0])
+    blob = pack_depth(prices, qtys)
+    assert len(blob) == 2 * 12
+    px, q = unpack_depth(blob)
+    assert px.tolist() == [24500.05, 24500.0] and q.tolist() == [75, 150]
+    px, q = unpack_depth('[{"price": 10.5, "qty": 3}]')
+    assert px.tolist() == [10.5] and q.tolist() == [3]
+
+
+def test_persist_writes_only_new_snapshots():
+    class FakeDB:
+        def __init__(self):
+            self.rows = []
+
+        def save_order_book_snapshots(self, rows):
+            self.rows.extend(rows)
+            return True
+
+    db = FakeDB()
+    store = OrderBookStore(capacity=4, levels=2)
+    for i in range(3):
+        store.record("X", *_book(100, [100, 100], [50, 50]), timestamp=1700000000.0 + i)
+    assert store.persist(db) == 3
+    store.record("X", *_book(100, [100, 100], [50, 50]), timestamp=1700000003.0)
+    assert store.persist(db) == 1
+    symbol, _, bid_blob, _, imbalance = db.rows[-1]
+    assert symbol == "X" and imbalance == pytest.approx(1 / 3)
+    assert unpack_depth(bid_blob)[1].tolist() == [100, 100]
+
+
+def test_failed_write_keeps_snapshots_pending():
+    class FlakyDB:
+        def __init__(self):
+            self.ok = False
+            self.rows = []
+
+        def save_order_book_snapshots(self, rows):
+            if self.ok:
+                self.rows.extend(rows)
+            return self.ok
+
+    db = FlakyDB()
+    store = OrderBookStore(capacity=4, levels=2)
+    for i in range(2):
+        store.record("X", *_book(100, [100, 100], [50, 50]), timestamp=1700000000.0 + i)
+    assert store.persist(db) == 0
+    assert len(store.pending_rows()) == 2
+    db.ok = True
+    assert store.persist(db) == 2
+    assert store.pending_rows() == [] and len(db.rows) == 2
+
+
+def test_sqlite_roundtrip(monkeypatch):
+    pytest.importorskip("dotenv")
+    from backend.config import Config
+    from backend.database.db import DatabaseManager
+    monkeypatch.setattr(Config, "DATABASE_TYPE", "sqlite")
+    monkeypatch.setattr(Config, "DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "ob.db"))
+    monkeypatch.setattr(DatabaseManager, "_instance", None)
+    db = DatabaseManager()
+
+    store = OrderBookStore(levels=2)
+    store.record("X", *_book(100, [10, 20], [30, 40]), timestamp=1700000000.0)
+    assert store.persist(db) == 1
+    row = db.get_order_book_snapshots("X")[0]
+    assert unpack_depth(row["ask_depth"])[1].tolist() == [30, 40]
+
+
+def test_snap_quote_depth_reaches_analyzer():
+    bids, asks = _book(2450, [10, 20, 30, 40, 50], [11, 21, 31, 41, 51])
+    depth = (tuple((p, q, 3) for p, q in bids), tuple((p, q, 4) for p, q in asks))
+    tick = Tick("2885", NSE_CM, MODE_SNAP_QUOTE, 1, 1700000000000, 2450.0, 1, 2450.0, 100, 0.0, 0.0,
+                2440.0, 2460.0, 2430.0, 2445.0, 0, depth)
+    decoded = decode_tick(encode_tick(tick))
+    assert decoded.depth == depth
+
+    analyzer = OrderBookAnalyzer()
+    analyzer.store.symbol_map["2885"] = "RELIANCE"
+    analyzer.store.on_tick(decoded)
+    book = analyzer.get_order_book("RELIANCE")
+    assert book["bids"][0] == {"price": 2449.95, "qty": 10}
+    assert analyzer.calculate_imbalance(book) == pytest.approx((150 - 155) / 305)
+    assert analyzer.get_order_book("UNKNOWN") == {}
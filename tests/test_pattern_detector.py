@@ -0,0 +1,74 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.ai.pattern_detector import PatternDetector
+
+
+def _candles(length, seed=0):
+    rng = np.random.default_rng(seed)
+    # Coarse price grid so equal tops and bottoms actually occur
+    close = np.round((100 + np.cumsum(rng.normal(0, 2, length))) / 2) * 2
+    open_ = close + rng.normal(0, 1, length)
+    high = np.maximum(open_, close) + rng.random(length)
+    low = np.minimum(open_, close) - rng.random(length) * 3
+    return open_, high, low, close
+
+
+def _loop_double_top(prices, tolerance=0.02):
+    if len(prices) < 20:
+        return False
+    peaks = [(i, prices[i]) for i in range(1, len(prices) - 1) if prices[i - 1] < prices[i] > prices[i + 1]]
+    if len(peaks) < 2:
+        return False
+    (i1, p1), (i2, p2) = peaks[-2], peaks[-1]
+    return abs(p1 - p2) / p1 <= tolerance and min(prices[i1:i2]) < p1 * 0.95
+
+
+def test_scan_matches_single_bar_checks_at_every_bar():
+    detector = PatternDetector()
+    open_, high, low, close = _candles(300)
+    scan = detector.scan(open_, high, low, close)
+
+    closes = list(close)
+    for t in range(len(close)):
+        assert scan['double_top'][t] == _loop_double_top(closes[:t + 1])
+        assert scan['doji'][t] == detector.detect_doji(open_[t], high[t], low[t], close[t])
+        assert scan['hammer'][t] == detector.detect_hammer(open_[t], high[t], low[t], close[t])
+        if t:
+            engulfing = detector.detect_engulfing({'open': open_[t - 1], 'close': close[t - 1]},
+                                                  {'open': open_[t], 'close': close[t]})
+            assert scan['bullish_engulfing'][t] == (engulfing == 'bullish_engulfing')
+            assert scan['bearish_engulfing'][t] == (engulfing == 'bearish_engulfing')
+    assert scan['double_top'].any() and scan['double_bottom'].any()
+
+
+def test_panel_scan_matches_per_symbol_scans():
+    detector = PatternDetector()
+    series = [_candles(120, seed) for seed in range(3)]
+    panel = detector.scan(*(np.column_stack([s[i] for s in series]) for i in range(4)))
+
+    for column, candles in enumerate(series):
+        single = detector.scan(*candles)
+        for name, values in single.items():
+            np.testing.assert_array_equal(panel[name][:, column], values)
+
+
+def test_analyze_patterns_reuses_scan_per_symbol():
+    detector = PatternDetector()
+    open_, high, low, close = _candles(60)
+    candles = [{'open': o, 'high': h, 'low': l, 'close': c, 'timestamp': str(i)}
+               for i, (o, h, l, c) in enumerate(zip(open_, high, low, close))]
+
+    first = detector.analyze_patterns(candles, symbol='TCS')
+    second = detector.analyze_patterns(candles, symbol='TCS')
+    frame = pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close})
+
+    assert first == second
+    assert detector.stats == {'scans': 1, 'cache_hits': 1}
+    assert first['patterns'][0]['data'] == detector.detect_support_resistance(list(close))
+    assert detector.analyze_patterns(frame, timestamp='59') == first
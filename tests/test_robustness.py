@@ -0,0 +1,74 @@
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from backend.intelligence.backtester import BacktestEngine
+from backend.intelligence.robustness import MonteCarloRobustness
+from backend.intelligence.walk_forward import WalkForwardOptimizer
+
+
+def _synthetic_prices(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0004, 0.015, n)))
+    index = pd.bdate_range("2021-01-01", periods=n)
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1000}, index=index)
+
+
+def test_trade_shuffle_keeps_final_equity():
+    mc = MonteCarloRobustness(n_resamples=500, seed=1)
+    report = mc.trade_shuffle([500, -200, 300, -100, 50], 10000)
+    assert report["final_equity"]["lower"] == report["final_equity"]["upper"] == 10550
+    assert report["max_drawdown_pct"]["lower"] <= report["max_drawdown_pct"]["upper"] <= 0
+
+
+def test_block_bootstrap_interval_is_ordered():
+    returns = np.random.default_rng(0).normal(0.0005, 0.01, 252)
+    report = MonteCarloRobustness(n_resamples=2000, seed=2).block_bootstrap(returns, 100000)
+    for key in ("sharpe_ratio", "sortino_ratio", "max_drawdown_pct", "total_return_pct"):
+        assert report[key]["lower"] <= report[key]["median"] <= report[key]["upper"]
+    assert 0 <= report["prob_loss"] <= 1
+
+
+def test_entry_delay_zero_reproduces_path():
+    prices = np.array([100, 101, 103, 102, 105, 104, 106], dtype=float)
+    exposure = [0, 1, 1, 0, 1, 1, 0]
+    report = MonteCarloRobustness(n_resamples=10, seed=3).entry_delay(prices, exposure, 1000, max_delay=0)
+
+    expected = 1000 * (103 / 101) * (102 / 103) * (104 / 105) * (106 / 104)
+    assert abs(report["final_equity"]["median"] - expected) < 1e-3
+
+
+def test_analyze_backtest_results_and_robust_fitness():
+    df = _synthetic_prices()
+    results = BacktestEngine().run_backtest_on_data(df, "SMA_CROSSOVER", 100000,
+                                                    {"ma_fast": 5, "ma_slow": 20}, include_curve=True)
+    assert len(results["exposure"]) == len(results["equity_curve"])
+
+    mc = MonteCarloRobustness(n_resamples=1000, seed=4)
+    report = mc.analyze(results, prices=df["Close"].values[-len(results["exposure"]):])
+    assert {"block_bootstrap", "trade_shuffle", "entry_delay"} <= set(report)
+    assert mc.robust_fitness(results, report) >= 0
+
+
+def test_ten_thousand_resamples_are_fast():
+    returns = np.random.default_rng(5).normal(0.0003, 0.012, 252)
+    mc = MonteCarloRobustness(n_resamples=10000, seed=5)
+    start = time.perf_counter()
+    mc.block_bootstrap(returns, 100000)
+    assert time.perf_counter() - start < 1.0
+
+
+def test_walk_forward_robust_objective():
+    optimizer = WalkForwardOptimizer(
+        strategy="SMA_CROSSOVER", param_grid={"ma_fast": [5, 10], "ma_slow": [20]},
+        train_bars=200, test_bars=100, max_workers=1, objective="robust", robust_resamples=200
+    )
+    report = optimizer.run_on_data(_synthetic_prices())
+    assert report["objective"] == "robust"
+    assert "equity_curve" not in report["folds"][0]["in_sample"]
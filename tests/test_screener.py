@@ -0,0 +1,151 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.intelligence.screener import CompiledScreen, ScreenCompileError, ScreenerEngine
+
+
+def _panel(n_symbols=30, days=260, seed=5):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2023-01-02", periods=days)
+    symbols = [f"S{i}" for i in range(n_symbols)]
+    close = 100 + rng.normal(0, 1.5, (days, n_symbols)).cumsum(axis=0)
+    open_ = close + rng.normal(0, 1, (days, n_symbols))
+    frame = lambda values: pd.DataFrame(values, index=dates, columns=symbols)
+    return {"Open": frame(open_), "High": frame(np.maximum(open_, close) + rng.random((days, n_symbols))),
+            "Low": frame(np.minimum(open_, close) - rng.random((days, n_symbols))), "Close": frame(close),
+            "Volume": frame(rng.integers(1_000, 9_000, (days, n_symbols)).astype(float))}
+
+
+def _bars(panel, row):
+    return [{"symbol": s, "timeframe": "1d", "timestamp": panel["Close"].index[row],
+             **{f.lower(): panel[f].iloc[row][s] for f in ("Open", "High", "Low", "Close", "Volume")}}
+            for s in panel["Close"].columns]
+
+
+def test_screens_match_pandas_definitions():
+    panel = _panel()
+    engine = ScreenerEngine()
+    engine.load_panel(panel)
+    results = {r["id"]: r for r in engine.get_results(refresh=False)}
+
+    close, open_, high, low = panel["Close"], panel["Open"], panel["High"], panel["Low"]
+    last = lambda mask: sorted(mask.columns[mask.iloc[-1].to_numpy()])
+    assert results["resistance_breakout"]["symbols"] == last(close > high.shift(1).rolling(20).max())
+    assert results["support_breakdown"]["symbols"] == last(close < low.shift(1).rolling(20).min())
+    engulf = (close.shift() > open_.shift()) & (close < open_) & (open_ >= close.shift()) & (close <= open_.shift())
+    assert results["bearish_engulfing"]["symbols"] == last(engulf)
+    fast, slow = close.rolling(50).mean(), close.rolling(200).mean()
+    assert results["golden_cross"]["symbols"] == last((fast > slow) & (fast.shift() <= slow.shift()))
+    assert results["rsi_oversold"]["count"] == len(results["rsi_oversold"]["symbols"])
+
+
+def test_incremental_bars_match_full_reload():
+    panel = _panel(days=240)
+    streamed = ScreenerEngine()
+    streamed.load_panel({k: v.iloc[:230] for k, v in panel.items()})
+    for row in range(230, 240):
+        streamed.on_bars(_bars(panel, row))
+
+    reloaded = ScreenerEngine()
+    reloaded.load_panel(panel)
+
+    assert streamed.get_results(refresh=False) == reloaded.get_results(refresh=False)
+    assert streamed.stats["incremental_updates"] == 10
+    for name in ("rsi", "macd_signal", "adx"):
+        assert np.allclose(streamed._columns[name][-1], reloaded._columns[name][-1], equal_nan=True)
+
+
+def test_cached_reads_do_not_reevaluate_and_new_symbols_are_added():
+    panel = _panel(n_symbols=500)
+    engine = ScreenerEngine()
+    engine.load_panel(panel)
+
+    evaluations = engine.stats["evaluations"]
+    first = engine.get_results(refresh=False)
+    for _ in range(100):
+        assert engine.get_results(refresh=False) == first
+    assert engine.stats["evaluations"] == evaluations
+
+    engine.on_bars([{"symbol": "NEW", "timeframe": "1d", "timestamp": "2024-01-01",
+                     "open": 1, "high": 2, "low": 0.5, "close": 1.5, "volume": 10}])
+    assert engine.symbols[-1] == "NEW"
+    assert engine.mask("rsi_oversold").shape == (engine.history, 501)
+
+
+def test_dashboard_endpoint_falls_back_to_provider_bars(monkeypatch):
+    from flask import Flask
+    from backend.api import dashboard_routes
+
+    panel = _panel(n_symbols=5, days=300)
+
+    class EmptyStore:
+        def get_market_data_panel(self, symbols, limit, timeframe):
+            return []  # only 1m bars are collected locally
+
+    class Provider:
+        def get_historical_data(self, symbol, period="1y", interval="1d"):
+            name = symbol.rsplit(".", 1)[0]
+            return pd.DataFrame({f: panel[f][name] for f in ("Open", "High", "Low", "Close", "Volume")})
+
+    engine = ScreenerEngine(db=EmptyStore(), data_provider=Provider(),
+                            universe=[f"{s}.NS" for s in panel["Close"].columns])
+    monkeypatch.setattr(dashboard_routes, "screener", engine)
+    app = Flask(__name__)
+    app.register_blueprint(dashboard_routes.dashboard_bp, url_prefix="/api/dashboard")
+
+    client = app.test_client()
+    first = client.get("/api/dashboard/screens").get_json()["screens"]
+    assert all(s["count"] == 0 for s in first)  # served from the empty cache while the panel loads
+    engine._refresh_thread.join(5.0)
+    screens = {s["id"]: s for s in client.get("/api/dashboard/screens").get_json()["screens"]}
+
+    expected = ScreenerEngine()
+    expected.load_panel(panel)
+    for result in expected.get_results(refresh=False):
+        if result["id"] in screens:
+            assert screens[result["id"]]["count"] == result["count"]
+    assert engine.symbols == list(panel["Close"].columns)
+    assert sum(s["count"] for s in screens.values()) > 0
+
+
+def test_empty_sources_are_not_reloaded_on_every_read():
+    calls = {"store": 0, "provider": 0}
+
+    class EmptyStore:
+        def get_market_data_panel(self, symbols, limit, timeframe):
+            calls["store"] += 1
+            return []
+
+    class EmptyProvider:
+        def get_historical_data(self, symbol, period="1y", interval="1d"):
+            calls["provider"] += 1
+            return None
+
+    engine = ScreenerEngine(db=EmptyStore(), data_provider=EmptyProvider(), universe=["A.NS", "B.NS"])
+    first = engine.get_results()
+    engine._refresh_thread.join(5.0)
+    second = engine.get_results()
+
+    assert calls == {"store": 1, "provider": 2}
+    assert engine.schedule_refresh() is None
+    assert first == second and all(r["count"] == 0 for r in second)
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os').system('x')", "close.real > 1", "foo > 1", "highest(close, n)", "close if rsi else open"
+])
+def test_rejects_expressions_outside_the_grammar(expression):
+    with pytest.raises(ScreenCompileError):
+        CompiledScreen({"id": "bad", "expression": expression})
+
+
+def test_lookback_covers_nested_windows():
+    assert CompiledScreen({"id": "a", "expression": "rsi < 30"}).window == 1
+    assert CompiledScreen({"id": "b", "expression": "close > highest(prev(high), 20)"}).window == 21
+    assert CompiledScreen({"id": "c", "expression": "crosses_above(sma(close, 50), sma(close, 200))"}).window == 201
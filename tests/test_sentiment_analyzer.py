@@ -0,0 +1,54 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.ai.sentiment_analyzer import LexiconScorer, SentimentAnalyzer, SymbolMatcher
+
+
+def test_matcher_agrees_with_substring_scan():
+    symbols = ["TCS", "INFY", "SBIN", "SBI", "BI", "M&M", "ITC"]
+    words = ["tcs", "Infy", "SBINs", "ITChing", "m&m", "sbi", "gains", "falls", "bin"]
+    rng = random.Random(3)
+    headlines = [" ".join(rng.choice(words) for _ in range(5)) for _ in range(300)]
+
+    routed = SymbolMatcher(symbols).route(headlines)
+
+    for symbol, rows in zip(symbols, routed):
+        assert rows == [i for i, h in enumerate(headlines) if symbol.upper() in h.upper()]
+
+
+def test_each_distinct_headline_is_scored_once_and_cache_is_bounded():
+    analyzer = SentimentAnalyzer(backend="lexicon", max_cache_entries=3)
+    headlines = ["TCS rallies", "TCS rallies", "INFY plunges", "ITC flat", "SBIN beats", "SBIN beats"]
+
+    results = analyzer.get_universe_sentiment(["TCS", "INFY", "SBIN", "HDFC"], headlines)
+
+    assert analyzer.stats["misses"] == 4
+    assert len(analyzer.sentiment_cache) == 3
+    assert results["TCS"]["total_count"] == 2
+    assert results["TCS"]["sentiment"] == "positive"
+    assert results["INFY"]["sentiment"] == "negative"
+    # No headline of its own: falls back to the whole batch
+    assert results["HDFC"]["total_count"] == len(headlines)
+
+
+def test_lexicon_scorer_handles_modifiers():
+    scorer = LexiconScorer(lexicon={"good": (0.7, 0.6), "very": (0.2, 0.3)}, intensifiers={"very": 1.3})
+    polarity, _ = scorer.score(["good", "very good", "not good", "isn't very good", "nothing here"])
+    assert list(polarity.round(3)) == [0.7, 0.91, -0.35, -0.455, 0.0]
+
+
+def test_symbol_sentiment_matches_headline_aggregate():
+    pytest.importorskip("textblob")
+    analyzer = SentimentAnalyzer(backend="textblob")
+    headlines = ["Reliance reports strong growth", "Reliance faces terrible losses", "Markets are calm"]
+
+    result = analyzer.get_symbol_sentiment("RELIANCE", headlines)
+
+    expected = analyzer.analyze_headlines(headlines[:2])
+    assert {k: result[k] for k in expected} == expected
+    assert result["symbol"] == "RELIANCE"
@@ -0,0 +1,70 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.strategy_dedup import StrategyDeduplicator
+
+BASE = ("Buy when RSI(14) crosses above 30 and price closes above the 20 day moving average. "
+        "Exit when RSI crosses below 70 or price falls 2% below entry. Works best on liquid large caps "
+        "during trending sessions with volume above the 20 day average.")
+
+
+def _corpus(n, seed=0):
+    rng = np.random.default_rng(seed)
+    words = np.array([f"w{i}" for i in range(5000)])
+    return [(i, f"strategy {i}", " ".join(words[row])) for i, row in enumerate(rng.integers(0, 5000, (n, 40)))]
+
+
+def test_near_duplicates_are_found_and_distinct_text_is_not():
+    index = StrategyDeduplicator()
+    assert index.add("RSI Reversal", BASE, strategy_id=7) is None
+
+    reworded = BASE.replace("liquid large caps", "liquid large-caps").upper() + " "
+    assert index.strategy_id(index.find("rsi reversal", reworded)) == 7
+    assert index.find("MACD momentum", "Go long on a MACD signal cross with a trailing 1.5 ATR stop.") is None
+    assert index.add("RSI Reversal", reworded) is not None and len(index) == 1
+
+
+def test_rebuild_from_loader_and_batch_signatures_match():
+    corpus = _corpus(3000)
+    index = StrategyDeduplicator(loader=lambda: corpus)
+    assert not index.loaded
+    assert index.strategy_id(index.find(*corpus[1234][1:])) == 1234
+    assert len(index) == 3000 and index.loaded
+
+    pairs = [row[1:] for row in corpus[:5]]
+    assert (index.signatures(pairs) == np.array([index.signature(*pair) for pair in pairs])).all()
+
+
+def test_lookups_check_only_band_candidates():
+    corpus = _corpus(20000, seed=1)
+    index = StrategyDeduplicator(loader=lambda: corpus)
+    index.ensure_loaded()
+
+    for _, title, content in corpus[:500]:
+        index.find(title, content + " extra")
+    stats = index.get_stats()
+    assert stats["duplicates"] == 500
+    # LSH buckets narrow each lookup to a handful of rows, not the 20000 indexed
+    assert stats["candidates_checked"] <= 2 * stats["lookups"]
+
+
+def test_added_rows_stay_findable_across_sorts():
+    corpus = _corpus(2500, seed=2)
+    index = StrategyDeduplicator()
+    for strategy_id, title, content in corpus:
+        assert index.add(title, content, strategy_id=strategy_id) is None
+    # Earlier adds were merged into the sorted band arrays, the latest are still in the dicts
+    assert index._sorted_keys.shape[1] > 0 and index._recent_rows
+    for strategy_id in (0, 1500, 2499):
+        _, title, content = corpus[strategy_id]
+        assert index.strategy_id(index.find(title, content + " extra")) == strategy_id
+
+    signatures = index.signatures([row[1:] for row in corpus[:10]])
+    bulk = StrategyDeduplicator()
+    bulk.index_signatures(signatures, [None] * 10)
+    assert bulk.find(*corpus[3][1:]) == 3 and bulk.strategy_id(3) is None
+    assert bulk.get_stats()["index_bytes"] > 0
@@ -0,0 +1,65 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.intelligence.backtester import BacktestEngine
+from backend.intelligence.streaming_backtest import StreamingBacktest
+
+METRICS = ["final_equity", "total_return_pct", "max_drawdown_pct", "sharpe_ratio",
+           "sortino_ratio", "win_rate", "total_trades"]
+
+
+def _prices(n=500, seed=21):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.02, n)))
+    return pd.DataFrame({"Close": close}, index=pd.bdate_range("2020-01-01", periods=n))
+
+
+@pytest.mark.parametrize("strategy,params", [
+    ("SMA_CROSSOVER", {"ma_fast": 10, "ma_slow": 30}),
+    ("RSI_STRATEGY", {"rsi_period": 14, "rsi_overbought": 65, "rsi_oversold": 35}),
+    ("EVOLUTION_DNA", {"rsi_period": 10, "rsi_overbought": 70, "rsi_oversold": 40, "ma_fast": 10, "ma_slow": 40}),
+])
+def test_streaming_matches_batch(strategy, params):
+    df = _prices()
+    engine = BacktestEngine(data_provider=False)
+    batch = engine.run_backtest_on_data(df, strategy, 100000, params)
+    stream = StreamingBacktest(strategy, params).warm_up(df).results()
+
+    for metric in METRICS:
+        assert stream[metric] == pytest.approx(batch[metric], abs=0.011), metric
+    assert stream["trades"] == batch["trades"]
+
+
+def test_prefix_consistency_bar_by_bar():
+    df = _prices(n=120)
+    engine = BacktestEngine(data_provider=False)
+    stream = StreamingBacktest("SMA_CROSSOVER", {"ma_fast": 5, "ma_slow": 15})
+    for i, (ts, close) in enumerate(zip(df.index, df["Close"])):
+        stream.on_bar({"close": close, "timestamp": ts})
+        if i in (20, 60, 119):
+            batch = engine.run_backtest_on_data(df.iloc[:i + 1], "SMA_CROSSOVER", 100000, {"ma_fast": 5, "ma_slow": 15})
+            assert stream.results()["final_equity"] == batch["final_equity"]
+
+
+class _Feed:
+    def __init__(self):
+        self.listeners = []
+
+    def add_bar_listener(self, callback):
+        self.listeners.append(callback)
+
+
+def test_attach_filters_by_symbol():
+    feed = _Feed()
+    stream = StreamingBacktest("SMA_CROSSOVER", {"ma_fast": 2, "ma_slow": 3}).attach(feed, "NIFTY")
+    for listener in feed.listeners:
+        listener("NIFTY", {"close": 100.0})
+        listener("BANKNIFTY", {"close": 50000.0})
+    assert stream.bars == 1
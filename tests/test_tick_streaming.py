@@ -0,0 +1,116 @@
+import sys
+import os
+import asyncio
+import json
+import struct
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from backend.streaming.smartapi_protocol import (
+    Tick, MODE_LTP, MODE_QUOTE, MODE_SNAP_QUOTE, NSE_CM, NSE_FO, LTP_PACKET_SIZE, QUOTE_PACKET_SIZE,
+    SNAP_QUOTE_PACKET_SIZE, decode_tick, encode_tick, subscribe_messages
+)
+from backend.streaming.tick_bus import TickBus
+
+
+def _quote(token="2885", ltp=2450.55, seq=1, mode=MODE_QUOTE):
+    return Tick(token, NSE_CM, mode, seq, 1700000000000, ltp, 10, 2449.1, 123456, 1500.0, 900.0,
+                2440.0, 2460.25, 2435.5, 2438.0)
+
+
+def test_encode_decode_roundtrip():
+    ltp = Tick("99926000", NSE_CM, MODE_LTP, 7, 1700000000000, 19876.35)
+    packet = encode_tick(ltp)
+    assert len(packet) == LTP_PACKET_SIZE
+    assert decode_tick(packet) == ltp
+
+    quote = _quote()
+    packet = encode_tick(quote)
+    assert len(packet) == QUOTE_PACKET_SIZE
+    assert decode_tick(packet) == quote
+
+    snap = _quote(mode=MODE_SNAP_QUOTE)._replace(open_interest=4200)
+    packet = encode_tick(snap)
+    assert len(packet) == SNAP_QUOTE_PACKET_SIZE
+    assert decode_tick(packet).open_interest == 4200
+
+
+def test_snap_quote_depth_at_sdk_offsets():
+    # Built field by field at the offsets the SmartAPI SDK parses
+    packet = bytearray(379)
+    struct.pack_into("<bb", packet, 0, MODE_SNAP_QUOTE, NSE_CM)
+    packet[2:6] = b"2885"
+    struct.pack_into("<q", packet, 43, 245055)
+    struct.pack_into("<q", packet, 131, 4200)                 # open interest
+    struct.pack_into("<hqqh", packet, 147, 1, 50, 245050, 3)  # best bid
+    struct.pack_into("<hqqh", packet, 247, 0, 75, 245060, 2)  # best ask
+    struct.pack_into("<qqqq", packet, 347, 269500, 220500, 280000, 190000)  # limits, not depth
+
+    tick = decode_tick(bytes(packet))
+    assert tick.open_interest == 4200
+    assert tick.depth == (((2450.5, 50, 3),), ((2450.6, 75, 2),))
+
+    # encode_tick writes the same layout
+    roundtrip = decode_tick(encode_tick(tick._replace(sequence=0, exchange_ts=0)))
+    assert roundtrip.depth == tick.depth
+
+
+def test_subscribe_messages_respect_token_limit():
+    tokens = {NSE_CM: [str(i) for i in range(1500)], NSE_FO: [str(i) for i in range(700)]}
+    messages = [json.loads(m) for m in subscribe_messages(tokens)]
+    counts = [sum(len(e["tokens"]) for e in m["params"]["tokenList"]) for m in messages]
+    assert counts == [1000, 1000, 200]
+
+
+def test_bus_drops_oldest_for_slow_subscribers():
+    async def scenario():
+        bus = TickBus()
+        slow = bus.subscribe(tokens=["2885"], maxsize=3)
+        everything = bus.subscribe(maxsize=100)
+        seen = []
+        bus.add_listener(seen.append, tokens=["2885"])
+
+        for seq in range(10):
+            bus.publish(_quote(seq=seq))
+        bus.publish(_quote(token="1594"))
+
+        assert slow.queue.qsize() == 3 and slow.dropped == 7
+        assert [(await slow.get()).sequence for _ in range(3)] == [7, 8, 9]
+        assert everything.queue.qsize() == 11
+        assert len(seen) == 10
+        assert bus.latest["1594"].token == "1594"
+
+    asyncio.run(scenario())
+
+
+def test_replay_server_to_feed_end_to_end():
+    pytest.importorskip("aiohttp")
+    from backend.streaming.replay_server import TickReplayServer
+    from backend.streaming.smartapi_feed import SmartAPIFeed
+
+    async def scenario():
+        server = TickReplayServer(port=0, rate=5000)
+        await server.start()
+        bus = TickBus()
+        feed = SmartAPIFeed("jwt", "key", "A123", "feed", bus=bus, url=server.url)
+        feed.add_tokens({NSE_CM: [str(t) for t in range(300)]})
+        task = asyncio.create_task(feed.run())
+        try:
+            await asyncio.wait_for(feed.connected.wait(), 5)
+            start = time.perf_counter()
+            while feed.stats["ticks"] < 2000 and time.perf_counter() - start < 5:
+                await asyncio.sleep(0.05)
+        finally:
+            await feed.stop()
+            await asyncio.wait_for(task, 5)
+            await server.stop()
+
+        assert feed.stats["ticks"] >= 2000
+        assert feed.stats["decode_errors"] == 0
+        assert len(bus.latest) == 300
+
+    asyncio.run(scenario())
@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.ai.verification_cache import VerificationCache, normalize_strategy_text
+
+
+def _response(model_id, content="Score: 7/10. VIABLE.", tokens=500, success=True):
+    return {"model_id": model_id, "content": content, "success": success, "usage": {"total_tokens": tokens}}
+
+
+def test_normalization_ignores_case_and_whitespace():
+    assert normalize_strategy_text("RSI  Strategy\\n\\nBuy <30") == normalize_strategy_text("rsi strategy buy <30")
+
+
+def test_keys_include_model_and_prompt_version(tmp_path):
+    cache = VerificationCache(path=str(tmp_path / "cache.db"), cost_per_1k_tokens=1.0)
+    cache.put_responses("strategy", [_response("a"), _response("b", success=False)], "v1")
+
+    assert list(cache.get_responses("STRATEGY", ["a", "b"], "v1")) == ["a"]
+    assert cache.get_responses("strategy", ["a"], "v2") == {}
+
+    stats = cache.get_stats()
+    assert stats["response_hits"] == 1 and stats["response_misses"] == 2
+    assert stats["estimated_cost_saved_usd"] == 0.5
+
+    # Entries survive a restart
+    assert "a" in VerificationCache(path=str(tmp_path / "cache.db")).get_responses("strategy", ["a"], "v1")
+
+
+def test_ttl_and_lru_eviction():
+    cache = VerificationCache(path=None, max_entries=2)
+    for model_id in ("a", "b"):
+        cache.put_responses("s", [_response(model_id)], "v1")
+    cache.get_responses("s", ["a"], "v1")  # b is now least recently used
+    cache.put_responses("s", [_response("c")], "v1")
+    assert sorted(cache.get_responses("s", ["a", "b", "c"], "v1")) == ["a", "c"]
+
+    cache.ttl = 0
+    assert cache.get_responses("s", ["a", "c"], "v1") == {}
@@ -0,0 +1,57 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from backend.intelligence.walk_forward import WalkForwardOptimizer, make_folds, expand_grid
+
+
+def _synthetic_prices(n=600, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n)))
+    index = pd.bdate_range("2020-01-01", periods=n)
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1000}, index=index)
+
+
+def test_make_folds_rolling_and_anchored():
+    folds = make_folds(500, train_bars=200, test_bars=100)
+    assert [(f.train_start, f.test_start, f.test_end) for f in folds] == [(0, 200, 300), (100, 300, 400), (200, 400, 500)]
+
+    anchored = make_folds(500, train_bars=200, test_bars=100, anchored=True)
+    assert all(f.train_start == 0 for f in anchored)
+    assert [f.test_start for f in anchored] == [200, 300, 400]
+
+
+def test_expand_grid_drops_inverted_moving_averages():
+    grid = expand_grid({"ma_fast": [10, 50], "ma_slow": [20, 100]})
+    assert {"ma_fast": 50, "ma_slow": 20} not in grid
+    assert len(grid) == 3
+
+
+def test_walk_forward_grid_stitches_oos_curve():
+    df = _synthetic_prices()
+    optimizer = WalkForwardOptimizer(
+        strategy="SMA_CROSSOVER",
+        param_grid={"ma_fast": [5, 10], "ma_slow": [20, 40]},
+        train_bars=200, test_bars=100, max_workers=2
+    )
+    report = optimizer.run_on_data(df)
+
+    assert report["total_folds"] == 4
+    # One stitched point per OOS bar, starting right after the first train window
+    assert len(report["oos_equity_curve"]) == 400
+    assert report["oos_equity_curve"][0]["date"] == str(df.index[200])
+    assert set(report["parameter_stability"]["params"]) == {"ma_fast", "ma_slow"}
+
+
+def test_walk_forward_evolution_is_deterministic():
+    df = _synthetic_prices(n=400)
+    kwargs = dict(strategy="EVOLUTION_DNA", method="evolution", train_bars=200, test_bars=100,
+                  population_size=6, generations=2, max_workers=1)
+    first = WalkForwardOptimizer(**kwargs).run_on_data(df)
+    second = WalkForwardOptimizer(**kwargs).run_on_data(df)
+    assert [f["best_params"] for f in first["folds"]] == [f["best_params"] for f in second["folds"]]